@@ -2,10 +2,17 @@ import test from 'node:test';
 import assert from 'node:assert/strict';
 
 import {
+  BASE_PROTOCOL_VERSION,
   createErrorResponse,
   createOkResponse,
+  decodeBinaryFrame,
+  encodeBinaryFrame,
+  MESSAGE_BATCH_FIELDS,
+  negotiateBatchBytes,
+  negotiateProtocolVersion,
   parseBridgeCommand,
   PROTOCOL_VERSION,
+  serializeMessageBatch,
 } from './protocol.js';
 
 test('parseBridgeCommand accepts valid v2 command', () => {
@@ -140,7 +147,7 @@ test('parseBridgeCommand rejects invalid presence_update payload', () => {
   }
 });
 
-test('response envelope uses protocol v2', () => {
+test('response envelope defaults to protocol v2', () => {
   const ok = createOkResponse({ requestId: 'req', accountId: 'default', result: { a: 1 } });
   const err = createErrorResponse({
     requestId: 'req',
@@ -148,8 +155,69 @@ test('response envelope uses protocol v2', () => {
     error: { code: 'ERR_SCHEMA', message: 'bad', retryable: false },
   });
 
-  assert.equal(ok.version, PROTOCOL_VERSION);
+  assert.equal(ok.version, BASE_PROTOCOL_VERSION);
   assert.equal(ok.type, 'response');
-  assert.equal(err.version, PROTOCOL_VERSION);
+  assert.equal(err.version, BASE_PROTOCOL_VERSION);
   assert.equal(err.type, 'response');
 });
+
+test('parseBridgeCommand keeps accepting v2 commands', () => {
+  const parsed = parseBridgeCommand({
+    version: BASE_PROTOCOL_VERSION,
+    type: 'health',
+    token: 'secret',
+    payload: {},
+  });
+
+  assert.equal(parsed.ok, true);
+  if (parsed.ok) {
+    assert.equal(parsed.command.version, BASE_PROTOCOL_VERSION);
+  }
+});
+
+test('negotiateProtocolVersion upgrades only when v3 is offered', () => {
+  assert.equal(negotiateProtocolVersion({}), BASE_PROTOCOL_VERSION);
+  assert.equal(negotiateProtocolVersion({ protocolVersions: [2] }), BASE_PROTOCOL_VERSION);
+  assert.equal(negotiateProtocolVersion({ protocolVersions: [2, 3] }), PROTOCOL_VERSION);
+});
+
+test('negotiateBatchBytes stays under the client frame limit', () => {
+  assert.equal(negotiateBatchBytes({}, 128 * 1024), 128 * 1024);
+  assert.equal(negotiateBatchBytes({ maxFrameBytes: 'big' }, 128 * 1024), 128 * 1024);
+  assert.equal(negotiateBatchBytes({ maxFrameBytes: 64 * 1024 }, 128 * 1024), 63 * 1024);
+  assert.equal(negotiateBatchBytes({ maxFrameBytes: 1024 * 1024 }, 128 * 1024), 128 * 1024);
+});
+
+test('binary frame round-trips a send_media command with inline bytes', () => {
+  const body = Buffer.from([0, 1, 2, 255]);
+  const frame = encodeBinaryFrame(
+    {
+      version: PROTOCOL_VERSION,
+      type: 'send_media',
+      token: 'secret',
+      requestId: 'req-bin',
+      payload: { to: '12345@s.whatsapp.net', mediaInline: true, mimeType: 'image/png' },
+    },
+    body,
+  );
+
+  const decoded = decodeBinaryFrame(frame);
+  assert.equal(decoded.ok, true);
+  if (decoded.ok) {
+    assert.deepEqual([...decoded.body], [...body]);
+    const parsed = parseBridgeCommand(decoded.header);
+    assert.equal(parsed.ok, true);
+  }
+  assert.equal(decodeBinaryFrame(Buffer.from('{"version":3}')).ok, false);
+});
+
+test('message batch carries positional rows', () => {
+  const row = JSON.stringify(MESSAGE_BATCH_FIELDS.map((field) => (field === 'text' ? 'hi' : null)));
+  const batch = JSON.parse(serializeMessageBatch('default', [row, row]));
+
+  assert.equal(batch.version, PROTOCOL_VERSION);
+  assert.equal(batch.type, 'message_batch');
+  assert.deepEqual(batch.payload.fields, [...MESSAGE_BATCH_FIELDS]);
+  assert.equal(batch.payload.rows.length, 2);
+  assert.equal(batch.payload.rows[0][MESSAGE_BATCH_FIELDS.indexOf('text')], 'hi');
+});
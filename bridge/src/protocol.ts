@@ -1,4 +1,33 @@
-export const PROTOCOL_VERSION = 2 as const;
+export const PROTOCOL_VERSION = 3 as const;
+// v2 clients keep working: every connection starts at v2 and is upgraded only
+// when its `health` command advertises v3 in `payload.protocolVersions`.
+export const BASE_PROTOCOL_VERSION = 2 as const;
+export const SUPPORTED_PROTOCOL_VERSIONS = [BASE_PROTOCOL_VERSION, PROTOCOL_VERSION] as const;
+export type ProtocolVersion = (typeof SUPPORTED_PROTOCOL_VERSIONS)[number];
+
+// v3 binary frame: magic "NB", version byte, kind byte, uint32 BE header length,
+// UTF-8 JSON header (a regular command envelope), then the raw attachment bytes.
+export const BINARY_FRAME_MAGIC = 0x4e42;
+export const BINARY_FRAME_PREFIX_BYTES = 8;
+export const BINARY_FRAME_KIND_COMMAND = 1;
+
+// Field order of the positional rows carried by a v3 `message_batch` event.
+export const MESSAGE_BATCH_FIELDS = [
+  'messageId',
+  'chatJid',
+  'participantJid',
+  'senderId',
+  'isGroup',
+  'text',
+  'timestamp',
+  'mentionedJids',
+  'mentionedBot',
+  'replyToBot',
+  'replyToMessageId',
+  'replyToParticipantJid',
+  'replyToText',
+  'media',
+] as const;
 
 const TOKEN_JSON_RE = /("token"\s*:\s*")[^"]*(")/gi;
 const TOKEN_ENV_RE = /(BRIDGE_TOKEN=)[^\s]+/gi;
@@ -15,7 +44,13 @@ export type BridgeCommandType =
   | 'logout'
   | 'health';
 
-export type BridgeEventType = 'message' | 'status' | 'qr' | 'error' | 'response';
+export type BridgeEventType =
+  | 'message'
+  | 'message_batch'
+  | 'status'
+  | 'qr'
+  | 'error'
+  | 'response';
 
 export interface ProtocolError {
   code:
@@ -41,6 +76,8 @@ export interface SendMediaPayload {
   mediaUrl?: string;
   mediaBase64?: string;
   mediaPath?: string;
+  mediaInline?: boolean;
+  mediaBuffer?: Buffer;
   mimeType?: string;
   fileName?: string;
   caption?: string;
@@ -85,7 +122,7 @@ export interface EmptyPayload {
 }
 
 export interface BridgeCommandEnvelope {
-  version: typeof PROTOCOL_VERSION;
+  version: ProtocolVersion;
   type: BridgeCommandType;
   token: string;
   requestId?: string;
@@ -94,7 +131,7 @@ export interface BridgeCommandEnvelope {
 }
 
 export interface BridgeEventEnvelope {
-  version: typeof PROTOCOL_VERSION;
+  version: ProtocolVersion;
   type: BridgeEventType;
   ts: number;
   accountId: string;
@@ -162,12 +199,23 @@ function parseSendMedia(payload: Record<string, unknown>): SendMediaPayload | nu
   const mediaUrl = asOptionalString(payload.mediaUrl);
   const mediaBase64 = asOptionalString(payload.mediaBase64);
   const mediaPath = asOptionalString(payload.mediaPath);
+  const mediaInline = asOptionalBool(payload.mediaInline);
   const mimeType = asOptionalString(payload.mimeType);
   const fileName = asOptionalString(payload.fileName);
   const caption = asOptionalString(payload.caption);
   const replyToMessageId = asOptionalString(payload.replyToMessageId);
-  if (!mediaUrl && !mediaBase64 && !mediaPath) return null;
-  return { to, mediaUrl, mediaBase64, mediaPath, mimeType, fileName, caption, replyToMessageId };
+  if (!mediaUrl && !mediaBase64 && !mediaPath && !mediaInline) return null;
+  return {
+    to,
+    mediaUrl,
+    mediaBase64,
+    mediaPath,
+    mediaInline,
+    mimeType,
+    fileName,
+    caption,
+    replyToMessageId,
+  };
 }
 
 function parseSendPoll(payload: Record<string, unknown>): SendPollPayload | null {
@@ -245,8 +293,12 @@ export function parseBridgeCommand(
     return err('ERR_SCHEMA', 'Command envelope must be an object');
   }
 
-  if (value.version !== PROTOCOL_VERSION) {
-    return err('ERR_PROTOCOL_VERSION', `Expected version ${PROTOCOL_VERSION}`);
+  const version = value.version as ProtocolVersion;
+  if (!SUPPORTED_PROTOCOL_VERSIONS.includes(version)) {
+    return err(
+      'ERR_PROTOCOL_VERSION',
+      `Expected version ${SUPPORTED_PROTOCOL_VERSIONS.join(' or ')}`,
+    );
   }
 
   const type = asString(value.type);
@@ -287,7 +339,7 @@ export function parseBridgeCommand(
   return {
     ok: true,
     command: {
-      version: PROTOCOL_VERSION,
+      version,
       type: typed,
       token,
       requestId,
@@ -345,6 +397,79 @@ export function parseLoginWaitPayload(payload: Record<string, unknown>): LoginWa
   return parsed;
 }
 
+export function negotiateProtocolVersion(payload: Record<string, unknown>): ProtocolVersion {
+  const offered = Array.isArray(payload.protocolVersions) ? payload.protocolVersions : [];
+  return offered.includes(PROTOCOL_VERSION) ? PROTOCOL_VERSION : BASE_PROTOCOL_VERSION;
+}
+
+// Room left in each outbound frame for the message_batch envelope around the rows.
+const BATCH_ENVELOPE_RESERVE_BYTES = 1024;
+const MIN_BATCH_BYTES = 4 * 1024;
+
+/**
+ * Byte budget for the rows of one message batch. Clients advertise their
+ * websocket max frame size as `maxFrameBytes` in `health`; the budget never
+ * exceeds `ceiling`.
+ */
+export function negotiateBatchBytes(payload: Record<string, unknown>, ceiling: number): number {
+  const advertised = payload.maxFrameBytes;
+  if (typeof advertised !== 'number' || !Number.isFinite(advertised) || advertised <= 0) {
+    return ceiling;
+  }
+  const budget = Math.floor(advertised) - BATCH_ENVELOPE_RESERVE_BYTES;
+  return Math.min(ceiling, Math.max(MIN_BATCH_BYTES, budget));
+}
+
+export function encodeBinaryFrame(header: Record<string, unknown>, body: Buffer): Buffer {
+  const headerBytes = Buffer.from(JSON.stringify(header), 'utf8');
+  const prefix = Buffer.alloc(BINARY_FRAME_PREFIX_BYTES);
+  prefix.writeUInt16BE(BINARY_FRAME_MAGIC, 0);
+  prefix.writeUInt8(PROTOCOL_VERSION, 2);
+  prefix.writeUInt8(BINARY_FRAME_KIND_COMMAND, 3);
+  prefix.writeUInt32BE(headerBytes.length, 4);
+  return Buffer.concat([prefix, headerBytes, body]);
+}
+
+/** Split a v3 binary frame; the body is a view into `data`, not a copy. */
+export function decodeBinaryFrame(
+  data: Buffer,
+): { ok: true; header: unknown; body: Buffer } | { ok: false; error: ProtocolError } {
+  if (data.length < BINARY_FRAME_PREFIX_BYTES || data.readUInt16BE(0) !== BINARY_FRAME_MAGIC) {
+    return err('ERR_SCHEMA', 'Invalid binary frame');
+  }
+  if (data.readUInt8(2) !== PROTOCOL_VERSION) {
+    return err('ERR_PROTOCOL_VERSION', `Binary frames require version ${PROTOCOL_VERSION}`);
+  }
+  if (data.readUInt8(3) !== BINARY_FRAME_KIND_COMMAND) {
+    return err('ERR_UNSUPPORTED', 'Unsupported binary frame kind');
+  }
+  const headerEnd = BINARY_FRAME_PREFIX_BYTES + data.readUInt32BE(4);
+  if (headerEnd > data.length) {
+    return err('ERR_SCHEMA', 'Binary frame header exceeds frame');
+  }
+  try {
+    const header: unknown = JSON.parse(
+      data.subarray(BINARY_FRAME_PREFIX_BYTES, headerEnd).toString('utf8'),
+    );
+    return { ok: true, header, body: data.subarray(headerEnd) };
+  } catch {
+    return err('ERR_SCHEMA', 'Invalid binary frame header');
+  }
+}
+
+/**
+ * Serialize a v3 `message_batch` event from rows that were stringified once when
+ * queued, so a burst costs one frame instead of one keyed envelope per message.
+ */
+export function serializeMessageBatch(accountId: string, encodedRows: string[]): string {
+  return (
+    `{"version":${PROTOCOL_VERSION},"type":"message_batch","ts":${Date.now()},` +
+    `"accountId":${JSON.stringify(accountId)},` +
+    `"payload":{"fields":${JSON.stringify(MESSAGE_BATCH_FIELDS)},` +
+    `"rows":[${encodedRows.join(',')}]}}`
+  );
+}
+
 export function createEventEnvelope(params: {
   type: BridgeEventType;
   accountId?: string;
@@ -352,7 +477,7 @@ export function createEventEnvelope(params: {
   payload?: Record<string, unknown>;
 }): BridgeEventEnvelope {
   return {
-    version: PROTOCOL_VERSION,
+    version: BASE_PROTOCOL_VERSION,
     type: params.type,
     ts: Date.now(),
     accountId: params.accountId ?? 'default',
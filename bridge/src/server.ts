@@ -7,7 +7,11 @@ import {
   createErrorResponse,
   createEventEnvelope,
   createOkResponse,
+  decodeBinaryFrame,
   isLoopbackAddress,
+  MESSAGE_BATCH_FIELDS,
+  negotiateBatchBytes,
+  negotiateProtocolVersion,
   parseBridgeCommand,
   parseListGroupsPayload,
   parseLoginStartPayload,
@@ -18,8 +22,11 @@ import {
   parseSendPollPayload,
   parseSendTextPayload,
   PROTOCOL_VERSION,
+  serializeMessageBatch,
+  SUPPORTED_PROTOCOL_VERSIONS,
   type BridgeEventEnvelope,
   type ProtocolError,
+  type ProtocolVersion,
 } from './protocol.js';
 import { WhatsAppClient, type InboundMessageV2 } from './whatsapp.js';
 
@@ -27,9 +34,21 @@ type ClientMeta = {
   ws: WebSocket;
   inflight: number;
   droppedEvents: number;
+  protocolVersion: ProtocolVersion;
+  pendingRows: string[];
+  pendingBytes: number;
+  batchBytes: number;
+  flushScheduled: boolean;
 };
 
+// Frame limit for every connection until it has authenticated and negotiated v3.
 const MAX_COMMAND_BYTES = 256 * 1024;
+// Binary media frames (v3 only, after auth) may carry a whole attachment.
+const MAX_MEDIA_FRAME_BYTES = 64 * 1024 * 1024;
+// A message batch is flushed at the end of the current event-loop turn or
+// once it reaches either cap, whichever comes first.
+const MAX_BATCH_MESSAGES = 64;
+const MAX_BATCH_BYTES = 128 * 1024;
 const MAX_INFLIGHT_PER_CLIENT = 20;
 const MAX_BUFFERED_BYTES = 2 * 1024 * 1024;
 
@@ -48,6 +67,15 @@ function constantTimeEqual(a: string, b: string): boolean {
   return timingSafeEqual(aBuf, bBuf);
 }
 
+/**
+ * Raise or lower the frame size `ws` accepts on one connection. ws has no
+ * public per-socket setting; its receiver checks `_maxPayload` on every frame.
+ */
+function setMaxPayload(ws: WebSocket, bytes: number): void {
+  const receiver = (ws as unknown as { _receiver?: { _maxPayload: number } })._receiver;
+  if (receiver) receiver._maxPayload = bytes;
+}
+
 function rawDataByteLength(data: RawData): number {
   if (typeof data === 'string') return Buffer.byteLength(data);
   if (data instanceof ArrayBuffer) return data.byteLength;
@@ -55,11 +83,11 @@ function rawDataByteLength(data: RawData): number {
   return data.byteLength;
 }
 
-function rawDataToString(data: RawData): string {
-  if (typeof data === 'string') return data;
-  if (data instanceof ArrayBuffer) return Buffer.from(data).toString('utf8');
-  if (Array.isArray(data)) return Buffer.concat(data).toString('utf8');
-  return data.toString('utf8');
+function rawDataToBuffer(data: RawData): Buffer {
+  if (typeof data === 'string') return Buffer.from(data, 'utf8');
+  if (data instanceof ArrayBuffer) return Buffer.from(data);
+  if (Array.isArray(data)) return Buffer.concat(data);
+  return data;
 }
 
 export class BridgeServer {
@@ -146,10 +174,19 @@ export class BridgeServer {
         return;
       }
 
-      const meta: ClientMeta = { ws, inflight: 0, droppedEvents: 0 };
+      const meta: ClientMeta = {
+        ws,
+        inflight: 0,
+        droppedEvents: 0,
+        protocolVersion: 2,
+        pendingRows: [],
+        pendingBytes: 0,
+        batchBytes: MAX_BATCH_BYTES,
+        flushScheduled: false,
+      };
       this.clients.add(meta);
 
-      ws.on('message', async (data) => {
+      ws.on('message', async (data, isBinary) => {
         if (meta.inflight >= MAX_INFLIGHT_PER_CLIENT) {
           const event = createErrorResponse({
             error: protocolError('ERR_QUEUE_OVERFLOW', 'Command queue overflow', true),
@@ -160,7 +197,16 @@ export class BridgeServer {
         }
 
         const dataBytes = rawDataByteLength(data);
-        if (dataBytes > MAX_COMMAND_BYTES) {
+        const binaryAllowed = isBinary && meta.protocolVersion >= PROTOCOL_VERSION;
+        if (isBinary && !binaryAllowed) {
+          const event = createErrorResponse({
+            error: protocolError('ERR_UNSUPPORTED', 'Binary frames require protocol v3', false),
+            accountId: this.accountId,
+          });
+          this.sendToClient(meta, event);
+          return;
+        }
+        if (dataBytes > (binaryAllowed ? MAX_MEDIA_FRAME_BYTES : MAX_COMMAND_BYTES)) {
           const event = createErrorResponse({
             error: protocolError('ERR_PAYLOAD_TOO_LARGE', 'Payload too large', false),
             accountId: this.accountId,
@@ -171,7 +217,11 @@ export class BridgeServer {
 
         meta.inflight += 1;
         try {
-          await this.handleClientMessage(meta, rawDataToString(data));
+          if (binaryAllowed) {
+            await this.handleBinaryFrame(meta, rawDataToBuffer(data));
+          } else {
+            await this.handleClientMessage(meta, rawDataToBuffer(data).toString('utf8'));
+          }
         } finally {
           meta.inflight = Math.max(0, meta.inflight - 1);
         }
@@ -187,6 +237,18 @@ export class BridgeServer {
     });
   }
 
+  private async handleBinaryFrame(meta: ClientMeta, data: Buffer): Promise<void> {
+    const frame = decodeBinaryFrame(data);
+    if (!frame.ok) {
+      this.sendToClient(
+        meta,
+        createErrorResponse({ error: frame.error, accountId: this.accountId }),
+      );
+      return;
+    }
+    await this.handleCommand(meta, frame.header, frame.body);
+  }
+
   private async handleClientMessage(meta: ClientMeta, raw: string): Promise<void> {
     let parsedJson: unknown;
     try {
@@ -199,7 +261,14 @@ export class BridgeServer {
       this.sendToClient(meta, event);
       return;
     }
+    await this.handleCommand(meta, parsedJson);
+  }
 
+  private async handleCommand(
+    meta: ClientMeta,
+    parsedJson: unknown,
+    attachment?: Buffer,
+  ): Promise<void> {
     const parsed = parseBridgeCommand(parsedJson);
     if (!parsed.ok) {
       this.sendToClient(
@@ -237,8 +306,30 @@ export class BridgeServer {
       return;
     }
 
+    if (attachment && cmd.type !== 'send_media') {
+      this.sendToClient(
+        meta,
+        createErrorResponse({
+          requestId: cmd.requestId,
+          accountId: this.accountId,
+          error: protocolError('ERR_UNSUPPORTED', `Binary frames are not valid for ${cmd.type}`),
+        }),
+      );
+      return;
+    }
+
+    if (cmd.type === 'health') {
+      // Only an authenticated v3 client may send large binary media frames.
+      meta.protocolVersion = negotiateProtocolVersion(cmd.payload);
+      meta.batchBytes = negotiateBatchBytes(cmd.payload, MAX_BATCH_BYTES);
+      setMaxPayload(
+        meta.ws,
+        meta.protocolVersion >= PROTOCOL_VERSION ? MAX_MEDIA_FRAME_BYTES : MAX_COMMAND_BYTES,
+      );
+    }
+
     try {
-      const result = await this.executeCommand(cmd.type, cmd.payload);
+      const result = await this.executeCommand(cmd.type, cmd.payload, meta, attachment);
       this.sendToClient(
         meta,
         createOkResponse({
@@ -263,6 +354,8 @@ export class BridgeServer {
   private async executeCommand(
     type: string,
     payload: Record<string, unknown>,
+    meta: ClientMeta,
+    attachment?: Buffer,
   ): Promise<Record<string, unknown>> {
     if (!this.wa) {
       throw protocolError('ERR_INTERNAL', 'WhatsApp client unavailable', true);
@@ -276,6 +369,12 @@ export class BridgeServer {
 
     if (type === 'send_media') {
       const parsed = parseSendMediaPayload(payload);
+      if (parsed.mediaInline) {
+        if (!attachment || attachment.length === 0) {
+          throw protocolError('ERR_SCHEMA', 'mediaInline requires a binary frame body', false);
+        }
+        parsed.mediaBuffer = attachment;
+      }
       const sent = await this.wa.sendMedia(parsed);
       return { sent };
     }
@@ -335,8 +434,9 @@ export class BridgeServer {
         { clients: 0, inflight: 0, dropped: 0 },
       );
       return {
-        version: PROTOCOL_VERSION,
-        protocolVersion: PROTOCOL_VERSION,
+        version: meta.protocolVersion,
+        protocolVersion: meta.protocolVersion,
+        supportedProtocolVersions: SUPPORTED_PROTOCOL_VERSIONS,
         bridgeVersion: this.bridgeVersion,
         buildId: this.buildId,
         accountId: this.accountId,
@@ -353,37 +453,75 @@ export class BridgeServer {
   }
 
   private broadcastMessage(msg: InboundMessageV2): void {
-    this.broadcastEvent(
-      createEventEnvelope({
-        type: 'message',
-        accountId: this.accountId,
-        payload: {
-          messageId: msg.messageId,
-          chatJid: msg.chatJid,
-          participantJid: msg.participantJid,
-          senderId: msg.senderId,
-          isGroup: msg.isGroup,
-          text: msg.text,
-          timestamp: msg.timestamp,
-          mentionedJids: msg.mentionedJids,
-          mentionedBot: msg.mentionedBot,
-          replyToBot: msg.replyToBot,
-          replyToMessageId: msg.replyToMessageId,
-          replyToParticipantJid: msg.replyToParticipantJid,
-          replyToText: msg.replyToText,
-          media: msg.media,
-        },
-      }),
-    );
+    const payload: Record<string, unknown> = {
+      messageId: msg.messageId,
+      chatJid: msg.chatJid,
+      participantJid: msg.participantJid,
+      senderId: msg.senderId,
+      isGroup: msg.isGroup,
+      text: msg.text,
+      timestamp: msg.timestamp,
+      mentionedJids: msg.mentionedJids,
+      mentionedBot: msg.mentionedBot,
+      replyToBot: msg.replyToBot,
+      replyToMessageId: msg.replyToMessageId,
+      replyToParticipantJid: msg.replyToParticipantJid,
+      replyToText: msg.replyToText,
+      media: msg.media,
+    };
+    let row: string | null = null;
+    let event: BridgeEventEnvelope | null = null;
+    for (const meta of this.clients) {
+      if (meta.protocolVersion >= PROTOCOL_VERSION) {
+        row ??= JSON.stringify(MESSAGE_BATCH_FIELDS.map((field) => payload[field] ?? null));
+        this.queueMessageRow(meta, row);
+      } else {
+        event ??= createEventEnvelope({ type: 'message', accountId: this.accountId, payload });
+        this.sendToClient(meta, event);
+      }
+    }
+  }
+
+  private queueMessageRow(meta: ClientMeta, row: string): void {
+    // UTF-8 bytes plus the separating comma; flush first if this row would not fit.
+    const rowBytes = Buffer.byteLength(row) + 1;
+    if (meta.pendingRows.length > 0 && meta.pendingBytes + rowBytes > meta.batchBytes) {
+      this.flushMessageRows(meta);
+    }
+    meta.pendingRows.push(row);
+    meta.pendingBytes += rowBytes;
+    if (meta.pendingRows.length >= MAX_BATCH_MESSAGES || meta.pendingBytes >= meta.batchBytes) {
+      this.flushMessageRows(meta);
+      return;
+    }
+    if (!meta.flushScheduled) {
+      meta.flushScheduled = true;
+      setImmediate(() => this.flushMessageRows(meta));
+    }
+  }
+
+  private flushMessageRows(meta: ClientMeta): void {
+    meta.flushScheduled = false;
+    if (meta.pendingRows.length === 0) return;
+    const rows = meta.pendingRows;
+    meta.pendingRows = [];
+    meta.pendingBytes = 0;
+    this.sendRaw(meta, serializeMessageBatch(this.accountId, rows), rows.length);
   }
 
   private sendToClient(meta: ClientMeta, event: BridgeEventEnvelope): void {
+    const stamped =
+      event.version === meta.protocolVersion ? event : { ...event, version: meta.protocolVersion };
+    this.sendRaw(meta, JSON.stringify(stamped), 1);
+  }
+
+  private sendRaw(meta: ClientMeta, frame: string, events: number): void {
     if (meta.ws.readyState !== WebSocket.OPEN) return;
     if (meta.ws.bufferedAmount > MAX_BUFFERED_BYTES) {
-      meta.droppedEvents += 1;
+      meta.droppedEvents += events;
       return;
     }
-    meta.ws.send(JSON.stringify(event));
+    meta.ws.send(frame);
   }
 
   private broadcastEvent(event: BridgeEventEnvelope): void {
@@ -68,6 +68,7 @@ export interface SendMediaInput {
   mediaUrl?: string;
   mediaBase64?: string;
   mediaPath?: string;
+  mediaBuffer?: Buffer;
   mimeType?: string;
   fileName?: string;
   caption?: string;
@@ -260,6 +261,14 @@ async function loadMediaSource(
   mimeType: string;
   fileName?: string;
 }> {
+  if (input.mediaBuffer) {
+    return {
+      buffer: input.mediaBuffer,
+      mimeType: input.mimeType || 'application/octet-stream',
+      fileName: input.fileName,
+    };
+  }
+
   if (input.mediaBase64) {
     const clean = input.mediaBase64.replace(/^data:[^;]+;base64,/, '').trim();
     const buffer = Buffer.from(clean, 'base64');
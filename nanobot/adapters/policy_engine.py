@@ -8,10 +8,11 @@ import re
 import threading
 import time
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, override
 
-import websockets
+from loguru import logger
 
 from nanobot.config.loader import load_config
 from nanobot.core.admin_commands import (
@@ -50,7 +51,9 @@ from nanobot.policy.schema import (
 from nanobot.utils.helpers import safe_filename
 
 if TYPE_CHECKING:
+    from nanobot.memory.session_state import SessionStateStore
     from nanobot.session.manager import SessionManager
+    from nanobot.storage.group_directory import GroupDirectory
 
 _POLICY_ADMIN_USAGE = (
     "Policy commands (owner DM only):\n"
@@ -66,6 +69,8 @@ _POLICY_ADMIN_USAGE = (
     "/policy list-blocked <chat_id@g.us>\n"
     "/policy status-group <chat_id@g.us>"
 )
+# Commands that mutate sessions shared with the responder stay on the event loop.
+_LOOP_ADMIN_NAMESPACES = frozenset({"reset"})
 
 
 def _to_actor(event: InboundEvent) -> ActorContext:
@@ -105,7 +110,15 @@ def _to_admin_context(event: InboundEvent) -> AdminCommandContext:
 
 
 class EnginePolicyAdapter(PolicyPort):
-    """PolicyPort implementation using the typed `PolicyEngine` directly."""
+    """
+    PolicyPort implementation using the typed `PolicyEngine` directly.
+
+    Admin commands (``aroute_admin_command``), policy saves and hot reloads
+    run on one background worker thread; the message path only reads
+    ``self._engine``, which is swapped in a single assignment once a new
+    engine has been compiled and validated. Rebuilds pass the current engine
+    as ``previous``, so unchanged chat overrides are not recompiled.
+    """
 
     def __init__(
         self,
@@ -118,6 +131,8 @@ class EnginePolicyAdapter(PolicyPort):
         session_manager: "SessionManager | None" = None,
         workspace: Path | None = None,
         memory_state_dir: str = "memory/session-state",
+        session_state: "SessionStateStore | None" = None,
+        group_directory: "GroupDirectory | None" = None,
     ) -> None:
         self._engine = engine
         self._known_tools = set(known_tools)
@@ -130,6 +145,7 @@ class EnginePolicyAdapter(PolicyPort):
         else:
             self._workspace = (Path.home() / ".nanobot" / "workspace").resolve()
         self._memory_state_dir = str(memory_state_dir or "memory/session-state")
+        self._session_state = session_state
         self._policy_admin_service: PolicyAdminService | None = None
         self._admin_router = AdminCommandRouter(
             [
@@ -143,6 +159,18 @@ class EnginePolicyAdapter(PolicyPort):
         )
         self._last_reload_check = 0.0
         self._last_mtime_ns = self._stat_mtime_ns()
+        # Serialises engine rebuilds; readers never take it.
+        self._engine_lock = threading.RLock()
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="policy-admin")
+        self._reload_future: Future[None] | None = None
+        self._admin_policy: tuple[int | None, PolicyConfig] | None = None
+        self._stats = {
+            "admin_commands": 0,
+            "reloads": 0,
+            "reload_errors": 0,
+            "rules_compiled": 0,
+            "rules_reused": 0,
+        }
 
         if engine is None:
             self._reload_on_change = False
@@ -165,6 +193,7 @@ class EnginePolicyAdapter(PolicyPort):
                 apply_channels=apply_channels,
                 on_policy_applied=self._on_policy_applied,
                 group_subject_resolver=lambda ids: self._list_group_subjects_from_bridge(ids),
+                group_directory=group_directory,
             )
 
     @property
@@ -216,29 +245,57 @@ class EnginePolicyAdapter(PolicyPort):
         current_mtime = self._stat_mtime_ns()
         if current_mtime == self._last_mtime_ns:
             return
+        # Compile off the message path; evaluation keeps the old engine meanwhile.
+        if self._reload_future is not None and not self._reload_future.done():
+            return
+        self._reload_future = self._worker.submit(self._reload_from_disk)
+
+    def _reload_from_disk(self) -> None:
+        assert self._policy_path is not None
+        with self._engine_lock:
+            current_mtime = self._stat_mtime_ns()
+            if current_mtime == self._last_mtime_ns:
+                return
+            try:
+                new_engine = self._build_engine(load_policy(self._policy_path))
+            except Exception as e:
+                # Keep serving the last good policy until the file changes again.
+                self._stats["reload_errors"] += 1
+                self._last_mtime_ns = current_mtime
+                logger.warning("policy reload from {} failed: {}", self._policy_path, e)
+                return
+            self._swap_engine(new_engine, current_mtime)
+            self._stats["reloads"] += 1
+            logger.info(
+                "policy reloaded ({} rules compiled, {} reused)",
+                new_engine.compile_stats["compiled"],
+                new_engine.compile_stats["reused"],
+            )
 
-        new_policy = load_policy(self._policy_path)
+    def _build_engine(self, policy: PolicyConfig) -> PolicyEngine:
+        assert self._engine is not None
         new_engine = PolicyEngine(
-            policy=new_policy,
+            policy=policy,
             workspace=self._engine.workspace,
             apply_channels=self._engine.apply_channels,
+            previous=self._engine,
         )
         new_engine.validate(self._known_tools)
+        return new_engine
+
+    def _swap_engine(self, new_engine: PolicyEngine, mtime_ns: int | None) -> None:
         self._engine = new_engine
-        self._last_mtime_ns = current_mtime
+        self._admin_policy = None
+        self._last_mtime_ns = mtime_ns
+        self._last_reload_check = time.monotonic()
+        self._stats["rules_compiled"] += new_engine.compile_stats["compiled"]
+        self._stats["rules_reused"] += new_engine.compile_stats["reused"]
 
     def _on_policy_applied(self, policy: PolicyConfig) -> None:
         if self._engine is None:
             return
-        new_engine = PolicyEngine(
-            policy=policy,
-            workspace=self._engine.workspace,
-            apply_channels=self._engine.apply_channels,
-        )
-        new_engine.validate(self._known_tools)
-        self._engine = new_engine
-        self._last_mtime_ns = self._stat_mtime_ns()
-        self._last_reload_check = time.monotonic()
+        with self._engine_lock:
+            self._swap_engine(self._build_engine(policy), self._stat_mtime_ns())
 
     @override
     def evaluate(self, event: InboundEvent) -> PolicyDecision:
@@ -467,6 +524,33 @@ class EnginePolicyAdapter(PolicyPort):
             return None
         return self._admin_router.route(_to_admin_context(event))
 
+    async def aroute_admin_command(self, event: InboundEvent) -> AdminCommandResult | None:
+        """
+        Like `route_admin_command`, but policy persistence runs on the worker thread.
+
+        Session commands (``/reset``) run inline: sessions are owned by the
+        event loop, where the responder and summary refresh also mutate them.
+        """
+        text = event.content.lstrip()
+        if event.channel != "whatsapp" or not text.startswith("/"):
+            return None
+        self._stats["admin_commands"] += 1
+        namespace = text[1:].split(maxsplit=1)[0].lower() if text[1:].strip() else ""
+        if namespace in _LOOP_ADMIN_NAMESPACES:
+            return self.route_admin_command(event)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._worker, self.route_admin_command, event)
+
+    def stats(self) -> dict[str, object]:
+        """Admin command, reload and incremental compile counters."""
+        return dict(self._stats)
+
+    def close(self) -> None:
+        """Finish queued admin commands and reloads, stop the worker, close the audit store."""
+        self._worker.shutdown(wait=True)
+        if self._policy_admin_service is not None:
+            self._policy_admin_service.close()
+
     def policy_admin_is_applicable(self, ctx: AdminCommandContext) -> bool:
         return bool(self._owner_policy_for_context(ctx)) and not ctx.is_group
 
@@ -548,11 +632,14 @@ class EnginePolicyAdapter(PolicyPort):
         except Exception as e:
             return AdminCommandResult(status="handled", response=f"Session reset failed: {e}")
 
-        wal_path = self._session_wal_path(session_key)
         wal_cleared = False
         try:
-            wal_path.unlink()
-            wal_cleared = True
+            if self._session_state is not None:
+                # Also drops buffered appends and rotated segments.
+                wal_cleared = self._session_state.clear(session_key)
+            else:
+                self._session_wal_path(session_key).unlink()
+                wal_cleared = True
         except FileNotFoundError:
             pass
         except Exception:
@@ -783,10 +870,16 @@ class EnginePolicyAdapter(PolicyPort):
     def _load_policy_for_admin(self) -> PolicyConfig | None:
         if self._engine is None or self._policy_path is None:
             return None
-        try:
-            return load_policy(self._policy_path)
-        except Exception:
-            return None
+        # Parsed once per file version; callers get a copy they may mutate.
+        mtime_ns = self._stat_mtime_ns()
+        cached = self._admin_policy
+        if cached is None or mtime_ns is None or cached[0] != mtime_ns:
+            try:
+                cached = (mtime_ns, load_policy(self._policy_path))
+            except Exception:
+                return None
+            self._admin_policy = cached
+        return cached[1].model_copy(deep=True)
 
     def _owner_policy_for_context(self, ctx: AdminCommandContext) -> PolicyConfig | None:
         if ctx.channel != "whatsapp":
@@ -938,16 +1031,10 @@ class EnginePolicyAdapter(PolicyPort):
     def _save_policy_and_reload(self, policy: PolicyConfig) -> None:
         if self._engine is None or self._policy_path is None:
             raise RuntimeError("policy adapter is not configured for persistence")
-        new_engine = PolicyEngine(
-            policy=policy,
-            workspace=self._engine.workspace,
-            apply_channels=self._engine.apply_channels,
-        )
-        new_engine.validate(self._known_tools)
-        save_policy(policy, self._policy_path)
-        self._engine = new_engine
-        self._last_mtime_ns = self._stat_mtime_ns()
-        self._last_reload_check = time.monotonic()
+        with self._engine_lock:
+            new_engine = self._build_engine(policy)
+            save_policy(policy, self._policy_path)
+            self._swap_engine(new_engine, self._stat_mtime_ns())
 
     def _cmd_allow_group(self, tokens: list[str], policy: PolicyConfig) -> str:
         if len(tokens) != 3:
@@ -1270,6 +1357,8 @@ class EnginePolicyAdapter(PolicyPort):
                 "accountId": "default",
                 "payload": {"ids": chat_ids},
             }
+            import websockets
+
             async with websockets.connect(url) as ws:
                 await ws.send(json.dumps(payload))
                 deadline = time.monotonic() + 5.0
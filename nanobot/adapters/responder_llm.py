@@ -13,6 +13,7 @@ from typing import TYPE_CHECKING, Any, override
 
 from loguru import logger
 
+from nanobot.agent.compaction import RETRIEVE_TOOL_NAME, ToolResultCompactor
 from nanobot.agent.context import ContextBuilder
 from nanobot.agent.subagent import SubagentManager
 from nanobot.agent.tools.cron import CronTool
@@ -28,18 +29,33 @@ from nanobot.agent.tools.spawn import SpawnTool
 from nanobot.agent.tools.web import DeepResearchTool, WebFetchTool, WebSearchTool
 from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
-from nanobot.core.models import InboundEvent, PolicyDecision
+from nanobot.core.models import DeferredReply, InboundEvent, PolicyDecision
 from nanobot.core.ports import ResponderPort, SecurityPort, TelemetryPort
 from nanobot.providers.base import LLMProvider
+from nanobot.session.history import HistoryBuilder, estimate_tokens
 from nanobot.session.manager import SessionManager
+from nanobot.media.inline_images import InlineImageCache
 from nanobot.media.tts import strip_markdown_for_tts, truncate_for_voice, write_tts_audio_file
 
 if TYPE_CHECKING:
-    from nanobot.config.schema import ExecToolConfig
+    from nanobot.config.schema import (
+        ExecToolConfig,
+        HistoryConfig,
+        InlineImageConfig,
+        SubagentConfig,
+        ToolResultCompactionConfig,
+    )
     from nanobot.cron.service import CronService
+    from nanobot.media.index import MediaIndex
     from nanobot.media.router import ModelRouter
     from nanobot.media.tts import TTSSynthesizer
     from nanobot.memory.service import MemoryService
+    from nanobot.storage.web_cache import WebCache
+
+
+# Pre-generated LLM cooldown messages per language: batch size and refill threshold.
+TALKATIVE_VARIANT_BATCH = 4
+TALKATIVE_VARIANT_LOW_WATER = 2
 
 
 @dataclass
@@ -77,8 +93,19 @@ class LLMResponder(ResponderPort):
         tts: "TTSSynthesizer | None" = None,
         whatsapp_tts_outgoing_dir: Path | None = None,
         whatsapp_tts_max_raw_bytes: int = 160 * 1024,
+        web_cache: "WebCache | None" = None,
+        media_index: "MediaIndex | None" = None,
+        history_config: "HistoryConfig | None" = None,
+        compaction_config: "ToolResultCompactionConfig | None" = None,
+        image_config: "InlineImageConfig | None" = None,
+        subagent_config: "SubagentConfig | None" = None,
     ) -> None:
-        from nanobot.config.schema import ExecToolConfig
+        from nanobot.config.schema import (
+            ExecToolConfig,
+            HistoryConfig,
+            InlineImageConfig,
+            ToolResultCompactionConfig,
+        )
 
         self.provider = provider
         self.workspace = workspace
@@ -98,18 +125,44 @@ class LLMResponder(ResponderPort):
         self._tts = tts
         self._whatsapp_tts_outgoing_dir = whatsapp_tts_outgoing_dir
         self._whatsapp_tts_max_raw_bytes = max(1, int(whatsapp_tts_max_raw_bytes))
+        self.web_cache = web_cache
+        self._media_index = media_index
         self._seen_chats: set[str] = set()
         self._seen_chats_path = Path.home() / ".nanobot" / "seen_chats.json"
         self._load_seen_chats()
         self._talkative_state: dict[str, _TalkativeCooldownState] = {}
+        self._talkative_variants: dict[str, list[str]] = {}
+        self._talkative_refills: dict[str, asyncio.Task[None]] = {}
 
         self.effective_restrict_to_workspace = restrict_to_workspace or (
             self.exec_config.isolation.enabled
             and self.exec_config.isolation.force_workspace_restriction
         )
 
-        self.context = ContextBuilder(workspace)
+        images = image_config or InlineImageConfig()
+        self.context = ContextBuilder(
+            workspace,
+            images=InlineImageCache(
+                max_pixels=images.max_pixels,
+                model_max_pixels=images.model_max_pixels,
+                jpeg_quality=images.jpeg_quality,
+                cache_entries=images.cache_entries,
+                cache_bytes=images.cache_bytes,
+                max_source_bytes=ContextBuilder.MAX_INLINE_IMAGE_BYTES,
+            ),
+        )
         self.sessions = session_manager or SessionManager(workspace)
+        self.compaction = compaction_config or ToolResultCompactionConfig()
+        history = history_config or HistoryConfig()
+        self.history = HistoryBuilder(
+            max_tokens=history.max_tokens,
+            max_message_tokens=history.max_message_tokens,
+            max_messages=history.max_messages,
+            summarize=self._summarize_history if history.summarize else None,
+            summary_max_tokens=history.summary_max_tokens,
+            max_summary_batch=history.summary_max_batch,
+            on_summary=self.sessions.save,
+        )
         self.tools = ToolRegistry()  # type: ignore[no-untyped-call]  # boundary-any
         subagent_model_to_use = subagent_model or self.model
         self.subagents = SubagentManager(
@@ -118,9 +171,12 @@ class LLMResponder(ResponderPort):
             bus=bus,
             model=subagent_model_to_use,
             tavily_api_key=tavily_api_key,
+            web_cache=web_cache,
             exec_config=self.exec_config,
             restrict_to_workspace=self.effective_restrict_to_workspace,
             file_access_resolver=file_access_resolver,
+            config=subagent_config,
+            telemetry=telemetry,
         )
         self._register_default_tools()
 
@@ -183,6 +239,7 @@ class LLMResponder(ResponderPort):
         exec_tool = ExecTool(
             working_dir=str(self.workspace),
             timeout=self.exec_config.timeout,
+            max_output_bytes=self.exec_config.max_output_bytes,
             restrict_to_workspace=self.effective_restrict_to_workspace,
             allow_host_execution=self.exec_config.allow_host_execution,
             isolation_config=self.exec_config.isolation,
@@ -192,9 +249,9 @@ class LLMResponder(ResponderPort):
         self.tools.register(exec_tool)
         self.tools.register(PiStatsTool())
 
-        self.tools.register(WebSearchTool(api_key=self.tavily_api_key))
-        self.tools.register(WebFetchTool(api_key=self.tavily_api_key))
-        self.tools.register(DeepResearchTool(api_key=self.tavily_api_key))
+        self.tools.register(WebSearchTool(api_key=self.tavily_api_key, cache=self.web_cache))
+        self.tools.register(WebFetchTool(api_key=self.tavily_api_key, cache=self.web_cache))
+        self.tools.register(DeepResearchTool(api_key=self.tavily_api_key, cache=self.web_cache))
 
         message_tool = MessageTool(
             send_callback=self.bus.publish_outbound,
@@ -380,7 +437,9 @@ class LLMResponder(ResponderPort):
             )
 
         out_dir = self._whatsapp_tts_outgoing_dir / "tts"
-        path = write_tts_audio_file(out_dir, audio, ext=".ogg")
+        path = write_tts_audio_file(
+            out_dir, audio, ext=".ogg", media_index=self._media_index, channel=channel
+        )
         await self.bus.publish_outbound(
             OutboundMessage(
                 channel=channel,
@@ -436,11 +495,7 @@ class LLMResponder(ResponderPort):
         return False
 
     def _tool_definitions(self, allowed_tools: set[str]) -> list[dict[str, Any]]:
-        return [
-            schema
-            for schema in self.tools.get_definitions()
-            if schema.get("function", {}).get("name") in allowed_tools
-        ]
+        return self.tools.get_definitions(allowed_tools)
 
     def _should_enable_grants(self, is_owner: bool) -> bool:
         """Check whether grants should be activated for tool execution."""
@@ -473,14 +528,35 @@ class LLMResponder(ResponderPort):
     ) -> str:
         iteration = 0
         final_content: str | None = None
+        tool_definitions = self._tool_definitions(allowed_tools)
+        compactor = (
+            ToolResultCompactor(
+                budgets=self.compaction.budgets,
+                default_budget=self.compaction.default_budget,
+                retrieve_chars=self.compaction.retrieve_chars,
+            )
+            if self.compaction.enabled
+            else None
+        )
+        retrieval_offered = False
 
         while iteration < self.max_iterations:
             iteration += 1
-            response = await self.provider.chat(
-                messages=messages,
-                tools=self._tool_definitions(allowed_tools),
-                model=self.model,
-            )
+            if compactor is not None:
+                compactor.advance()
+                # The retrieval tool only reads back output this loop already
+                # produced, so it is offered regardless of the chat's tool policy.
+                if compactor.has_handles and not retrieval_offered:
+                    tool_definitions = [*tool_definitions, compactor.definition()]
+                    retrieval_offered = True
+            # Background subagents hold their model calls while replies are made.
+            async with self.subagents.interactive():
+                response = await self.provider.chat(
+                    messages=messages,
+                    tools=tool_definitions,
+                    model=self.model,
+                )
+            self._record_prompt_tokens(iteration, messages, response.usage)
 
             if response.has_tool_calls:
                 tool_call_dicts: list[dict[str, Any]] = [
@@ -503,7 +579,10 @@ class LLMResponder(ResponderPort):
                 for tool_call in response.tool_calls:
                     args_preview = json.dumps(tool_call.arguments, ensure_ascii=False)
                     logger.info("Tool call: {}({})", tool_call.name, args_preview[:200])
-                    if tool_call.name not in allowed_tools:
+                    if retrieval_offered and tool_call.name == RETRIEVE_TOOL_NAME:
+                        assert compactor is not None
+                        result = compactor.retrieve(tool_call.arguments)
+                    elif tool_call.name not in allowed_tools:
                         result = (
                             f"Error: Tool '{tool_call.name}' is blocked by policy for this chat."
                         )
@@ -546,15 +625,36 @@ class LLMResponder(ResponderPort):
                         tool_call.name,
                         result,
                     )
+                    if compactor is not None:
+                        compactor.add(messages[-1])
                 continue
 
             final_content = response.content
             break
         else:
-            return "⚙️❓"  # max iterations reached without a text response
+            final_content = "⚙️❓"  # max iterations reached without a text response
 
+        if compactor is not None and compactor.compacted:
+            self._metric("tool_results_compacted", compactor.compacted)
+            self._metric("tool_result_chars_saved", compactor.chars_saved)
         return final_content or "🤔❓"
 
+    def _record_prompt_tokens(
+        self, iteration: int, messages: list[dict[str, Any]], usage: dict[str, int]
+    ) -> None:
+        """Prompt size per loop iteration, from provider usage or a local estimate."""
+        if self.telemetry is None:
+            return
+        tokens = int(usage.get("prompt_tokens") or 0)
+        if not tokens:
+            tokens = sum(
+                estimate_tokens(m["content"]) if isinstance(m.get("content"), str) else 0
+                for m in messages
+            )
+        labels = (("iteration", str(min(iteration, 10))),)
+        self._metric("llm_prompt_tokens", tokens, labels=labels)
+        self._metric("llm_calls", 1, labels=labels)
+
     async def _notify_new_chat(self, channel: str, chat_id: str) -> None:
         """Notify owner when Nano sees a new chat for the first time."""
         if self.owner_alert_resolver is None:
@@ -652,23 +752,58 @@ class LLMResponder(ResponderPort):
             "If you want 24/7 bot chat, get an OpenAI/Kimi/Anthropic subscription."
         )
 
-    async def _generate_talkative_message_llm(self, text: str) -> str | None:
-        language_hint = "German" if self._is_probably_german(text) else "English"
+    async def _summarize_history(
+        self, previous: str, turns: list[dict[str, Any]]
+    ) -> str | None:
+        transcript = "\n".join(f"{t['role']}: {t['content']}" for t in turns)
+        prompt = [
+            {
+                "role": "system",
+                "content": (
+                    "You maintain a running summary of a chat so later replies keep context. "
+                    "Merge the previous summary with the new turns. Keep names, decisions, "
+                    "open questions and facts the participants stated; drop small talk. "
+                    f"Plain text, at most {self.history.summary_max_tokens * 3} characters."
+                ),
+            },
+            {
+                "role": "user",
+                "content": f"Previous summary:\n{previous or '(none)'}\n\nNew turns:\n{transcript}",
+            },
+        ]
+        response = await asyncio.wait_for(
+            self.provider.chat(
+                messages=prompt,
+                tools=[],
+                model=self.model,
+                max_tokens=self.history.summary_max_tokens,
+                temperature=0.2,
+            ),
+            timeout=60.0,
+        )
+        # A failed call comes back as an apology with finish_reason "error";
+        # it must never be stored as the summary.
+        if response.is_error or response.has_tool_calls:
+            return None
+        return (response.content or "").strip() or None
+
+    async def _generate_talkative_variants_llm(self, language: str) -> list[str]:
         prompt = [
             {
                 "role": "system",
                 "content": (
-                    "You write one short playful cooldown message for a busy group chat. "
+                    "You write short playful cooldown messages for a busy group chat. "
                     "No markdown. No threats. No slurs. No factual claims. "
-                    "Max 2 sentences and max 160 characters."
+                    "Each message max 2 sentences and max 160 characters."
                 ),
             },
             {
                 "role": "user",
                 "content": (
-                    "Write a cheeky message telling one very talkative person to take a short pause, "
+                    f"Write {TALKATIVE_VARIANT_BATCH} different cheeky messages, one per line, "
+                    "each telling one very talkative person to take a short pause, "
                     "and suggest buying an OpenAI/Kimi/Anthropic subscription for all-day bot chatting. "
-                    f"Output language: {language_hint}."
+                    f"Output language: {language}."
                 ),
             },
         ]
@@ -678,23 +813,47 @@ class LLMResponder(ResponderPort):
                     messages=prompt,
                     tools=[],
                     model=self.model,
-                    max_tokens=80,
+                    max_tokens=80 * TALKATIVE_VARIANT_BATCH,
                     temperature=0.9,
                 ),
-                timeout=6.0,
+                timeout=30.0,
             )
         except Exception as exc:
             logger.debug("talkative llm message generation failed: {}", exc)
-            return None
+            return []
+
+        if response.is_error or response.has_tool_calls:
+            return []
+        variants = []
+        for line in (response.content or "").splitlines():
+            line = re.sub(r"^\s*(?:[-*]|\d+[.)])\s*", "", line).strip().strip('"')
+            if not line:
+                continue
+            if len(line) > 220:
+                line = line[:220].rstrip() + "..."
+            variants.append(line)
+        return variants[:TALKATIVE_VARIANT_BATCH]
+
+    def _warm_talkative_variants(self, language: str) -> None:
+        """Top up the pre-generated cooldown messages for ``language`` in the background."""
+        if len(self._talkative_variants.get(language, ())) >= TALKATIVE_VARIANT_LOW_WATER:
+            return
+        task = self._talkative_refills.get(language)
+        if task is not None and not task.done():
+            return
 
-        if response.has_tool_calls:
-            return None
-        content = (response.content or "").strip()
-        if not content:
-            return None
-        if len(content) > 220:
-            content = content[:220].rstrip() + "..."
-        return content
+        async def _refill() -> None:
+            variants = await self._generate_talkative_variants_llm(language)
+            self._talkative_variants.setdefault(language, []).extend(variants)
+
+        self._talkative_refills[language] = asyncio.create_task(_refill())
+
+    def _take_talkative_variant(self, text: str) -> str | None:
+        language = "German" if self._is_probably_german(text) else "English"
+        pool = self._talkative_variants.get(language)
+        variant = pool.pop() if pool else None
+        self._warm_talkative_variants(language)
+        return variant
 
     async def _maybe_talkative_cooldown_reply(
         self,
@@ -707,7 +866,6 @@ class LLMResponder(ResponderPort):
         streak_threshold: int,
         topic_overlap_threshold: float,
         cooldown_seconds: int,
-        delay_seconds: float,
         use_llm_message: bool,
     ) -> str | None:
         if not enabled:
@@ -745,18 +903,21 @@ class LLMResponder(ResponderPort):
 
         if state.streak < int(streak_threshold):
             self._talkative_state[session_key] = state
+            if use_llm_message and state.streak * 2 >= int(streak_threshold):
+                # Halfway to a cooldown: have LLM variants ready before they are needed.
+                self._warm_talkative_variants(
+                    "German" if self._is_probably_german(content) else "English"
+                )
             return None
 
         state.cooldown_until = now + float(cooldown_seconds)
         state.streak = 0
         self._talkative_state[session_key] = state
 
-        if delay_seconds > 0:
-            await asyncio.sleep(float(delay_seconds))
         if use_llm_message:
-            llm_message = await self._generate_talkative_message_llm(content)
-            if llm_message:
-                return llm_message
+            variant = self._take_talkative_variant(content)
+            if variant:
+                return variant
         return self._talkative_message_for(content)
 
     async def _generate(
@@ -778,7 +939,7 @@ class LLMResponder(ResponderPort):
         talkative_cooldown_delay_seconds: float = 2.5,
         talkative_cooldown_use_llm_message: bool = False,
         is_owner: bool = False,
-    ) -> str:
+    ) -> str | DeferredReply:
         # Check for new chat and notify owner
         await self._notify_new_chat(channel, chat_id)
 
@@ -807,6 +968,7 @@ class LLMResponder(ResponderPort):
             except Exception as e:
                 logger.warning("memory wal pre-write failed: {}", e)
 
+        deferred_delay = 0.0
         owner_raw_voice_reply = await self._maybe_handle_owner_raw_voice_command(
             channel=channel,
             content=content,
@@ -858,14 +1020,22 @@ class LLMResponder(ResponderPort):
                 streak_threshold=talkative_cooldown_streak_threshold,
                 topic_overlap_threshold=talkative_cooldown_topic_overlap_threshold,
                 cooldown_seconds=talkative_cooldown_cooldown_seconds,
-                delay_seconds=talkative_cooldown_delay_seconds,
                 use_llm_message=talkative_cooldown_use_llm_message,
             )
             if talkative_reply is not None:
                 final_content = talkative_reply
+                # Sent later by the runtime so this chat's delay does not hold up others.
+                deferred_delay = max(0.0, float(talkative_cooldown_delay_seconds))
             else:
+                image_parts = (
+                    await self.context.images.image_parts(
+                        media, model=self.model, limit=self.context.MAX_INLINE_IMAGES
+                    )
+                    if media
+                    else []
+                )
                 messages = self.context.build_messages(
-                    history=session.get_history(),
+                    history=self.history.build(session),
                     current_message=content,
                     current_metadata=metadata,
                     retrieved_memory_text=retrieved_memory_text,
@@ -873,6 +1043,7 @@ class LLMResponder(ResponderPort):
                     media=list(media),
                     channel=channel,
                     chat_id=chat_id,
+                    image_parts=image_parts,
                 )
 
                 final_content = await self._chat_loop(
@@ -932,10 +1103,14 @@ class LLMResponder(ResponderPort):
             session.add_message("user", content)
         session.add_message("assistant", final_content)
         self.sessions.save(session)
+        if deferred_delay > 0:
+            return DeferredReply(text=final_content, delay_seconds=deferred_delay)
         return final_content
 
     @override
-    async def generate_reply(self, event: InboundEvent, decision: PolicyDecision) -> str | None:
+    async def generate_reply(
+        self, event: InboundEvent, decision: PolicyDecision
+    ) -> str | DeferredReply | None:
         route_channel, route_chat_id = self._route_for_event(event)
         session_key = f"{route_channel}:{route_chat_id}"
         metadata = self._metadata_for_event(event)
@@ -981,7 +1156,7 @@ class LLMResponder(ResponderPort):
         persona_text: str | None = None,
         is_owner: bool = True,
     ) -> str:
-        return await self._generate(
+        reply = await self._generate(
             session_key=session_key,
             channel=channel,
             chat_id=chat_id,
@@ -999,8 +1174,23 @@ class LLMResponder(ResponderPort):
             talkative_cooldown_use_llm_message=False,
             is_owner=is_owner,
         )
+        return reply.text if isinstance(reply, DeferredReply) else reply
+
+    def provider_stats(self) -> dict[str, object] | None:
+        """Failover, hedging and per-route health, if the provider tracks them."""
+        stats = getattr(self.provider, "stats", None)
+        return stats() if callable(stats) else None
+
+    def web_cache_stats(self) -> dict[str, object] | None:
+        """Hit rates and size of the shared web cache, if one is configured."""
+        if self.web_cache is None:
+            return None
+        return self.web_cache.stats()
 
     async def aclose(self) -> None:
+        for task in self._talkative_refills.values():
+            task.cancel()
+        await self.subagents.aclose()
         exec_tool = self.tools.get("exec")
         if isinstance(exec_tool, ExecTool):
             await exec_tool.aclose()
@@ -0,0 +1,134 @@
+"""Compaction of older tool results inside one agent loop."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any
+
+RETRIEVE_TOOL_NAME = "tool_result"
+
+# Characters of an older result kept in the transcript, per tool.
+DEFAULT_TOOL_BUDGETS: dict[str, int] = {
+    "web_fetch": 1500,
+    "web_search": 2000,
+    "deep_research": 3000,
+    "exec": 1200,
+    "read_file": 2000,
+    "list_dir": 1000,
+}
+
+
+class ToolResultCompactor:
+    """
+    Shrinks tool results once the model has had one turn to read them.
+
+    The agent loop resends the whole transcript on every iteration, so a
+    50k-char ``web_fetch`` from the first iteration would otherwise be paid
+    for again on every later one. Results from the latest iteration stay
+    complete; older ones are cut to a per-tool head and end with a handle the
+    model can pass to the ``tool_result`` tool to read the rest. The full
+    text only lives in this object, i.e. for the duration of one loop.
+    """
+
+    def __init__(
+        self,
+        *,
+        budgets: Mapping[str, int] | None = None,
+        default_budget: int = 1500,
+        retrieve_chars: int = 4000,
+    ) -> None:
+        self._budgets = {**DEFAULT_TOOL_BUDGETS, **(budgets or {})}
+        self._default_budget = max(1, int(default_budget))
+        self._retrieve_chars = max(1, int(retrieve_chars))
+        self._latest: list[dict[str, Any]] = []
+        self._previous: list[dict[str, Any]] = []
+        self._originals: dict[str, str] = {}
+        self.compacted = 0
+        self.chars_saved = 0
+
+    def add(self, message: dict[str, Any]) -> None:
+        """Track a tool-result message appended in the current iteration."""
+        self._latest.append(message)
+
+    def advance(self) -> None:
+        """
+        Start a new iteration: compact results two iterations old.
+
+        Results produced by the previous iteration are still shown in full in
+        this request; they are compacted at the start of the next one.
+        """
+        for message in self._previous:
+            self._compact(message)
+        self._previous = self._latest
+        self._latest = []
+
+    def _compact(self, message: dict[str, Any]) -> None:
+        content = message.get("content")
+        if not isinstance(content, str):
+            return
+        budget = self._budgets.get(str(message.get("name") or ""), self._default_budget)
+        if len(content) <= budget:
+            return
+        handle = f"r{len(self._originals) + 1}"
+        self._originals[handle] = content
+        message["content"] = (
+            f"{content[:budget]}\n[... {len(content) - budget} more chars omitted. "
+            f'Call {RETRIEVE_TOOL_NAME}(handle="{handle}", offset={budget}) to read more.]'
+        )
+        self.compacted += 1
+        self.chars_saved += len(content) - len(message["content"])
+
+    @property
+    def has_handles(self) -> bool:
+        return bool(self._originals)
+
+    def retrieve(self, arguments: Mapping[str, Any]) -> str:
+        """A slice of a compacted result, for the ``tool_result`` tool."""
+        handle = str(arguments.get("handle") or "")
+        original = self._originals.get(handle)
+        if original is None:
+            return f"Error: unknown tool result handle {handle!r}"
+        try:
+            start = max(0, int(arguments.get("offset") or 0))
+            size = min(int(arguments.get("length") or self._retrieve_chars), self._retrieve_chars)
+        except (TypeError, ValueError):
+            return "Error: offset and length must be integers"
+        end = min(len(original), start + max(1, size))
+        chunk = original[start:end]
+        if end < len(original):
+            chunk += (
+                f"\n[... {len(original) - end} more chars. "
+                f'Call {RETRIEVE_TOOL_NAME}(handle="{handle}", offset={end}) to continue.]'
+            )
+        return chunk
+
+    @staticmethod
+    def definition() -> dict[str, Any]:
+        """Function schema for the loop-local retrieval tool."""
+        return {
+            "type": "function",
+            "function": {
+                "name": RETRIEVE_TOOL_NAME,
+                "description": (
+                    "Read more of an earlier tool result that was shortened to save context. "
+                    "Use the handle and offset given in the shortened result."
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "handle": {"type": "string", "description": "Handle such as r1."},
+                        "offset": {
+                            "type": "integer",
+                            "minimum": 0,
+                            "description": "Character offset to start reading from.",
+                        },
+                        "length": {
+                            "type": "integer",
+                            "minimum": 1,
+                            "description": "Characters to read (capped).",
+                        },
+                    },
+                    "required": ["handle"],
+                },
+            },
+        }
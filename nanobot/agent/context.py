@@ -1,13 +1,12 @@
 """Context builder for assembling agent prompts."""
 
-import base64
-import mimetypes
 import platform
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
 from nanobot.agent.skills import SkillsLoader
+from nanobot.media.inline_images import InlineImageCache
 
 
 class ContextBuilder:
@@ -22,9 +21,10 @@ class ContextBuilder:
     MAX_INLINE_IMAGES = 4
     MAX_INLINE_IMAGE_BYTES = 8 * 1024 * 1024
 
-    def __init__(self, workspace: Path):
+    def __init__(self, workspace: Path, images: InlineImageCache | None = None):
         self.workspace = workspace
         self.skills = SkillsLoader(workspace)
+        self.images = images or InlineImageCache(max_source_bytes=self.MAX_INLINE_IMAGE_BYTES)
 
     def build_system_prompt(
         self,
@@ -229,6 +229,7 @@ Always be helpful, accurate, and concise. When using tools, explain what you're
         media: list[str] | None = None,
         channel: str | None = None,
         chat_id: str | None = None,
+        image_parts: list[dict[str, Any]] | None = None,
     ) -> list[dict[str, Any]]:
         """
         Build the complete message list for an LLM call.
@@ -240,6 +241,8 @@ Always be helpful, accurate, and concise. When using tools, explain what you're
             media: Optional list of local file paths for images/media.
             channel: Current channel (telegram, feishu, etc.).
             chat_id: Current chat/user ID.
+            image_parts: Images for ``media`` already encoded off-loop via
+                ``self.images.image_parts``; encoded here when omitted.
 
         Returns:
             List of messages including system prompt.
@@ -260,7 +263,9 @@ Always be helpful, accurate, and concise. When using tools, explain what you're
             messages.append({"role": "system", "content": retrieved_memory_text})
 
         # Current message (with optional image attachments)
-        user_content = self._build_user_content(current_message, media, metadata=current_metadata)
+        user_content = self._build_user_content(
+            current_message, media, metadata=current_metadata, image_parts=image_parts
+        )
         messages.append({"role": "user", "content": user_content})
 
         return messages
@@ -270,6 +275,7 @@ Always be helpful, accurate, and concise. When using tools, explain what you're
         text: str,
         media: list[str] | None,
         metadata: dict[str, Any] | None = None,
+        image_parts: list[dict[str, Any]] | None = None,
     ) -> str | list[dict[str, Any]]:
         """Build user message content with optional base64-encoded images."""
         text_with_context = self._with_reply_context(text, metadata)
@@ -278,23 +284,9 @@ Always be helpful, accurate, and concise. When using tools, explain what you're
         if not media:
             return text_with_context
 
-        images = []
-        for path in media[: self.MAX_INLINE_IMAGES]:
-            p = Path(path)
-            mime, _ = mimetypes.guess_type(path)
-            if not p.is_file() or not mime or not mime.startswith("image/"):
-                continue
-            try:
-                if p.stat().st_size > self.MAX_INLINE_IMAGE_BYTES:
-                    continue
-            except OSError:
-                continue
-            try:
-                b64 = base64.b64encode(p.read_bytes()).decode()
-            except OSError:
-                continue
-            images.append({"type": "image_url", "image_url": {"url": f"data:{mime};base64,{b64}"}})
-
+        images = image_parts
+        if images is None:
+            images = self.images.image_parts_sync(media, limit=self.MAX_INLINE_IMAGES)
         if not images:
             return text_with_context
         return [{"type": "text", "text": text_with_context}, *images]
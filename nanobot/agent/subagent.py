@@ -4,7 +4,11 @@ from __future__ import annotations
 
 import asyncio
 import json
+import time
 import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
@@ -12,7 +16,9 @@ from loguru import logger
 
 if TYPE_CHECKING:
     from nanobot.agent.tools.file_access import FileAccessResolver
-    from nanobot.config.schema import ExecToolConfig
+    from nanobot.config.schema import ExecToolConfig, SubagentConfig
+    from nanobot.core.ports import TelemetryPort
+    from nanobot.storage.web_cache import WebCache
 
 from nanobot.agent.tools.file_access import enable_grants
 from nanobot.agent.tools.filesystem import ListDirTool, ReadFileTool, WriteFileTool
@@ -26,6 +32,35 @@ from nanobot.bus.queue import MessageBus
 from nanobot.providers.base import LLMProvider
 
 
+@dataclass(slots=True)
+class SubagentJob:
+    """Bookkeeping for one queued or running subagent."""
+
+    task_id: str
+    label: str
+    task: str
+    origin: dict[str, str]
+    state: str = "queued"
+    created_at: float = field(default_factory=time.monotonic)
+    started_at: float | None = None
+    iterations: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    llm_seconds: float = 0.0
+    runner: asyncio.Task[None] | None = None
+
+    @property
+    def chat_key(self) -> str:
+        return f"{self.origin['channel']}:{self.origin['chat_id']}"
+
+    def describe(self, now: float) -> str:
+        since = self.started_at if self.started_at is not None else self.created_at
+        return (
+            f"{self.task_id} [{self.label}] {self.state} {now - since:.0f}s, "
+            f"{self.iterations} steps, {self.prompt_tokens + self.completion_tokens} tokens"
+        )
+
+
 class SubagentManager:
     """
     Manages background subagent execution.
@@ -33,6 +68,15 @@ class SubagentManager:
     Subagents are lightweight agent instances that run in the background
     to handle specific tasks. They share the same LLM provider but have
     isolated context and a focused system prompt.
+
+    At most ``max_concurrent`` subagents run at once; further spawns wait in
+    a FIFO queue of ``max_queued`` and each chat may hold ``max_per_chat``
+    running or queued jobs. Spawns past those limits are refused with a
+    message instead of piling up tasks. Interactive turns wrap their model
+    calls in :meth:`interactive`, and subagents hold their next model call
+    until no interactive turn is in flight (for at most
+    ``interactive_wait_seconds``), so background work does not compete with
+    replies for provider rate limits.
     """
 
     def __init__(
@@ -42,16 +86,20 @@ class SubagentManager:
         bus: MessageBus,
         model: str | None = None,
         tavily_api_key: str | None = None,
+        web_cache: "WebCache | None" = None,
         exec_config: "ExecToolConfig | None" = None,
         restrict_to_workspace: bool = False,
         file_access_resolver: "FileAccessResolver | None" = None,
+        config: "SubagentConfig | None" = None,
+        telemetry: "TelemetryPort | None" = None,
     ):
-        from nanobot.config.schema import ExecToolConfig
+        from nanobot.config.schema import ExecToolConfig, SubagentConfig
         self.provider = provider
         self.workspace = workspace
         self.bus = bus
         self.model = model or provider.get_default_model()
         self.tavily_api_key = tavily_api_key
+        self.web_cache = web_cache
         self.exec_config = exec_config or ExecToolConfig()
         self.restrict_to_workspace = restrict_to_workspace
         self.file_access_resolver = file_access_resolver
@@ -62,7 +110,54 @@ class SubagentManager:
                 and self.exec_config.isolation.force_workspace_restriction
             )
         )
-        self._running_tasks: dict[str, asyncio.Task[None]] = {}
+        self.config = config or SubagentConfig()
+        self.telemetry = telemetry
+        self._jobs: dict[str, SubagentJob] = {}
+        self._slots = asyncio.Semaphore(self.config.max_concurrent)
+        self._interactive = 0
+        self._interactive_idle = asyncio.Event()
+        self._interactive_idle.set()
+        self._totals = {
+            "spawned": 0,
+            "rejected": 0,
+            "cancelled": 0,
+            "completed": 0,
+            "failed": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "interactive_waits": 0,
+        }
+
+    def _metric(self, name: str, value: int = 1, labels: tuple[tuple[str, str], ...] = ()) -> None:
+        if self.telemetry is None:
+            return
+        try:
+            self.telemetry.incr(name, value, labels)
+        except Exception as exc:  # pragma: no cover - defensive logging
+            logger.debug("telemetry incr failed {}={}: {}", name, value, exc)
+
+    @asynccontextmanager
+    async def interactive(self) -> AsyncIterator[None]:
+        """Mark an interactive turn in flight; subagents yield to it."""
+        self._interactive += 1
+        self._interactive_idle.clear()
+        try:
+            yield
+        finally:
+            self._interactive -= 1
+            if self._interactive == 0:
+                self._interactive_idle.set()
+
+    async def _yield_to_interactive(self) -> None:
+        if self._interactive_idle.is_set():
+            return
+        self._totals["interactive_waits"] += 1
+        try:
+            await asyncio.wait_for(
+                self._interactive_idle.wait(), timeout=self.config.interactive_wait_seconds
+            )
+        except TimeoutError:
+            pass
 
     async def spawn(
         self,
@@ -90,25 +185,95 @@ class SubagentManager:
             "channel": origin_channel,
             "chat_id": origin_chat_id,
         }
+        chat_key = f"{origin_channel}:{origin_chat_id}"
+        in_chat = [job for job in self._jobs.values() if job.chat_key == chat_key]
+        if len(in_chat) >= self.config.max_per_chat:
+            self._reject("chat_quota")
+            return (
+                f"Not started: this chat already has {len(in_chat)} background tasks "
+                f"({', '.join(job.task_id for job in in_chat)}). "
+                "Wait for one to finish or cancel one first."
+            )
+        # The slot semaphore is FIFO, so every job beyond the first
+        # max_concurrent is waiting, whether or not it has been scheduled yet.
+        position = len(self._jobs) - self.config.max_concurrent + 1
+        if position > self.config.max_queued:
+            self._reject("queue_full")
+            return (
+                f"Not started: {position - 1} background tasks are already waiting. "
+                "Try again in a few minutes."
+            )
 
-        # Create background task
-        bg_task = asyncio.create_task(
-            self._run_subagent(task_id, task, display_label, origin)
-        )
-        self._running_tasks[task_id] = bg_task
-
-        # Cleanup when done
-        bg_task.add_done_callback(lambda _: self._running_tasks.pop(task_id, None))
+        job = SubagentJob(task_id=task_id, label=display_label, task=task, origin=origin)
+        job.runner = asyncio.create_task(self._run_job(job))
+        self._jobs[task_id] = job
+        job.runner.add_done_callback(lambda _: self._jobs.pop(task_id, None))
+        self._totals["spawned"] += 1
 
         logger.info(f"Spawned subagent [{task_id}]: {display_label}")
+        if position > 0:
+            return (
+                f"Subagent [{display_label}] queued (id: {task_id}, position {position}). "
+                "I'll notify you when it completes."
+            )
         return f"Subagent [{display_label}] started (id: {task_id}). I'll notify you when it completes."
 
+    def _reject(self, reason: str) -> None:
+        self._totals["rejected"] += 1
+        self._metric("subagent_rejected", 1, (("reason", reason),))
+        logger.info(f"Subagent spawn rejected: {reason}")
+
+    def list_jobs(self, chat_key: str | None = None) -> list[SubagentJob]:
+        """Queued and running subagents, oldest first, optionally for one chat."""
+        return [
+            job
+            for job in self._jobs.values()
+            if chat_key is None or job.chat_key == chat_key
+        ]
+
+    def cancel(self, task_id: str, chat_key: str | None = None) -> str:
+        """Cancel a queued or running subagent (restricted to ``chat_key`` if given)."""
+        job = self._jobs.get(task_id.strip())
+        if job is None or (chat_key is not None and job.chat_key != chat_key):
+            return f"No background task with id {task_id!r} in this chat."
+        if job.runner is not None:
+            job.runner.cancel()
+        self._totals["cancelled"] += 1
+        logger.info(f"Subagent [{job.task_id}] cancelled while {job.state}")
+        return f"Cancelled background task [{job.label}] (id: {job.task_id})."
+
+    async def _run_job(self, job: SubagentJob) -> None:
+        async with self._slots:
+            job.state = "running"
+            job.started_at = time.monotonic()
+            self._metric(
+                "subagent_queue_wait_ms", int((job.started_at - job.created_at) * 1000)
+            )
+            try:
+                await self._run_subagent(job.task_id, job.task, job.label, job.origin, job)
+            finally:
+                self._account(job)
+
+    def _account(self, job: SubagentJob) -> None:
+        elapsed = time.monotonic() - (job.started_at or job.created_at)
+        self._totals["prompt_tokens"] += job.prompt_tokens
+        self._totals["completion_tokens"] += job.completion_tokens
+        self._metric("subagent_prompt_tokens", job.prompt_tokens)
+        self._metric("subagent_completion_tokens", job.completion_tokens)
+        self._metric("subagent_run_ms", int(elapsed * 1000))
+        logger.info(
+            f"Subagent [{job.task_id}] used {job.iterations} steps, "
+            f"{job.prompt_tokens}+{job.completion_tokens} tokens, "
+            f"{job.llm_seconds:.1f}s in model calls, {elapsed:.1f}s total"
+        )
+
     async def _run_subagent(
         self,
         task_id: str,
         task: str,
         label: str,
         origin: dict[str, str],
+        job: SubagentJob | None = None,
     ) -> None:
         """Execute the subagent task and announce the result."""
         logger.info(f"Subagent [{task_id}] starting task: {label}")
@@ -142,6 +307,9 @@ class SubagentManager:
             exec_tool = ExecTool(
                 working_dir=str(self.workspace),
                 timeout=self.exec_config.timeout,
+                max_output_bytes=self.exec_config.max_output_bytes,
+                # Single-session tool: a warm pool would only start sandboxes it never uses.
+                warm_pool=False,
                 restrict_to_workspace=self.effective_restrict_to_workspace,
                 allow_host_execution=self.exec_config.allow_host_execution,
                 isolation_config=self.exec_config.isolation,
@@ -151,9 +319,9 @@ class SubagentManager:
             exec_tool.set_session_context(f"subagent:{task_id}")
             tools.register(exec_tool)
             tools.register(PiStatsTool())
-            tools.register(WebSearchTool(api_key=self.tavily_api_key))
-            tools.register(WebFetchTool(api_key=self.tavily_api_key))
-            tools.register(DeepResearchTool(api_key=self.tavily_api_key))
+            tools.register(WebSearchTool(api_key=self.tavily_api_key, cache=self.web_cache))
+            tools.register(WebFetchTool(api_key=self.tavily_api_key, cache=self.web_cache))
+            tools.register(DeepResearchTool(api_key=self.tavily_api_key, cache=self.web_cache))
 
             # Build messages with subagent-specific prompt
             system_prompt = self._build_subagent_prompt(task)
@@ -163,18 +331,27 @@ class SubagentManager:
             ]
 
             # Run agent loop (limited iterations)
-            max_iterations = 15
+            max_iterations = self.config.max_iterations
             iteration = 0
             final_result: str | None = None
 
             while iteration < max_iterations:
                 iteration += 1
 
+                await self._yield_to_interactive()
+                started = time.monotonic()
                 response = await self.provider.chat(
                     messages=messages,
                     tools=tools.get_definitions(),
                     model=self.model,
                 )
+                if job is not None:
+                    job.iterations = iteration
+                    job.llm_seconds += time.monotonic() - started
+                    job.prompt_tokens += int(response.usage.get("prompt_tokens") or 0)
+                    job.completion_tokens += int(response.usage.get("completion_tokens") or 0)
+                if response.is_error:
+                    raise RuntimeError(response.content or "LLM call failed")
 
                 if response.has_tool_calls:
                     # Add assistant message with tool calls
@@ -214,11 +391,13 @@ class SubagentManager:
                 final_result = "Task completed but no final response was generated."
 
             logger.info(f"Subagent [{task_id}] completed successfully")
+            self._totals["completed"] += 1
             await self._announce_result(task_id, label, task, final_result, origin, "ok")
 
         except Exception as e:
             error_msg = f"Error: {str(e)}"
             logger.error(f"Subagent [{task_id}] failed: {e}")
+            self._totals["failed"] += 1
             await self._announce_result(task_id, label, task, error_msg, origin, "error")
         finally:
             if exec_tool:
@@ -289,4 +468,24 @@ When you have completed the task, provide a clear summary of your findings or ac
 
     def get_running_count(self) -> int:
         """Return the number of currently running subagents."""
-        return len(self._running_tasks)
+        return sum(1 for job in self._jobs.values() if job.state == "running")
+
+    def get_queued_count(self) -> int:
+        """Return the number of subagents waiting for a free slot."""
+        return sum(1 for job in self._jobs.values() if job.state == "queued")
+
+    def stats(self) -> dict[str, object]:
+        """Queue depth plus spawn outcome and token counters."""
+        return {
+            **self._totals,
+            "running": self.get_running_count(),
+            "queued": self.get_queued_count(),
+            "max_concurrent": self.config.max_concurrent,
+        }
+
+    async def aclose(self) -> None:
+        """Cancel every queued and running subagent."""
+        runners = [job.runner for job in self._jobs.values() if job.runner is not None]
+        for runner in runners:
+            runner.cancel()
+        await asyncio.gather(*runners, return_exceptions=True)
@@ -1,6 +1,7 @@
 """Base class for agent tools."""
 
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from typing import Any
 
 
@@ -21,6 +22,8 @@ class Tool(ABC):
         "object": dict,
     }
 
+    _compiled_validator: Callable[[Any, str], list[str]] | None = None
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -54,41 +57,100 @@ class Tool(ABC):
 
     def validate_params(self, params: dict[str, Any]) -> list[str]:
         """Validate tool parameters against JSON schema. Returns error list (empty if valid)."""
-        schema = self.parameters or {}
-        if schema.get("type", "object") != "object":
-            raise ValueError(f"Schema must be object type, got {schema.get('type')!r}")
-        return self._validate(params, {**schema, "type": "object"}, "")
-
-    def _validate(self, val: Any, schema: dict[str, Any], path: str) -> list[str]:
-        t, label = schema.get("type"), path or "parameter"
-        if t in self._TYPE_MAP and not isinstance(val, self._TYPE_MAP[t]):
-            return [f"{label} should be {t}"]
-
-        errors = []
-        if "enum" in schema and val not in schema["enum"]:
-            errors.append(f"{label} must be one of {schema['enum']}")
+        validator = self._compiled_validator
+        if validator is None:
+            schema = self.parameters or {}
+            if schema.get("type", "object") != "object":
+                raise ValueError(f"Schema must be object type, got {schema.get('type')!r}")
+            validator = self._compile({**schema, "type": "object"})
+            self._compiled_validator = validator
+        return validator(params, "")
+
+    @classmethod
+    def _compile(cls, schema: dict[str, Any]) -> Callable[[Any, str], list[str]]:
+        """
+        Compile a JSON schema node into a validator closure.
+
+        The schema is walked once; the returned callable only performs the checks
+        that apply to this node, so repeated validation does no dict lookups on
+        the schema itself. Error messages match the historical recursive walk.
+        """
+        t = schema.get("type")
+        expected = cls._TYPE_MAP.get(t) if isinstance(t, str) else None
+        checks: list[Callable[[Any, str], list[str]]] = []
+        structural: Callable[[Any, str], list[str]] | None = None
+
+        if "enum" in schema:
+            choices = schema["enum"]
+
+            def check_enum(val: Any, label: str) -> list[str]:
+                return [] if val in choices else [f"{label} must be one of {choices}"]
+
+            checks.append(check_enum)
+
+        bounds: list[tuple[str, Any]] = []
         if t in ("integer", "number"):
-            if "minimum" in schema and val < schema["minimum"]:
-                errors.append(f"{label} must be >= {schema['minimum']}")
-            if "maximum" in schema and val > schema["maximum"]:
-                errors.append(f"{label} must be <= {schema['maximum']}")
-        if t == "string":
-            if "minLength" in schema and len(val) < schema["minLength"]:
-                errors.append(f"{label} must be at least {schema['minLength']} chars")
-            if "maxLength" in schema and len(val) > schema["maxLength"]:
-                errors.append(f"{label} must be at most {schema['maxLength']} chars")
+            bounds = [(k, schema[k]) for k in ("minimum", "maximum") if k in schema]
+        elif t == "string":
+            bounds = [(k, schema[k]) for k in ("minLength", "maxLength") if k in schema]
+        for key, limit in bounds:
+            checks.append(cls._compile_bound(key, limit))
+
         if t == "object":
-            props = schema.get("properties", {})
-            for k in schema.get("required", []):
-                if k not in val:
-                    errors.append(f"missing required {path + '.' + k if path else k}")
-            for k, v in val.items():
-                if k in props:
-                    errors.extend(self._validate(v, props[k], path + '.' + k if path else k))
+            required = tuple(schema.get("required", []))
+            props = {k: cls._compile(v) for k, v in schema.get("properties", {}).items()}
+
+            def check_object(val: Any, path: str) -> list[str]:
+                errors = [
+                    f"missing required {path + '.' + k if path else k}"
+                    for k in required
+                    if k not in val
+                ]
+                for k, v in val.items():
+                    child = props.get(k)
+                    if child is not None:
+                        errors.extend(child(v, path + "." + k if path else k))
+                return errors
+
+            structural = check_object
+
         if t == "array" and "items" in schema:
-            for i, item in enumerate(val):
-                errors.extend(self._validate(item, schema["items"], f"{path}[{i}]" if path else f"[{i}]"))
-        return errors
+            item_check = cls._compile(schema["items"])
+
+            def check_array(val: Any, path: str) -> list[str]:
+                errors: list[str] = []
+                for i, item in enumerate(val):
+                    errors.extend(item_check(item, f"{path}[{i}]" if path else f"[{i}]"))
+                return errors
+
+            structural = check_array
+
+        def validate(val: Any, path: str) -> list[str]:
+            label = path or "parameter"
+            if expected is not None and not isinstance(val, expected):
+                return [f"{label} should be {t}"]
+            errors: list[str] = []
+            for check in checks:
+                errors.extend(check(val, label))
+            if structural is not None:
+                errors.extend(structural(val, path))
+            return errors
+
+        return validate
+
+    @staticmethod
+    def _compile_bound(key: str, limit: Any) -> Callable[[Any, str], list[str]]:
+        if key == "minimum":
+            return lambda val, label: [f"{label} must be >= {limit}"] if val < limit else []
+        if key == "maximum":
+            return lambda val, label: [f"{label} must be <= {limit}"] if val > limit else []
+        if key == "minLength":
+            return lambda val, label: (
+                [f"{label} must be at least {limit} chars"] if len(val) < limit else []
+            )
+        return lambda val, label: (
+            [f"{label} must be at most {limit} chars"] if len(val) > limit else []
+        )
 
     def to_schema(self) -> dict[str, Any]:
         """Convert tool to OpenAI function schema format."""
@@ -16,6 +16,8 @@ from pathlib import Path
 
 from loguru import logger
 
+from nanobot.agent.tools.exec_output import OutputCollector
+
 DEFAULT_BLOCKED_HOST_PATTERNS = [
     ".ssh",
     ".aws",
@@ -50,6 +52,9 @@ class CommandResult:
 
     output: str
     exit_code: int
+    total_bytes: int = 0
+    dropped_bytes: int = 0
+    killed_reason: str | None = None
 
 
 @dataclass(frozen=True, slots=True)
@@ -148,6 +153,7 @@ class BubblewrapSandboxSession:
         self.created_at = time.monotonic()
         self.last_used_at = self.created_at
         self.active_since: float | None = None
+        self.use_count = 0
 
     @property
     def active(self) -> bool:
@@ -165,7 +171,13 @@ class BubblewrapSandboxSession:
             stderr=asyncio.subprocess.STDOUT,
         )
 
-    async def run_command(self, command: str, cwd: str, timeout: int) -> CommandResult:
+    async def run_command(
+        self,
+        command: str,
+        cwd: str,
+        timeout: int,
+        max_output_bytes: int = 0,
+    ) -> CommandResult:
         if self._preempt_reason:
             raise SandboxPreemptedError(self._preempt_reason)
 
@@ -199,9 +211,20 @@ class BubblewrapSandboxSession:
             try:
                 self._process.stdin.write(script.encode("utf-8"))
                 await self._process.stdin.drain()
-                output, exit_code = await self._read_until_marker(marker, timeout=timeout)
+                collector = OutputCollector(max_total_bytes=max_output_bytes)
+                exit_code = await self._read_until_marker(marker, timeout, collector)
                 self.last_used_at = time.monotonic()
-                return CommandResult(output=output, exit_code=exit_code)
+                result = CommandResult(
+                    output=collector.text().strip("\n"),
+                    exit_code=-1 if exit_code is None else exit_code,
+                    total_bytes=collector.total_bytes,
+                    dropped_bytes=collector.dropped_bytes,
+                )
+                if exit_code is None:
+                    # The shell is still producing output; killing it is the only way to stop it.
+                    result.killed_reason = "output limit exceeded"
+                    await self.stop(reason=result.killed_reason)
+                return result
             except asyncio.TimeoutError as e:
                 await self.stop(reason="timed out")
                 raise SandboxTimeoutError(
@@ -288,11 +311,24 @@ class BubblewrapSandboxSession:
         args.extend(["/bin/sh"])
         return args
 
-    async def _read_until_marker(self, marker: str, timeout: int) -> tuple[str, int]:
+    async def _read_until_marker(
+        self,
+        marker: str,
+        timeout: int,
+        collector: OutputCollector,
+    ) -> int | None:
+        """
+        Stream command output into ``collector`` until the completion marker.
+
+        Only a short window is kept unflushed so a marker split across reads is
+        still found. Returns the exit status, or None when the collector's size
+        limit was hit first.
+        """
         if not self._process or not self._process.stdout:
             raise SandboxExecutionError("sandbox process stdout unavailable")
 
         marker_prefix = f"\n{marker}:".encode("utf-8")
+        keep = len(marker_prefix) + 16
         deadline = time.monotonic() + timeout
 
         while True:
@@ -307,10 +343,14 @@ class BubblewrapSandboxSession:
                     if not raw_status.isdigit():
                         raise SandboxExecutionError(f"invalid exit code marker: {raw_status!r}")
 
-                    raw_output = self._buffer[:marker_idx]
+                    collector.feed(self._buffer[:marker_idx])
                     self._buffer = self._buffer[newline_idx + 1 :]
-                    output = raw_output.decode("utf-8", errors="replace").strip("\n")
-                    return output, int(raw_status)
+                    return int(raw_status)
+            elif len(self._buffer) > keep:
+                within_limit = collector.feed(self._buffer[:-keep])
+                self._buffer = self._buffer[-keep:]
+                if not within_limit:
+                    return None
 
             if self._preempt_reason:
                 raise SandboxPreemptedError(self._preempt_reason)
@@ -319,7 +359,7 @@ class BubblewrapSandboxSession:
             if remaining <= 0:
                 raise asyncio.TimeoutError()
 
-            chunk = await asyncio.wait_for(self._process.stdout.read(4096), timeout=remaining)
+            chunk = await asyncio.wait_for(self._process.stdout.read(65536), timeout=remaining)
             if not chunk:
                 if self._preempt_reason:
                     raise SandboxPreemptedError(self._preempt_reason)
@@ -328,7 +368,14 @@ class BubblewrapSandboxSession:
 
 
 class ExecSandboxManager:
-    """Global manager for per-session bubblewrap sandboxes."""
+    """
+    Global manager for per-session bubblewrap sandboxes.
+
+    Optionally keeps a warm pool of generic sandboxes that are started ahead of
+    demand and bound to a session key on first use, so sandbox startup stays off
+    the critical path of the first ``exec`` call in a chat. Warm sandboxes count
+    against ``max_containers`` and are the first to go under capacity pressure.
+    """
 
     def __init__(
         self,
@@ -338,6 +385,8 @@ class ExecSandboxManager:
         pressure_policy: str,
         allowlist_path: Path,
         extra_mounts: list[SandboxMount] | None = None,
+        warm_pool_size: int = 0,
+        max_uses_per_sandbox: int = 0,
     ):
         self.workspace = workspace.expanduser().resolve()
         self.max_containers = max(1, max_containers)
@@ -345,10 +394,25 @@ class ExecSandboxManager:
         self.pressure_policy = pressure_policy
         self.allowlist_path = allowlist_path
         self._extra_mounts: list[SandboxMount] = list(extra_mounts or [])
+        self.warm_pool_size = max(0, min(warm_pool_size, self.max_containers))
+        self.max_uses_per_sandbox = max(0, max_uses_per_sandbox)
 
         self._sessions: dict[str, BubblewrapSandboxSession] = {}
+        self._warm: list[BubblewrapSandboxSession] = []
+        # Warm sandboxes whose bwrap process is still starting; tracked so shutdown can reap them.
+        self._warming: set[BubblewrapSandboxSession] = set()
+        self._refill_task: asyncio.Task[None] | None = None
+        self._closed = False
         self._lock = asyncio.Lock()
 
+        self._starts = 0
+        self._start_ms_total = 0.0
+        self._start_ms_last = 0.0
+        self._start_ms_max = 0.0
+        self._pool_hits = 0
+        self._pool_misses = 0
+        self._recycled = 0
+
         self._check_runtime()
         self._allowlist = MountAllowlist.load(self.allowlist_path)
         self._allowlist.validate_workspace(self.workspace)
@@ -363,34 +427,164 @@ class ExecSandboxManager:
         command: str,
         host_cwd: str,
         timeout: int,
+        max_output_bytes: int = 0,
     ) -> CommandResult:
         session = await self._get_or_create_session(session_key)
         cwd = self._to_container_path(host_cwd)
 
         try:
-            return await session.run_command(command=command, cwd=cwd, timeout=timeout)
+            result = await session.run_command(
+                command=command,
+                cwd=cwd,
+                timeout=timeout,
+                max_output_bytes=max_output_bytes,
+            )
         except SandboxPreemptedError:
             # Preempted sessions are removed by capacity management.
             raise
         except (SandboxTimeoutError, SandboxExecutionError):
             # Broken sessions are discarded and lazily recreated on next request.
             await self._drop_session(session_key, session)
+            self.schedule_prewarm()
             raise
 
+        if result.killed_reason:
+            await self._drop_session(session_key, session, reason=result.killed_reason)
+            self.schedule_prewarm()
+            return result
+
+        session.use_count += 1
+        if self.max_uses_per_sandbox and session.use_count >= self.max_uses_per_sandbox:
+            # Recycle long-lived sandboxes so leaked state (tmpfs, background jobs) is bounded.
+            self._recycled += 1
+            await self._drop_session(session_key, session, reason="use budget exhausted")
+            self.schedule_prewarm()
+        return result
+
+    def schedule_prewarm(self) -> None:
+        """Top up the warm pool in the background when running inside an event loop."""
+        if self._closed or self.warm_pool_size <= 0:
+            return
+        if self._refill_task is not None and not self._refill_task.done():
+            return
+        if len(self._warm) + len(self._warming) >= self.warm_pool_size:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._refill_task = loop.create_task(self.prewarm())
+
+    async def prewarm(self) -> None:
+        """Start generic sandboxes until the warm pool target is reached."""
+        while True:
+            async with self._lock:
+                if (
+                    self._closed
+                    or len(self._warm) + len(self._warming) >= self.warm_pool_size
+                    or self._occupancy_locked() + len(self._warming) >= self.max_containers
+                ):
+                    return
+                session = self._new_session("")
+                self._warming.add(session)
+
+            try:
+                await self._timed_start(session)
+            except BaseException as e:
+                session.stop_now()
+                if not isinstance(e, Exception):
+                    raise
+                logger.warning("exec sandbox prewarm failed: {}", e)
+                return
+            finally:
+                self._warming.discard(session)
+
+            async with self._lock:
+                # Chats may have claimed the capacity while this sandbox was starting.
+                keep = not self._closed and self._occupancy_locked() < self.max_containers
+                if keep:
+                    self._warm.append(session)
+            if not keep:
+                await session.stop(reason="pool full")
+                return
+
+    def stats(self) -> dict[str, object]:
+        """Pool occupancy and sandbox start-latency metrics."""
+        return {
+            "bound": len(self._sessions),
+            "warm": len(self._warm),
+            "warm_target": self.warm_pool_size,
+            "capacity": self.max_containers,
+            "starts": self._starts,
+            "pool_hits": self._pool_hits,
+            "pool_misses": self._pool_misses,
+            "recycled": self._recycled,
+            "start_ms_last": round(self._start_ms_last, 2),
+            "start_ms_avg": round(self._start_ms_total / self._starts, 2) if self._starts else 0.0,
+            "start_ms_max": round(self._start_ms_max, 2),
+        }
+
     async def aclose(self) -> None:
+        self._closed = True
+        refill = self._refill_task
+        self._refill_task = None
+        if refill is not None and not refill.done():
+            refill.cancel()
+            try:
+                await refill
+            except (asyncio.CancelledError, Exception):
+                pass
+
         async with self._lock:
-            sessions = list(self._sessions.values())
+            sessions = list(self._sessions.values()) + self._warm + list(self._warming)
             self._sessions.clear()
+            self._warm = []
+            self._warming.clear()
 
         for session in sessions:
             await session.stop(reason="manager shutdown")
 
     def close(self) -> None:
-        sessions = list(self._sessions.values())
+        self._closed = True
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+            self._refill_task = None
+        sessions = list(self._sessions.values()) + self._warm + list(self._warming)
         self._sessions.clear()
+        self._warm = []
+        self._warming.clear()
         for session in sessions:
             session.stop_now()
 
+    def _new_session(self, session_key: str) -> BubblewrapSandboxSession:
+        return BubblewrapSandboxSession(
+            session_key=session_key,
+            workspace=self.workspace,
+            extra_mounts=self._extra_mounts,
+        )
+
+    async def _start_session(self, session_key: str) -> BubblewrapSandboxSession:
+        session = self._new_session(session_key)
+        try:
+            await self._timed_start(session)
+        except BaseException:
+            session.stop_now()
+            raise
+        return session
+
+    async def _timed_start(self, session: BubblewrapSandboxSession) -> None:
+        started = time.perf_counter()
+        await session.start()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self._starts += 1
+        self._start_ms_total += elapsed_ms
+        self._start_ms_last = elapsed_ms
+        self._start_ms_max = max(self._start_ms_max, elapsed_ms)
+
+    def _occupancy_locked(self) -> int:
+        """Bound plus ready-warm sandboxes; in-flight warm starts never displace a chat."""
+        return len(self._sessions) + len(self._warm)
+
     async def _get_or_create_session(self, session_key: str) -> BubblewrapSandboxSession:
         now = time.monotonic()
 
@@ -401,21 +595,25 @@ class ExecSandboxManager:
             if existing:
                 return existing
 
-            await self._ensure_capacity_locked()
-
-            session = BubblewrapSandboxSession(
-                session_key=session_key,
-                workspace=self.workspace,
-                extra_mounts=self._extra_mounts,
-            )
-            await session.start()
+            if self._warm:
+                session = self._warm.pop(0)
+                session.session_key = session_key
+                self._pool_hits += 1
+            else:
+                if self.warm_pool_size:
+                    self._pool_misses += 1
+                await self._ensure_capacity_locked()
+                session = await self._start_session(session_key)
             self._sessions[session_key] = session
             logger.debug(
-                "exec sandbox created session={} total={}",
+                "exec sandbox bound session={} total={} warm={}",
                 session_key,
                 len(self._sessions),
+                len(self._warm),
             )
-            return session
+
+        self.schedule_prewarm()
+        return session
 
     async def _expire_idle_locked(self, now: float) -> None:
         to_remove = [
@@ -429,7 +627,12 @@ class ExecSandboxManager:
                 await session.stop(reason="idle timeout")
 
     async def _ensure_capacity_locked(self) -> None:
-        if len(self._sessions) < self.max_containers:
+        if self._occupancy_locked() < self.max_containers:
+            return
+
+        if self._warm:
+            # Shrink the warm pool before touching sandboxes that belong to a chat.
+            await self._warm.pop().stop(reason="evicted by capacity")
             return
 
         idle_candidates = [
@@ -458,12 +661,17 @@ class ExecSandboxManager:
         self._sessions.pop(key, None)
         await victim.preempt("preempted by capacity policy")
 
-    async def _drop_session(self, session_key: str, session: BubblewrapSandboxSession) -> None:
+    async def _drop_session(
+        self,
+        session_key: str,
+        session: BubblewrapSandboxSession,
+        reason: str = "dropped",
+    ) -> None:
         async with self._lock:
             current = self._sessions.get(session_key)
             if current is session:
                 self._sessions.pop(session_key, None)
-        await session.stop(reason="dropped")
+        await session.stop(reason=reason)
 
     def _to_container_path(self, host_cwd: str) -> str:
         resolved = Path(host_cwd).expanduser().resolve()
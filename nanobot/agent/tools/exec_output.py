@@ -0,0 +1,66 @@
+"""Bounded head+tail collector for streamed command output."""
+
+from __future__ import annotations
+
+DEFAULT_HEAD_BYTES = 6000
+DEFAULT_TAIL_BYTES = 4000
+
+
+class OutputCollector:
+    """
+    Keep the first and last bytes of a stream and count what was dropped.
+
+    Memory stays at ``head_bytes + tail_bytes`` regardless of how much a command
+    prints. ``feed`` returns False once ``max_total_bytes`` has been seen, which
+    callers treat as a signal to kill the producer.
+    """
+
+    def __init__(
+        self,
+        head_bytes: int = DEFAULT_HEAD_BYTES,
+        tail_bytes: int = DEFAULT_TAIL_BYTES,
+        max_total_bytes: int = 0,
+    ):
+        self.head_bytes = max(0, head_bytes)
+        self.tail_bytes = max(0, tail_bytes)
+        self.max_total_bytes = max(0, max_total_bytes)
+        self.total_bytes = 0
+        self._head = bytearray()
+        self._tail = bytearray()
+
+    @property
+    def dropped_bytes(self) -> int:
+        return self.total_bytes - len(self._head) - len(self._tail)
+
+    @property
+    def limit_exceeded(self) -> bool:
+        return bool(self.max_total_bytes) and self.total_bytes >= self.max_total_bytes
+
+    def feed(self, chunk: bytes) -> bool:
+        """Add a chunk. Returns False when the total-size limit has been reached."""
+        if not chunk:
+            return not self.limit_exceeded
+        self.total_bytes += len(chunk)
+
+        room = self.head_bytes - len(self._head)
+        if room > 0:
+            self._head += chunk[:room]
+            chunk = chunk[room:]
+        if chunk and self.tail_bytes:
+            if len(chunk) >= self.tail_bytes:
+                self._tail[:] = chunk[-self.tail_bytes :]
+            else:
+                self._tail += chunk
+                overflow = len(self._tail) - self.tail_bytes
+                if overflow > 0:
+                    del self._tail[:overflow]
+        return not self.limit_exceeded
+
+    def text(self) -> str:
+        """Decoded output with an omission marker between head and tail."""
+        head = self._head.decode("utf-8", errors="replace")
+        tail = self._tail.decode("utf-8", errors="replace")
+        dropped = self.dropped_bytes
+        if dropped > 0:
+            return f"{head}\n... ({dropped} bytes omitted) ...\n{tail}"
+        return head + tail
@@ -1,5 +1,6 @@
 """Tool registry for dynamic tool management."""
 
+from collections.abc import Iterable
 from typing import Any
 
 from nanobot.agent.tools.base import Tool
@@ -10,18 +11,31 @@ class ToolRegistry:
     Registry for agent tools.
 
     Allows dynamic registration and execution of tools.
+
+    Tool schemas are rendered once at registration time and filtered views are
+    memoized per allowed-tool set, so the agent loop can resend the same
+    definitions on every iteration without rebuilding them.
     """
 
     def __init__(self):
         self._tools: dict[str, Tool] = {}
+        self._schemas: dict[str, dict[str, Any]] = {}
+        self._views: dict[frozenset[str] | None, tuple[dict[str, Any], ...]] = {}
 
     def register(self, tool: Tool) -> None:
         """Register a tool."""
         self._tools[tool.name] = tool
+        self._schemas[tool.name] = tool.to_schema()
+        self._invalidate_views()
 
     def unregister(self, name: str) -> None:
         """Unregister a tool by name."""
         self._tools.pop(name, None)
+        self._schemas.pop(name, None)
+        self._invalidate_views()
+
+    def _invalidate_views(self) -> None:
+        self._views.clear()
 
     def get(self, name: str) -> Tool | None:
         """Get a tool by name."""
@@ -31,9 +45,30 @@ class ToolRegistry:
         """Check if a tool is registered."""
         return name in self._tools
 
-    def get_definitions(self) -> list[dict[str, Any]]:
-        """Get all tool definitions in OpenAI format."""
-        return [tool.to_schema() for tool in self._tools.values()]
+    def _view(self, allowed: Iterable[str] | None) -> tuple[dict[str, Any], ...]:
+        key = None if allowed is None else frozenset(allowed)
+        view = self._views.get(key)
+        if view is None:
+            view = tuple(
+                schema
+                for name, schema in self._schemas.items()
+                if key is None or name in key
+            )
+            self._views[key] = view
+        return view
+
+    def get_definitions(self, allowed: Iterable[str] | None = None) -> list[dict[str, Any]]:
+        """
+        Get tool definitions in OpenAI format.
+
+        Args:
+            allowed: Optional tool names to include; all tools when omitted.
+
+        Returns:
+            Precomputed schema dicts in registration order. The dicts are shared
+            between calls and must be treated as read-only.
+        """
+        return list(self._view(allowed))
 
     async def execute(self, name: str, params: dict[str, Any]) -> str:
         """
@@ -5,12 +5,14 @@ from __future__ import annotations
 import asyncio
 import os
 import re
+import signal
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
 from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.exec_output import OutputCollector
 from nanobot.agent.tools.file_access import grants_are_active
 from nanobot.config.schema import ExecIsolationConfig
 
@@ -33,8 +35,12 @@ class ExecTool(Tool):
         *,
         extra_mounts: list["SandboxMount"] | None = None,
         grant_container_prefixes: list[str] | None = None,
+        max_output_bytes: int = 4 * 1024 * 1024,
+        warm_pool: bool = True,
     ):
         self.timeout = timeout
+        self.max_output_bytes = max(0, max_output_bytes)
+        self.warm_pool = warm_pool
         self.working_dir = working_dir
         self.deny_patterns = deny_patterns or [
             r"\brm\s+-[rf]{1,2}\b",  # rm -r, rm -rf, rm -fr
@@ -106,6 +112,15 @@ class ExecTool(Tool):
     def set_session_context(self, session_key: str) -> None:
         """Bind exec calls to a session key for batch-session isolation."""
         self._session_key = session_key or "cli:default"
+        if self._sandbox_manager:
+            # Warm a sandbox while the model is still deciding whether to call exec.
+            self._sandbox_manager.schedule_prewarm()
+
+    def sandbox_stats(self) -> dict[str, object] | None:
+        """Sandbox pool occupancy and start-latency metrics, if isolation is active."""
+        if self._sandbox_manager is None:
+            return None
+        return self._sandbox_manager.stats()
 
     def close(self) -> None:
         """Close isolation resources synchronously."""
@@ -183,6 +198,8 @@ class ExecTool(Tool):
                 pressure_policy=self.isolation_config.pressure_policy,
                 allowlist_path=allowlist_path,
                 extra_mounts=self._extra_mounts,
+                warm_pool_size=self.isolation_config.warm_pool_size if self.warm_pool else 0,
+                max_uses_per_sandbox=self.isolation_config.max_uses_per_sandbox,
             )
         except Exception as e:
             self._isolation_error = str(e)
@@ -199,37 +216,110 @@ class ExecTool(Tool):
 
     async def _execute_local(self, command: str, cwd: str) -> str:
         try:
+            # Own process group so a kill reaches every stage of a pipeline,
+            # not just the ``sh -c`` wrapper.
             process = await asyncio.create_subprocess_shell(
                 command,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
                 cwd=cwd,
+                start_new_session=True,
             )
 
+            stdout = OutputCollector()
+            stderr = OutputCollector()
+            limit_hit = asyncio.Event()
+
+            async def pump(stream: asyncio.StreamReader, collector: OutputCollector) -> None:
+                while chunk := await stream.read(65536):
+                    collector.feed(chunk)
+                    if self.max_output_bytes and (
+                        stdout.total_bytes + stderr.total_bytes >= self.max_output_bytes
+                    ):
+                        limit_hit.set()
+                        return
+
+            async def collect() -> None:
+                assert process.stdout is not None and process.stderr is not None
+                await asyncio.gather(pump(process.stdout, stdout), pump(process.stderr, stderr))
+                if not limit_hit.is_set():
+                    # Output may close long before exit (``exec >&-``); the wait
+                    # stays inside the same timeout.
+                    await process.wait()
+
+            run = asyncio.ensure_future(collect())
+            limit_wait = asyncio.ensure_future(limit_hit.wait())
             try:
-                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=self.timeout)
-            except asyncio.TimeoutError:
-                process.kill()
-                return f"Error: Command timed out after {self.timeout} seconds"
+                done, _ = await asyncio.wait(
+                    {run, limit_wait},
+                    timeout=self.timeout,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+            finally:
+                limit_wait.cancel()
+
+            killed_reason: str | None = None
+            if not done:
+                killed_reason = "timeout"
+            elif limit_hit.is_set():
+                killed_reason = "output limit exceeded"
+            if killed_reason:
+                run.cancel()
+                try:
+                    await run
+                except (asyncio.CancelledError, Exception):
+                    pass
+                await self._kill_process_group(process)
+                if killed_reason == "timeout":
+                    return f"Error: Command timed out after {self.timeout} seconds"
+            else:
+                run.result()
 
             output_parts = []
 
-            if stdout:
-                output_parts.append(stdout.decode("utf-8", errors="replace"))
+            if stdout.total_bytes:
+                output_parts.append(stdout.text())
 
-            if stderr:
-                stderr_text = stderr.decode("utf-8", errors="replace")
+            if stderr.total_bytes:
+                stderr_text = stderr.text()
                 if stderr_text.strip():
                     output_parts.append(f"STDERR:\n{stderr_text}")
 
             result = "\n".join(output_parts) if output_parts else "(no output)"
-            if process.returncode != 0:
-                result = f"{result}\n\nExit code: {process.returncode}"
-            return self._truncate_result(result)
+            return self._format_result(
+                result,
+                exit_code=process.returncode,
+                total_bytes=stdout.total_bytes + stderr.total_bytes,
+                dropped_bytes=stdout.dropped_bytes + stderr.dropped_bytes,
+                killed_reason=killed_reason,
+            )
 
         except Exception as e:
             return f"Error executing command: {str(e)}"
 
+    @staticmethod
+    async def _kill_process_group(process: asyncio.subprocess.Process) -> None:
+        """SIGKILL the command's whole process group and reap the shell."""
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        except OSError:
+            process.kill()
+
+        async def drain(stream: asyncio.StreamReader | None) -> None:
+            # ``wait()`` also waits for the pipes to close, which needs them read.
+            while stream is not None and await stream.read(65536):
+                pass
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(drain(process.stdout), drain(process.stderr), process.wait()),
+                timeout=5,
+            )
+        except asyncio.TimeoutError:
+            logger.warning("exec: pid {} did not exit after SIGKILL", process.pid)
+
     async def _execute_isolated(self, command: str, cwd: str) -> str:
         from nanobot.agent.tools.exec_isolation import (
             IsolationUnavailableError,
@@ -247,6 +337,7 @@ class ExecTool(Tool):
                 command=command,
                 host_cwd=cwd,
                 timeout=self.timeout,
+                max_output_bytes=self.max_output_bytes,
             )
         except SandboxTimeoutError:
             return f"Error: Command timed out after {self.timeout} seconds"
@@ -257,10 +348,38 @@ class ExecTool(Tool):
         except Exception as e:
             return f"Error executing command: {str(e)}"
 
-        output = result.output if result.output else "(no output)"
-        if result.exit_code != 0:
-            output = f"{output}\n\nExit code: {result.exit_code}"
-        return self._truncate_result(output)
+        return self._format_result(
+            result.output if result.output else "(no output)",
+            exit_code=result.exit_code,
+            total_bytes=result.total_bytes,
+            dropped_bytes=result.dropped_bytes,
+            killed_reason=result.killed_reason,
+        )
+
+    def _format_result(
+        self,
+        output: str,
+        *,
+        exit_code: int | None,
+        total_bytes: int,
+        dropped_bytes: int,
+        killed_reason: str | None,
+    ) -> str:
+        """Append the run summary (kill reason, omitted bytes, exit code) to the output."""
+        output = self._truncate_result(output)
+        summary: list[str] = []
+        if killed_reason:
+            summary.append(
+                f"Command killed: {killed_reason} ({total_bytes} bytes, "
+                f"limit {self.max_output_bytes})"
+            )
+        elif dropped_bytes:
+            summary.append(f"Output: {total_bytes} bytes, {dropped_bytes} omitted")
+        if exit_code and not killed_reason:
+            summary.append(f"Exit code: {exit_code}")
+        if summary:
+            output = f"{output}\n\n" + "\n".join(summary)
+        return output
 
     @staticmethod
     def _truncate_result(result: str) -> str:
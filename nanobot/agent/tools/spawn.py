@@ -1,5 +1,6 @@
 """Spawn tool for creating background subagents."""
 
+import time
 from typing import TYPE_CHECKING, Any
 
 from nanobot.agent.tools.base import Tool
@@ -35,7 +36,9 @@ class SpawnTool(Tool):
         return (
             "Spawn a subagent to handle a task in the background. "
             "Use this for complex or time-consuming tasks that can run independently. "
-            "The subagent will complete the task and report back when done."
+            "The subagent will complete the task and report back when done. "
+            "Use action 'list' to see this chat's background tasks and 'cancel' with a "
+            "task_id to stop one."
         )
 
     @property
@@ -43,20 +46,48 @@ class SpawnTool(Tool):
         return {
             "type": "object",
             "properties": {
+                "action": {
+                    "type": "string",
+                    "enum": ["spawn", "list", "cancel"],
+                    "description": "What to do (default: spawn)",
+                },
                 "task": {
                     "type": "string",
-                    "description": "The task for the subagent to complete",
+                    "description": "The task for the subagent to complete (for spawn)",
                 },
                 "label": {
                     "type": "string",
                     "description": "Optional short label for the task (for display)",
                 },
+                "task_id": {
+                    "type": "string",
+                    "description": "Id of the background task to cancel (for cancel)",
+                },
             },
-            "required": ["task"],
         }
 
-    async def execute(self, task: str, label: str | None = None, **kwargs: Any) -> str:
-        """Spawn a subagent to execute the given task."""
+    async def execute(
+        self,
+        task: str | None = None,
+        label: str | None = None,
+        action: str = "spawn",
+        task_id: str | None = None,
+        **kwargs: Any,
+    ) -> str:
+        """Spawn, list or cancel subagents of the current chat."""
+        chat_key = f"{self._origin_channel}:{self._origin_chat_id}"
+        if action == "list":
+            jobs = self._manager.list_jobs(chat_key)
+            if not jobs:
+                return "No background tasks in this chat."
+            now = time.monotonic()
+            return "\n".join(job.describe(now) for job in jobs)
+        if action == "cancel":
+            if not task_id:
+                return "Error: task_id is required to cancel a background task"
+            return self._manager.cancel(task_id, chat_key=chat_key)
+        if not task:
+            return "Error: task is required to spawn a subagent"
         return await self._manager.spawn(
             task=task,
             label=label,
@@ -1,17 +1,20 @@
 """Web tools: web_search, web_fetch, and deep_research (all powered by Tavily)."""
 
+import asyncio
 import html
 import ipaddress
 import json
 import os
 import re
 import socket
+import time
 from typing import Any
 from urllib.parse import urlparse
 
 import httpx
 
 from nanobot.agent.tools.base import Tool
+from nanobot.storage.web_cache import WebCache, freshness_ttl, normalize_query
 
 # Shared constants
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_7_2) AppleWebKit/537.36"
@@ -95,6 +98,91 @@ def _tavily_auth_headers(api_key: str) -> dict[str, str]:
     return {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
 
 
+async def _tavily_post(
+    endpoint: str,
+    api_key: str,
+    payload: dict[str, Any],
+    *,
+    timeout: float,
+    client: httpx.AsyncClient | None = None,
+) -> httpx.Response:
+    """POST to a Tavily endpoint, reusing ``client`` when the caller has one open."""
+    if client is not None:
+        return await client.post(
+            endpoint, json=payload, headers=_tavily_auth_headers(api_key), timeout=timeout
+        )
+    async with httpx.AsyncClient() as own_client:
+        return await own_client.post(
+            endpoint, json=payload, headers=_tavily_auth_headers(api_key), timeout=timeout
+        )
+
+
+async def _tavily_search(
+    api_key: str,
+    payload: dict[str, Any],
+    *,
+    timeout: float,
+    cache: WebCache | None = None,
+    client: httpx.AsyncClient | None = None,
+) -> dict[str, Any]:
+    """Run one Tavily search, serving identical recent queries from the cache."""
+    key = "\n".join(
+        [
+            normalize_query(str(payload.get("query", ""))),
+            str(payload.get("search_depth", "basic")),
+            str(payload.get("max_results", "")),
+        ]
+    )
+    if cache is not None:
+        cached = await asyncio.to_thread(cache.get, "search", key)
+        if cached is not None and cached.fresh:
+            return json.loads(cached.text())  # type: ignore[no-any-return]
+
+    r = await _tavily_post(_TAVILY_SEARCH_URL, api_key, payload, timeout=timeout, client=client)
+    r.raise_for_status()
+    data: dict[str, Any] = r.json()
+    if cache is not None:
+        await asyncio.to_thread(
+            cache.put, "search", key, json.dumps(data), ttl_seconds=cache.search_ttl_seconds
+        )
+    return data
+
+
+async def _tavily_extract(
+    api_key: str,
+    url: str,
+    *,
+    timeout: float,
+    cache: WebCache | None = None,
+    client: httpx.AsyncClient | None = None,
+) -> str | None:
+    """Extract one page's text via Tavily Extract. Returns None when nothing was extracted."""
+    cache_key = f"tavily\n{url}"
+    if cache is not None:
+        cached = await asyncio.to_thread(cache.get, "extract", cache_key)
+        if cached is not None and cached.fresh:
+            return cached.text()
+
+    r = await _tavily_post(
+        _TAVILY_EXTRACT_URL, api_key, {"urls": [url]}, timeout=timeout, client=client
+    )
+    if r.status_code != 200:
+        return None
+    results = r.json().get("results", [])
+    if not results:
+        return None
+    item = results[0]
+    raw_content = item.get("raw_content") or item.get("content") or ""
+    if not raw_content:
+        return None
+
+    if cache is not None:
+        await asyncio.to_thread(
+            cache.put, "extract", cache_key, raw_content, ttl_seconds=cache.fetch_ttl_seconds
+        )
+    return str(raw_content)
+
+
 class WebSearchTool(Tool):
     """Search the web using Tavily Search API."""
 
@@ -109,9 +197,15 @@ class WebSearchTool(Tool):
         "required": ["query"]
     }
 
-    def __init__(self, api_key: str | None = None, max_results: int = 5):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        max_results: int = 5,
+        cache: WebCache | None = None,
+    ):
         self.api_key = api_key or os.environ.get("TAVILY_API_KEY", "")
         self.max_results = max_results
+        self.cache = cache
 
     async def execute(self, query: str, count: int | None = None, **kwargs: Any) -> str:
         if not self.api_key:
@@ -125,16 +219,7 @@ class WebSearchTool(Tool):
                 "max_results": n,
                 "include_answer": True,
             }
-            async with httpx.AsyncClient() as client:
-                r = await client.post(
-                    _TAVILY_SEARCH_URL,
-                    json=payload,
-                    headers=_tavily_auth_headers(self.api_key),
-                    timeout=15.0,
-                )
-                r.raise_for_status()
-
-            data = r.json()
+            data = await _tavily_search(self.api_key, payload, timeout=15.0, cache=self.cache)
             results = data.get("results", [])
             if not results:
                 return f"No results for: {query}"
@@ -156,6 +241,9 @@ class WebFetchTool(Tool):
 
     Uses Tavily Extract when an API key is available (handles JS-heavy and paywalled pages),
     falls back to direct HTTP fetch with Readability extraction.
+
+    With a cache, extracted text is reused per URL and extract mode while the source
+    response is fresh, and stale responses are revalidated with ETag/Last-Modified.
     """
 
     name = "web_fetch"
@@ -170,9 +258,15 @@ class WebFetchTool(Tool):
         "required": ["url"]
     }
 
-    def __init__(self, api_key: str | None = None, max_chars: int = 50000):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        max_chars: int = 50000,
+        cache: WebCache | None = None,
+    ):
         self.api_key = api_key or os.environ.get("TAVILY_API_KEY", "")
         self.max_chars = max_chars
+        self.cache = cache
 
     async def execute(
         self, url: str, extract_mode: str = "markdown", max_chars: int | None = None, **kwargs: Any
@@ -198,95 +292,147 @@ class WebFetchTool(Tool):
 
     async def _tavily_extract(self, url: str, max_chars: int) -> str | None:
         """Extract content via Tavily Extract API. Returns None on failure."""
-        async with httpx.AsyncClient() as client:
-            r = await client.post(
-                _TAVILY_EXTRACT_URL,
-                json={"urls": [url]},
-                headers=_tavily_auth_headers(self.api_key),
-                timeout=30.0,
-            )
-            if r.status_code != 200:
-                return None
-
-        data = r.json()
-        results = data.get("results", [])
-        if not results:
-            return None
-
-        item = results[0]
-        raw_content = item.get("raw_content") or item.get("content") or ""
-        if not raw_content:
+        raw_content = await _tavily_extract(self.api_key, url, timeout=30.0, cache=self.cache)
+        if raw_content is None:
             return None
+        return self._render(
+            {"url": url, "finalUrl": url, "extractor": "tavily", "text": raw_content}, max_chars
+        )
 
-        truncated = len(raw_content) > max_chars
-        text = raw_content[:max_chars] if truncated else raw_content
-        return json.dumps({
-            "url": url,
-            "finalUrl": url,
-            "extractor": "tavily",
-            "truncated": truncated,
-            "length": len(text),
-            "text": text,
-        })
+    @staticmethod
+    def _render(result: dict[str, Any], max_chars: int) -> str:
+        """Serialize an extraction result, truncating the text to ``max_chars``."""
+        text = str(result.get("text", ""))
+        truncated = len(text) > max_chars
+        if truncated:
+            text = text[:max_chars]
+        return json.dumps({**result, "truncated": truncated, "length": len(text), "text": text})
 
     async def _direct_fetch(self, url: str, extract_mode: str, max_chars: int) -> str:
         """Direct HTTP fetch with Readability extraction."""
-        from readability import Document
+        cache = self.cache
+        extract_key = f"{extract_mode}\n{url}"
+        if cache is not None:
+            cached_extract = await asyncio.to_thread(cache.get, "extract", extract_key)
+            if cached_extract is not None and cached_extract.fresh:
+                result = dict(cached_extract.meta, text=cached_extract.text())
+                return self._render(result, max_chars)
 
         try:
-            async with httpx.AsyncClient(
-                follow_redirects=False,
-                timeout=30.0
-            ) as client:
-                next_url = url
-                redirects = 0
-                while True:
-                    is_valid, error_msg = _validate_url(next_url)
-                    if not is_valid:
-                        return json.dumps({"error": f"URL validation failed: {error_msg}", "url": next_url})
-
-                    r = await client.get(next_url, headers={"User-Agent": USER_AGENT})
-
-                    if r.status_code in {301, 302, 303, 307, 308} and "location" in r.headers:
-                        redirects += 1
-                        if redirects > MAX_REDIRECTS:
-                            return json.dumps({"error": "Too many redirects", "url": url})
-                        location = r.headers.get("location", "")
-                        if not location:
-                            return json.dumps({"error": "Redirect missing location header", "url": next_url})
-                        next_url = str(r.url.join(location))
-                        continue
-
+            cached = None
+            if cache is not None:
+                cached = await asyncio.to_thread(cache.get, "http", url)
+            if cached is not None and cached.fresh:
+                body, meta = cached.payload, cached.meta
+                ttl: float | None = cached.expires_at - time.time()
+            else:
+                conditional: dict[str, str] = {}
+                if cached is not None and cached.etag:
+                    conditional["If-None-Match"] = cached.etag
+                if cached is not None and cached.last_modified:
+                    conditional["If-Modified-Since"] = cached.last_modified
+
+                r = await self._get_following_redirects(url, conditional)
+                if isinstance(r, str):
+                    return r
+
+                default_ttl = cache.fetch_ttl_seconds if cache is not None else 0
+                ttl = freshness_ttl(r.headers, default_ttl)
+                if r.status_code == 304 and cached is not None:
+                    body, meta = cached.payload, cached.meta
+                    if cache is not None and ttl is not None:
+                        await asyncio.to_thread(cache.refresh, "http", url, ttl)
+                else:
                     r.raise_for_status()
-                    break
-
-            ctype = r.headers.get("content-type", "")
-
-            # JSON
-            if "application/json" in ctype:
-                text, extractor = json.dumps(r.json(), indent=2), "json"
-            # HTML
-            elif "text/html" in ctype or r.text[:256].lower().startswith(("<!doctype", "<html")):
-                doc = Document(r.text)
-                content = (
-                    self._to_markdown(doc.summary()) if extract_mode == "markdown" else _strip_tags(doc.summary())
+                    body = r.content
+                    meta = {
+                        "finalUrl": str(r.url),
+                        "status": r.status_code,
+                        "contentType": r.headers.get("content-type", ""),
+                        "encoding": r.encoding or "utf-8",
+                    }
+                    if cache is not None and ttl is not None:
+                        await asyncio.to_thread(
+                            cache.put,
+                            "http",
+                            url,
+                            body,
+                            ttl_seconds=ttl,
+                            etag=r.headers.get("etag"),
+                            last_modified=r.headers.get("last-modified"),
+                            meta=meta,
+                        )
+
+            text, extractor = self._extract(
+                body.decode(str(meta.get("encoding") or "utf-8"), errors="replace"),
+                str(meta.get("contentType") or ""),
+                extract_mode,
+            )
+            result = {
+                "url": url,
+                "finalUrl": meta.get("finalUrl", url),
+                "status": meta.get("status", 200),
+                "extractor": extractor,
+                "text": text,
+            }
+            if cache is not None and ttl:
+                await asyncio.to_thread(
+                    cache.put,
+                    "extract",
+                    extract_key,
+                    text,
+                    ttl_seconds=ttl,
+                    meta={k: v for k, v in result.items() if k != "text"},
                 )
-                text = f"# {doc.title()}\n\n{content}" if doc.title() else content
-                extractor = "readability"
-            else:
-                text, extractor = r.text, "raw"
-
-            truncated = len(text) > max_chars
-            if truncated:
-                text = text[:max_chars]
-
-            return json.dumps({
-                "url": url, "finalUrl": str(r.url), "status": r.status_code,
-                "extractor": extractor, "truncated": truncated, "length": len(text), "text": text,
-            })
+            return self._render(result, max_chars)
         except Exception as e:
             return json.dumps({"error": str(e), "url": url})
 
+    async def _get_following_redirects(
+        self, url: str, extra_headers: dict[str, str]
+    ) -> httpx.Response | str:
+        """GET with SSRF validation on every hop. Returns a JSON error string on failure."""
+        async with httpx.AsyncClient(
+            follow_redirects=False,
+            timeout=30.0
+        ) as client:
+            next_url = url
+            redirects = 0
+            while True:
+                is_valid, error_msg = _validate_url(next_url)
+                if not is_valid:
+                    return json.dumps({"error": f"URL validation failed: {error_msg}", "url": next_url})
+
+                r = await client.get(next_url, headers={"User-Agent": USER_AGENT, **extra_headers})
+
+                if r.status_code in {301, 302, 303, 307, 308} and "location" in r.headers:
+                    redirects += 1
+                    if redirects > MAX_REDIRECTS:
+                        return json.dumps({"error": "Too many redirects", "url": url})
+                    location = r.headers.get("location", "")
+                    if not location:
+                        return json.dumps({"error": "Redirect missing location header", "url": next_url})
+                    next_url = str(r.url.join(location))
+                    continue
+                return r
+
+    def _extract(self, body: str, ctype: str, extract_mode: str) -> tuple[str, str]:
+        """Turn a response body into (text, extractor name)."""
+        from readability import Document
+
+        # JSON
+        if "application/json" in ctype:
+            return json.dumps(json.loads(body), indent=2), "json"
+        # HTML
+        if "text/html" in ctype or body[:256].lower().startswith(("<!doctype", "<html")):
+            doc = Document(body)
+            content = (
+                self._to_markdown(doc.summary()) if extract_mode == "markdown" else _strip_tags(doc.summary())
+            )
+            text = f"# {doc.title()}\n\n{content}" if doc.title() else content
+            return text, "readability"
+        return body, "raw"
+
     def _to_markdown(self, html_text: str) -> str:
         """Convert HTML to markdown."""
         # Convert links, headings, lists before stripping tags
@@ -308,8 +454,11 @@ class DeepResearchTool(Tool):
     """Multi-pass web research using Tavily Search API.
 
     Performs an initial advanced search, derives follow-up queries from the result titles,
-    then runs up to two additional basic searches to broaden coverage. Returns a synthesised
-    report with key findings and deduplicated source list.
+    then fans the follow-up searches out concurrently and extracts the top sources in
+    parallel over one shared HTTP client. Follow-ups are cancelled once ``target_sources``
+    distinct URLs are known, and the whole call is bounded by ``time_budget_seconds``.
+    Returns a synthesised report with key findings, page excerpts, a deduplicated source
+    list and per-stage timings.
 
     No shell or exec access required — runs entirely in-process.
     """
@@ -344,8 +493,24 @@ class DeepResearchTool(Tool):
         "required": ["query"],
     }
 
-    def __init__(self, api_key: str | None = None):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        cache: WebCache | None = None,
+        *,
+        max_follow_ups: int = 2,
+        max_concurrency: int = 3,
+        extract_top: int = 3,
+        target_sources: int = 15,
+        time_budget_seconds: float = 45.0,
+    ):
         self.api_key = api_key or os.environ.get("TAVILY_API_KEY", "")
+        self.cache = cache
+        self.max_follow_ups = max(0, max_follow_ups)
+        self.max_concurrency = max(1, max_concurrency)
+        self.extract_top = max(0, extract_top)
+        self.target_sources = max(1, target_sources)
+        self.time_budget_seconds = max(1.0, time_budget_seconds)
 
     async def execute(
         self, query: str, depth: str = "advanced", max_results: int = 5, **kwargs: Any
@@ -353,38 +518,71 @@ class DeepResearchTool(Tool):
         if not self.api_key:
             return "Error: TAVILY_API_KEY not configured"
 
+        n = min(max(max_results, 1), 10)
+        started = time.monotonic()
+        deadline = started + self.time_budget_seconds
+        timings: list[str] = []
+        excerpts: dict[str, str] = {}
         try:
-            n = min(max(max_results, 1), 10)
-            all_results: list[dict[str, Any]] = []
-            all_answers: list[str] = []
-            queries_done: set[str] = {query}
-
-            # Pass 1: primary search with advanced depth for richer results
-            primary = await self._search(query, search_depth="advanced", max_results=n)
-            all_results.extend(primary.get("results", []))
-            if answer := primary.get("answer"):
-                all_answers.append(f"[{query}] {answer}")
-
-            if depth == "advanced":
-                # Extract follow-up queries from primary result titles
-                follow_ups = self._extract_follow_up_queries(query, primary.get("results", []))
-
-                # Passes 2 & 3: follow-up searches
-                for fq in follow_ups[:2]:
-                    if fq in queries_done:
-                        continue
-                    queries_done.add(fq)
-                    extra = await self._search(fq, search_depth="basic", max_results=n)
-                    all_results.extend(extra.get("results", []))
-                    if answer := extra.get("answer"):
-                        all_answers.append(f"[{fq}] {answer}")
-
-            return self._format_report(query, all_answers, all_results)
+            async with httpx.AsyncClient() as client:
+                # Pass 1: primary search with advanced depth for richer results
+                stage = time.monotonic()
+                primary = await asyncio.wait_for(
+                    self._search(query, search_depth="advanced", max_results=n, client=client),
+                    timeout=self.time_budget_seconds,
+                )
+                timings.append(f"search {time.monotonic() - stage:.2f}s")
+                passes: list[tuple[str, dict[str, Any]]] = [(query, primary)]
+
+                if depth == "advanced":
+                    follow_ups = [
+                        fq
+                        for fq in self._extract_follow_up_queries(query, primary.get("results", []))
+                        if fq != query
+                    ][: self.max_follow_ups]
+                    seen_urls = {r.get("url") for r in primary.get("results", []) if r.get("url")}
+
+                    # Passes 2+: follow-up searches, fanned out concurrently
+                    stage = time.monotonic()
+                    extra = await self._fan_out_searches(follow_ups, n, client, deadline, seen_urls)
+                    passes.extend((fq, data) for fq, data in zip(follow_ups, extra) if data)
+                    timings.append(
+                        f"follow-ups {time.monotonic() - stage:.2f}s "
+                        f"({sum(1 for d in extra if d)}/{len(follow_ups)} queries)"
+                    )
+
+                    top_urls = list(
+                        dict.fromkeys(
+                            r["url"] for _, data in passes for r in data.get("results", [])
+                            if r.get("url")
+                        )
+                    )[: self.extract_top]
+                    stage = time.monotonic()
+                    excerpts = await self._extract_pages(top_urls, client, deadline)
+                    timings.append(
+                        f"extract {time.monotonic() - stage:.2f}s "
+                        f"({len(excerpts)}/{len(top_urls)} pages)"
+                    )
+        except TimeoutError:
+            return f"Error: research timed out after {self.time_budget_seconds:.0f}s"
         except Exception as e:
             return f"Error: {e}"
 
+        all_results: list[dict[str, Any]] = []
+        all_answers: list[str] = []
+        for q, data in passes:
+            all_results.extend(data.get("results", []))
+            if answer := data.get("answer"):
+                all_answers.append(f"[{q}] {answer}")
+        timings.append(f"total {time.monotonic() - started:.2f}s")
+        return self._format_report(query, all_answers, all_results, excerpts, timings)
+
     async def _search(
-        self, query: str, search_depth: str = "basic", max_results: int = 5
+        self,
+        query: str,
+        search_depth: str = "basic",
+        max_results: int = 5,
+        client: httpx.AsyncClient | None = None,
     ) -> dict[str, Any]:
         payload: dict[str, Any] = {
             "query": query,
@@ -392,15 +590,81 @@ class DeepResearchTool(Tool):
             "max_results": max_results,
             "include_answer": True,
         }
-        async with httpx.AsyncClient() as client:
-            r = await client.post(
-                _TAVILY_SEARCH_URL,
-                json=payload,
-                headers=_tavily_auth_headers(self.api_key),
-                timeout=30.0,
-            )
-            r.raise_for_status()
-        return r.json()  # type: ignore[no-any-return]
+        return await _tavily_search(
+            self.api_key, payload, timeout=30.0, cache=self.cache, client=client
+        )
+
+    async def _fan_out_searches(
+        self,
+        queries: list[str],
+        max_results: int,
+        client: httpx.AsyncClient,
+        deadline: float,
+        seen_urls: set[str],
+    ) -> list[dict[str, Any] | None]:
+        """
+        Run follow-up searches with bounded concurrency.
+
+        Results keep the order of ``queries`` (None for failed, cancelled or late
+        searches). Outstanding searches are cancelled once ``seen_urls`` reaches
+        ``target_sources`` or the deadline passes.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(q: str) -> dict[str, Any]:
+            async with semaphore:
+                return await self._search(
+                    q, search_depth="basic", max_results=max_results, client=client
+                )
+
+        tasks = {asyncio.create_task(run(q)): i for i, q in enumerate(queries)}
+        results: list[dict[str, Any] | None] = [None] * len(queries)
+        pending = set(tasks)
+        try:
+            while pending and len(seen_urls) < self.target_sources:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        continue  # One failed follow-up should not sink the report
+                    data = task.result()
+                    results[tasks[task]] = data
+                    seen_urls.update(r["url"] for r in data.get("results", []) if r.get("url"))
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        return results
+
+    async def _extract_pages(
+        self, urls: list[str], client: httpx.AsyncClient, deadline: float
+    ) -> dict[str, str]:
+        """Extract page text concurrently; pages not done by the deadline are skipped."""
+        remaining = deadline - time.monotonic()
+        if not urls or remaining <= 0:
+            return {}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(url: str) -> str | None:
+            async with semaphore:
+                return await _tavily_extract(
+                    self.api_key, url, timeout=min(30.0, remaining), cache=self.cache, client=client
+                )
+
+        tasks = {asyncio.create_task(run(url)): url for url in urls}
+        done, pending = await asyncio.wait(tasks, timeout=remaining)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        excerpts: dict[str, str] = {}
+        for task in done:
+            if task.exception() is None and (text := task.result()):
+                excerpts[tasks[task]] = text
+        return {url: excerpts[url] for url in urls if url in excerpts}
 
     def _extract_follow_up_queries(
         self, original: str, results: list[dict[str, Any]]
@@ -429,7 +693,12 @@ class DeepResearchTool(Tool):
         return follow_ups[:3]
 
     def _format_report(
-        self, query: str, answers: list[str], results: list[dict[str, Any]]
+        self,
+        query: str,
+        answers: list[str],
+        results: list[dict[str, Any]],
+        excerpts: dict[str, str] | None = None,
+        timings: list[str] | None = None,
     ) -> str:
         """Format a concise research report."""
         # Deduplicate results by URL
@@ -449,6 +718,13 @@ class DeepResearchTool(Tool):
                 lines.append(f"- {a}")
             lines.append("")
 
+        if excerpts:
+            lines.append("## Excerpts\n")
+            for url, text in excerpts.items():
+                lines.append(f"### {url}")
+                lines.append(" ".join(text.split())[:600])
+                lines.append("")
+
         lines.append(f"## Sources ({len(unique_results)} results)\n")
         for i, item in enumerate(unique_results[:15], 1):
             lines.append(f"{i}. **{item.get('title', 'Untitled')}**")
@@ -457,4 +733,7 @@ class DeepResearchTool(Tool):
                 lines.append(f"   {content[:200]}")
             lines.append("")
 
+        if timings:
+            lines.append(f"_Timings: {' · '.join(timings)}_")
+
         return "\n".join(lines)
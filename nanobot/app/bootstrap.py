@@ -25,15 +25,17 @@ from nanobot.core.intents import (
     QueueMemoryNotesCaptureIntent,
     RecordManualMemoryIntent,
     RecordMetricIntent,
+    SendDeferredOutboundIntent,
     SendOutboundIntent,
     SendReactionIntent,
     SetTypingIntent,
 )
-from nanobot.core.models import InboundEvent
+from nanobot.core.models import InboundEvent, OutboundEvent
 from nanobot.core.orchestrator import Orchestrator
 from nanobot.cron.service import CronService
 from nanobot.cron.types import CronJob
 from nanobot.heartbeat.service import HeartbeatService
+from nanobot.media.index import MediaIndex
 from nanobot.media.router import ModelRouter
 from nanobot.media.storage import MediaStorage
 from nanobot.media.tts import TTSSynthesizer
@@ -42,7 +44,11 @@ from nanobot.providers.factory import ProviderFactory
 from nanobot.providers.openai_compatible import resolve_openai_compatible_credentials
 from nanobot.security import NoopSecurity, SecurityEngine
 from nanobot.session.manager import SessionManager
+from nanobot.storage.group_directory import GroupDirectory
 from nanobot.storage.inbound_archive import InboundArchive
+from nanobot.storage.llm_cache import LLMResponseCache
+from nanobot.storage.web_cache import WebCache
+from nanobot.utils.ttl_set import TTLSet
 
 if TYPE_CHECKING:
     from pathlib import Path
@@ -70,6 +76,87 @@ def _resolve_security_tool_settings(config: "Config") -> tuple[bool, "ExecToolCo
     return restrict_to_workspace, exec_config
 
 
+def build_web_cache(config: "Config") -> WebCache | None:
+    """Open the shared web_fetch/web_search cache, or None when disabled."""
+    from nanobot.utils.helpers import get_cache_path
+
+    cache_config = config.tools.web.cache
+    if not cache_config.enabled:
+        return None
+    try:
+        return WebCache(
+            db_path=get_cache_path() / "web" / "web_cache.db",
+            max_bytes=cache_config.max_bytes,
+            fetch_ttl_seconds=cache_config.fetch_ttl_seconds,
+            search_ttl_seconds=cache_config.search_ttl_seconds,
+        )
+    except Exception as e:
+        logger.warning("web cache disabled: {}", e)
+        return None
+
+
+def build_llm_cache(config: "Config") -> LLMResponseCache | None:
+    """Open the response cache for opted-in side-call routes, or None when disabled."""
+    from nanobot.utils.helpers import get_cache_path
+
+    cache_config = config.models.cache
+    if not cache_config.enabled or not cache_config.routes:
+        return None
+    try:
+        return LLMResponseCache(
+            db_path=get_cache_path() / "llm" / "responses.db",
+            max_bytes=cache_config.max_bytes,
+            route_ttls=cache_config.routes,
+        )
+    except Exception as e:
+        logger.warning("LLM response cache disabled: {}", e)
+        return None
+
+
+def build_media_index(config: "Config") -> MediaIndex | None:
+    """Open the media retention index, seeding it from existing files once."""
+    from nanobot.utils.helpers import get_var_path
+
+    whatsapp_media = config.channels.whatsapp.media
+    pipeline_root = get_var_path() / "media" / "incoming"
+    try:
+        index = MediaIndex()
+        indexed = index.backfill_once(
+            [
+                (whatsapp_media.incoming_path, "whatsapp", "incoming"),
+                (whatsapp_media.outgoing_path, "whatsapp", "outgoing"),
+                (pipeline_root / "telegram", "telegram", "incoming"),
+                (pipeline_root / "discord", "discord", "incoming"),
+            ]
+        )
+    except Exception as e:
+        logger.warning("media index disabled: {}", e)
+        return None
+    if indexed:
+        logger.info("media index backfilled {} files", indexed)
+    return index
+
+
+def build_message_dedupe(config: "Config") -> TTLSet:
+    """Shared inbound duplicate filter, optionally persisted across restarts."""
+    from nanobot.utils.helpers import get_var_path
+
+    dedupe = config.channels.dedupe
+    db_path = get_var_path() / "dedupe.db" if dedupe.persist else None
+    try:
+        return TTLSet(
+            dedupe.ttl_seconds,
+            max_entries=dedupe.max_entries,
+            name="orchestrator dedupe",
+            db_path=db_path,
+        )
+    except Exception as e:
+        logger.warning("persistent dedupe disabled: {}", e)
+        return TTLSet(
+            dedupe.ttl_seconds, max_entries=dedupe.max_entries, name="orchestrator dedupe"
+        )
+
+
 def _inbound_message_to_event(msg: InboundMessage) -> InboundEvent:
     meta = msg.metadata
     return InboundEvent(
@@ -109,6 +196,7 @@ class OrchestratorService:
         self._telemetry = telemetry
         self._memory = memory
         self._running = False
+        self._deferred: set[asyncio.Task[None]] = set()
 
     async def run(self) -> None:
         self._running = True
@@ -139,6 +227,32 @@ class OrchestratorService:
 
     def stop(self) -> None:
         self._running = False
+        for task in self._deferred:
+            task.cancel()
+
+    async def _publish(self, event: OutboundEvent) -> None:
+        await self._bus.publish_outbound(
+            OutboundMessage(
+                channel=event.channel,
+                chat_id=event.chat_id,
+                content=event.content,
+                reply_to=event.reply_to,
+                media=list(event.media),
+                metadata=dict(event.metadata or {}),
+            )
+        )
+
+    def _publish_later(self, event: OutboundEvent, delay_seconds: float) -> None:
+        async def _send() -> None:
+            await asyncio.sleep(delay_seconds)
+            try:
+                await self._publish(event)
+            except Exception as e:
+                logger.error("deferred outbound failed channel={}: {}", event.channel, e)
+
+        task = asyncio.create_task(_send())
+        self._deferred.add(task)
+        task.add_done_callback(self._deferred.discard)
 
     async def _dispatch_intents(self, intents: list[OrchestratorIntent]) -> None:
         for intent in intents:
@@ -146,16 +260,9 @@ class OrchestratorService:
                 case SetTypingIntent():
                     await self._typing_adapter(intent.channel, intent.chat_id, intent.enabled)
                 case SendOutboundIntent():
-                    await self._bus.publish_outbound(
-                        OutboundMessage(
-                            channel=intent.event.channel,
-                            chat_id=intent.event.chat_id,
-                            content=intent.event.content,
-                            reply_to=intent.event.reply_to,
-                            media=list(intent.event.media),
-                            metadata=dict(intent.event.metadata or {}),
-                        )
-                    )
+                    await self._publish(intent.event)
+                case SendDeferredOutboundIntent():
+                    self._publish_later(intent.event, intent.delay_seconds)
                 case SendReactionIntent():
                     await self._bus.publish_reaction(
                         ReactionMessage(
@@ -209,8 +316,14 @@ class GatewayRuntime:
     cron: CronService
     heartbeat: HeartbeatService
     inbound_archive: InboundArchive
+    group_directory: GroupDirectory
     responder: LLMResponder
     memory: MemoryService
+    web_cache: WebCache | None = None
+    llm_cache: LLMResponseCache | None = None
+    policy: EnginePolicyAdapter | None = None
+    media_index: MediaIndex | None = None
+    dedupe: TTLSet | None = None
 
     async def run(self) -> None:
         try:
@@ -226,8 +339,26 @@ class GatewayRuntime:
             self.orchestrator.stop()
             await self.channels.stop_all()
             await self.responder.aclose()
+            provider_stats = self.responder.provider_stats()
+            if provider_stats is not None:
+                logger.info("provider stats: {}", provider_stats)
             self.inbound_archive.close()
+            self.group_directory.close()
             self.memory.close()
+            if self.web_cache is not None:
+                logger.info("web cache stats: {}", self.web_cache.stats())
+                self.web_cache.close()
+            if self.llm_cache is not None:
+                logger.info("LLM response cache stats: {}", self.llm_cache.stats())
+                self.llm_cache.close()
+            if self.policy is not None:
+                logger.info("policy adapter stats: {}", self.policy.stats())
+                self.policy.close()
+            if self.media_index is not None:
+                self.media_index.close()
+            if self.dedupe is not None:
+                logger.info("dedupe stats: {}", self.dedupe.stats())
+                self.dedupe.close()
 
 
 def build_gateway_runtime(
@@ -250,12 +381,21 @@ def build_gateway_runtime(
         retention_days=30,
     )
     inbound_archive.purge_older_than(days=30)
+    group_directory = GroupDirectory(
+        db_path=get_operational_data_path() / "whatsapp" / "groups.db",
+    )
+    if policy_path is not None:
+        imported_groups = group_directory.backfill_once(policy_path.parent)
+        if imported_groups:
+            logger.info("group directory backfilled {} groups", imported_groups)
     model_router = ModelRouter(config.models)
     media_storage = MediaStorage(
         incoming_dir=config.channels.whatsapp.media.incoming_path,
         outgoing_dir=config.channels.whatsapp.media.outgoing_path,
     )
-    provider_factory = ProviderFactory(config=config)
+    media_index = build_media_index(config)
+    llm_cache = build_llm_cache(config)
+    provider_factory = ProviderFactory(config=config, response_cache=llm_cache)
 
     assistant_model = config.agents.defaults.model
     try:
@@ -267,9 +407,12 @@ def build_gateway_runtime(
 
     telemetry = InMemoryTelemetry()
     restrict_to_workspace, exec_config = _resolve_security_tool_settings(config)
+    web_cache = build_web_cache(config)
     security = SecurityEngine(config.security) if config.security.enabled else NoopSecurity()
 
-    memory_service = MemoryService(workspace=workspace, config=config.memory, root_config=config)
+    memory_service = MemoryService(
+        workspace=workspace, config=config.memory, root_config=config, response_cache=llm_cache
+    )
     memory_state_dir = config.memory.wal.state_dir
     try:
         imported = memory_service.backfill_from_workspace_files(force=False)
@@ -279,7 +422,11 @@ def build_gateway_runtime(
         logger.warning("memory backfill failed: {}", e)
 
     cron_store_path = get_operational_data_path() / "cron" / "jobs.json"
-    cron = CronService(cron_store_path)
+    cron = CronService(
+        cron_store_path,
+        max_concurrency=config.cron.max_concurrency,
+        missed_runs=config.cron.missed_runs,
+    )
 
     # Create policy adapter first so we can use it for owner_alert_resolver
     policy_adapter = EnginePolicyAdapter(
@@ -289,6 +436,8 @@ def build_gateway_runtime(
         session_manager=session_manager,
         workspace=workspace,
         memory_state_dir=memory_state_dir,
+        session_state=memory_service.state_store,
+        group_directory=group_directory,
     )
 
     file_access_resolver = build_file_access_resolver(
@@ -322,6 +471,7 @@ def build_gateway_runtime(
         subagent_model=config.agents.defaults.subagent_model,
         max_iterations=config.agents.defaults.max_tool_iterations,
         tavily_api_key=config.tools.web.search.tavily_api_key or None,
+        web_cache=web_cache,
         exec_config=exec_config,
         restrict_to_workspace=restrict_to_workspace,
         session_manager=session_manager,
@@ -335,13 +485,20 @@ def build_gateway_runtime(
         model_router=model_router,
         tts=tts,
         whatsapp_tts_outgoing_dir=config.channels.whatsapp.media.outgoing_path,
+        media_index=media_index,
+        history_config=config.agents.defaults.history,
+        compaction_config=config.agents.defaults.tool_result_compaction,
+        image_config=config.agents.defaults.images,
+        subagent_config=config.agents.defaults.subagents,
     )
     if policy_engine is not None:
         policy_engine.validate(set(responder.tool_names))
 
     # Update policy adapter with actual tool names
     policy_adapter._known_tools = set(responder.tool_names)
-    admin_command_handler = getattr(policy_adapter, "route_admin_command", None)
+    admin_command_handler = getattr(policy_adapter, "aroute_admin_command", None)
+    if admin_command_handler is None:
+        admin_command_handler = getattr(policy_adapter, "route_admin_command", None)
     if admin_command_handler is None:
         admin_command_handler = getattr(policy_adapter, "maybe_handle_admin_command", None)
 
@@ -353,10 +510,13 @@ def build_gateway_runtime(
         model_router=model_router,
         media_storage=media_storage,
         provider_factory=provider_factory,
+        group_directory=group_directory,
+        media_index=media_index,
     )
 
     typing_adapter = ChannelManagerTypingAdapter(channels)
     archive_adapter = SqliteReplyArchiveAdapter(inbound_archive)
+    message_dedupe = build_message_dedupe(config)
     orchestrator = Orchestrator(
         policy=policy_adapter,
         responder=responder,
@@ -372,6 +532,8 @@ def build_gateway_runtime(
         tts=tts,
         whatsapp_tts_outgoing_dir=config.channels.whatsapp.media.outgoing_path,
         owner_alert_resolver=policy_adapter.owner_recipients,
+        media_index=media_index,
+        message_dedupe=message_dedupe,
     )
 
     async def on_cron_job(job: CronJob) -> str | None:
@@ -460,6 +622,12 @@ def build_gateway_runtime(
         cron=cron,
         heartbeat=heartbeat,
         inbound_archive=inbound_archive,
+        group_directory=group_directory,
         responder=responder,
         memory=memory_service,
+        web_cache=web_cache,
+        llm_cache=llm_cache,
+        policy=policy_adapter,
+        media_index=media_index,
+        dedupe=message_dedupe,
     )
@@ -1,10 +1,16 @@
 """Base channel interface for chat platforms."""
 
+import asyncio
 from abc import ABC, abstractmethod
+from collections.abc import Awaitable
 from typing import Any
 
+from loguru import logger
+
 from nanobot.bus.events import InboundMessage, OutboundMessage, ReactionMessage
 from nanobot.bus.queue import MessageBus
+from nanobot.channels.coalesce import InboundCoalescer
+from nanobot.channels.rate_limit import RateLimiter
 
 
 class BaseChannel(ABC):
@@ -16,6 +22,10 @@ class BaseChannel(ABC):
     """
 
     name: str = "base"
+    # Outbound pacing shared by every sender of this channel; None disables it.
+    rate_limiter: RateLimiter | None = None
+    # Inbound burst coalescing; None when the channel publishes every message.
+    coalescer: InboundCoalescer[Any] | None = None
 
     def __init__(self, config: Any, bus: MessageBus):
         """
@@ -28,6 +38,8 @@ class BaseChannel(ABC):
         self.config = config
         self.bus = bus
         self._running = False
+        self._background_tasks: set[asyncio.Task[None]] = set()
+        self._chat_tails: dict[str, asyncio.Task[None]] = {}
 
     @abstractmethod
     async def start(self) -> None:
@@ -115,6 +127,61 @@ class BaseChannel(ABC):
 
         await self.bus.publish_inbound(msg)
 
+    async def _dispatch_inbound(
+        self,
+        chat_id: str,
+        fields: dict[str, Any] | None = None,
+        *,
+        prepare: Awaitable[dict[str, Any] | None] | None = None,
+    ) -> None:
+        """
+        Publish an inbound message (``_handle_message`` keyword arguments).
+
+        With ``prepare`` (media download, transcription, ...) the fields are
+        produced in the background so the platform handler returns immediately,
+        while messages of one chat are still published in arrival order. Plain
+        messages of a chat with no pending work are published inline.
+        """
+        previous = self._chat_tails.get(chat_id)
+        if prepare is None and previous is None:
+            if fields is not None:
+                await self._handle_message(**fields)
+            return
+
+        async def run() -> None:
+            resolved = fields
+            if prepare is not None:
+                try:
+                    resolved = await prepare
+                except Exception as e:
+                    logger.error(f"{self.name}: failed to prepare inbound message: {e}")
+                    resolved = None
+            if previous is not None:
+                await asyncio.wait({previous})
+            if resolved is not None:
+                await self._handle_message(**resolved)
+
+        task = asyncio.create_task(run())
+        self._chat_tails[chat_id] = task
+        self._background_tasks.add(task)
+
+        def _done(t: asyncio.Task[None]) -> None:
+            self._background_tasks.discard(t)
+            if self._chat_tails.get(chat_id) is t:
+                del self._chat_tails[chat_id]
+
+        task.add_done_callback(_done)
+
+    async def _cancel_background_tasks(self) -> None:
+        """Cancel inbound work still queued by ``_dispatch_inbound``."""
+        tasks = list(self._background_tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._background_tasks.clear()
+        self._chat_tails.clear()
+
     @property
     def is_running(self) -> bool:
         """Check if the channel is running."""
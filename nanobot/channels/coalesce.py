@@ -0,0 +1,185 @@
+"""Adaptive coalescing of inbound message bursts behind a single timer."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Generic, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+# Arrival rates decay with this time constant (seconds); a chat that stops
+# talking is back to the base window after roughly half a minute.
+RATE_TAU_S = 10.0
+# Quiet keys only carry a decayed rate; cap how many we remember.
+MAX_TRACKED_KEYS = 4096
+
+
+@dataclass(slots=True)
+class _Bucket(Generic[T]):
+    items: list[T] = field(default_factory=list)
+    first_at: float = 0.0
+    deadline: float = 0.0
+
+
+class InboundCoalescer(Generic[T]):
+    """
+    Trailing-edge debounce for many keys driven by one timer task.
+
+    Each item pushes its bucket's deadline out by the key's current window,
+    but never past ``max_ms`` after the bucket's first item, so a constant
+    flood still flushes regularly. The window is ``base_ms`` for a quiet key
+    and grows with the key's recent arrival rate (``base * (1 + msgs/s)``), so
+    busy chats are merged into fewer, larger batches. Deadlines live in a
+    min-heap with lazy invalidation; rescheduling a bucket never cancels or
+    creates tasks.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[str, list[T]], Awaitable[None]],
+        *,
+        base_ms: int,
+        max_ms: int,
+        max_buckets: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._flush = flush
+        self._base = max(0.0, base_ms / 1000.0)
+        self._max = max(self._base, max_ms / 1000.0)
+        self._max_buckets = max(1, int(max_buckets))
+        self._clock = clock
+        self._buckets: dict[str, _Bucket[T]] = {}
+        self._heap: list[tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._rates: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._wake: asyncio.Event | None = None
+        self._timer: asyncio.Task[None] | None = None
+        self._items = 0
+        self._flushes = 0
+        self._immediate = 0
+        self._overflow = 0
+
+    def _observe(self, key: str, now: float) -> float:
+        """Record an arrival for ``key`` and return its decayed rate in msgs/s."""
+        rate, updated_at = self._rates.pop(key, (0.0, now))
+        rate = rate * math.exp(-(now - updated_at) / RATE_TAU_S) + 1.0 / RATE_TAU_S
+        self._rates[key] = (rate, now)
+        while len(self._rates) > MAX_TRACKED_KEYS:
+            self._rates.popitem(last=False)
+        return rate
+
+    async def add(self, key: str, item: T, *, immediate: bool = False) -> None:
+        """
+        Queue ``item`` under ``key``. With ``immediate`` the key's pending
+        items are flushed right away together with ``item``.
+        """
+        now = self._clock()
+        rate = self._observe(key, now)
+        self._items += 1
+        bucket = self._buckets.get(key)
+        if immediate:
+            self._immediate += 1
+            items = bucket.items if bucket is not None else []
+            self._buckets.pop(key, None)
+            items.append(item)
+            await self._deliver(key, items)
+            return
+
+        if bucket is None:
+            if len(self._buckets) >= self._max_buckets:
+                await self._flush_oldest()
+            bucket = _Bucket(first_at=now)
+            self._buckets[key] = bucket
+        bucket.items.append(item)
+        window = min(self._max, self._base * (1.0 + rate))
+        bucket.deadline = min(bucket.first_at + self._max, now + window)
+        heapq.heappush(self._heap, (bucket.deadline, next(self._seq), key))
+        self._ensure_timer()
+        if self._heap[0][2] == key and self._wake is not None:
+            self._wake.set()
+
+    async def flush(self, key: str) -> None:
+        """Deliver whatever is pending under ``key`` now."""
+        bucket = self._buckets.pop(key, None)
+        if bucket is not None:
+            await self._deliver(key, bucket.items)
+
+    async def _flush_oldest(self) -> None:
+        self._overflow += 1
+        if self._overflow == 1 or self._overflow % 100 == 0:
+            logger.warning(
+                "Inbound coalescer bucket overflow: early_flushes={} max={}",
+                self._overflow,
+                self._max_buckets,
+            )
+        key = min(self._buckets, key=lambda k: self._buckets[k].first_at)
+        await self._deliver(key, self._buckets.pop(key).items)
+
+    def _ensure_timer(self) -> None:
+        if self._timer is None or self._timer.done():
+            self._wake = asyncio.Event()
+            self._timer = asyncio.create_task(self._run())
+
+    def _pop_due(self, now: float) -> list[tuple[str, list[T]]]:
+        due: list[tuple[str, list[T]]] = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, _, key = heapq.heappop(self._heap)
+            bucket = self._buckets.get(key)
+            # Entries for rescheduled or already-flushed buckets are stale.
+            if bucket is None or bucket.deadline != deadline:
+                continue
+            del self._buckets[key]
+            due.append((key, bucket.items))
+        return due
+
+    async def _run(self) -> None:
+        assert self._wake is not None
+        while True:
+            for key, items in self._pop_due(self._clock()):
+                await self._deliver(key, items)
+            self._wake.clear()
+            if not self._heap:
+                await self._wake.wait()
+                continue
+            delay = self._heap[0][0] - self._clock()
+            if delay > 0:
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._wake.wait(), timeout=delay)
+
+    async def _deliver(self, key: str, items: list[T]) -> None:
+        self._flushes += 1
+        try:
+            await self._flush(key, items)
+        except Exception as e:
+            logger.error("Inbound coalescer flush failed for {}: {}", key, e)
+
+    def stats(self) -> dict[str, object]:
+        """Counters for status output."""
+        return {
+            "items": self._items,
+            "flushes": self._flushes,
+            "immediate": self._immediate,
+            "overflow_flushes": self._overflow,
+            "pending_buckets": len(self._buckets),
+            "pending_items": sum(len(b.items) for b in self._buckets.values()),
+        }
+
+    async def close(self) -> None:
+        """Stop the timer and drop anything still pending."""
+        if self._timer is not None:
+            self._timer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._timer
+            self._timer = None
+        self._buckets.clear()
+        self._heap.clear()
@@ -2,7 +2,6 @@
 
 import asyncio
 import json
-from pathlib import Path
 from typing import Any
 
 import httpx
@@ -12,10 +11,14 @@ from loguru import logger
 from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
+from nanobot.channels.rate_limit import RateLimiter
 from nanobot.config.schema import DiscordConfig
+from nanobot.media.pipeline import MediaPipeline, MediaTooLargeError
 
 DISCORD_API_BASE = "https://discord.com/api/v10"
 MAX_ATTACHMENT_BYTES = 20 * 1024 * 1024  # 20MB
+MAX_SEND_ERRORS = 3
+MAX_RATE_LIMITED_RETRIES = 5
 
 
 class DiscordChannel(BaseChannel):
@@ -23,14 +26,21 @@ class DiscordChannel(BaseChannel):
 
     name = "discord"
 
-    def __init__(self, config: DiscordConfig, bus: MessageBus):
+    def __init__(
+        self,
+        config: DiscordConfig,
+        bus: MessageBus,
+        media_pipeline: MediaPipeline | None = None,
+    ):
         super().__init__(config, bus)
         self.config: DiscordConfig = config
+        self._media = media_pipeline or MediaPipeline()
         self._ws: websockets.WebSocketClientProtocol | None = None
         self._seq: int | None = None
         self._heartbeat_task: asyncio.Task | None = None
         self._typing_tasks: dict[str, asyncio.Task] = {}
         self._http: httpx.AsyncClient | None = None
+        self.rate_limiter = RateLimiter.from_config(self.name, config.rate_limit)
 
     async def start(self) -> None:
         """Start the Discord gateway connection."""
@@ -64,6 +74,7 @@ class DiscordChannel(BaseChannel):
         for task in self._typing_tasks.values():
             task.cancel()
         self._typing_tasks.clear()
+        await self._cancel_background_tasks()
         if self._ws:
             await self._ws.close()
             self._ws = None
@@ -86,23 +97,37 @@ class DiscordChannel(BaseChannel):
 
         headers = {"Authorization": f"Bot {self.config.token}"}
 
+        limiter = self.rate_limiter
+        errors = 0
+        rate_limited = 0
         try:
-            for attempt in range(3):
+            while errors < MAX_SEND_ERRORS and rate_limited <= MAX_RATE_LIMITED_RETRIES:
+                if limiter is not None:
+                    await limiter.acquire(msg.chat_id)
                 try:
                     response = await self._http.post(url, headers=headers, json=payload)
+                    if limiter is not None:
+                        limiter.observe_headers(msg.chat_id, response.headers)
                     if response.status_code == 429:
                         data = response.json()
                         retry_after = float(data.get("retry_after", 1.0))
                         logger.warning(f"Discord rate limited, retrying in {retry_after}s")
-                        await asyncio.sleep(retry_after)
+                        rate_limited += 1
+                        if limiter is not None:
+                            limiter.hold(None if data.get("global") else msg.chat_id, retry_after)
+                        else:
+                            await asyncio.sleep(retry_after)
                         continue
                     response.raise_for_status()
                     return
                 except Exception as e:
-                    if attempt == 2:
+                    errors += 1
+                    if errors >= MAX_SEND_ERRORS:
                         logger.error(f"Error sending Discord message: {e}")
                     else:
                         await asyncio.sleep(1)
+            if rate_limited > MAX_RATE_LIMITED_RETRIES:
+                logger.error(f"Discord message to {msg.chat_id} dropped: still rate limited")
         finally:
             await self._stop_typing(msg.chat_id)
 
@@ -196,46 +221,59 @@ class DiscordChannel(BaseChannel):
         if not self.is_allowed(sender_id):
             return
 
-        content_parts = [content] if content else []
-        media_paths: list[str] = []
-        media_dir = Path.home() / ".nanobot" / "media"
-
-        for attachment in payload.get("attachments") or []:
-            url = attachment.get("url")
-            filename = attachment.get("filename") or "attachment"
-            size = attachment.get("size") or 0
-            if not url or not self._http:
-                continue
-            if size and size > MAX_ATTACHMENT_BYTES:
-                content_parts.append(f"[attachment: {filename} - too large]")
-                continue
-            try:
-                media_dir.mkdir(parents=True, exist_ok=True)
-                file_path = media_dir / f"{attachment.get('id', 'file')}_{filename.replace('/', '_')}"
-                resp = await self._http.get(url)
-                resp.raise_for_status()
-                file_path.write_bytes(resp.content)
-                media_paths.append(str(file_path))
-                content_parts.append(f"[attachment: {file_path}]")
-            except Exception as e:
-                logger.warning(f"Failed to download Discord attachment: {e}")
-                content_parts.append(f"[attachment: {filename} - download failed]")
-
+        attachments = [a for a in payload.get("attachments") or [] if a.get("url")]
         reply_to = (payload.get("referenced_message") or {}).get("id")
 
         await self._start_typing(channel_id)
 
-        await self._handle_message(
-            sender_id=sender_id,
-            chat_id=channel_id,
-            content="\n".join(p for p in content_parts if p) or "[empty message]",
-            media=media_paths,
-            metadata={
-                "message_id": str(payload.get("id", "")),
-                "guild_id": payload.get("guild_id"),
-                "reply_to": reply_to,
-            },
-        )
+        def build(parts: list[str], paths: list[str]) -> dict[str, Any]:
+            return {
+                "sender_id": sender_id,
+                "chat_id": channel_id,
+                "content": "\n".join(p for p in parts if p) or "[empty message]",
+                "media": paths,
+                "metadata": {
+                    "message_id": str(payload.get("id", "")),
+                    "guild_id": payload.get("guild_id"),
+                    "reply_to": reply_to,
+                },
+            }
+
+        content_parts = [content] if content else []
+        if not attachments:
+            await self._dispatch_inbound(channel_id, build(content_parts, []))
+            return
+
+        async def prepare() -> dict[str, Any]:
+            results = await asyncio.gather(
+                *(self._download_attachment(a) for a in attachments)
+            )
+            paths = [path for path, _ in results if path]
+            return build(content_parts + [note for _, note in results], paths)
+
+        # Attachments download concurrently in the shared media pipeline.
+        await self._dispatch_inbound(channel_id, prepare=prepare())
+
+    async def _download_attachment(self, attachment: dict[str, Any]) -> tuple[str | None, str]:
+        """Download one attachment; returns (path or None, content note)."""
+        filename = attachment.get("filename") or "attachment"
+        size = attachment.get("size") or 0
+        limit = min(MAX_ATTACHMENT_BYTES, self._media.max_download_bytes)
+        if size and size > limit:
+            return None, f"[attachment: {filename} - too large]"
+        try:
+            downloaded = await self._media.download(
+                self.name,
+                attachment["url"],
+                filename=f"{attachment.get('id', 'file')}_{filename}",
+                max_bytes=limit,
+            )
+        except MediaTooLargeError:
+            return None, f"[attachment: {filename} - too large]"
+        except Exception as e:
+            logger.warning(f"Failed to download Discord attachment: {e}")
+            return None, f"[attachment: {filename} - download failed]"
+        return str(downloaded.path), f"[attachment: {downloaded.path}]"
 
     async def _start_typing(self, channel_id: str) -> None:
         """Start periodic typing indicator for a channel."""
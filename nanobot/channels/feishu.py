@@ -4,7 +4,6 @@ import asyncio
 import json
 import re
 import threading
-from collections import OrderedDict
 from typing import Any
 
 from loguru import logger
@@ -13,6 +12,7 @@ from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
 from nanobot.config.schema import FeishuConfig
+from nanobot.utils.ttl_set import TTLSet
 
 try:
     import lark_oapi as lark
@@ -59,7 +59,7 @@ class FeishuChannel(BaseChannel):
         self._client: Any = None
         self._ws_client: Any = None
         self._ws_thread: threading.Thread | None = None
-        self._processed_message_ids: OrderedDict[str, None] = OrderedDict()  # Ordered dedup cache
+        self._processed_message_ids = TTLSet(20 * 60, max_entries=1000, name="Feishu dedupe")
         self._loop: asyncio.AbstractEventLoop | None = None
 
     async def start(self) -> None:
@@ -260,13 +260,8 @@ class FeishuChannel(BaseChannel):
 
             # Deduplication check
             message_id = message.message_id
-            if message_id in self._processed_message_ids:
+            if self._processed_message_ids.seen(message_id):
                 return
-            self._processed_message_ids[message_id] = None
-
-            # Trim cache: keep most recent 500 when exceeds 1000
-            while len(self._processed_message_ids) > 1000:
-                self._processed_message_ids.popitem(last=False)
 
             # Skip bot messages
             sender_type = sender.sender_type
@@ -13,10 +13,13 @@ from nanobot.config.schema import Config
 from nanobot.providers.openai_compatible import resolve_openai_compatible_credentials
 
 if TYPE_CHECKING:
+    from nanobot.media.index import MediaIndex, SweepResult
+    from nanobot.media.pipeline import MediaPipeline
     from nanobot.media.router import ModelRouter
     from nanobot.media.storage import MediaStorage
     from nanobot.providers.factory import ProviderFactory
     from nanobot.session.manager import SessionManager
+    from nanobot.storage.group_directory import GroupDirectory
     from nanobot.storage.inbound_archive import InboundArchive
 
 
@@ -39,6 +42,9 @@ class ChannelManager:
         model_router: "ModelRouter | None" = None,
         media_storage: "MediaStorage | None" = None,
         provider_factory: "ProviderFactory | None" = None,
+        group_directory: "GroupDirectory | None" = None,
+        media_pipeline: "MediaPipeline | None" = None,
+        media_index: "MediaIndex | None" = None,
     ):
         self.config = config
         self.bus = bus
@@ -47,12 +53,54 @@ class ChannelManager:
         self.model_router = model_router
         self.media_storage = media_storage
         self.provider_factory = provider_factory
+        self.group_directory = group_directory
+        self.media_index = media_index
+        self.media_pipeline = media_pipeline or self._build_media_pipeline()
         self.channels: dict[str, BaseChannel] = {}
         self._dispatch_task: asyncio.Task | None = None
+        self._media_sweep_task: asyncio.Task | None = None
         self._reaction_dispatch_task: asyncio.Task | None = None
 
         self._init_channels()
 
+    def _build_media_pipeline(self) -> "MediaPipeline":
+        """One pipeline for every channel, so media limits and caches are global."""
+        from nanobot.media.asr import ASRTranscriber
+        from nanobot.media.pipeline import MediaPipeline
+        from nanobot.media.router import ModelRouter
+        from nanobot.media.vision import VisionDescriber
+
+        media = self.config.channels.media
+        openai_compat = resolve_openai_compatible_credentials(self.config)
+        return MediaPipeline(
+            router=self.model_router or ModelRouter(self.config.models),
+            asr=ASRTranscriber(
+                groq_api_key=self.config.providers.groq.api_key or None,
+                openai_api_key=openai_compat.api_key if openai_compat else None,
+                openai_api_base=openai_compat.api_base if openai_compat else None,
+                openai_extra_headers=openai_compat.extra_headers if openai_compat else None,
+                max_concurrency=media.max_asr_concurrency,
+                response_cache=(
+                    self.provider_factory.response_cache
+                    if self.provider_factory is not None
+                    else None
+                ),
+            ),
+            vision=(
+                VisionDescriber(self.provider_factory)
+                if self.provider_factory is not None
+                else None
+            ),
+            max_concurrent_downloads=media.max_concurrent_downloads,
+            max_download_bytes=media.max_download_mb * 1024 * 1024,
+            max_vision_concurrency=media.max_vision_concurrency,
+            asr_channel_limits={
+                "whatsapp": self.config.channels.whatsapp.media.max_asr_concurrency,
+            },
+            cache_entries=media.cache_entries,
+            index=self.media_index,
+        )
+
     def _init_channels(self) -> None:
         """Initialize channels based on config."""
 
@@ -66,6 +114,7 @@ class ChannelManager:
                     self.bus,
                     groq_api_key=self.config.providers.groq.api_key,
                     session_manager=self.session_manager,
+                    media_pipeline=self.media_pipeline,
                 )
                 logger.info("Telegram channel enabled")
             except ImportError as e:
@@ -81,6 +130,7 @@ class ChannelManager:
                     self.config.channels.whatsapp,
                     self.bus,
                     inbound_archive=self.inbound_archive,
+                    group_directory=self.group_directory,
                     model_router=self.model_router,
                     media_storage=self.media_storage,
                     provider_factory=self.provider_factory,
@@ -88,6 +138,8 @@ class ChannelManager:
                     openai_api_key=openai_compat.api_key if openai_compat else None,
                     openai_api_base=openai_compat.api_base if openai_compat else None,
                     openai_extra_headers=openai_compat.extra_headers if openai_compat else None,
+                    media_pipeline=self.media_pipeline,
+                    media_index=self.media_index,
                 )
                 logger.info("WhatsApp channel enabled")
             except ImportError as e:
@@ -98,7 +150,11 @@ class ChannelManager:
             try:
                 from nanobot.channels.discord import DiscordChannel
 
-                self.channels["discord"] = DiscordChannel(self.config.channels.discord, self.bus)
+                self.channels["discord"] = DiscordChannel(
+                    self.config.channels.discord,
+                    self.bus,
+                    media_pipeline=self.media_pipeline,
+                )
                 logger.info("Discord channel enabled")
             except ImportError as e:
                 logger.warning(f"Discord channel not available: {e}")
@@ -129,6 +185,8 @@ class ChannelManager:
         # Start outbound and reaction dispatchers
         self._dispatch_task = asyncio.create_task(self._dispatch_outbound())
         self._reaction_dispatch_task = asyncio.create_task(self._dispatch_reactions())
+        if self.media_index is not None:
+            self._media_sweep_task = asyncio.create_task(self._media_sweep_loop())
 
         # Start channels
         tasks = []
@@ -156,6 +214,12 @@ class ChannelManager:
                 await self._reaction_dispatch_task
             except asyncio.CancelledError:
                 pass
+        if self._media_sweep_task:
+            self._media_sweep_task.cancel()
+            try:
+                await self._media_sweep_task
+            except asyncio.CancelledError:
+                pass
 
         # Stop all channels
         for name, channel in self.channels.items():
@@ -165,6 +229,45 @@ class ChannelManager:
             except Exception as e:
                 logger.error(f"Error stopping {name}: {e}")
 
+        logger.info("Media pipeline stats: {}", self.media_pipeline.stats())
+        await self.media_pipeline.close()
+
+    async def sweep_media_once(self) -> "SweepResult | None":
+        """Run one budgeted retention pass over the media index."""
+        if self.media_index is None:
+            return None
+        media = self.config.channels.media
+        day = 24 * 60 * 60
+        whatsapp_media = self.config.channels.whatsapp.media
+        result = await asyncio.to_thread(
+            self.media_index.sweep,
+            max_age_seconds=media.retention_days * day,
+            channel_max_age={"whatsapp": whatsapp_media.retention_days * day},
+            max_total_bytes=media.max_total_mb * 1024 * 1024,
+            budget=media.sweep_budget,
+        )
+        if result.deleted:
+            logger.info(
+                "Media sweep removed {} files ({} bytes){}",
+                result.deleted,
+                result.freed_bytes,
+                "; more pending" if result.budget_exhausted else "",
+            )
+        return result
+
+    async def _media_sweep_loop(self) -> None:
+        """Sweep in small passes; keep going quickly while a backlog remains."""
+        interval = float(self.config.channels.media.sweep_interval_seconds)
+        while True:
+            try:
+                result = await self.sweep_media_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Media sweep failed {}: {}", e.__class__.__name__, e)
+                result = None
+            await asyncio.sleep(1.0 if result and result.budget_exhausted else interval)
+
     async def _dispatch_outbound(self) -> None:
         """Dispatch outbound messages to the appropriate channel."""
         logger.info("Outbound dispatcher started")
@@ -262,10 +365,18 @@ class ChannelManager:
 
     def get_status(self) -> dict[str, Any]:
         """Get status of all channels."""
-        return {
-            name: {"enabled": True, "running": channel.is_running}
-            for name, channel in self.channels.items()
-        }
+        status: dict[str, Any] = {}
+        usage = self.media_index.usage() if self.media_index is not None else {}
+        for name, channel in self.channels.items():
+            entry: dict[str, Any] = {"enabled": True, "running": channel.is_running}
+            if channel.rate_limiter is not None:
+                entry["rate_limit"] = channel.rate_limiter.stats()
+            if channel.coalescer is not None:
+                entry["coalesce"] = channel.coalescer.stats()
+            if name in usage:
+                entry["media"] = usage[name]
+            status[name] = entry
+        return status
 
     @property
     def enabled_channels(self) -> list[str]:
@@ -0,0 +1,178 @@
+"""Token-bucket pacing for outbound channel sends."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from nanobot.config.schema import ChannelRateLimitConfig
+
+# Idle per-destination buckets are full again anyway; cap how many we remember.
+MAX_TRACKED_KEYS = 4096
+
+
+@dataclass(slots=True)
+class TokenBucket:
+    """
+    Reservation-based token bucket.
+
+    ``reserve`` always takes a token and may drive the balance negative; the
+    returned delay is how long the caller must wait for its slot. Concurrent
+    callers therefore queue in arrival order instead of racing for tokens.
+    """
+
+    rate: float
+    capacity: float
+    tokens: float
+    updated_at: float
+
+    def reserve(self, now: float) -> float:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        self.tokens -= 1.0
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+class RateLimiter:
+    """
+    Per-channel limiter with a global bucket and one bucket per destination.
+
+    Destinations can additionally be held until a deadline, which is how
+    server-reported limits (Discord ``X-RateLimit-*`` headers, Telegram
+    ``RetryAfter``, 429 responses) are folded in. ``acquire`` never fails; it
+    waits for the slot and records how long that took.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        global_per_second: float,
+        global_burst: int,
+        per_chat_per_second: float,
+        per_chat_burst: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], object] = asyncio.sleep,
+    ) -> None:
+        self.name = name
+        self._clock = clock
+        self._sleep = sleep
+        self._per_chat_rate = max(0.0, float(per_chat_per_second))
+        self._per_chat_burst = max(1, int(per_chat_burst))
+        self._global: TokenBucket | None = None
+        if global_per_second > 0:
+            self._global = TokenBucket(
+                rate=float(global_per_second),
+                capacity=float(max(1, int(global_burst))),
+                tokens=float(max(1, int(global_burst))),
+                updated_at=clock(),
+            )
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._holds: dict[str, float] = {}
+        self._global_hold = 0.0
+        self._acquired = 0
+        self._delayed = 0
+        self._penalties = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @classmethod
+    def from_config(cls, name: str, config: ChannelRateLimitConfig) -> RateLimiter | None:
+        """Build a limiter from channel config; ``None`` when pacing is disabled."""
+        if not config.enabled:
+            return None
+        return cls(
+            name,
+            global_per_second=config.global_per_second,
+            global_burst=config.global_burst,
+            per_chat_per_second=config.per_chat_per_second,
+            per_chat_burst=config.per_chat_burst,
+        )
+
+    def _bucket(self, key: str, now: float) -> TokenBucket | None:
+        if self._per_chat_rate <= 0:
+            return None
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(
+                rate=self._per_chat_rate,
+                capacity=float(self._per_chat_burst),
+                tokens=float(self._per_chat_burst),
+                updated_at=now,
+            )
+            self._buckets[key] = bucket
+            while len(self._buckets) > MAX_TRACKED_KEYS:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def reserve(self, key: str) -> float:
+        """Take a slot for ``key`` and return how many seconds to wait for it."""
+        now = self._clock()
+        delay = 0.0
+        if self._global is not None:
+            delay = self._global.reserve(now)
+        bucket = self._bucket(key, now)
+        if bucket is not None:
+            delay = max(delay, bucket.reserve(now))
+        hold = max(self._global_hold, self._holds.get(key, 0.0))
+        if hold > now:
+            delay = max(delay, hold - now)
+        elif key in self._holds:
+            del self._holds[key]
+        return delay
+
+    async def acquire(self, key: str) -> float:
+        """Wait until a send to ``key`` may go out. Returns seconds waited."""
+        delay = self.reserve(key)
+        self._acquired += 1
+        if delay > 0:
+            self._delayed += 1
+            self._wait_total += delay
+            self._wait_max = max(self._wait_max, delay)
+            await self._sleep(delay)
+        return delay
+
+    def hold(self, key: str | None, seconds: float) -> None:
+        """Block ``key`` (or the whole channel when ``None``) for ``seconds``."""
+        if seconds <= 0:
+            return
+        until = self._clock() + float(seconds)
+        self._penalties += 1
+        if key is None:
+            self._global_hold = max(self._global_hold, until)
+        else:
+            self._holds[key] = max(self._holds.get(key, 0.0), until)
+        logger.debug("{} rate limit: holding {} for {:.2f}s", self.name, key or "*", seconds)
+
+    def observe_headers(self, key: str, headers: Mapping[str, str]) -> None:
+        """Apply Discord-style ``X-RateLimit-*`` headers to ``key``."""
+        try:
+            remaining = int(headers.get("x-ratelimit-remaining", "1"))
+            reset_after = float(headers.get("x-ratelimit-reset-after", "0"))
+        except ValueError:
+            return
+        if remaining <= 0 and reset_after > 0:
+            is_global = str(headers.get("x-ratelimit-global", "")).lower() == "true"
+            self.hold(None if is_global else key, reset_after)
+
+    def stats(self) -> dict[str, object]:
+        """Wait-time counters for status output."""
+        return {
+            "acquired": self._acquired,
+            "delayed": self._delayed,
+            "penalties": self._penalties,
+            "wait_total_s": round(self._wait_total, 3),
+            "wait_max_s": round(self._wait_max, 3),
+            "tracked_keys": len(self._buckets),
+        }
@@ -4,22 +4,37 @@ from __future__ import annotations
 
 import asyncio
 import re
-from typing import TYPE_CHECKING
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 from telegram import BotCommand, Update
 from telegram.constants import MessageEntityType
-from telegram.error import Conflict, NetworkError, RetryAfter, TelegramError, TimedOut
+from telegram.error import (
+    BadRequest,
+    Conflict,
+    NetworkError,
+    RetryAfter,
+    TelegramError,
+    TimedOut,
+)
 from telegram.ext import Application, CommandHandler, ContextTypes, MessageHandler, filters
 
 from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
-from nanobot.config.schema import TelegramConfig
+from nanobot.channels.rate_limit import RateLimiter
+from nanobot.config.schema import ModelRoutingConfig, TelegramConfig
+from nanobot.media.asr import ASRTranscriber
+from nanobot.media.pipeline import MediaPipeline, MediaTooLargeError
+from nanobot.media.router import ModelRouter
 
 if TYPE_CHECKING:
     from nanobot.session.manager import SessionManager
 
+# Server RetryAfter replies tolerated per message before giving up.
+MAX_RETRY_AFTER_RETRIES = 3
+
 
 def _markdown_to_telegram_html(text: str) -> str:
     """
@@ -106,17 +121,23 @@ class TelegramChannel(BaseChannel):
         bus: MessageBus,
         groq_api_key: str = "",
         session_manager: SessionManager | None = None,
+        media_pipeline: MediaPipeline | None = None,
     ):
         super().__init__(config, bus)
         self.config: TelegramConfig = config
         self.groq_api_key = groq_api_key
         self.session_manager = session_manager
+        self._media = media_pipeline or MediaPipeline(
+            router=ModelRouter(ModelRoutingConfig()),
+            asr=ASRTranscriber(groq_api_key=groq_api_key or None),
+        )
         self._app: Application | None = None
         self._chat_ids: dict[str, int] = {}  # Map sender_id to chat_id for replies
         self._typing_tasks: dict[str, asyncio.Task] = {}  # chat_id -> typing loop task
         self._bot_id: int | None = None
         self._bot_username: str = ""
         self._stopping_due_to_conflict = False
+        self.rate_limiter = RateLimiter.from_config(self.name, config.rate_limit)
 
     async def start(self) -> None:
         """Start the Telegram bot with long polling."""
@@ -183,6 +204,7 @@ class TelegramChannel(BaseChannel):
         # Cancel all typing indicators
         for chat_id in list(self._typing_tasks):
             self._stop_typing(chat_id)
+        await self._cancel_background_tasks()
 
         if self._app:
             logger.info("Stopping Telegram bot...")
@@ -203,25 +225,52 @@ class TelegramChannel(BaseChannel):
         try:
             # chat_id should be the Telegram chat ID (integer)
             chat_id = int(msg.chat_id)
-            # Convert markdown to Telegram HTML
-            html_content = _markdown_to_telegram_html(msg.content)
-            await self._app.bot.send_message(
-                chat_id=chat_id,
-                text=html_content,
-                parse_mode="HTML"
-            )
         except ValueError:
             logger.error(f"Invalid chat_id: {msg.chat_id}")
-        except Exception as e:
-            # Fallback to plain text if HTML parsing fails
+            return
+
+        try:
+            # Convert markdown to Telegram HTML
+            html_content = _markdown_to_telegram_html(msg.content)
+            await self._send_paced(chat_id, text=html_content, parse_mode="HTML")
+        except BadRequest as e:
+            # Only a rejected HTML body is worth resending as plain text.
+            if "parse entities" not in str(e).lower():
+                logger.error(f"Error sending Telegram message: {e}")
+                return
             logger.warning(f"HTML parse failed, falling back to plain text: {e}")
             try:
-                await self._app.bot.send_message(
-                    chat_id=int(msg.chat_id),
-                    text=msg.content
-                )
+                await self._send_paced(chat_id, text=msg.content)
             except Exception as e2:
                 logger.error(f"Error sending Telegram message: {e2}")
+        except RetryAfter as e:
+            logger.error(
+                f"Telegram message to {chat_id} dropped: still rate limited after "
+                f"{MAX_RETRY_AFTER_RETRIES} retries ({e})"
+            )
+        except Exception as e:
+            logger.error(f"Error sending Telegram message: {e}")
+
+    async def _send_paced(self, chat_id: int, **kwargs: Any) -> None:
+        """Send one message, queueing behind local pacing and server ``RetryAfter``."""
+        assert self._app is not None
+        key = str(chat_id)
+        for attempt in range(MAX_RETRY_AFTER_RETRIES + 1):
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire(key)
+            try:
+                await self._app.bot.send_message(chat_id=chat_id, **kwargs)
+                return
+            except RetryAfter as e:
+                if attempt >= MAX_RETRY_AFTER_RETRIES:
+                    raise
+                retry_after = e.retry_after
+                seconds = float(getattr(retry_after, "total_seconds", lambda: retry_after)())
+                logger.warning(f"Telegram rate limited; retrying after {seconds}s")
+                if self.rate_limiter is not None:
+                    self.rate_limiter.hold(key, seconds)
+                else:
+                    await asyncio.sleep(seconds)
 
     async def _on_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /start command."""
@@ -314,66 +363,95 @@ class TelegramChannel(BaseChannel):
             media_file = message.document
             media_type = "file"
 
-        # Download media if present
-        if media_file and self._app:
-            try:
-                file = await self._app.bot.get_file(media_file.file_id)
-                ext = self._get_extension(media_type, getattr(media_file, 'mime_type', None))
-
-                # Save to workspace/media/
-                from pathlib import Path
-                media_dir = Path.home() / ".nanobot" / "media"
-                media_dir.mkdir(parents=True, exist_ok=True)
-
-                file_path = media_dir / f"{media_file.file_id[:16]}{ext}"
-                await file.download_to_drive(str(file_path))
-
-                media_paths.append(str(file_path))
-
-                # Handle voice transcription
-                if media_type == "voice" or media_type == "audio":
-                    from nanobot.providers.transcription import GroqTranscriptionProvider
-                    transcriber = GroqTranscriptionProvider(api_key=self.groq_api_key)
-                    transcription = await transcriber.transcribe(file_path)
-                    if transcription:
-                        logger.info(f"Transcribed {media_type}: {transcription[:50]}...")
-                        content_parts.append(f"[transcription: {transcription}]")
-                    else:
-                        content_parts.append(f"[{media_type}: {file_path}]")
-                else:
-                    content_parts.append(f"[{media_type}: {file_path}]")
-
-                logger.debug(f"Downloaded {media_type} to {file_path}")
-            except Exception as e:
-                logger.error(f"Failed to download media: {e}")
-                content_parts.append(f"[{media_type}: download failed]")
-
-        content = "\n".join(content_parts) if content_parts else "[empty message]"
-
-        logger.debug(f"Telegram message from {sender_id}: {content[:50]}...")
-
         str_chat_id = str(chat_id)
         mention_meta = self._mention_metadata(message)
+        metadata = {
+            "message_id": message.message_id,
+            "user_id": user.id,
+            "username": user.username,
+            "first_name": user.first_name,
+            "is_group": message.chat.type != "private",
+            "mentioned_bot": mention_meta["mentioned_bot"],
+            "reply_to_bot": mention_meta["reply_to_bot"],
+        }
 
         # Start typing indicator before processing
         self._start_typing(str_chat_id)
 
-        # Forward to the message bus
-        await self._handle_message(
-            sender_id=sender_id,
-            chat_id=str_chat_id,
-            content=content,
-            media=media_paths,
-            metadata={
-                "message_id": message.message_id,
-                "user_id": user.id,
-                "username": user.username,
-                "first_name": user.first_name,
-                "is_group": message.chat.type != "private",
-                "mentioned_bot": mention_meta["mentioned_bot"],
-                "reply_to_bot": mention_meta["reply_to_bot"],
+        def build(parts: list[str], paths: list[str]) -> dict[str, Any]:
+            content = "\n".join(parts) if parts else "[empty message]"
+            logger.debug(f"Telegram message from {sender_id}: {content[:50]}...")
+            return {
+                "sender_id": sender_id,
+                "chat_id": str_chat_id,
+                "content": content,
+                "media": paths,
+                "metadata": metadata,
             }
-        )
+
+        if not (media_file and self._app):
+            await self._dispatch_inbound(str_chat_id, build(content_parts, media_paths))
+            return
+
+        async def prepare() -> dict[str, Any]:
+            await self._ingest_media(media_file, media_type, content_parts, media_paths)
+            return build(content_parts, media_paths)
+
+        # Download/transcription runs in the shared media pipeline, off the update handler.
+        await self._dispatch_inbound(str_chat_id, prepare=prepare())
+
+    async def _ingest_media(
+        self,
+        media_file: Any,
+        media_type: str,
+        content_parts: list[str],
+        media_paths: list[str],
+    ) -> None:
+        """Download one attachment and append its path or transcription."""
+        assert self._app is not None
+        limit = self._media.max_download_bytes
+        declared = int(getattr(media_file, "file_size", 0) or 0)
+        if declared > limit:
+            content_parts.append(f"[{media_type}: too large]")
+            return
+        try:
+            file = await self._app.bot.get_file(media_file.file_id)
+            ext = self._get_extension(media_type, getattr(media_file, "mime_type", None))
+            filename = f"{media_file.file_id[:16]}{ext}"
+            remote = str(file.file_path or "")
+            if remote.startswith(("http://", "https://")):
+                downloaded = await self._media.download(self.name, remote, filename=filename)
+                file_path, digest = downloaded.path, downloaded.sha256
+            else:
+                # Local Bot API server: the file is already on this host.
+                file_path = Path(await file.download_to_drive()).resolve()
+                digest = None
+        except MediaTooLargeError:
+            content_parts.append(f"[{media_type}: too large]")
+            return
+        except Exception as e:
+            # The error text can carry the file URL, which embeds the bot token.
+            logger.error(
+                "Failed to download media {}: {}", media_file.file_id, type(e).__name__
+            )
+            content_parts.append(f"[{media_type}: download failed]")
+            return
+
+        media_paths.append(str(file_path))
+        logger.debug(f"Downloaded {media_type} to {file_path}")
+        if media_type in {"voice", "audio"}:
+            transcription = None
+            try:
+                transcription = await self._media.transcribe_audio(
+                    file_path, self.name, sha256=digest
+                )
+            except Exception as e:
+                logger.warning(f"Telegram transcription failed: {e}")
+            if transcription:
+                logger.info(f"Transcribed {media_type}: {transcription[:50]}...")
+                content_parts.append(f"[transcription: {transcription}]")
+                return
+        content_parts.append(f"[{media_type}: {file_path}]")
 
     def _mention_metadata(self, message) -> dict[str, bool]:
         """Extract mention/reply-to-bot metadata for policy decisions."""
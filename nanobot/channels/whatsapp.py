@@ -1,4 +1,4 @@
-"""WhatsApp channel implementation using strict bridge protocol v2."""
+"""WhatsApp channel implementation using strict bridge protocol v3 (v2-compatible)."""
 
 from __future__ import annotations
 
@@ -7,8 +7,10 @@ import contextlib
 import json
 import random
 import re
+import struct
 import uuid
 from dataclasses import dataclass, replace
+from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 from loguru import logger
@@ -16,15 +18,21 @@ from loguru import logger
 from nanobot.bus.events import OutboundMessage, ReactionMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
+from nanobot.channels.coalesce import InboundCoalescer
+from nanobot.channels.rate_limit import RateLimiter
 from nanobot.channels.whatsapp_runtime import WhatsAppRuntimeManager
 from nanobot.config.schema import WhatsAppConfig
 from nanobot.media.asr import ASRTranscriber
+from nanobot.media.index import MediaIndex
+from nanobot.media.pipeline import MediaPipeline
 from nanobot.media.storage import MediaStorage
 from nanobot.media.vision import VisionDescriber
+from nanobot.utils.ttl_set import TTLSet
 
 if TYPE_CHECKING:
     from nanobot.media.router import ModelRouter
     from nanobot.providers.factory import ProviderFactory
+    from nanobot.storage.group_directory import GroupDirectory
     from nanobot.storage.inbound_archive import InboundArchive
 
 
@@ -68,14 +76,35 @@ def _markdown_to_whatsapp(text: str) -> str:
     return text.strip()
 
 
-PROTOCOL_VERSION = 2
+PROTOCOL_VERSION = 3
+BASE_PROTOCOL_VERSION = 2
+SUPPORTED_PROTOCOL_VERSIONS = frozenset({BASE_PROTOCOL_VERSION, PROTOCOL_VERSION})
+# v3 binary frame prefix: magic "NB", version, kind, uint32 BE JSON header length.
+BINARY_FRAME_PREFIX = struct.Struct(">HBBI")
+BINARY_FRAME_MAGIC = 0x4E42
+BINARY_FRAME_KIND_COMMAND = 1
+# Bridge-side cap for one binary media frame (MAX_MEDIA_FRAME_BYTES in server.ts).
+MAX_MEDIA_FRAME_BYTES = 64 * 1024 * 1024
 DEDUPE_TTL_SECONDS = 20 * 60
-DEDUPE_CLEANUP_INTERVAL_SECONDS = 30
 TYPING_LOOP_INTERVAL_SECONDS = 4.0
 TYPING_MAX_DURATION_SECONDS = 45.0
 SEND_CONNECT_WAIT_SECONDS = 8.0
 SEND_MAX_ATTEMPTS = 3
 SEND_RETRY_BASE_DELAY_SECONDS = 0.6
+# Commands that deliver something to a chat and go through the outbound rate limiter.
+PACED_COMMANDS = frozenset({"send_text", "send_media", "react"})
+SUBJECT_REFRESH_BATCH = 100
+SUBJECT_REFRESH_TIMEOUT_S = 5.0
+MEDIA_CLEANUP_INTERVAL_S = 3600.0
+# With a media index, the directory walk only catches files the index missed.
+MEDIA_FALLBACK_CLEANUP_INTERVAL_S = 24 * 3600.0
+
+
+def _encode_binary_frame(header: bytes, body: bytes) -> bytes:
+    prefix = BINARY_FRAME_PREFIX.pack(
+        BINARY_FRAME_MAGIC, PROTOCOL_VERSION, BINARY_FRAME_KIND_COMMAND, len(header)
+    )
+    return b"".join((prefix, header, body))
 
 
 class BridgeProtocolMismatchError(RuntimeError):
@@ -112,10 +141,17 @@ class InboundEvent:
     media_bytes: int | None
     media_description: str | None
     voice_transcript: str | None
+    coalesced: int = 1
 
 
 class WhatsAppChannel(BaseChannel):
-    """WhatsApp channel backed by the Node.js bridge protocol v2."""
+    """
+    WhatsApp channel backed by the Node.js bridge.
+
+    Each connection starts on protocol v2 and is upgraded to v3 when the bridge
+    supports it: inbound messages then arrive as batched positional rows, and
+    outbound media can travel as raw bytes in a binary frame instead of a path.
+    """
 
     name = "whatsapp"
 
@@ -124,6 +160,7 @@ class WhatsAppChannel(BaseChannel):
         config: WhatsAppConfig,
         bus: MessageBus,
         inbound_archive: "InboundArchive | None" = None,
+        group_directory: "GroupDirectory | None" = None,
         model_router: "ModelRouter | None" = None,
         media_storage: MediaStorage | None = None,
         provider_factory: "ProviderFactory | None" = None,
@@ -131,24 +168,34 @@ class WhatsAppChannel(BaseChannel):
         openai_api_key: str | None = None,
         openai_api_base: str | None = None,
         openai_extra_headers: dict[str, str] | None = None,
+        media_pipeline: MediaPipeline | None = None,
+        media_index: MediaIndex | None = None,
     ):
         super().__init__(config, bus)
         self.config: WhatsAppConfig = config
         self.inbound_archive = inbound_archive
+        self.group_directory = group_directory
+        self.media_index = media_index
+        self.rate_limiter = RateLimiter.from_config(self.name, config.rate_limit)
         self._model_router = model_router
         self._media_storage = media_storage or MediaStorage(
             incoming_dir=self.config.media.incoming_path,
             outgoing_dir=self.config.media.outgoing_path,
         )
-        self._vision_describer = (
-            VisionDescriber(provider_factory) if provider_factory is not None else None
-        )
-        self._asr_transcriber = ASRTranscriber(
-            groq_api_key=groq_api_key,
-            openai_api_key=openai_api_key,
-            openai_api_base=openai_api_base,
-            openai_extra_headers=openai_extra_headers,
-            max_concurrency=self.config.media.max_asr_concurrency,
+        # Enrichment shares the channel manager's pipeline (global ASR/vision limits
+        # and caches); a private one is only built when the channel runs standalone.
+        self._media_pipeline = media_pipeline or MediaPipeline(
+            router=model_router,
+            asr=ASRTranscriber(
+                groq_api_key=groq_api_key,
+                openai_api_key=openai_api_key,
+                openai_api_base=openai_api_base,
+                openai_extra_headers=openai_extra_headers,
+                max_concurrency=self.config.media.max_asr_concurrency,
+                response_cache=provider_factory.response_cache if provider_factory else None,
+            ),
+            vision=VisionDescriber(provider_factory) if provider_factory is not None else None,
+            incoming_root=self._media_storage.incoming_dir,
         )
         self._ws: Any | None = None
         self._connected = False
@@ -156,26 +203,36 @@ class WhatsAppChannel(BaseChannel):
         self._media_cleanup_task: asyncio.Task[None] | None = None
         self._send_lock = asyncio.Lock()
         self._pending: dict[str, asyncio.Future[dict[str, Any]]] = {}
-        self._recent_message_ids: dict[str, float] = {}
-        self._debounce_buffers: dict[str, list[InboundEvent]] = {}
-        self._debounce_tasks: dict[str, asyncio.Task[None]] = {}
+        self._recent_message_ids = TTLSet(
+            DEDUPE_TTL_SECONDS,
+            max_entries=self.config.max_dedupe_entries,
+            name="WhatsApp dedupe",
+        )
+        self.coalescer: InboundCoalescer[InboundEvent] | None = None
+        if self.config.debounce_ms > 0:
+            self.coalescer = InboundCoalescer(
+                self._flush_coalesced,
+                base_ms=self.config.debounce_ms,
+                max_ms=self.config.debounce_max_ms,
+                max_buckets=self.config.max_debounce_buckets,
+            )
         self._inbound_tasks: set[asyncio.Task[None]] = set()
         self._typing_tasks: dict[str, asyncio.Task[None]] = {}
         self._reconnect_attempts = 0
         self._repair_attempted = False
-        self._next_dedupe_cleanup_at = 0.0
-        self._max_dedupe_entries = max(1, int(self.config.max_dedupe_entries))
-        self._max_debounce_buckets = max(1, int(self.config.max_debounce_buckets))
-        self._dedupe_evictions = 0
-        self._debounce_overflow = 0
         self._presence_supported = True
         self._presence_unsupported_logged = False
         self._runtime = WhatsAppRuntimeManager()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._subject_refresh_ids: set[str] = set()
+        self._subject_refresh_task: asyncio.Task[None] | None = None
+        self._protocol_version = BASE_PROTOCOL_VERSION
+        self._inline_media = False
 
     def _require_token(self) -> str:
         token = (self.config.bridge_token or "").strip()
         if not token:
-            raise RuntimeError("channels.whatsapp.bridgeToken is required for protocol v2")
+            raise RuntimeError("channels.whatsapp.bridgeToken is required for the bridge protocol")
         return token
 
     async def start(self) -> None:
@@ -189,6 +246,9 @@ class WhatsAppChannel(BaseChannel):
         logger.info(f"Connecting to WhatsApp bridge at {bridge_url}...")
 
         self._running = True
+        self._loop = asyncio.get_running_loop()
+        if self.group_directory is not None:
+            self.group_directory.set_refresh_hook(self.request_group_subjects)
         try:
             await asyncio.to_thread(
                 self._runtime.ensure_ready,
@@ -200,7 +260,10 @@ class WhatsAppChannel(BaseChannel):
             logger.error(f"WhatsApp runtime preparation failed: {e}")
             self._running = False
             return
-        await self._run_media_cleanup_once()
+        # With a media index the channel manager's sweeper handles retention;
+        # a daily directory walk still removes files that never got indexed.
+        if self.media_index is None:
+            await self._run_media_cleanup_once()
         if self.config.media.enabled:
             self._media_cleanup_task = asyncio.create_task(self._media_cleanup_loop())
 
@@ -214,6 +277,8 @@ class WhatsAppChannel(BaseChannel):
                 ) as ws:
                     self._ws = ws
                     self._connected = False
+                    self._protocol_version = BASE_PROTOCOL_VERSION
+                    self._inline_media = self.config.media_transport == "binary"
                     self._reader_task = asyncio.create_task(self._read_loop())
 
                     try:
@@ -236,7 +301,12 @@ class WhatsAppChannel(BaseChannel):
                     self._connected = True
                     self._repair_attempted = False
                     self._reconnect_attempts = 0
-                    logger.info("Connected to WhatsApp bridge (protocol v2)")
+                    logger.info(
+                        "Connected to WhatsApp bridge (protocol v{})", self._protocol_version
+                    )
+                    if self.group_directory is not None:
+                        stale = await asyncio.to_thread(self.group_directory.stale_subject_ids)
+                        self._queue_subject_refresh(stale)
 
                     await self._reader_task
 
@@ -282,6 +352,11 @@ class WhatsAppChannel(BaseChannel):
         """Stop the WhatsApp channel."""
         self._running = False
         self._connected = False
+        if self.group_directory is not None:
+            self.group_directory.set_refresh_hook(None)
+        if self._subject_refresh_task:
+            self._subject_refresh_task.cancel()
+            self._subject_refresh_task = None
 
         for chat_id in list(self._typing_tasks):
             await self._stop_typing(chat_id)
@@ -290,10 +365,8 @@ class WhatsAppChannel(BaseChannel):
             task.cancel()
         self._inbound_tasks.clear()
 
-        for task in self._debounce_tasks.values():
-            task.cancel()
-        self._debounce_tasks.clear()
-        self._debounce_buffers.clear()
+        if self.coalescer is not None:
+            await self.coalescer.close()
 
         if self._reader_task:
             self._reader_task.cancel()
@@ -387,12 +460,7 @@ class WhatsAppChannel(BaseChannel):
                 if reply_to:
                     payload["replyToMessageId"] = reply_to
 
-                await self._send_command_with_retry(
-                    "send_media",
-                    payload,
-                    timeout_seconds=30.0,
-                    max_attempts=SEND_MAX_ATTEMPTS,
-                )
+                await self._send_media(validated, payload)
                 sent_any_media = True
 
                 # Best-effort cleanup for generated TTS voice notes.
@@ -403,6 +471,7 @@ class WhatsAppChannel(BaseChannel):
                 ):
                     with contextlib.suppress(OSError):
                         validated.unlink()
+                    self._forget_media(validated)
 
             if sent_any_media:
                 return
@@ -424,6 +493,51 @@ class WhatsAppChannel(BaseChannel):
             max_attempts=SEND_MAX_ATTEMPTS,
         )
 
+    async def _send_media(self, path: Path, payload: dict[str, Any]) -> None:
+        """
+        Send one attachment by path, or as inline bytes over a v3 binary frame.
+
+        The path handoff is zero-copy when the bridge shares the filesystem. In
+        ``auto`` mode a bridge that rejects or cannot find the path (separate
+        container or media root) switches the connection to inline frames.
+        """
+        if self._use_inline_media():
+            await self._send_media_inline(path, payload)
+            return
+        try:
+            await self._send_command_with_retry(
+                "send_media", payload, timeout_seconds=30.0, max_attempts=SEND_MAX_ATTEMPTS
+            )
+        except BridgeProtocolError as e:
+            if not (
+                self.config.media_transport == "auto"
+                and self._protocol_version >= PROTOCOL_VERSION
+                and ("mediaPath" in str(e) or "ENOENT" in str(e))
+            ):
+                raise
+            logger.info("WhatsApp bridge cannot read media paths ({}); sending inline", e)
+            self._inline_media = True
+            await self._send_media_inline(path, payload)
+
+    def _use_inline_media(self) -> bool:
+        return (
+            self._inline_media
+            and self.config.media_transport != "path"
+            and self._protocol_version >= PROTOCOL_VERSION
+        )
+
+    async def _send_media_inline(self, path: Path, payload: dict[str, Any]) -> None:
+        body = await asyncio.to_thread(path.read_bytes)
+        inline = {k: v for k, v in payload.items() if k != "mediaPath"}
+        inline["mediaInline"] = True
+        await self._send_command_with_retry(
+            "send_media",
+            inline,
+            timeout_seconds=30.0,
+            max_attempts=SEND_MAX_ATTEMPTS,
+            attachment=body,
+        )
+
     async def start_typing(self, chat_id: str) -> None:
         """Public typing API used by policy-aware orchestration."""
         await self._start_typing(chat_id)
@@ -459,17 +573,28 @@ class WhatsAppChannel(BaseChannel):
         )
 
     async def _verify_bridge_health(self, token: str, timeout_seconds: float) -> None:
+        # v2 bridges ignore the offer and answer with protocolVersion 2.
+        # maxFrameBytes lets the bridge size message batches to our websocket max_size.
+        offer = (
+            {
+                "protocolVersions": sorted(SUPPORTED_PROTOCOL_VERSIONS),
+                "maxFrameBytes": int(self.config.max_payload_bytes),
+            }
+            if self.config.bridge_protocol_v3
+            else {}
+        )
         response = await self._send_command(
             "health",
-            {},
+            offer,
             timeout_seconds=timeout_seconds,
             token=token,
         )
         version = response.get("protocolVersion", response.get("version"))
-        if version != PROTOCOL_VERSION:
+        if version not in SUPPORTED_PROTOCOL_VERSIONS:
             raise BridgeProtocolMismatchError(
                 f"Bridge protocol mismatch: expected v{PROTOCOL_VERSION}, got {version!r}"
             )
+        self._protocol_version = int(version)
 
     def _is_repairable_startup_error(self, err: Exception) -> bool:
         if isinstance(err, (BridgeProtocolMismatchError, BridgeProtocolError, TimeoutError)):
@@ -487,7 +612,10 @@ class WhatsAppChannel(BaseChannel):
         async for raw in self._ws:
             await self._handle_bridge_message(raw)
 
-    async def _handle_bridge_message(self, raw: str) -> None:
+    async def _handle_bridge_message(self, raw: str | bytes) -> None:
+        if isinstance(raw, bytes):
+            logger.warning("Unexpected binary frame from bridge ({} bytes)", len(raw))
+            return
         try:
             data = json.loads(raw)
         except json.JSONDecodeError:
@@ -499,7 +627,7 @@ class WhatsAppChannel(BaseChannel):
             return
 
         version = data.get("version")
-        if version != PROTOCOL_VERSION:
+        if version not in SUPPORTED_PROTOCOL_VERSIONS:
             if version is None:
                 logger.warning(
                     "Bridge frame missing protocol version. "
@@ -521,14 +649,18 @@ class WhatsAppChannel(BaseChannel):
             return
 
         if msg_type == "message":
-            event = self._parse_inbound_event(payload)
-            if not event:
+            self._accept_inbound_payload(payload)
+            return
+
+        if msg_type == "message_batch":
+            fields = payload.get("fields")
+            rows = payload.get("rows")
+            if not isinstance(fields, list) or not isinstance(rows, list):
+                logger.warning("Dropping malformed inbound message batch")
                 return
-            # Keep reader loop free so bridge command responses can be consumed
-            # while inbound events are being ingested/published.
-            task = asyncio.create_task(self._ingest_inbound_event(event))
-            self._inbound_tasks.add(task)
-            task.add_done_callback(self._on_inbound_task_done)
+            for row in rows:
+                if isinstance(row, list):
+                    self._accept_inbound_payload(dict(zip(fields, row)))
             return
 
         if msg_type == "status":
@@ -544,6 +676,16 @@ class WhatsAppChannel(BaseChannel):
             logger.error(f"WhatsApp bridge error: {payload.get('error')}")
             return
 
+    def _accept_inbound_payload(self, payload: dict[str, Any]) -> None:
+        event = self._parse_inbound_event(payload)
+        if not event:
+            return
+        # Keep reader loop free so bridge command responses can be consumed
+        # while inbound events are being ingested/published.
+        task = asyncio.create_task(self._ingest_inbound_event(event))
+        self._inbound_tasks.add(task)
+        task.add_done_callback(self._on_inbound_task_done)
+
     def _parse_inbound_event(self, payload: dict[str, Any]) -> InboundEvent | None:
         message_id = str(payload.get("messageId") or "").strip()
         chat_jid = str(payload.get("chatJid") or "").strip()
@@ -628,31 +770,21 @@ class WhatsAppChannel(BaseChannel):
         event = await self._enrich_media_event(event)
         self._archive_inbound_event(event)
 
-        if self.config.debounce_ms <= 0 or event.media_kind is not None:
+        if self.coalescer is None:
             await self._publish_event(event)
             return
 
-        key = f"{event.chat_jid}:{event.sender_id}"
-        if (
-            key not in self._debounce_buffers
-            and len(self._debounce_buffers) >= self._max_debounce_buckets
-        ):
-            self._debounce_overflow += 1
-            if self._debounce_overflow == 1 or self._debounce_overflow % 100 == 0:
-                logger.warning(
-                    "WhatsApp debounce bucket overflow: "
-                    f"dropped_batches={self._debounce_overflow} max={self._max_debounce_buckets}"
-                )
+        # Chatter coalesces per chat *and sender*, so every merged turn still has
+        # one sender for policy (blocked senders, whoCanTalk) to judge. Anything
+        # that addresses the bot (DMs, mentions, replies) goes out at once with
+        # that sender's pending chatter; media keeps its own turn.
+        key = f"{event.chat_jid}|{event.sender_id}"
+        if event.media_kind is not None:
+            await self.coalescer.flush(key)
             await self._publish_event(event)
             return
-        bucket = self._debounce_buffers.setdefault(key, [])
-        bucket.append(event)
-
-        existing_task = self._debounce_tasks.get(key)
-        if existing_task:
-            existing_task.cancel()
-
-        self._debounce_tasks[key] = asyncio.create_task(self._flush_debounce_bucket(key))
+        addressed = not event.is_group or event.mentioned_bot or event.reply_to_bot
+        await self.coalescer.add(key, event, immediate=addressed)
 
     def _on_inbound_task_done(self, task: asyncio.Task[None]) -> None:
         self._inbound_tasks.discard(task)
@@ -662,21 +794,12 @@ class WhatsAppChannel(BaseChannel):
         if exc is not None:
             logger.error(f"WhatsApp inbound task failed: {exc}")
 
-    async def _flush_debounce_bucket(self, key: str) -> None:
-        try:
-            await asyncio.sleep(self.config.debounce_ms / 1000.0)
-        except asyncio.CancelledError:
-            return
-
-        events = self._debounce_buffers.pop(key, [])
-        self._debounce_tasks.pop(key, None)
-        if not events:
-            return
-
-        if len(events) == 1:
-            await self._publish_event(events[0])
-            return
+    async def _flush_coalesced(self, key: str, events: list[InboundEvent]) -> None:
+        await self._publish_event(events[0] if len(events) == 1 else self._merge_events(events))
 
+    @staticmethod
+    def _merge_events(events: list[InboundEvent]) -> InboundEvent:
+        """Fold one sender's burst into its last event."""
         combined_text = "\n".join(event.text for event in events if event.text).strip()
         last = events[-1]
         mentioned_jids = sorted({jid for event in events for jid in event.mentioned_jids})
@@ -697,7 +820,7 @@ class WhatsAppChannel(BaseChannel):
             None,
         )
 
-        merged = InboundEvent(
+        return InboundEvent(
             message_id=last.message_id,
             chat_jid=last.chat_jid,
             participant_jid=last.participant_jid,
@@ -717,11 +840,83 @@ class WhatsAppChannel(BaseChannel):
             media_bytes=last.media_bytes,
             media_description=last.media_description,
             voice_transcript=last.voice_transcript,
+            coalesced=sum(event.coalesced for event in events),
         )
 
-        await self._publish_event(merged)
+    def _index_group(self, event: InboundEvent) -> None:
+        if self.group_directory is None or not event.is_group:
+            return
+        try:
+            if self.group_directory.record_seen(event.chat_jid):
+                self._queue_subject_refresh([event.chat_jid])
+        except Exception as e:
+            logger.warning(f"Failed to index WhatsApp group {event.chat_jid}: {e}")
+
+    def request_group_subjects(self, chat_ids: list[str]) -> None:
+        """Schedule a background subject refresh; safe to call from any thread."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._queue_subject_refresh, list(chat_ids))
+
+    def _queue_subject_refresh(self, chat_ids: list[str]) -> None:
+        self._subject_refresh_ids.update(cid for cid in chat_ids if cid.endswith("@g.us"))
+        if not self._subject_refresh_ids:
+            return
+        if self._subject_refresh_task is None or self._subject_refresh_task.done():
+            self._subject_refresh_task = asyncio.create_task(self._refresh_group_subjects())
+
+    async def _refresh_group_subjects(self) -> None:
+        """Fetch group subjects over the live bridge connection into the directory."""
+        while self._subject_refresh_ids and self._connected and self.group_directory is not None:
+            batch = sorted(self._subject_refresh_ids)[:SUBJECT_REFRESH_BATCH]
+            self._subject_refresh_ids.difference_update(batch)
+            try:
+                result = await self._send_command(
+                    "list_groups", {"ids": batch}, timeout_seconds=SUBJECT_REFRESH_TIMEOUT_S
+                )
+            except Exception as e:
+                logger.debug(f"WhatsApp group subject refresh failed: {e}")
+                return
+            subjects: dict[str, str] = {}
+            groups = result.get("groups", [])
+            for item in groups if isinstance(groups, list) else []:
+                if not isinstance(item, dict):
+                    continue
+                gid = str(item.get("chatJid", "")).strip()
+                subject = str(item.get("subject", "")).strip()
+                if gid and subject:
+                    subjects[gid] = subject
+            await asyncio.to_thread(self.group_directory.update_subjects, subjects)
+
+    def _index_media(self, event: InboundEvent) -> None:
+        if self.media_index is None or not event.media_path:
+            return
+        validated = self._media_storage.validate_incoming_path(event.media_path)
+        # Transcribed voice notes may already have been deleted during enrichment.
+        if validated is None or not validated.is_file():
+            return
+        try:
+            self.media_index.record(
+                validated,
+                channel=self.name,
+                direction="incoming",
+                size_bytes=event.media_bytes,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to index WhatsApp media {validated}: {e}")
+
+    def _forget_media(self, path: Path) -> None:
+        if self.media_index is None:
+            return
+        try:
+            self.media_index.forget(path)
+        except Exception as e:
+            logger.debug(f"Failed to drop {path} from media index: {e}")
 
     def _archive_inbound_event(self, event: InboundEvent) -> None:
+        self._index_group(event)
+        self._index_media(event)
         if self.inbound_archive is None:
             return
         try:
@@ -757,7 +952,6 @@ class WhatsAppChannel(BaseChannel):
             if (
                 not self.config.media.describe_images
                 or not event.media_path
-                or self._vision_describer is None
                 or self._model_router is None
             ):
                 return event
@@ -784,13 +978,7 @@ class WhatsAppChannel(BaseChannel):
                 return replace(event, media_path=str(validated_path), media_bytes=size_bytes)
 
             try:
-                profile = self._model_router.resolve("vision.describe_image", channel=self.name)
-            except KeyError as e:
-                logger.warning(f"Skipping WhatsApp image description due to missing route: {e}")
-                return replace(event, media_path=str(validated_path), media_bytes=size_bytes)
-
-            try:
-                description = await self._vision_describer.describe(validated_path, profile)
+                description = await self._media_pipeline.describe_image(validated_path, self.name)
             except Exception as e:
                 logger.warning("WhatsApp image description failed {}: {}", e.__class__.__name__, e)
                 return replace(event, media_path=str(validated_path), media_bytes=size_bytes)
@@ -838,15 +1026,9 @@ class WhatsAppChannel(BaseChannel):
                 )
                 return replace(event, media_path=str(validated_path), media_bytes=size_bytes)
 
-            try:
-                profile = self._model_router.resolve("asr.transcribe_audio", channel=self.name)
-            except KeyError as e:
-                logger.warning(f"Skipping WhatsApp audio transcription due to missing route: {e}")
-                return replace(event, media_path=str(validated_path), media_bytes=size_bytes)
-
             transcript = None
             try:
-                transcript = await self._asr_transcriber.transcribe(validated_path, profile)
+                transcript = await self._media_pipeline.transcribe_audio(validated_path, self.name)
             except Exception as e:
                 logger.warning(
                     "WhatsApp audio transcription failed {}: {}", e.__class__.__name__, e
@@ -858,6 +1040,7 @@ class WhatsAppChannel(BaseChannel):
             if self.config.media.delete_audio_after_transcription:
                 with contextlib.suppress(OSError):
                     validated_path.unlink()
+                self._forget_media(validated_path)
 
             return replace(
                 event,
@@ -888,9 +1071,14 @@ class WhatsAppChannel(BaseChannel):
             logger.warning("WhatsApp media cleanup failed {}: {}", e.__class__.__name__, e)
 
     async def _media_cleanup_loop(self) -> None:
+        interval = (
+            MEDIA_CLEANUP_INTERVAL_S
+            if self.media_index is None
+            else MEDIA_FALLBACK_CLEANUP_INTERVAL_S
+        )
         while self._running:
             try:
-                await asyncio.sleep(3600)
+                await asyncio.sleep(interval)
                 await self._run_media_cleanup_once()
             except asyncio.CancelledError:
                 break
@@ -931,6 +1119,7 @@ class WhatsAppChannel(BaseChannel):
                 "media_description": event.media_description,
                 "is_voice": is_voice,
                 "voice_transcript": event.voice_transcript,
+                "coalesced_messages": event.coalesced,
             },
         )
 
@@ -992,31 +1181,7 @@ class WhatsAppChannel(BaseChannel):
             )
 
     def _is_duplicate(self, chat_jid: str, message_id: str) -> bool:
-        now = asyncio.get_running_loop().time()
-        dedupe_key = f"{chat_jid}:{message_id}"
-
-        if now >= self._next_dedupe_cleanup_at:
-            for key, expires_at in list(self._recent_message_ids.items()):
-                if expires_at <= now:
-                    self._recent_message_ids.pop(key, None)
-            self._next_dedupe_cleanup_at = now + DEDUPE_CLEANUP_INTERVAL_SECONDS
-
-        if dedupe_key in self._recent_message_ids:
-            return True
-
-        if len(self._recent_message_ids) >= self._max_dedupe_entries:
-            oldest = next(iter(self._recent_message_ids), None)
-            if oldest is not None:
-                self._recent_message_ids.pop(oldest, None)
-                self._dedupe_evictions += 1
-                if self._dedupe_evictions == 1 or self._dedupe_evictions % 500 == 0:
-                    logger.warning(
-                        "WhatsApp dedupe cache overflow: "
-                        f"evictions={self._dedupe_evictions} max={self._max_dedupe_entries}"
-                    )
-
-        self._recent_message_ids[dedupe_key] = now + DEDUPE_TTL_SECONDS
-        return False
+        return self._recent_message_ids.seen(f"{chat_jid}:{message_id}")
 
     async def _send_command(
         self,
@@ -1024,13 +1189,14 @@ class WhatsAppChannel(BaseChannel):
         payload: dict[str, Any],
         timeout_seconds: float,
         token: str | None = None,
+        attachment: bytes | None = None,
     ) -> dict[str, Any]:
         if not self._ws:
             raise RuntimeError("Bridge websocket not connected")
 
         request_id = uuid.uuid4().hex
         envelope = {
-            "version": PROTOCOL_VERSION,
+            "version": self._protocol_version,
             "type": command_type,
             "token": token or self._require_token(),
             "requestId": request_id,
@@ -1044,6 +1210,15 @@ class WhatsAppChannel(BaseChannel):
             raise ValueError(
                 f"Bridge command payload too large: {envelope_bytes} > {max_payload_bytes} bytes"
             )
+        frame: str | bytes = encoded
+        if attachment is not None:
+            if self._protocol_version < PROTOCOL_VERSION:
+                raise RuntimeError("Inline media requires bridge protocol v3")
+            frame = _encode_binary_frame(encoded.encode("utf-8"), attachment)
+            if len(frame) > MAX_MEDIA_FRAME_BYTES:
+                raise ValueError(
+                    f"Bridge media frame too large: {len(frame)} > {MAX_MEDIA_FRAME_BYTES} bytes"
+                )
         future: asyncio.Future[dict[str, Any]] = asyncio.get_running_loop().create_future()
         self._pending[request_id] = future
 
@@ -1056,7 +1231,7 @@ class WhatsAppChannel(BaseChannel):
                 self._summarize_command_payload(command_type, payload),
             )
             async with self._send_lock:
-                await self._ws.send(encoded)
+                await self._ws.send(frame)
             result = await asyncio.wait_for(future, timeout=timeout_seconds)
             logger.debug(
                 "WhatsApp bridge command ok type={} request_id={}",
@@ -1085,6 +1260,7 @@ class WhatsAppChannel(BaseChannel):
             return summary
         if command_type == "send_media":
             summary["has_media_path"] = bool(payload.get("mediaPath"))
+            summary["inline"] = bool(payload.get("mediaInline"))
             summary["mime_type"] = payload.get("mimeType")
             summary["file_name"] = payload.get("fileName")
             summary["caption_len"] = len(str(payload.get("caption") or ""))
@@ -1139,14 +1315,20 @@ class WhatsAppChannel(BaseChannel):
         *,
         timeout_seconds: float,
         max_attempts: int,
+        attachment: bytes | None = None,
     ) -> dict[str, Any]:
         attempts = max(1, int(max_attempts))
+        limiter = self.rate_limiter if command_type in PACED_COMMANDS else None
+        pace_key = str(payload.get("to") or payload.get("chatJid") or "")
         for attempt in range(1, attempts + 1):
+            if limiter is not None:
+                await limiter.acquire(pace_key)
             try:
                 return await self._send_command(
                     command_type,
                     payload,
                     timeout_seconds=timeout_seconds,
+                    attachment=attachment,
                 )
             except asyncio.CancelledError:
                 raise
@@ -1165,7 +1347,15 @@ class WhatsAppChannel(BaseChannel):
                     err,
                     delay,
                 )
-                await asyncio.sleep(delay)
+                if (
+                    limiter is not None
+                    and isinstance(err, BridgeProtocolError)
+                    and err.code == "ERR_QUEUE_OVERFLOW"
+                ):
+                    # Bridge backpressure applies to the whole channel, not just this chat.
+                    limiter.hold(None, delay)
+                else:
+                    await asyncio.sleep(delay)
                 await self._wait_connected_for_send(timeout_seconds=delay + 1.0)
         raise RuntimeError(f"Failed to send command after retries: {command_type}")
 
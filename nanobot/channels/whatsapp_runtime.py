@@ -28,7 +28,10 @@ from nanobot.utils.process import (
     signal_process_group,
 )
 
-PROTOCOL_VERSION = 2
+PROTOCOL_VERSION = 3
+# Runtime health probes speak the v2 subset, which every supported bridge accepts.
+BASE_PROTOCOL_VERSION = 2
+SUPPORTED_PROTOCOL_VERSIONS = frozenset({BASE_PROTOCOL_VERSION, PROTOCOL_VERSION})
 MANIFEST_FILENAME = "bridge.manifest.json"
 DEFAULT_BUILD_ID = "dev"
 
@@ -134,7 +137,7 @@ class WhatsAppRuntimeManager:
         protocol_version = int(data.get("protocolVersion") or 0)
         if not bridge_version:
             raise RuntimeError(f"Bridge manifest missing bridgeVersion: {path}")
-        if protocol_version != PROTOCOL_VERSION:
+        if protocol_version not in SUPPORTED_PROTOCOL_VERSIONS:
             raise RuntimeError(
                 f"Bridge manifest protocol mismatch: expected {PROTOCOL_VERSION}, got {protocol_version}"
             )
@@ -386,7 +389,7 @@ class WhatsAppRuntimeManager:
         token = self.ensure_bridge_token(quiet=True)
         request_id = uuid.uuid4().hex
         envelope = {
-            "version": PROTOCOL_VERSION,
+            "version": BASE_PROTOCOL_VERSION,
             "type": "health",
             "token": token,
             "requestId": request_id,
@@ -407,7 +410,7 @@ class WhatsAppRuntimeManager:
                 data = json.loads(raw)
                 if not isinstance(data, dict):
                     continue
-                if data.get("version") != PROTOCOL_VERSION:
+                if data.get("version") not in SUPPORTED_PROTOCOL_VERSIONS:
                     continue
                 if data.get("type") != "response":
                     continue
@@ -422,7 +425,7 @@ class WhatsAppRuntimeManager:
                 if not isinstance(result, dict):
                     raise RuntimeError("Bridge health result malformed")
                 protocol_version = result.get("protocolVersion", result.get("version"))
-                if protocol_version != PROTOCOL_VERSION:
+                if protocol_version not in SUPPORTED_PROTOCOL_VERSIONS:
                     raise RuntimeError(
                         f"Bridge protocol mismatch: expected {PROTOCOL_VERSION}, got {protocol_version!r}"
                     )
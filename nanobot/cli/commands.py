@@ -139,6 +139,7 @@ Information about the user goes here.
 def _make_provider(config):
     """Create LiteLLMProvider from config. Exits if no API key found."""
     from nanobot.media.router import ModelRouter
+    from nanobot.providers.factory import ProviderFactory
     from nanobot.providers.litellm_provider import LiteLLMProvider
 
     model = config.agents.defaults.model
@@ -154,12 +155,13 @@ def _make_provider(config):
         console.print("[red]Error: No API key configured.[/red]")
         console.print("Set one in ~/.nanobot/config.json under providers section")
         raise typer.Exit(1)
-    return LiteLLMProvider(
+    primary = LiteLLMProvider(
         api_key=p.api_key if p else None,
         api_base=p.api_base if p else None,
         default_model=model,
         extra_headers=p.extra_headers if p else None,
     )
+    return ProviderFactory(config).create_resilient_chat_provider("assistant.reply", primary)
 
 
 def _make_memory_service(config):
@@ -708,6 +710,7 @@ def agent(
     from nanobot.adapters.responder_llm import LLMResponder
     from nanobot.adapters.telemetry import InMemoryTelemetry
     from nanobot.agent.tools.file_access import build_file_access_resolver
+    from nanobot.app.bootstrap import build_web_cache
     from nanobot.bus.queue import MessageBus
     from nanobot.config.loader import load_config
     from nanobot.policy.loader import load_policy
@@ -715,6 +718,7 @@ def agent(
 
     config = load_config()
     memory_service = _make_memory_service(config)
+    web_cache = build_web_cache(config)
     telemetry = InMemoryTelemetry()
 
     bus = MessageBus(
@@ -744,12 +748,17 @@ def agent(
         model=config.agents.defaults.model,
         max_iterations=config.agents.defaults.max_tool_iterations,
         tavily_api_key=config.tools.web.search.tavily_api_key or None,
+        web_cache=web_cache,
         exec_config=exec_config,
         restrict_to_workspace=restrict_to_workspace,
         memory_service=memory_service,
         telemetry=telemetry,
         security=security,
         file_access_resolver=file_access_resolver,
+        history_config=config.agents.defaults.history,
+        compaction_config=config.agents.defaults.tool_result_compaction,
+        image_config=config.agents.defaults.images,
+        subagent_config=config.agents.defaults.subagents,
     )
 
     if message:
@@ -763,6 +772,8 @@ def agent(
         finally:
             responder.close()
             memory_service.close()
+            if web_cache is not None:
+                web_cache.close()
     else:
         # Interactive mode
         console.print(f"{__logo__} Interactive mode (Ctrl+C to exit)\n")
@@ -785,6 +796,8 @@ def agent(
         finally:
             responder.close()
             memory_service.close()
+            if web_cache is not None:
+                web_cache.close()
 
 
 # ============================================================================
@@ -1389,18 +1402,21 @@ def policy_cmd(
         apply_channels=apply_channels,
         on_policy_applied=None,
     )
-    result = service.execute_from_text(
-        command,
-        actor=PolicyActorContext(
-            source="cli",
-            channel="cli",
-            chat_id="local",
-            sender_id=getpass.getuser(),
-            is_group=False,
-            is_owner=True,
-        ),
-        options=PolicyExecutionOptions(dry_run=dry_run, confirm=confirm),
-    )
+    try:
+        result = service.execute_from_text(
+            command,
+            actor=PolicyActorContext(
+                source="cli",
+                channel="cli",
+                chat_id="local",
+                sender_id=getpass.getuser(),
+                is_group=False,
+                is_owner=True,
+            ),
+            options=PolicyExecutionOptions(dry_run=dry_run, confirm=confirm),
+        )
+    finally:
+        service.close()
     if result.message:
         console.print(result.message)
     if result.outcome in {"invalid", "error", "denied"}:
@@ -2272,5 +2288,41 @@ def status():
                 )
 
 
+# ============================================================================
+# Debug Commands
+# ============================================================================
+
+debug_app = typer.Typer(help="Diagnostics for the nanobot runtime")
+app.add_typer(debug_app, name="debug")
+
+
+@debug_app.command("import-time")
+def debug_import_time(
+    module: str = typer.Argument("nanobot.app.bootstrap", help="Module to import"),
+    top: int = typer.Option(15, "--top", "-n", min=1, help="Rows to show"),
+    sort: Literal["cumulative", "self"] = typer.Option(
+        "cumulative", "--sort", help="Order by cumulative or self time"
+    ),
+):
+    """Report the slowest imports when loading a module in a fresh interpreter."""
+    from nanobot.utils.importtime import measure_import
+
+    try:
+        timings = measure_import(module)
+    except (ValueError, RuntimeError) as e:
+        console.print(f"[red]Import failed:[/red] {e}")
+        raise typer.Exit(1)
+
+    total_us = max((t.cumulative_us for t in timings if t.module == module), default=0)
+    key = (lambda t: t.self_us) if sort == "self" else (lambda t: t.cumulative_us)
+    table = Table(title=f"import {module}: {total_us / 1000:.0f} ms, {len(timings)} modules")
+    table.add_column("Module")
+    table.add_column("Self ms", justify="right")
+    table.add_column("Cumulative ms", justify="right")
+    for t in sorted(timings, key=key, reverse=True)[:top]:
+        table.add_row(t.module, f"{t.self_us / 1000:.1f}", f"{t.cumulative_us / 1000:.1f}")
+    console.print(table)
+
+
 if __name__ == "__main__":
     app()
@@ -131,6 +131,11 @@ DEFAULT_MEMORY: dict[str, Any] = {
     "wal": {
         "enabled": True,
         "state_dir": "memory/session-state",
+        "max_segment_kb": 256,
+        "max_segment_age_hours": 24,
+        "max_segments": 5,
+        "retention_days": 30,
+        "flush_interval_ms": 1000,
     },
 }
 
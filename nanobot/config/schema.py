@@ -35,6 +35,43 @@ class ModelProfile(BaseModel):
     max_tokens: int | None = None
     temperature: float | None = None
     timeout_ms: int | None = None
+    fallbacks: list[str] = Field(default_factory=list)  # chat profiles tried in order
+
+
+class ProviderResilienceConfig(BaseModel):
+    """Retries, circuit breaking and hedging for chat model calls."""
+
+    model_config = ConfigDict(extra="ignore")
+
+    enabled: bool = True
+    default_timeout_ms: int = Field(default=60000, ge=1)  # when the profile sets none
+    retries: int = Field(default=2, ge=0)
+    retry_base_delay_ms: int = Field(default=250, ge=0)
+    retry_max_delay_ms: int = Field(default=4000, ge=0)
+    breaker_failure_threshold: int = Field(default=5, ge=1)
+    breaker_reset_seconds: float = Field(default=30.0, ge=0)
+    hedge: bool = False
+    hedge_min_delay_ms: int = Field(default=1500, ge=0)
+
+
+def _default_cached_routes() -> dict[str, int]:
+    return {
+        "vision.describe_image": 7 * 86400,
+        "whatsapp.vision.describe_image": 7 * 86400,
+        "whatsapp.asr.transcribe_audio": 7 * 86400,
+        "asr.transcribe_audio": 7 * 86400,
+        "memory.capture.extract": 86400,
+    }
+
+
+class LLMResponseCacheConfig(BaseModel):
+    """Exact-match response cache for side calls whose output only depends on input."""
+
+    model_config = ConfigDict(extra="ignore")
+
+    enabled: bool = True
+    max_bytes: int = Field(default=32 * 1024 * 1024, ge=1024 * 1024)
+    routes: dict[str, int] = Field(default_factory=_default_cached_routes)  # route -> TTL s
 
 
 class ModelRoutingConfig(BaseModel):
@@ -44,12 +81,26 @@ class ModelRoutingConfig(BaseModel):
 
     profiles: dict[str, ModelProfile] = Field(default_factory=_default_model_profiles)
     routes: dict[str, str] = Field(default_factory=default_model_routes)
+    resilience: ProviderResilienceConfig = Field(default_factory=ProviderResilienceConfig)
+    cache: LLMResponseCacheConfig = Field(default_factory=LLMResponseCacheConfig)
 
     @model_validator(mode="after")
     def _validate_routes(self) -> "ModelRoutingConfig":
         missing = sorted({name for name in self.routes.values() if name not in self.profiles})
         if missing:
             raise ValueError("models.routes references unknown profiles: " + ", ".join(missing))
+        missing = sorted(
+            {
+                name
+                for profile in self.profiles.values()
+                for name in profile.fallbacks
+                if name not in self.profiles
+            }
+        )
+        if missing:
+            raise ValueError(
+                "models.profiles fallbacks reference unknown profiles: " + ", ".join(missing)
+            )
         return self
 
 
@@ -81,6 +132,18 @@ class WhatsAppMediaConfig(BaseModel):
         return Path(self.outgoing_dir).expanduser()
 
 
+class ChannelRateLimitConfig(BaseModel):
+    """Outbound pacing for one channel: a global bucket plus one per chat."""
+
+    model_config = ConfigDict(extra="ignore")
+
+    enabled: bool = True
+    global_per_second: float = 10.0
+    global_burst: int = 10
+    per_chat_per_second: float = 1.0
+    per_chat_burst: int = 5
+
+
 class WhatsAppConfig(BaseModel):
     """WhatsApp channel configuration."""
 
@@ -95,6 +158,7 @@ class WhatsAppConfig(BaseModel):
     bridge_startup_timeout_ms: int = 15000
     auth_dir: str = "~/.nanobot/secrets/whatsapp-auth"
     debounce_ms: int = 0
+    debounce_max_ms: int = 5000
     read_receipts: bool = True
     accept_from_me: bool = False
     media_max_mb: int = 50
@@ -106,10 +170,13 @@ class WhatsAppConfig(BaseModel):
     reconnect_jitter: float = 0.25
     reconnect_max_attempts: int = 0  # 0 means unlimited retries
     max_payload_bytes: int = 262144
+    bridge_protocol_v3: bool = True
+    media_transport: Literal["auto", "path", "binary"] = "auto"
     reply_context_window_limit: int = int(DEFAULT_WHATSAPP_REPLY_CONTEXT["window_limit"])
     reply_context_line_max_chars: int = int(DEFAULT_WHATSAPP_REPLY_CONTEXT["line_max_chars"])
     ambient_window_limit: int = int(DEFAULT_WHATSAPP_REPLY_CONTEXT["ambient_window_limit"])
     media: WhatsAppMediaConfig = Field(default_factory=WhatsAppMediaConfig)
+    rate_limit: ChannelRateLimitConfig = Field(default_factory=ChannelRateLimitConfig)
 
     @property
     def resolved_bridge_port(self) -> int:
@@ -143,6 +210,12 @@ class TelegramConfig(BaseModel):
     proxy: str | None = (
         None  # HTTP/SOCKS5 proxy URL, e.g. "http://127.0.0.1:7890" or "socks5://127.0.0.1:1080"
     )
+    # Bot API limits: ~30 messages/s overall, ~1 message/s per chat.
+    rate_limit: ChannelRateLimitConfig = Field(
+        default_factory=lambda: ChannelRateLimitConfig(
+            global_per_second=30.0, global_burst=30, per_chat_per_second=1.0, per_chat_burst=3
+        )
+    )
 
 
 class FeishuConfig(BaseModel):
@@ -166,6 +239,39 @@ class DiscordConfig(BaseModel):
     token: str = ""  # Bot token from Discord Developer Portal
     gateway_url: str = "wss://gateway.discord.gg/?v=10&encoding=json"
     intents: int = 37377  # GUILDS + GUILD_MESSAGES + DIRECT_MESSAGES + MESSAGE_CONTENT
+    # Global bot limit is 50 requests/s; per-route buckets come from X-RateLimit-* headers.
+    rate_limit: ChannelRateLimitConfig = Field(
+        default_factory=lambda: ChannelRateLimitConfig(
+            global_per_second=50.0, global_burst=50, per_chat_per_second=1.0, per_chat_burst=5
+        )
+    )
+
+
+class ChannelMediaConfig(BaseModel):
+    """Shared inbound media pipeline limits for all channels."""
+
+    model_config = ConfigDict(extra="ignore")
+
+    max_concurrent_downloads: int = Field(default=4, ge=1)
+    max_download_mb: int = Field(default=20, ge=1)
+    max_asr_concurrency: int = Field(default=2, ge=1)
+    max_vision_concurrency: int = Field(default=2, ge=1)
+    cache_entries: int = Field(default=512, ge=0)
+    # Retention for indexed media; WhatsApp uses channels.whatsapp.media.retentionDays.
+    retention_days: int = Field(default=30, ge=1)
+    max_total_mb: int = Field(default=0, ge=0)  # 0 disables the quota
+    sweep_interval_seconds: int = Field(default=600, ge=10)
+    sweep_budget: int = Field(default=500, ge=1)
+
+
+class ChannelDedupeConfig(BaseModel):
+    """Cross-channel duplicate suppression in the orchestrator."""
+
+    model_config = ConfigDict(extra="ignore")
+
+    ttl_seconds: int = Field(default=20 * 60, ge=1)
+    max_entries: int = Field(default=50_000, ge=1)
+    persist: bool = False  # keep seen ids in ~/.nanobot/var/dedupe.db across restarts
 
 
 class ChannelsConfig(BaseModel):
@@ -175,6 +281,56 @@ class ChannelsConfig(BaseModel):
     telegram: TelegramConfig = Field(default_factory=TelegramConfig)
     discord: DiscordConfig = Field(default_factory=DiscordConfig)
     feishu: FeishuConfig = Field(default_factory=FeishuConfig)
+    media: ChannelMediaConfig = Field(default_factory=ChannelMediaConfig)
+    dedupe: ChannelDedupeConfig = Field(default_factory=ChannelDedupeConfig)
+
+
+class HistoryConfig(BaseModel):
+    """How much conversation history goes into each prompt."""
+
+    model_config = ConfigDict(extra="ignore")
+
+    max_tokens: int = Field(default=6000, ge=1)
+    max_message_tokens: int = Field(default=1500, ge=1)
+    max_messages: int = Field(default=50, ge=1)
+    summarize: bool = True
+    summary_max_tokens: int = Field(default=400, ge=1)
+    summary_max_batch: int = Field(default=40, ge=1)
+
+
+class ToolResultCompactionConfig(BaseModel):
+    """Shortening of older tool results within one agent loop."""
+
+    model_config = ConfigDict(extra="ignore")
+
+    enabled: bool = True
+    default_budget: int = Field(default=1500, ge=1)  # chars kept of an older result
+    budgets: dict[str, int] = Field(default_factory=dict)  # per-tool overrides
+    retrieve_chars: int = Field(default=4000, ge=1)
+
+
+class InlineImageConfig(BaseModel):
+    """Downscaling of images attached to prompts."""
+
+    model_config = ConfigDict(extra="ignore")
+
+    max_pixels: int = Field(default=1_150_000, ge=1)
+    model_max_pixels: dict[str, int] = Field(default_factory=dict)  # fnmatch pattern -> pixels
+    jpeg_quality: int = Field(default=85, ge=30, le=95)
+    cache_entries: int = Field(default=64, ge=0)
+    cache_bytes: int = Field(default=64 * 1024 * 1024, ge=0)
+
+
+class SubagentConfig(BaseModel):
+    """Scheduling limits for background subagents."""
+
+    model_config = ConfigDict(extra="ignore")
+
+    max_concurrent: int = Field(default=2, ge=1)
+    max_queued: int = Field(default=8, ge=0)
+    max_per_chat: int = Field(default=3, ge=1)  # running + queued
+    max_iterations: int = Field(default=15, ge=1)
+    interactive_wait_seconds: float = Field(default=30.0, ge=0)
 
 
 class AgentDefaults(BaseModel):
@@ -188,6 +344,12 @@ class AgentDefaults(BaseModel):
     max_tool_iterations: int = 20
     timing_logs_enabled: bool = False
     subagent_model: str | None = Field(default=None, alias="subagentModel")
+    history: HistoryConfig = Field(default_factory=HistoryConfig)
+    tool_result_compaction: ToolResultCompactionConfig = Field(
+        default_factory=ToolResultCompactionConfig
+    )
+    images: InlineImageConfig = Field(default_factory=InlineImageConfig)
+    subagents: SubagentConfig = Field(default_factory=SubagentConfig)
 
 
 class AgentsConfig(BaseModel):
@@ -277,10 +439,20 @@ class WebSearchConfig(BaseModel):
     max_results: int = 5
 
 
+class WebCacheConfig(BaseModel):
+    """On-disk cache for web_fetch / web_search results."""
+
+    enabled: bool = True
+    max_bytes: int = 64 * 1024 * 1024  # Total payload budget; LRU entries are evicted beyond it
+    fetch_ttl_seconds: int = 300  # Freshness when a response has no Cache-Control/Expires
+    search_ttl_seconds: int = 600
+
+
 class WebToolsConfig(BaseModel):
     """Web tools configuration."""
 
     search: WebSearchConfig = Field(default_factory=WebSearchConfig)
+    cache: WebCacheConfig = Field(default_factory=WebCacheConfig)
 
 
 class MemoryCaptureConfig(BaseModel):
@@ -347,6 +519,13 @@ class MemoryWalConfig(BaseModel):
 
     enabled: bool = bool(DEFAULT_MEMORY["wal"]["enabled"])
     state_dir: str = str(DEFAULT_MEMORY["wal"]["state_dir"])
+    max_segment_kb: int = Field(default=int(DEFAULT_MEMORY["wal"]["max_segment_kb"]), ge=1)
+    max_segment_age_hours: float = Field(
+        default=float(DEFAULT_MEMORY["wal"]["max_segment_age_hours"]), gt=0
+    )
+    max_segments: int = Field(default=int(DEFAULT_MEMORY["wal"]["max_segments"]), ge=0)
+    retention_days: float = Field(default=float(DEFAULT_MEMORY["wal"]["retention_days"]), ge=0)
+    flush_interval_ms: int = Field(default=int(DEFAULT_MEMORY["wal"]["flush_interval_ms"]), ge=0)
 
 
 class MemoryConfig(BaseModel):
@@ -374,6 +553,8 @@ class ExecIsolationConfig(BaseModel):
     batch_session_idle_seconds: int = 600
     max_containers: int = 5
     pressure_policy: Literal["preempt_oldest_active"] = "preempt_oldest_active"
+    warm_pool_size: int = 0  # Generic sandboxes kept started ahead of demand (0 = off)
+    max_uses_per_sandbox: int = 200  # Recycle a sandbox after this many commands (0 = never)
     force_workspace_restriction: bool = True
     allowlist_path: str = "~/.config/nanobot/mount-allowlist.json"
 
@@ -382,6 +563,7 @@ class ExecToolConfig(BaseModel):
     """Shell exec tool configuration."""
 
     timeout: int = 60
+    max_output_bytes: int = 4 * 1024 * 1024  # Kill commands that print more than this
     allow_host_execution: bool = False
     isolation: ExecIsolationConfig = Field(default_factory=ExecIsolationConfig)
 
@@ -420,6 +602,13 @@ class BusConfig(BaseModel):
     outbound_maxsize: int = 2000
 
 
+class CronConfig(BaseModel):
+    """Scheduled job execution configuration."""
+
+    max_concurrency: int = Field(default=4, ge=1)
+    missed_runs: Literal["skip", "once"] = "skip"
+
+
 class Config(BaseSettings):
     """Root configuration for nanobot."""
     model_config = ConfigDict(extra="ignore", populate_by_name=True, env_prefix="NANOBOT_", env_nested_delimiter="__")
@@ -435,6 +624,7 @@ class Config(BaseSettings):
     security: SecurityConfig = Field(default_factory=SecurityConfig)
     memory: MemoryConfig = Field(default_factory=MemoryConfig)
     bus: BusConfig = Field(default_factory=BusConfig)
+    cron: CronConfig = Field(default_factory=CronConfig)
 
     @property
     def workspace_path(self) -> Path:
@@ -5,12 +5,14 @@ from nanobot.core.intents import (
     QueueMemoryNotesCaptureIntent,
     RecordManualMemoryIntent,
     RecordMetricIntent,
+    SendDeferredOutboundIntent,
     SendOutboundIntent,
     SendReactionIntent,
     SetTypingIntent,
 )
 from nanobot.core.models import (
     ArchivedMessage,
+    DeferredReply,
     InboundEvent,
     OutboundEvent,
     PolicyDecision,
@@ -19,6 +21,7 @@ from nanobot.core.orchestrator import Orchestrator
 
 __all__ = [
     "ArchivedMessage",
+    "DeferredReply",
     "InboundEvent",
     "Orchestrator",
     "OutboundEvent",
@@ -27,6 +30,7 @@ __all__ = [
     "QueueMemoryNotesCaptureIntent",
     "RecordManualMemoryIntent",
     "RecordMetricIntent",
+    "SendDeferredOutboundIntent",
     "SendOutboundIntent",
     "SendReactionIntent",
     "SetTypingIntent",
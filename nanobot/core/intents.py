@@ -24,6 +24,14 @@ class SendOutboundIntent:
     event: OutboundEvent
 
 
+@dataclass(frozen=True, slots=True, kw_only=True)
+class SendDeferredOutboundIntent:
+    """Deliver one outbound message after ``delay_seconds``; the runtime schedules it."""
+
+    event: OutboundEvent
+    delay_seconds: float
+
+
 @dataclass(frozen=True, slots=True, kw_only=True)
 class PersistSessionIntent:
     """Persist user/assistant turn for a session."""
@@ -82,6 +90,7 @@ class SendReactionIntent:
 type OrchestratorIntent = (
     SetTypingIntent
     | SendOutboundIntent
+    | SendDeferredOutboundIntent
     | SendReactionIntent
     | PersistSessionIntent
     | QueueMemoryNotesCaptureIntent
@@ -91,6 +100,7 @@ type OrchestratorIntent = (
 type IntentKind = Literal[
     "typing",
     "send_outbound",
+    "send_deferred_outbound",
     "send_reaction",
     "persist_session",
     "queue_memory_notes_capture",
@@ -113,6 +113,14 @@ class InboundEvent:
         return self.content.strip()
 
 
+@dataclass(frozen=True, slots=True, kw_only=True)
+class DeferredReply:
+    """Responder output that should be sent after a delay, without blocking the reply path."""
+
+    text: str
+    delay_seconds: float
+
+
 @dataclass(frozen=True, slots=True, kw_only=True)
 class OutboundEvent:
     """Typed outbound event emitted by the orchestrator."""
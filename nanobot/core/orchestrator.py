@@ -2,8 +2,8 @@
 
 from __future__ import annotations
 
+import inspect
 import re
-import time
 import unicodedata
 from dataclasses import replace
 from pathlib import Path
@@ -17,11 +17,18 @@ from nanobot.core.intents import (
     QueueMemoryNotesCaptureIntent,
     RecordManualMemoryIntent,
     RecordMetricIntent,
+    SendDeferredOutboundIntent,
     SendOutboundIntent,
     SendReactionIntent,
     SetTypingIntent,
 )
-from nanobot.core.models import ArchivedMessage, InboundEvent, OutboundEvent, PolicyDecision
+from nanobot.core.models import (
+    ArchivedMessage,
+    DeferredReply,
+    InboundEvent,
+    OutboundEvent,
+    PolicyDecision,
+)
 from nanobot.core.ports import PolicyPort, ReplyArchivePort, ResponderPort, SecurityPort
 from nanobot.media.tts import (
     TTSSynthesizer,
@@ -29,8 +36,10 @@ from nanobot.media.tts import (
     truncate_for_voice,
     write_tts_audio_file,
 )
+from nanobot.utils.ttl_set import TTLSet
 
 if TYPE_CHECKING:
+    from nanobot.media.index import MediaIndex
     from nanobot.media.router import ModelRouter
 
 _REACTION_RE = re.compile(r"^\s*::reaction::(.+?)\s*$", re.DOTALL)
@@ -82,7 +91,10 @@ class Orchestrator:
         typing_notifier: Callable[[str, str, bool], Awaitable[None]] | None = None,
         security: SecurityPort | None = None,
         security_block_message: str = "😂",
-        policy_admin_handler: Callable[[InboundEvent], AdminCommandResult | str | None]
+        policy_admin_handler: Callable[
+            [InboundEvent],
+            AdminCommandResult | str | None | Awaitable[AdminCommandResult | str | None],
+        ]
         | None = None,
         model_router: "ModelRouter | None" = None,
         tts: TTSSynthesizer | None = None,
@@ -90,6 +102,8 @@ class Orchestrator:
         whatsapp_tts_max_raw_bytes: int = 160 * 1024,
         owner_alert_resolver: Callable[[str], list[str]] | None = None,
         owner_alert_cooldown_seconds: int = 300,
+        media_index: "MediaIndex | None" = None,
+        message_dedupe: TTLSet | None = None,
     ) -> None:
         self._policy = policy
         self._responder = responder
@@ -105,12 +119,18 @@ class Orchestrator:
         self._tts = tts
         self._whatsapp_tts_outgoing_dir = whatsapp_tts_outgoing_dir
         self._whatsapp_tts_max_raw_bytes = max(1, int(whatsapp_tts_max_raw_bytes))
+        self._media_index = media_index
         self._owner_alert_resolver = owner_alert_resolver
         self._owner_alert_cooldown_seconds = max(30, int(owner_alert_cooldown_seconds))
-        self._recent_owner_alert_keys: dict[str, float] = {}
-        self._dedupe_ttl_seconds = max(1, int(dedupe_ttl_seconds))
-        self._recent_message_keys: dict[str, float] = {}
-        self._next_dedupe_cleanup_at = 0.0
+        self._recent_owner_alert_keys = TTLSet(
+            self._owner_alert_cooldown_seconds, max_entries=1024, name="owner alert cooldown"
+        )
+        # An empty TTLSet is falsy (it has __len__), so test for None explicitly.
+        self._recent_message_keys = (
+            message_dedupe
+            if message_dedupe is not None
+            else TTLSet(dedupe_ttl_seconds, max_entries=50_000, name="orchestrator dedupe")
+        )
 
     @staticmethod
     def _fold_accents(text: str) -> str:
@@ -214,6 +234,8 @@ class Orchestrator:
 
         if self._policy_admin_handler is not None:
             admin_result = self._policy_admin_handler(event)
+            if inspect.isawaitable(admin_result):
+                admin_result = await admin_result
             if isinstance(admin_result, str):
                 admin_result = AdminCommandResult(status="handled", response=admin_result)
             if admin_result is not None:
@@ -576,6 +598,10 @@ class Orchestrator:
                 typing_started = True
 
             reply = await self._responder.generate_reply(event, decision)
+            delay_seconds = 0.0
+            if isinstance(reply, DeferredReply):
+                delay_seconds = max(0.0, float(reply.delay_seconds))
+                reply = reply.text
             if not reply:
                 intents.append(
                     RecordMetricIntent(
@@ -666,7 +692,12 @@ class Orchestrator:
             )
             if voice_outbound is not None:
                 outbound = voice_outbound
-            intents.append(SendOutboundIntent(event=outbound))
+            if delay_seconds > 0:
+                intents.append(
+                    SendDeferredOutboundIntent(event=outbound, delay_seconds=delay_seconds)
+                )
+            else:
+                intents.append(SendOutboundIntent(event=outbound))
             intents.append(
                 PersistSessionIntent(
                     session_key=f"{event.channel}:{event.chat_id}",
@@ -787,7 +818,13 @@ class Orchestrator:
             return None
 
         out_dir = self._whatsapp_tts_outgoing_dir / "tts"
-        path = write_tts_audio_file(out_dir, audio, ext=".ogg")
+        path = write_tts_audio_file(
+            out_dir,
+            audio,
+            ext=".ogg",
+            media_index=self._media_index,
+            channel=outbound_channel,
+        )
         return OutboundEvent(
             channel=outbound_channel,
             chat_id=outbound_chat_id,
@@ -810,11 +847,6 @@ class Orchestrator:
         if not targets_raw:
             return
 
-        now = time.monotonic()
-        for key, expires_at in list(self._recent_owner_alert_keys.items()):
-            if expires_at <= now:
-                self._recent_owner_alert_keys.pop(key, None)
-
         normalized_targets: list[str] = []
         for raw in targets_raw:
             target = self._normalize_owner_target(channel, raw)
@@ -825,9 +857,8 @@ class Orchestrator:
 
         reason_compact = " ".join(str(reason or "unknown").split()).strip() or "unknown"
         key = f"{channel}:{reason_compact}"
-        if key in self._recent_owner_alert_keys:
+        if self._recent_owner_alert_keys.seen(key):
             return
-        self._recent_owner_alert_keys[key] = now + float(self._owner_alert_cooldown_seconds)
 
         content = (
             f"⚠️ Nano diagnostic\nvoice fallback in {channel}:{chat_id}\nreason={reason_compact}"
@@ -866,18 +897,7 @@ class Orchestrator:
         key = self._dedupe_key(event)
         if key is None:
             return False
-        now = time.monotonic()
-        if now >= self._next_dedupe_cleanup_at:
-            expired = [
-                k for k, expires_at in self._recent_message_keys.items() if expires_at <= now
-            ]
-            for expired_key in expired:
-                self._recent_message_keys.pop(expired_key, None)
-            self._next_dedupe_cleanup_at = now + 30.0
-        if key in self._recent_message_keys:
-            return True
-        self._recent_message_keys[key] = now + float(self._dedupe_ttl_seconds)
-        return False
+        return self._recent_message_keys.seen(key)
 
     def _record_archive(self, event: InboundEvent) -> None:
         if self._reply_archive is None:
@@ -4,7 +4,13 @@ from __future__ import annotations
 
 from typing import Protocol
 
-from nanobot.core.models import ArchivedMessage, InboundEvent, PolicyDecision, SecurityResult
+from nanobot.core.models import (
+    ArchivedMessage,
+    DeferredReply,
+    InboundEvent,
+    PolicyDecision,
+    SecurityResult,
+)
 
 
 class ReplyArchivePort(Protocol):
@@ -46,8 +52,10 @@ class PolicyPort(Protocol):
 class ResponderPort(Protocol):
     """LLM/tool execution port."""
 
-    async def generate_reply(self, event: InboundEvent, decision: PolicyDecision) -> str | None:
-        """Return assistant text for one event, or None for no response."""
+    async def generate_reply(
+        self, event: InboundEvent, decision: PolicyDecision
+    ) -> str | DeferredReply | None:
+        """Return assistant text for one event (possibly deferred), or None for no response."""
 
 
 class TelemetryPort(Protocol):
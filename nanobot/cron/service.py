@@ -1,16 +1,24 @@
 """Cron service for scheduling agent tasks."""
 
 import asyncio
+import heapq
 import json
+import os
+import tempfile
 import time
 import uuid
 from pathlib import Path
-from typing import Any, Callable, Coroutine
+from typing import Any, Callable, Coroutine, Literal
 
 from loguru import logger
 
 from nanobot.cron.types import CronJob, CronJobState, CronPayload, CronSchedule, CronStore
 
+# Timer-driven state changes (last run, next run) are coalesced into one write.
+SAVE_DELAY_S = 1.0
+
+MissedRunPolicy = Literal["skip", "once"]
+
 
 def _now_ms() -> int:
     return int(time.time() * 1000)
@@ -45,12 +53,25 @@ class CronService:
     def __init__(
         self,
         store_path: Path,
-        on_job: Callable[[CronJob], Coroutine[Any, Any, str | None]] | None = None
+        on_job: Callable[[CronJob], Coroutine[Any, Any, str | None]] | None = None,
+        *,
+        max_concurrency: int = 4,
+        missed_runs: MissedRunPolicy = "skip",
     ):
         self.store_path = store_path
         self.on_job = on_job  # Callback to execute job, returns response text
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.missed_runs: MissedRunPolicy = missed_runs
         self._store: CronStore | None = None
+        self._jobs_by_id: dict[str, CronJob] = {}
+        # (next_run_at_ms, seq, job_id); stale entries are dropped lazily on pop.
+        self._heap: list[tuple[int, int, str]] = []
+        self._seq = 0
         self._timer_task: asyncio.Task | None = None
+        self._save_handle: asyncio.TimerHandle | None = None
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._slots: asyncio.Semaphore | None = None
+        self._last_saved: str | None = None
         self._running = False
 
     def _load_store(self) -> CronStore:
@@ -96,6 +117,7 @@ class CronService:
                             last_run_at_ms=j.get("state", {}).get("lastRunAtMs"),
                             last_status=j.get("state", {}).get("lastStatus"),
                             last_error=j.get("state", {}).get("lastError"),
+                            running_since_ms=j.get("state", {}).get("runningSinceMs"),
                         ),
                         created_at_ms=j.get("createdAtMs", 0),
                         updated_at_ms=j.get("updatedAtMs", 0),
@@ -108,15 +130,12 @@ class CronService:
         else:
             self._store = CronStore()
 
+        self._jobs_by_id = {j.id: j for j in self._store.jobs}
+        self._rebuild_heap()
         return self._store
 
-    def _save_store(self) -> None:
-        """Save jobs to disk."""
-        if not self._store:
-            return
-
-        self.store_path.parent.mkdir(parents=True, exist_ok=True)
-
+    def _serialize_store(self) -> str:
+        assert self._store is not None
         data = {
             "version": self._store.version,
             "jobs": [
@@ -153,6 +172,7 @@ class CronService:
                         "lastRunAtMs": j.state.last_run_at_ms,
                         "lastStatus": j.state.last_status,
                         "lastError": j.state.last_error,
+                        "runningSinceMs": j.state.running_since_ms,
                     },
                     "createdAtMs": j.created_at_ms,
                     "updatedAtMs": j.updated_at_ms,
@@ -161,12 +181,56 @@ class CronService:
                 for j in self._store.jobs
             ]
         }
+        return json.dumps(data, separators=(",", ":"))
+
+    def _save_store(self) -> None:
+        """Atomically write jobs to disk when they changed since the last write."""
+        self._cancel_pending_save()
+        if not self._store:
+            return
+
+        text = self._serialize_store()
+        if text == self._last_saved:
+            return
+
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_raw = tempfile.mkstemp(
+            prefix=f".{self.store_path.name}.tmp-", dir=str(self.store_path.parent)
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_raw, self.store_path)
+        except Exception:
+            Path(tmp_raw).unlink(missing_ok=True)
+            raise
+        self._last_saved = text
+
+    def _request_save(self) -> None:
+        """Coalesce timer-driven writes; saves immediately when no loop is running."""
+        if not self._running:
+            self._save_store()
+            return
+        if self._save_handle is None:
+            loop = asyncio.get_running_loop()
+            self._save_handle = loop.call_later(SAVE_DELAY_S, self._flush_save)
+
+    def _flush_save(self) -> None:
+        self._save_handle = None
+        try:
+            self._save_store()
+        except Exception as e:
+            logger.warning(f"Failed to save cron store: {e}")
 
-        self.store_path.write_text(json.dumps(data, indent=2))
+    def _cancel_pending_save(self) -> None:
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
 
     async def start(self) -> None:
         """Start the cron service."""
         self._running = True
+        self._slots = asyncio.Semaphore(self.max_concurrency)
         self._load_store()
         self._recompute_next_runs()
         self._save_store()
@@ -179,23 +243,58 @@ class CronService:
         if self._timer_task:
             self._timer_task.cancel()
             self._timer_task = None
+        for task in self._inflight.values():
+            task.cancel()
+        self._inflight.clear()
+        if self._save_handle is not None:
+            self._flush_save()
 
     def _recompute_next_runs(self) -> None:
-        """Recompute next run times for all enabled jobs."""
+        """
+        Fill in next run times on startup.
+
+        Future runs persisted by a previous process are kept. Runs missed while
+        the service was down are either dropped (``skip``) or fired once right
+        away (``once``); either way the schedule then resumes from now, so a long
+        outage never replays every missed interval. A run that was interrupted
+        by a restart is always re-armed, so one-shot jobs are not lost.
+        """
         if not self._store:
             return
         now = _now_ms()
         for job in self._store.jobs:
-            if job.enabled:
+            if not job.enabled:
+                continue
+            next_run = job.state.next_run_at_ms
+            if job.state.running_since_ms is not None:
+                logger.warning(f"Cron: job '{job.name}' ({job.id}) was interrupted, re-running")
+                job.state.running_since_ms = None
+                job.state.next_run_at_ms = min(next_run or now, now)
+                continue
+            if next_run is None or (next_run <= now and self.missed_runs == "skip"):
                 job.state.next_run_at_ms = _compute_next_run(job.schedule, now)
+        self._rebuild_heap()
+
+    def _rebuild_heap(self) -> None:
+        self._heap = []
+        for job in self._jobs_by_id.values():
+            self._schedule(job)
+
+    def _schedule(self, job: CronJob) -> None:
+        """Push the job's current next run onto the heap."""
+        if job.enabled and job.state.next_run_at_ms:
+            self._seq += 1
+            heapq.heappush(self._heap, (job.state.next_run_at_ms, self._seq, job.id))
+
+    def _is_current(self, entry: tuple[int, int, str]) -> bool:
+        job = self._jobs_by_id.get(entry[2])
+        return bool(job and job.enabled and job.state.next_run_at_ms == entry[0])
 
     def _get_next_wake_ms(self) -> int | None:
         """Get the earliest next run time across all jobs."""
-        if not self._store:
-            return None
-        times = [j.state.next_run_at_ms for j in self._store.jobs
-                 if j.enabled and j.state.next_run_at_ms]
-        return min(times) if times else None
+        while self._heap and not self._is_current(self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
 
     def _arm_timer(self) -> None:
         """Schedule the next timer tick."""
@@ -217,20 +316,38 @@ class CronService:
         self._timer_task = asyncio.create_task(tick())
 
     async def _on_timer(self) -> None:
-        """Handle timer tick - run due jobs."""
+        """Handle timer tick - dispatch due jobs without waiting for them."""
         if not self._store:
             return
 
         now = _now_ms()
-        due_jobs = [
-            j for j in self._store.jobs
-            if j.enabled and j.state.next_run_at_ms and now >= j.state.next_run_at_ms
-        ]
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if not self._is_current(entry):
+                continue
+            job = self._jobs_by_id[entry[2]]
+            if job.id in self._inflight:
+                # Previous run still going: skip this slot rather than stacking runs.
+                logger.warning(f"Cron: job '{job.name}' ({job.id}) still running, skipping")
+                job.state.next_run_at_ms = _compute_next_run(job.schedule, now)
+                self._schedule(job)
+                continue
+            # Off the heap until the run finishes and computes the next slot. The
+            # schedule stays persisted with a running marker until then.
+            job.state.running_since_ms = now
+            self._inflight[job.id] = asyncio.create_task(self._run_dispatched(job))
+            self._request_save()
 
-        for job in due_jobs:
-            await self._execute_job(job)
+        self._arm_timer()
 
-        self._save_store()
+    async def _run_dispatched(self, job: CronJob) -> None:
+        assert self._slots is not None
+        try:
+            async with self._slots:
+                await self._execute_job(job)
+        finally:
+            self._inflight.pop(job.id, None)
+        self._request_save()
         self._arm_timer()
 
     async def _execute_job(self, job: CronJob) -> None:
@@ -252,18 +369,33 @@ class CronService:
             logger.error(f"Cron: job '{job.name}' failed: {e}")
 
         job.state.last_run_at_ms = start_ms
+        job.state.running_since_ms = None
         job.updated_at_ms = _now_ms()
 
         # Handle one-shot jobs
         if job.schedule.kind == "at":
             if job.delete_after_run:
-                self._store.jobs = [j for j in self._store.jobs if j.id != job.id]
+                self._drop_job(job.id)
             else:
                 job.enabled = False
                 job.state.next_run_at_ms = None
         else:
             # Compute next run
             job.state.next_run_at_ms = _compute_next_run(job.schedule, _now_ms())
+            self._schedule(job)
+
+    def _add_to_store(self, job: CronJob) -> None:
+        store = self._load_store()
+        store.jobs.append(job)
+        self._jobs_by_id[job.id] = job
+        self._schedule(job)
+
+    def _drop_job(self, job_id: str) -> bool:
+        if self._jobs_by_id.pop(job_id, None) is None:
+            return False
+        store = self._load_store()
+        store.jobs = [j for j in store.jobs if j.id != job_id]
+        return True
 
     # ========== Public API ==========
 
@@ -305,7 +437,7 @@ class CronService:
             delete_after_run=delete_after_run,
         )
 
-        store.jobs.append(job)
+        self._add_to_store(job)
         self._save_store()
         self._arm_timer()
 
@@ -364,7 +496,7 @@ class CronService:
             delete_after_run=delete_after_run,
         )
 
-        store.jobs.append(job)
+        self._add_to_store(job)
         self._save_store()
         self._arm_timer()
 
@@ -373,10 +505,8 @@ class CronService:
 
     def remove_job(self, job_id: str) -> bool:
         """Remove a job by ID."""
-        store = self._load_store()
-        before = len(store.jobs)
-        store.jobs = [j for j in store.jobs if j.id != job_id]
-        removed = len(store.jobs) < before
+        self._load_store()
+        removed = self._drop_job(job_id)
 
         if removed:
             self._save_store()
@@ -387,32 +517,43 @@ class CronService:
 
     def enable_job(self, job_id: str, enabled: bool = True) -> CronJob | None:
         """Enable or disable a job."""
-        store = self._load_store()
-        for job in store.jobs:
-            if job.id == job_id:
-                job.enabled = enabled
-                job.updated_at_ms = _now_ms()
-                if enabled:
-                    job.state.next_run_at_ms = _compute_next_run(job.schedule, _now_ms())
-                else:
-                    job.state.next_run_at_ms = None
-                self._save_store()
-                self._arm_timer()
-                return job
-        return None
+        self._load_store()
+        job = self._jobs_by_id.get(job_id)
+        if job is None:
+            return None
+        job.enabled = enabled
+        job.updated_at_ms = _now_ms()
+        if enabled:
+            job.state.next_run_at_ms = _compute_next_run(job.schedule, _now_ms())
+            self._schedule(job)
+        else:
+            job.state.next_run_at_ms = None
+        self._save_store()
+        self._arm_timer()
+        return job
 
     async def run_job(self, job_id: str, force: bool = False) -> bool:
         """Manually run a job."""
-        store = self._load_store()
-        for job in store.jobs:
-            if job.id == job_id:
-                if not force and not job.enabled:
-                    return False
-                await self._execute_job(job)
-                self._save_store()
-                self._arm_timer()
-                return True
-        return False
+        self._load_store()
+        job = self._jobs_by_id.get(job_id)
+        if job is None or job_id in self._inflight:
+            return False
+        if not force and not job.enabled:
+            return False
+        # Own task, so stop() cancels the job and not whoever called run_job.
+        task = asyncio.create_task(self._execute_job(job))
+        self._inflight[job_id] = task
+        try:
+            await asyncio.wait({task})
+        finally:
+            self._inflight.pop(job_id, None)
+            if not task.done():
+                task.cancel()
+        if task.cancelled():
+            return False
+        self._save_store()
+        self._arm_timer()
+        return True
 
     def status(self) -> dict:
         """Get service status."""
@@ -420,5 +561,6 @@ class CronService:
         return {
             "enabled": self._running,
             "jobs": len(store.jobs),
+            "running": len(self._inflight),
             "next_wake_at_ms": self._get_next_wake_ms(),
         }
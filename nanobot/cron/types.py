@@ -47,6 +47,8 @@ class CronJobState:
     last_run_at_ms: int | None = None
     last_status: Literal["ok", "error", "skipped"] | None = None
     last_error: str | None = None
+    # Set while a run is in flight; a job still marked on load was interrupted.
+    running_since_ms: int | None = None
 
 
 @dataclass
@@ -1,12 +1,14 @@
 """Media intelligence routing, storage, and capability executors."""
 
 from nanobot.media.asr import ASRTranscriber
+from nanobot.media.pipeline import MediaPipeline
 from nanobot.media.router import ModelRouter, ResolvedProfile
 from nanobot.media.storage import MediaStorage
 from nanobot.media.vision import VisionDescriber
 
 __all__ = [
     "ASRTranscriber",
+    "MediaPipeline",
     "MediaStorage",
     "ModelRouter",
     "ResolvedProfile",
@@ -4,10 +4,14 @@ from __future__ import annotations
 
 import asyncio
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from nanobot.media.router import ResolvedProfile
 from nanobot.providers.transcription import GroqTranscriptionProvider, OpenAITranscriptionProvider
 
+if TYPE_CHECKING:
+    from nanobot.storage.llm_cache import LLMResponseCache
+
 
 class ASRTranscriber:
     """Transcribe audio files through route-selected ASR backend."""
@@ -20,12 +24,14 @@ class ASRTranscriber:
         openai_api_base: str | None = None,
         openai_extra_headers: dict[str, str] | None = None,
         max_concurrency: int = 2,
+        response_cache: "LLMResponseCache | None" = None,
     ) -> None:
         self._groq_api_key = groq_api_key
         self._openai_api_key = openai_api_key
         self._openai_api_base = openai_api_base
         self._openai_extra_headers = openai_extra_headers
         self._semaphore = asyncio.Semaphore(max(1, int(max_concurrency)))
+        self._response_cache = response_cache
 
     async def transcribe(self, audio_path: Path, profile: ResolvedProfile) -> str | None:
         async with self._semaphore:
@@ -57,6 +63,8 @@ class ASRTranscriber:
                 extra_headers=self._openai_extra_headers,
                 model=model,
                 timeout_seconds=timeout_s,
+                response_cache=self._response_cache,
+                cache_route=profile.route_key,
             )
             text = await transcriber.transcribe(audio_path)
         else:
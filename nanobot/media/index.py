@@ -0,0 +1,270 @@
+"""On-disk index of persisted media files for budgeted retention sweeps."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal
+
+from loguru import logger
+
+from nanobot.utils.helpers import ensure_dir, get_var_path
+
+Direction = Literal["incoming", "outgoing"]
+
+DEFAULT_SWEEP_BUDGET = 500
+
+
+@dataclass(frozen=True, slots=True)
+class SweepResult:
+    """Outcome of one sweep pass."""
+
+    deleted: int
+    freed_bytes: int
+    budget_exhausted: bool
+
+
+class MediaIndex:
+    """
+    SQLite index of media files written by channels and TTS.
+
+    Files are recorded with their size and creation time when they are
+    persisted, so retention never walks or stats the media trees: a sweep is
+    an indexed range query over the oldest rows, bounded by a per-pass budget.
+    """
+
+    def __init__(self, db_path: Path | None = None) -> None:
+        self.db_path = db_path or (get_var_path() / "media" / "index.db")
+        ensure_dir(self.db_path.parent)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        with self._lock:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS media_files (
+                    path TEXT PRIMARY KEY,
+                    channel TEXT NOT NULL,
+                    direction TEXT NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_media_files_channel_created
+                ON media_files(channel, created_at)
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_media_files_created ON media_files(created_at)"
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS index_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+
+    def record(
+        self,
+        path: Path,
+        *,
+        channel: str,
+        direction: Direction,
+        size_bytes: int | None = None,
+        created_at: float | None = None,
+    ) -> None:
+        """Register a file that was just written (one stat when size is unknown)."""
+        if size_bytes is None:
+            try:
+                size_bytes = path.stat().st_size
+            except OSError:
+                return
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO media_files (path, channel, direction, size_bytes, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    size_bytes = excluded.size_bytes,
+                    created_at = excluded.created_at
+                """,
+                (
+                    str(path),
+                    channel.strip().lower(),
+                    direction,
+                    int(size_bytes),
+                    time.time() if created_at is None else float(created_at),
+                ),
+            )
+            self._conn.commit()
+
+    def forget(self, path: Path) -> None:
+        """Drop a file that was deleted outside the sweeper."""
+        with self._lock:
+            self._conn.execute("DELETE FROM media_files WHERE path = ?", (str(path),))
+            self._conn.commit()
+
+    def sweep(
+        self,
+        *,
+        max_age_seconds: float,
+        channel_max_age: Mapping[str, float] | None = None,
+        max_total_bytes: int = 0,
+        budget: int = DEFAULT_SWEEP_BUDGET,
+        now: float | None = None,
+    ) -> SweepResult:
+        """
+        Delete up to ``budget`` files: expired ones first, then the oldest
+        files while the total exceeds ``max_total_bytes`` (0 disables the quota).
+        """
+        now = time.time() if now is None else now
+        budget = max(1, int(budget))
+        overrides = channel_max_age or {}
+        victims: list[tuple[str, int]] = []
+        with self._lock:
+            channels = [
+                str(row[0])
+                for row in self._conn.execute("SELECT DISTINCT channel FROM media_files")
+            ]
+            for channel in channels:
+                left = budget - len(victims)
+                if left <= 0:
+                    break
+                max_age = float(overrides.get(channel, max_age_seconds))
+                if max_age <= 0:
+                    continue
+                victims.extend(
+                    (str(p), int(s))
+                    for p, s in self._conn.execute(
+                        """
+                        SELECT path, size_bytes FROM media_files
+                        WHERE channel = ? AND created_at < ?
+                        ORDER BY created_at LIMIT ?
+                        """,
+                        (channel, now - max_age, left),
+                    )
+                )
+            if max_total_bytes > 0 and len(victims) < budget:
+                total = int(
+                    self._conn.execute(
+                        "SELECT COALESCE(SUM(size_bytes), 0) FROM media_files"
+                    ).fetchone()[0]
+                )
+                excess = total - sum(size for _, size in victims) - int(max_total_bytes)
+                chosen = {path for path, _ in victims}
+                if excess > 0:
+                    rows = self._conn.execute(
+                        "SELECT path, size_bytes FROM media_files ORDER BY created_at LIMIT ?",
+                        (budget,),
+                    )
+                    for path, size in rows:
+                        if excess <= 0 or len(victims) >= budget:
+                            break
+                        if path in chosen:
+                            continue
+                        victims.append((str(path), int(size)))
+                        excess -= int(size)
+
+        # Rows go only once the file is gone; a failed unlink is retried next pass.
+        removed: list[tuple[str, int]] = []
+        for path, size in victims:
+            try:
+                Path(path).unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning("media sweep could not delete {}: {}", path, e)
+                continue
+            removed.append((path, size))
+
+        if removed:
+            with self._lock:
+                self._conn.executemany(
+                    "DELETE FROM media_files WHERE path = ?", [(p,) for p, _ in removed]
+                )
+                self._conn.commit()
+        return SweepResult(
+            deleted=len(removed),
+            freed_bytes=sum(size for _, size in removed),
+            budget_exhausted=len(victims) >= budget,
+        )
+
+    def usage(self) -> dict[str, dict[str, dict[str, int]]]:
+        """Files and bytes per channel and direction."""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT channel, direction, COUNT(*), COALESCE(SUM(size_bytes), 0)
+                FROM media_files GROUP BY channel, direction
+                """
+            ).fetchall()
+        out: dict[str, dict[str, dict[str, int]]] = {}
+        for channel, direction, files, size in rows:
+            out.setdefault(str(channel), {})[str(direction)] = {
+                "files": int(files),
+                "bytes": int(size),
+            }
+        return out
+
+    def backfill_once(self, roots: Iterable[tuple[Path, str, Direction]]) -> int:
+        """
+        Index files that predate the index, using their mtime as creation time.
+
+        Runs only the first time an index is opened; afterwards every file is
+        recorded when it is written. Returns the number of files indexed.
+        """
+        with self._lock:
+            done = self._conn.execute(
+                "SELECT value FROM index_meta WHERE key = 'backfilled_at'"
+            ).fetchone()
+        if done is not None:
+            return 0
+
+        rows: list[tuple[str, str, str, int, float]] = []
+        for root, channel, direction in roots:
+            root = root.expanduser()
+            if not root.is_dir():
+                continue
+            for path in root.rglob("*"):
+                try:
+                    if path.is_file():
+                        st = path.stat()
+                        rows.append(
+                            (str(path), channel, direction, st.st_size, st.st_mtime)
+                        )
+                except OSError:
+                    continue
+
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT INTO media_files (path, channel, direction, size_bytes, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO NOTHING
+                """,
+                rows,
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO index_meta (key, value) VALUES ('backfilled_at', ?)",
+                (str(time.time()),),
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def close(self) -> None:
+        """Close the sqlite connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,249 @@
+"""Downscaled, pre-encoded image attachments for chat prompts."""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import fnmatch
+import hashlib
+import importlib.util
+import io
+import mimetypes
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+# Pillow is optional (``pip install nanobot-stack[images]``) and imported on
+# first use, so it stays out of startup time.
+PILLOW_AVAILABLE = importlib.util.find_spec("PIL") is not None
+
+MAX_INLINE_IMAGE_BYTES = 8 * 1024 * 1024
+# Roughly what the large vision models resize to server-side anyway.
+DEFAULT_MAX_PIXELS = 1_150_000
+# Small images are sent as they are; recompressing them saves little.
+RECOMPRESS_MIN_BYTES = 256 * 1024
+# Images with more pixels than this are refused before they are decoded;
+# a small compressed file can otherwise expand to gigabytes of bitmap.
+MAX_DECODE_PIXELS = 40_000_000
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+# One cached data URL may use at most this share of ``cache_bytes``.
+CACHE_ENTRY_FRACTION = 8
+
+
+@dataclass(frozen=True, slots=True)
+class EncodedImage:
+    """One image ready to inline as a data URL."""
+
+    data_url: str
+    source_bytes: int
+    encoded_bytes: int
+
+
+class InlineImageCache:
+    """
+    Encodes prompt images once per file content and pixel limit.
+
+    Images are decoded, downscaled to the model's pixel budget and
+    recompressed (JPEG, or PNG when there is transparency) in a worker
+    thread, then kept as base64 data URLs in an LRU keyed by content hash.
+    The same attachment in a later turn, or in another chat, costs one stat
+    call. The LRU is bounded by ``cache_entries`` and by ``cache_bytes`` of
+    data URLs; a single URL larger than an eighth of ``cache_bytes`` is not
+    cached. Dimensions are read from the header and images above
+    ``MAX_DECODE_PIXELS`` are refused before decoding. Without Pillow,
+    files are inlined as they are, as before, but still off the event loop
+    and cached.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_pixels: int = DEFAULT_MAX_PIXELS,
+        model_max_pixels: Mapping[str, int] | None = None,
+        jpeg_quality: int = 85,
+        cache_entries: int = 64,
+        cache_bytes: int = DEFAULT_CACHE_BYTES,
+        max_source_bytes: int = MAX_INLINE_IMAGE_BYTES,
+    ) -> None:
+        self.max_pixels = max(1, int(max_pixels))
+        # Longest pattern first, so "openai/gpt-4o-mini*" beats "openai/*".
+        self._model_max_pixels = sorted(
+            (model_max_pixels or {}).items(), key=lambda kv: len(kv[0]), reverse=True
+        )
+        self._jpeg_quality = min(95, max(30, int(jpeg_quality)))
+        self._cache_entries = max(0, int(cache_entries))
+        self._cache_bytes_limit = max(0, int(cache_bytes))
+        self._cache_bytes = 0
+        self._max_source_bytes = max(1, int(max_source_bytes))
+        self._cache: OrderedDict[tuple[str, int], EncodedImage] = OrderedDict()
+        # (path, mtime_ns, size) -> sha256, so cache hits skip re-reading the file.
+        self._digests: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "downscaled": 0,
+            "refused": 0,
+            "uncached_large": 0,
+            "source_bytes": 0,
+            "encoded_bytes": 0,
+        }
+
+    def pixel_limit(self, model: str | None) -> int:
+        """Max pixels for ``model`` (fnmatch patterns, longest match wins)."""
+        if model:
+            for pattern, limit in self._model_max_pixels:
+                if fnmatch.fnmatchcase(model, pattern):
+                    return max(1, int(limit))
+        return self.max_pixels
+
+    async def image_parts(
+        self, paths: Sequence[str], *, model: str | None = None, limit: int = 4
+    ) -> list[dict[str, Any]]:
+        """``image_url`` content parts for up to ``limit`` usable images."""
+        return await asyncio.to_thread(self.image_parts_sync, paths, model=model, limit=limit)
+
+    def image_parts_sync(
+        self, paths: Sequence[str], *, model: str | None = None, limit: int = 4
+    ) -> list[dict[str, Any]]:
+        max_pixels = self.pixel_limit(model)
+        parts: list[dict[str, Any]] = []
+        for path in paths[:limit]:
+            encoded = self.encode(Path(path), max_pixels)
+            if encoded is not None:
+                parts.append({"type": "image_url", "image_url": {"url": encoded.data_url}})
+        return parts
+
+    def encode(self, path: Path, max_pixels: int) -> EncodedImage | None:
+        """Cached encoding of ``path``; None when it is not a usable image."""
+        mime, _ = mimetypes.guess_type(str(path))
+        if not mime or not mime.startswith("image/"):
+            return None
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        if not path.is_file() or st.st_size > self._max_source_bytes:
+            return None
+
+        stat_key = (str(path), st.st_mtime_ns, st.st_size)
+        with self._lock:
+            digest = self._digests.get(stat_key)
+            cached = self._cache.get((digest, max_pixels)) if digest else None
+            if cached is not None:
+                self._cache.move_to_end((digest, max_pixels))
+                self._stats["hits"] += 1
+                return cached
+
+        try:
+            raw = path.read_bytes()
+        except OSError:
+            return None
+        digest = hashlib.sha256(raw).hexdigest()
+        key = (digest, max_pixels)
+        with self._lock:
+            self._remember_digest(stat_key, digest)
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self._stats["hits"] += 1
+                return cached
+            self._stats["misses"] += 1
+
+        shrunk = self._shrink(raw, mime, max_pixels)
+        if shrunk is None:
+            with self._lock:
+                self._stats["refused"] += 1
+            return None
+        data, out_mime = shrunk
+        encoded = EncodedImage(
+            data_url=f"data:{out_mime};base64,{base64.b64encode(data).decode()}",
+            source_bytes=len(raw),
+            encoded_bytes=len(data),
+        )
+        with self._lock:
+            self._stats["source_bytes"] += len(raw)
+            self._stats["encoded_bytes"] += len(data)
+            self._store(key, encoded)
+        return encoded
+
+    def _store(self, key: tuple[str, int], encoded: EncodedImage) -> None:
+        size = len(encoded.data_url)
+        if not self._cache_entries or key in self._cache:
+            return
+        if size > self._cache_bytes_limit // CACHE_ENTRY_FRACTION:
+            self._stats["uncached_large"] += 1
+            return
+        self._cache[key] = encoded
+        self._cache_bytes += size
+        while len(self._cache) > self._cache_entries or self._cache_bytes > self._cache_bytes_limit:
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_bytes -= len(evicted.data_url)
+
+    def _remember_digest(self, stat_key: tuple[str, int, int], digest: str) -> None:
+        self._digests[stat_key] = digest
+        self._digests.move_to_end(stat_key)
+        while len(self._digests) > max(16, self._cache_entries * 4):
+            self._digests.popitem(last=False)
+
+    def _shrink(self, raw: bytes, mime: str, max_pixels: int) -> tuple[bytes, str] | None:
+        """Recompressed bytes and mime; None when the image is too large to decode."""
+        if not PILLOW_AVAILABLE or mime == "image/gif":
+            return raw, mime
+        from PIL import Image, ImageOps
+
+        try:
+            # open() only parses the header; pixel data is decoded on first use.
+            with Image.open(io.BytesIO(raw)) as img:
+                pixels = img.width * img.height
+                if pixels > MAX_DECODE_PIXELS:
+                    logger.warning(
+                        "inline image refused: {}x{} exceeds {} pixels",
+                        img.width,
+                        img.height,
+                        MAX_DECODE_PIXELS,
+                    )
+                    return None
+                if pixels <= max_pixels and len(raw) < RECOMPRESS_MIN_BYTES:
+                    return raw, mime
+                if pixels > max_pixels:
+                    # JPEG can decode straight at 1/2, 1/4 or 1/8 scale.
+                    scale = (max_pixels / pixels) ** 0.5
+                    img.draft(img.mode, (int(img.width * scale), int(img.height * scale)))
+                img = ImageOps.exif_transpose(img)
+                if pixels > max_pixels:
+                    scale = (max_pixels / (img.width * img.height)) ** 0.5
+                    if scale < 1:
+                        size = (max(1, int(img.width * scale)), max(1, int(img.height * scale)))
+                        img = img.resize(size, Image.Resampling.LANCZOS)
+                    with self._lock:
+                        self._stats["downscaled"] += 1
+                out = io.BytesIO()
+                has_alpha = img.mode in ("RGBA", "LA") or (
+                    img.mode == "P" and "transparency" in img.info
+                )
+                if has_alpha:
+                    img.save(out, format="PNG", optimize=True)
+                    out_mime = "image/png"
+                else:
+                    img.convert("RGB").save(
+                        out, format="JPEG", quality=self._jpeg_quality, optimize=True
+                    )
+                    out_mime = "image/jpeg"
+        except Exception as e:
+            logger.debug("inline image recompression failed, sending original: {}", e)
+            return raw, mime
+        data = out.getvalue()
+        if len(data) >= len(raw) and pixels <= max_pixels:
+            return raw, mime
+        return data, out_mime
+
+    def stats(self) -> dict[str, object]:
+        """Hit/miss counters and bytes before and after encoding."""
+        with self._lock:
+            return {**self._stats, "entries": len(self._cache), "cache_bytes": self._cache_bytes}
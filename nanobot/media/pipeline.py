@@ -0,0 +1,232 @@
+"""Channel-agnostic inbound media pipeline: streamed downloads plus routed enrichment."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import httpx
+from loguru import logger
+
+from nanobot.utils.helpers import ensure_dir, get_var_path, safe_filename
+
+if TYPE_CHECKING:
+    from nanobot.media.asr import ASRTranscriber
+    from nanobot.media.index import MediaIndex
+    from nanobot.media.router import ModelRouter
+    from nanobot.media.vision import VisionDescriber
+
+CHUNK_BYTES = 64 * 1024
+DEFAULT_MAX_DOWNLOAD_BYTES = 20 * 1024 * 1024
+
+
+class MediaTooLargeError(ValueError):
+    """Raised when a download exceeds its byte cap."""
+
+
+@dataclass(frozen=True, slots=True)
+class DownloadedMedia:
+    """A media file persisted by the pipeline."""
+
+    path: Path
+    size_bytes: int
+    sha256: str
+
+
+class MediaPipeline:
+    """
+    Shared inbound media work for all channels.
+
+    Downloads are streamed to disk under a global concurrency limit, with the
+    byte cap enforced while streaming (a missing or lying ``Content-Length``
+    cannot exhaust the disk). Enrichment goes through the routed ASR/vision
+    executors behind shared semaphores, and results are cached by content
+    hash so a forwarded image or voice note is only processed once.
+    """
+
+    def __init__(
+        self,
+        *,
+        router: ModelRouter | None = None,
+        asr: ASRTranscriber | None = None,
+        vision: VisionDescriber | None = None,
+        incoming_root: Path | None = None,
+        max_concurrent_downloads: int = 4,
+        max_download_bytes: int = DEFAULT_MAX_DOWNLOAD_BYTES,
+        max_vision_concurrency: int = 2,
+        asr_channel_limits: Mapping[str, int] | None = None,
+        cache_entries: int = 512,
+        client: httpx.AsyncClient | None = None,
+        index: MediaIndex | None = None,
+    ) -> None:
+        self._router = router
+        self._index = index
+        self._asr = asr
+        self._vision = vision
+        self.incoming_root = incoming_root or (get_var_path() / "media" / "incoming")
+        self.max_download_bytes = max(1, int(max_download_bytes))
+        self._downloads = asyncio.Semaphore(max(1, int(max_concurrent_downloads)))
+        self._vision_slots = asyncio.Semaphore(max(1, int(max_vision_concurrency)))
+        # Per-channel ASR caps on top of the transcriber's global one.
+        self._asr_channel_slots = {
+            channel: asyncio.Semaphore(max(1, int(limit)))
+            for channel, limit in (asr_channel_limits or {}).items()
+        }
+        self._cache: OrderedDict[tuple[str, str, str], str] = OrderedDict()
+        self._cache_entries = max(0, int(cache_entries))
+        self._client = client
+        self._owns_client = client is None
+        self._stats = {
+            "downloads": 0,
+            "download_bytes": 0,
+            "rejected_too_large": 0,
+            "download_failures": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+        }
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=60.0, follow_redirects=True)
+        return self._client
+
+    async def download(
+        self,
+        channel: str,
+        url: str,
+        *,
+        filename: str,
+        headers: Mapping[str, str] | None = None,
+        max_bytes: int | None = None,
+    ) -> DownloadedMedia:
+        """Stream ``url`` to ``<incoming_root>/<channel>/<filename>``."""
+        limit = min(self.max_download_bytes, max_bytes or self.max_download_bytes)
+        target_dir = ensure_dir(self.incoming_root / safe_filename(channel.lower()))
+        target = target_dir / (safe_filename(filename).lstrip(".") or "media")
+        tmp = target.with_name(f".{target.name}.part")
+        digest = hashlib.sha256()
+        size = 0
+        async with self._downloads:
+            try:
+                async with self._http().stream("GET", url, headers=dict(headers or {})) as resp:
+                    resp.raise_for_status()
+                    declared = int(resp.headers.get("content-length") or 0)
+                    if declared > limit:
+                        raise MediaTooLargeError(f"{declared} bytes exceeds limit {limit}")
+                    # File I/O runs in worker threads; SD cards can stall for a while.
+                    f = await asyncio.to_thread(open, tmp, "wb")
+                    try:
+                        async for chunk in resp.aiter_bytes(CHUNK_BYTES):
+                            size += len(chunk)
+                            if size > limit:
+                                raise MediaTooLargeError(f"more than {limit} bytes")
+                            digest.update(chunk)
+                            await asyncio.to_thread(f.write, chunk)
+                    finally:
+                        await asyncio.to_thread(f.close)
+                os.replace(tmp, target)
+            except MediaTooLargeError:
+                self._stats["rejected_too_large"] += 1
+                tmp.unlink(missing_ok=True)
+                raise
+            except BaseException:
+                self._stats["download_failures"] += 1
+                tmp.unlink(missing_ok=True)
+                raise
+        self._stats["downloads"] += 1
+        self._stats["download_bytes"] += size
+        if self._index is not None:
+            try:
+                self._index.record(target, channel=channel, direction="incoming", size_bytes=size)
+            except Exception as e:
+                logger.warning("Failed to index downloaded media {}: {}", target, e)
+        return DownloadedMedia(path=target, size_bytes=size, sha256=digest.hexdigest())
+
+    async def describe_image(
+        self, path: Path, channel: str, *, sha256: str | None = None
+    ) -> str | None:
+        """Routed image description, cached by content hash."""
+        if self._vision is None or self._router is None:
+            return None
+        try:
+            profile = self._router.resolve("vision.describe_image", channel=channel)
+        except KeyError as e:
+            logger.warning("Skipping {} image description due to missing route: {}", channel, e)
+            return None
+        key = ("vision", profile.model or "", sha256 or await _file_sha256(path))
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        async with self._vision_slots:
+            description = await self._vision.describe(path, profile)
+        self._cache_put(key, description)
+        return description
+
+    async def transcribe_audio(
+        self, path: Path, channel: str, *, sha256: str | None = None
+    ) -> str | None:
+        """Routed transcription (throttled by the shared ASR semaphore), cached by hash."""
+        if self._asr is None or self._router is None:
+            return None
+        try:
+            profile = self._router.resolve("asr.transcribe_audio", channel=channel)
+        except KeyError as e:
+            logger.warning("Skipping {} audio transcription due to missing route: {}", channel, e)
+            return None
+        key = ("asr", f"{profile.provider}:{profile.model}", sha256 or await _file_sha256(path))
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        slots = self._asr_channel_slots.get(channel)
+        if slots is None:
+            transcript = await self._asr.transcribe(path, profile)
+        else:
+            async with slots:
+                transcript = await self._asr.transcribe(path, profile)
+        self._cache_put(key, transcript)
+        return transcript
+
+    def _cache_get(self, key: tuple[str, str, str]) -> str | None:
+        value = self._cache.get(key)
+        if value is None:
+            self._stats["cache_misses"] += 1
+            return None
+        self._cache.move_to_end(key)
+        self._stats["cache_hits"] += 1
+        return value
+
+    def _cache_put(self, key: tuple[str, str, str], value: str | None) -> None:
+        # Failures are not cached so a later message can retry.
+        if not value or not self._cache_entries:
+            return
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._cache_entries:
+            self._cache.popitem(last=False)
+
+    def stats(self) -> dict[str, object]:
+        """Download and enrichment cache counters."""
+        return {**self._stats, "cache_entries": len(self._cache)}
+
+    async def close(self) -> None:
+        """Close the HTTP client if the pipeline created it."""
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+async def _file_sha256(path: Path) -> str:
+    def _hash() -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_BYTES), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    return await asyncio.to_thread(_hash)
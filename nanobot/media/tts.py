@@ -9,6 +9,7 @@ import os
 import re
 import uuid
 from pathlib import Path
+from typing import TYPE_CHECKING
 from urllib.parse import quote
 
 import httpx
@@ -16,6 +17,9 @@ from loguru import logger
 
 from nanobot.media.router import ResolvedProfile
 
+if TYPE_CHECKING:
+    from nanobot.media.index import MediaIndex
+
 
 def strip_markdown_for_tts(text: str) -> str:
     """Best-effort markdown -> plain text for speech synthesis."""
@@ -69,7 +73,14 @@ def truncate_for_voice(text: str, *, max_sentences: int, max_chars: int) -> str:
     return clipped + ellipsis
 
 
-def write_tts_audio_file(outgoing_dir: Path, audio_bytes: bytes, *, ext: str = ".ogg") -> Path:
+def write_tts_audio_file(
+    outgoing_dir: Path,
+    audio_bytes: bytes,
+    *,
+    ext: str = ".ogg",
+    media_index: MediaIndex | None = None,
+    channel: str = "whatsapp",
+) -> Path:
     """Write synthesized audio bytes to a unique file under outgoing_dir."""
     outgoing_dir.mkdir(parents=True, exist_ok=True)
     name = f"tts-{uuid.uuid4().hex}{ext}"
@@ -79,6 +90,14 @@ def write_tts_audio_file(outgoing_dir: Path, audio_bytes: bytes, *, ext: str = "
         path.chmod(0o600)
     except OSError:
         pass
+    if media_index is not None:
+        # Indexed so the sweeper reclaims it even if the send never succeeds.
+        try:
+            media_index.record(
+                path, channel=channel, direction="outgoing", size_bytes=len(audio_bytes)
+            )
+        except Exception as e:
+            logger.warning("Failed to index TTS file {}: {}", path, e)
     return path
 
 
@@ -33,7 +33,9 @@ class VisionDescriber:
             return None
 
         b64 = base64.b64encode(image_path.read_bytes()).decode()
-        provider = self._provider_factory.create_chat_provider(profile.model)
+        provider = self._provider_factory.create_chat_provider(
+            profile.model, route_key=profile.route_key
+        )
         messages = [
             {
                 "role": "user",
@@ -57,6 +59,8 @@ class VisionDescriber:
             )
         except Exception:
             return None
+        if response.is_error:
+            return None
         text = (response.content or "").strip()
         if not text:
             return None
@@ -16,6 +16,8 @@ from nanobot.providers.litellm_provider import LiteLLMProvider
 
 if TYPE_CHECKING:
     from nanobot.config.schema import Config, ModelProfile
+    from nanobot.providers.base import LLMProvider
+    from nanobot.storage.llm_cache import LLMResponseCache
 
 VALID_SECTORS: set[str] = {"episodic", "semantic", "procedural", "emotional", "reflective"}
 
@@ -36,14 +38,27 @@ class ExtractedCandidate:
 class MemoryExtractorService:
     """Extract semantic memory candidates using a routed chat model."""
 
-    def __init__(self, *, config: "Config", route_key: str) -> None:
+    def __init__(
+        self,
+        *,
+        config: "Config",
+        route_key: str,
+        response_cache: "LLMResponseCache | None" = None,
+    ) -> None:
         self._config = config
         self._route_key = route_key
         self._profile_name, self._profile = self._resolve_profile()
         self._model = (self._profile.model or "").strip()
         self._max_tokens = int(self._profile.max_tokens or 700)
         self._temperature = float(self._profile.temperature if self._profile.temperature is not None else 0.0)
-        self._provider = self._create_provider(self._model)
+        self._provider: LLMProvider = self._create_provider(self._model)
+        ttl = response_cache.ttl_for(route_key) if response_cache is not None else None
+        if response_cache is not None and ttl is not None:
+            from nanobot.providers.cached import CachedProvider
+
+            self._provider = CachedProvider(
+                self._provider, cache=response_cache, route=route_key, ttl_seconds=ttl
+            )
 
     def _resolve_profile(self) -> tuple[str, "ModelProfile"]:
         route_name = self._config.models.routes.get(self._route_key)
@@ -103,6 +118,8 @@ class MemoryExtractorService:
         except Exception as exc:
             logger.debug("memory extractor request failed: {}", exc)
             return []
+        if response.is_error:
+            return []
 
         content = (response.content or "").strip()
         if not content:
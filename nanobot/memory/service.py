@@ -31,6 +31,7 @@ from nanobot.policy.loader import load_policy
 
 if TYPE_CHECKING:
     from nanobot.config.schema import Config, MemoryConfig
+    from nanobot.storage.llm_cache import LLMResponseCache
 
 
 @dataclass(slots=True)
@@ -62,6 +63,7 @@ class MemoryService:
         workspace: Path,
         config: "MemoryConfig",
         root_config: "Config | None" = None,
+        response_cache: "LLMResponseCache | None" = None,
     ) -> None:
         self.workspace = workspace
         self.config = config
@@ -74,7 +76,16 @@ class MemoryService:
             db_path = (Path.home() / ".nanobot" / db_path).resolve()
         self.db_path = db_path
         self.store = MemoryStore(db_path)
-        self.state_store = SessionStateStore(workspace, state_dir=self.config.wal.state_dir)
+        wal = self.config.wal
+        self.state_store = SessionStateStore(
+            workspace,
+            state_dir=wal.state_dir,
+            max_segment_bytes=wal.max_segment_kb * 1024,
+            max_segment_age_seconds=wal.max_segment_age_hours * 3600,
+            max_segments=wal.max_segments,
+            retention_days=wal.retention_days,
+            flush_interval_seconds=wal.flush_interval_ms / 1000,
+        )
         self._owner_ids = _load_owner_ids()
 
         self.embedding: MemoryEmbeddingService | None = None
@@ -93,6 +104,7 @@ class MemoryService:
                     self.extractor = MemoryExtractorService(
                         config=root_config,
                         route_key=self.config.capture.extract_route,
+                        response_cache=response_cache,
                     )
                 except Exception as exc:
                     logger.warning("memory extractor disabled due to route error: {}", exc)
@@ -832,9 +844,7 @@ class MemoryService:
 
     def stats(self) -> dict[str, object]:
         base = self.store.stats(workspace_id=self.workspace_id)
-        wal_files = 0
-        if self.state_store.state_dir.exists():
-            wal_files = len(list(self.state_store.state_dir.glob("*.md")))
+        wal = self.state_store.stats()
         return {
             "enabled": bool(self.config.enabled),
             "backend": "sqlite_semantic_v2",
@@ -843,7 +853,8 @@ class MemoryService:
             "state_dir": str(self.state_store.state_dir),
             "total_active": int(base.get("nodes", 0)),
             "total_deleted": 0,
-            "wal_files": wal_files,
+            "wal_files": wal["sessions"],
+            "wal": wal,
             "backfill_marker": "",
             "by_kind": {},
             "by_scope": {},
@@ -869,6 +880,7 @@ class MemoryService:
         self._capture_stop.set()
         if self._capture_thread.is_alive():
             self._capture_thread.join(timeout=2.0)
+        self.state_store.close()
         self.store.close()
 
 
@@ -2,28 +2,135 @@
 
 from __future__ import annotations
 
+import gzip
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from pathlib import Path
 
+from loguru import logger
+
 from nanobot.utils.helpers import ensure_dir, safe_filename
 
+ROTATED_SUFFIX = ".md.gz"
+# Flush early once this much text is buffered across all sessions.
+FLUSH_BYTES = 64 * 1024
+
+
+@dataclass(slots=True)
+class _SessionFiles:
+    """Index entry for one session's active segment and rotated archives."""
+
+    active_bytes: int = 0
+    active_since: float = 0.0
+    rotated: list[tuple[Path, int, float]] = field(default_factory=list)  # path, bytes, mtime
+    header: str = ""
+
 
 class SessionStateStore:
-    """Append-only markdown WAL for per-session state."""
+    """
+    Append-only markdown WAL for per-session state.
+
+    Appends are rendered immediately but buffered in memory and written by
+    one background flusher, one ``open``/``write`` per session per flush
+    instead of two per turn. The active ``<session>.md`` segment is rotated
+    to ``<session>.<timestamp>.md.gz`` once it exceeds ``max_segment_bytes``
+    or ``max_segment_age_seconds``; only the newest ``max_segments`` archives
+    are kept, and archives older than ``retention_days`` are dropped. File
+    sizes are tracked in an in-memory index built with one directory scan at
+    start, so ``stats`` never globs the directory.
+
+    ``_lock`` only guards the buffers and the index and is never held across
+    file I/O, so appends do not wait for a flush or rotation. ``_io_lock``
+    serializes flushes, rotation, pruning and clearing; it is always taken
+    before ``_lock``.
+    """
 
-    def __init__(self, workspace: Path, state_dir: str = "memory/session-state") -> None:
+    def __init__(
+        self,
+        workspace: Path,
+        state_dir: str = "memory/session-state",
+        *,
+        max_segment_bytes: int = 256 * 1024,
+        max_segment_age_seconds: float = 24 * 3600,
+        max_segments: int = 5,
+        retention_days: float = 30,
+        flush_interval_seconds: float = 1.0,
+    ) -> None:
         relative = Path(state_dir)
         self._base = ensure_dir(workspace / relative)
+        self._max_segment_bytes = max(1024, int(max_segment_bytes))
+        self._max_segment_age = max(1.0, float(max_segment_age_seconds))
+        self._max_segments = max(0, int(max_segments))
+        self._retention_seconds = max(0.0, float(retention_days) * 86400)
+        self._flush_interval = max(0.0, float(flush_interval_seconds))
+        self._lock = threading.RLock()
+        self._io_lock = threading.Lock()
+        self._pending: dict[str, list[str]] = {}
+        self._pending_bytes = 0
+        self._index: dict[str, _SessionFiles] = {}
+        self._stats = {"appends": 0, "flushes": 0, "file_writes": 0, "rotations": 0, "pruned": 0}
+        self._scan()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        if self._flush_interval > 0:
+            self._thread = threading.Thread(
+                target=self._flush_loop, name="memory-wal-flush", daemon=True
+            )
+            self._thread.start()
+
+    def _safe_key(self, session_key: str) -> str:
+        return safe_filename(session_key.replace(":", "_"))
 
     def _path_for_session(self, session_key: str) -> Path:
-        safe_key = safe_filename(session_key.replace(":", "_"))
-        return self._base / f"{safe_key}.md"
+        return self._base / f"{self._safe_key(session_key)}.md"
+
+    def _scan(self) -> None:
+        now = time.time()
+        with os.scandir(self._base) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+                if entry.name.endswith(ROTATED_SUFFIX):
+                    safe_key = entry.name[: -len(ROTATED_SUFFIX)].rsplit(".", 1)[0]
+                    files = self._index.setdefault(safe_key, _SessionFiles())
+                    files.rotated.append((Path(entry.path), st.st_size, st.st_mtime))
+                elif entry.name.endswith(".md"):
+                    files = self._index.setdefault(entry.name[:-3], _SessionFiles())
+                    files.active_bytes = st.st_size
+                    files.active_since = st.st_mtime if st.st_size else now
+        for files in self._index.values():
+            files.rotated.sort(key=lambda item: item[2])
 
     def read(self, session_key: str) -> str:
+        self.flush()
         path = self._path_for_session(session_key)
-        if not path.exists():
-            return ""
-        return path.read_text(encoding="utf-8")
+        with self._io_lock:
+            if not path.exists():
+                return ""
+            return path.read_text(encoding="utf-8")
+
+    def _append(self, session_key: str, header: str, text: str) -> Path:
+        safe_key = self._safe_key(session_key)
+        with self._lock:
+            files = self._index.setdefault(safe_key, _SessionFiles())
+            if header and not files.header:
+                files.header = header
+            self._pending.setdefault(safe_key, []).append(text)
+            self._pending_bytes += len(text)
+            self._stats["appends"] += 1
+            full = self._pending_bytes >= FLUSH_BYTES
+        if full or self._thread is None:
+            if self._thread is None:
+                self.flush()
+            else:
+                self._wake.set()
+        return self._base / f"{safe_key}.md"
 
     def pre_write(
         self,
@@ -34,22 +141,19 @@ class SessionStateStore:
         user_message: str,
         metadata: dict[str, object],
     ) -> Path:
-        path = self._path_for_session(session_key)
         now_iso = datetime.now(UTC).isoformat()
         user_preview = " ".join(user_message.split())
         if len(user_preview) > 400:
             user_preview = user_preview[:400] + "..."
 
-        if not path.exists():
-            path.write_text(
-                "# Session WAL State\n\n"
-                f"- session_key: {session_key}\n"
-                f"- channel: {channel}\n"
-                f"- chat_id: {chat_id}\n"
-                "\n"
-                "## Turns\n\n",
-                encoding="utf-8",
-            )
+        header = (
+            "# Session WAL State\n\n"
+            f"- session_key: {session_key}\n"
+            f"- channel: {channel}\n"
+            f"- chat_id: {chat_id}\n"
+            "\n"
+            "## Turns\n\n"
+        )
 
         message_id = str(metadata.get("message_id") or "").strip()
         sender_id = str(metadata.get("sender_id") or metadata.get("sender") or "").strip()
@@ -60,24 +164,23 @@ class SessionStateStore:
         media_kind = str(metadata.get("media_kind") or "").strip()
         media_type = str(metadata.get("media_type") or "").strip()
 
-        with path.open("a", encoding="utf-8") as f:
-            f.write(f"### {now_iso} PRE\n")
-            if speaker:
-                f.write(f"- speaker: {speaker}\n")
-            if sender_id and sender_id != speaker:
-                f.write(f"- sender_id: {sender_id}\n")
-            if message_id:
-                f.write(f"- message_id: {message_id}\n")
-            if media_kind or media_type:
-                media_label = " / ".join(part for part in [media_kind, media_type] if part)
-                f.write(f"- media: {media_label}\n")
-            f.write(f"- user: {user_preview}\n")
-            if reply_to:
-                f.write(f"- reply_to_message_id: {reply_to}\n")
-            if reply_to_participant:
-                f.write(f"- reply_to_participant: {reply_to_participant}\n")
-            f.write("\n")
-        return path
+        lines = [f"### {now_iso} PRE\n"]
+        if speaker:
+            lines.append(f"- speaker: {speaker}\n")
+        if sender_id and sender_id != speaker:
+            lines.append(f"- sender_id: {sender_id}\n")
+        if message_id:
+            lines.append(f"- message_id: {message_id}\n")
+        if media_kind or media_type:
+            media_label = " / ".join(part for part in [media_kind, media_type] if part)
+            lines.append(f"- media: {media_label}\n")
+        lines.append(f"- user: {user_preview}\n")
+        if reply_to:
+            lines.append(f"- reply_to_message_id: {reply_to}\n")
+        if reply_to_participant:
+            lines.append(f"- reply_to_participant: {reply_to_participant}\n")
+        lines.append("\n")
+        return self._append(session_key, header, "".join(lines))
 
     def post_write(
         self,
@@ -86,24 +189,141 @@ class SessionStateStore:
         assistant_reply: str,
         pending_actions: list[str] | None = None,
     ) -> Path:
-        path = self._path_for_session(session_key)
         now_iso = datetime.now(UTC).isoformat()
         reply_preview = " ".join((assistant_reply or "").split())
         if len(reply_preview) > 400:
             reply_preview = reply_preview[:400] + "..."
 
-        if not path.exists():
-            path.write_text("# Session WAL State\n\n## Turns\n\n", encoding="utf-8")
-
-        with path.open("a", encoding="utf-8") as f:
-            f.write(f"### {now_iso} POST\n")
-            f.write(f"- assistant: {reply_preview or '(empty)'}\n")
-            if pending_actions:
-                f.write("- pending_actions:\n")
-                for action in pending_actions[:10]:
-                    f.write(f"  - {action}\n")
-            f.write("\n")
-        return path
+        lines = [f"### {now_iso} POST\n", f"- assistant: {reply_preview or '(empty)'}\n"]
+        if pending_actions:
+            lines.append("- pending_actions:\n")
+            for action in pending_actions[:10]:
+                lines.append(f"  - {action}\n")
+        lines.append("\n")
+        return self._append(session_key, "", "".join(lines))
+
+    def flush(self) -> None:
+        """Write all buffered appends, rotating segments that are due."""
+        with self._io_lock:
+            # Swap the buffers under the lock; write them outside it.
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._pending_bytes = 0
+                if not pending:
+                    return
+                self._stats["flushes"] += 1
+                batch = [
+                    (safe_key, "".join(chunks), self._index.setdefault(safe_key, _SessionFiles()))
+                    for safe_key, chunks in pending.items()
+                ]
+            now = time.time()
+            for safe_key, text, files in batch:
+                try:
+                    self._write(safe_key, files, text, now)
+                except OSError as e:
+                    logger.warning("session WAL write failed for {}: {}", safe_key, e)
+
+    def _write(self, safe_key: str, files: _SessionFiles, text: str, now: float) -> None:
+        path = self._base / f"{safe_key}.md"
+        if files.active_bytes and (
+            files.active_bytes + len(text) > self._max_segment_bytes
+            or now - files.active_since > self._max_segment_age
+        ):
+            self._rotate(safe_key, files, path, now)
+        if not files.active_bytes:
+            text = (files.header or "# Session WAL State\n\n## Turns\n\n") + text
+            files.active_since = now
+        data = text.encode("utf-8")
+        with path.open("ab") as f:
+            f.write(data)
+        with self._lock:
+            files.active_bytes += len(data)
+            self._stats["file_writes"] += 1
+
+    def _rotate(self, safe_key: str, files: _SessionFiles, path: Path, now: float) -> None:
+        stamp = datetime.fromtimestamp(now, UTC).strftime("%Y%m%dT%H%M%S%f")
+        target = self._base / f"{safe_key}.{stamp}{ROTATED_SUFFIX}"
+        with path.open("rb") as src, gzip.open(target, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst)
+        path.unlink()
+        size = target.stat().st_size
+        with self._lock:
+            files.rotated.append((target, size, now))
+            files.active_bytes = 0
+            self._stats["rotations"] += 1
+        self._prune(files, now)
+
+    def _prune(self, files: _SessionFiles, now: float) -> None:
+        """Delete archives past the count or age limit; caller holds ``_io_lock``."""
+        with self._lock:
+            rotated = list(files.rotated)
+        keep: list[tuple[Path, int, float]] = []
+        dropped: list[Path] = []
+        for index, item in enumerate(rotated):
+            expired = self._retention_seconds and now - item[2] > self._retention_seconds
+            if expired or index < len(rotated) - self._max_segments:
+                dropped.append(item[0])
+            else:
+                keep.append(item)
+        if not dropped:
+            return
+        with self._lock:
+            files.rotated = keep
+            self._stats["pruned"] += len(dropped)
+        for path in dropped:
+            path.unlink(missing_ok=True)
+
+    def clear(self, session_key: str) -> bool:
+        """Drop buffered appends and delete every segment of ``session_key``."""
+        safe_key = self._safe_key(session_key)
+        with self._io_lock:
+            with self._lock:
+                dropped = self._pending.pop(safe_key, [])
+                self._pending_bytes -= sum(len(chunk) for chunk in dropped)
+                files = self._index.pop(safe_key, None)
+            removed = bool(dropped)
+            path = self._base / f"{safe_key}.md"
+            if path.exists():
+                path.unlink()
+                removed = True
+            for rotated, _, _ in files.rotated if files is not None else []:
+                rotated.unlink(missing_ok=True)
+                removed = True
+        return removed
+
+    def _flush_loop(self) -> None:
+        next_sweep = time.monotonic() + 3600
+        while not self._stop.is_set():
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            self.flush()
+            if time.monotonic() >= next_sweep:
+                next_sweep = time.monotonic() + 3600
+                with self._io_lock:
+                    with self._lock:
+                        sessions = list(self._index.values())
+                    for files in sessions:
+                        self._prune(files, time.time())
+
+    def stats(self) -> dict[str, object]:
+        """Segment counts and sizes from the index, plus writer counters."""
+        with self._lock:
+            return {
+                **self._stats,
+                "sessions": sum(1 for f in self._index.values() if f.active_bytes),
+                "active_bytes": sum(f.active_bytes for f in self._index.values()),
+                "rotated_segments": sum(len(f.rotated) for f in self._index.values()),
+                "rotated_bytes": sum(b for f in self._index.values() for _, b, _ in f.rotated),
+                "pending_bytes": self._pending_bytes,
+            }
+
+    def close(self) -> None:
+        """Stop the flusher and write anything still buffered."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+        self.flush()
 
     @property
     def state_dir(self) -> Path:
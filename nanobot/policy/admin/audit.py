@@ -4,9 +4,13 @@ from __future__ import annotations
 
 import hashlib
 import json
+import sqlite3
+import threading
+from collections.abc import Mapping
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from pathlib import Path
+from typing import Any
 
 from nanobot.policy.loader import load_policy
 from nanobot.policy.schema import PolicyConfig
@@ -29,18 +33,49 @@ class PolicyAuditEntry:
     error: str | None = None
 
 
+_AUDIT_COLUMNS = (
+    "id",
+    "timestamp",
+    "actor_source",
+    "actor_id",
+    "channel",
+    "chat_id",
+    "command_raw",
+    "dry_run",
+    "result",
+    "before_hash",
+    "after_hash",
+    "backup_ref",
+    "error",
+)
+
+
 class PolicyAuditStore:
-    """Stores append-only audit rows and policy backup snapshots."""
+    """
+    Stores append-only audit rows and policy backup snapshots.
+
+    Rows live in SQLite keyed by change id with an insertion sequence, so history
+    and rollback lookups cost O(limit) no matter how long the history is. A legacy
+    ``policy_changes.jsonl`` is imported once on first use.
+    """
 
     def __init__(self, policy_path: Path) -> None:
         self._policy_path = policy_path
         self._root = policy_path.parent / "policy" / "audit"
-        self._history_path = self._root / "policy_changes.jsonl"
+        self._legacy_history_path = self._root / "policy_changes.jsonl"
+        self._db_path = self._root / "policy_changes.db"
         self._backup_dir = self._root / "backups"
+        self._lock = threading.RLock()
+        self._conn: sqlite3.Connection | None = None
+
+    @property
+    def legacy_history_path(self) -> Path:
+        """The pre-SQLite JSONL log, only read for the one-time import."""
+        return self._legacy_history_path
 
     @property
-    def history_path(self) -> Path:
-        return self._history_path
+    def db_path(self) -> Path:
+        return self._db_path
 
     def ensure_dirs(self) -> None:
         self._backup_dir.mkdir(parents=True, exist_ok=True)
@@ -68,8 +103,122 @@ class PolicyAuditStore:
         return load_policy(path)
 
     def append(self, entry: PolicyAuditEntry) -> None:
-        self.ensure_dirs()
-        row = {
+        conn = self._connection(create=True)
+        assert conn is not None
+        with self._lock:
+            self._insert_locked(conn, self._entry_row(entry), ignore_duplicate=False)
+            conn.commit()
+
+    def read_recent(self, limit: int) -> list[PolicyAuditEntry]:
+        if limit <= 0:
+            return []
+        conn = self._connection()
+        if conn is None:
+            return []
+        with self._lock:
+            rows = conn.execute(
+                f"SELECT {', '.join(_AUDIT_COLUMNS)} FROM policy_changes ORDER BY seq DESC LIMIT ?",
+                (int(limit),),
+            ).fetchall()
+        return [self._entry_from_row(row) for row in rows]
+
+    def find(self, change_id: str) -> PolicyAuditEntry | None:
+        conn = self._connection()
+        if conn is None:
+            return None
+        with self._lock:
+            row = conn.execute(
+                f"SELECT {', '.join(_AUDIT_COLUMNS)} FROM policy_changes WHERE id = ?",
+                (change_id.strip(),),
+            ).fetchone()
+        return self._entry_from_row(row) if row is not None else None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connection(self, *, create: bool = False) -> sqlite3.Connection | None:
+        """Open the store lazily; readers never create files for an empty history."""
+        with self._lock:
+            if self._conn is not None:
+                return self._conn
+            if not create and not self._db_path.exists() and not self._legacy_history_path.exists():
+                return None
+            self._root.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self._db_path), check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS policy_changes (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id TEXT NOT NULL UNIQUE,
+                    timestamp TEXT NOT NULL,
+                    actor_source TEXT NOT NULL,
+                    actor_id TEXT NOT NULL,
+                    channel TEXT NOT NULL,
+                    chat_id TEXT NOT NULL,
+                    command_raw TEXT NOT NULL,
+                    dry_run INTEGER NOT NULL,
+                    result TEXT NOT NULL,
+                    before_hash TEXT,
+                    after_hash TEXT,
+                    backup_ref TEXT,
+                    error TEXT
+                )
+                """
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS audit_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            self._import_legacy_jsonl_locked(conn)
+            conn.commit()
+            self._conn = conn
+            return conn
+
+    def _import_legacy_jsonl_locked(self, conn: sqlite3.Connection) -> None:
+        done = conn.execute("SELECT 1 FROM audit_meta WHERE key = 'jsonl_imported'").fetchone()
+        if done is not None:
+            return
+        imported = 0
+        if self._legacy_history_path.exists():
+            with open(self._legacy_history_path, encoding="utf-8", errors="ignore") as f:
+                for line in f:
+                    compact = line.strip()
+                    if not compact:
+                        continue
+                    try:
+                        data = json.loads(compact)
+                    except json.JSONDecodeError:
+                        continue
+                    if not isinstance(data, dict) or not str(data.get("id", "")).strip():
+                        continue
+                    entry = self._entry_from_row(data)
+                    # The JSONL lookup returned the first row for an id; keep that one.
+                    self._insert_locked(conn, self._entry_row(entry), ignore_duplicate=True)
+                    imported += 1
+        conn.execute(
+            "INSERT OR REPLACE INTO audit_meta (key, value) VALUES ('jsonl_imported', ?)",
+            (str(imported),),
+        )
+
+    @staticmethod
+    def _insert_locked(
+        conn: sqlite3.Connection, row: dict[str, object], *, ignore_duplicate: bool
+    ) -> None:
+        verb = "INSERT OR IGNORE" if ignore_duplicate else "INSERT"
+        conn.execute(
+            f"{verb} INTO policy_changes ({', '.join(_AUDIT_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in _AUDIT_COLUMNS)})",
+            tuple(row[col] for col in _AUDIT_COLUMNS),
+        )
+
+    @staticmethod
+    def _entry_row(entry: PolicyAuditEntry) -> dict[str, object]:
+        return {
             "id": entry.id,
             "timestamp": entry.timestamp,
             "actor_source": entry.actor_source,
@@ -77,82 +226,37 @@ class PolicyAuditStore:
             "channel": entry.channel,
             "chat_id": entry.chat_id,
             "command_raw": entry.command_raw,
-            "dry_run": entry.dry_run,
+            "dry_run": int(entry.dry_run),
             "result": entry.result,
             "before_hash": entry.before_hash,
             "after_hash": entry.after_hash,
             "backup_ref": entry.backup_ref,
             "error": entry.error,
         }
-        with open(self._history_path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n")
 
-    def read_recent(self, limit: int) -> list[PolicyAuditEntry]:
-        if limit <= 0:
-            return []
-        if not self._history_path.exists():
-            return []
-        rows: list[PolicyAuditEntry] = []
-        with open(self._history_path, encoding="utf-8", errors="ignore") as f:
-            for line in f:
-                compact = line.strip()
-                if not compact:
-                    continue
-                try:
-                    data = json.loads(compact)
-                except json.JSONDecodeError:
-                    continue
-                rows.append(
-                    PolicyAuditEntry(
-                        id=str(data.get("id", "")),
-                        timestamp=str(data.get("timestamp", "")),
-                        actor_source=str(data.get("actor_source", "")),
-                        actor_id=str(data.get("actor_id", "")),
-                        channel=str(data.get("channel", "")),
-                        chat_id=str(data.get("chat_id", "")),
-                        command_raw=str(data.get("command_raw", "")),
-                        dry_run=bool(data.get("dry_run", False)),
-                        result=str(data.get("result", "")),
-                        before_hash=self._none_if_blank(data.get("before_hash")),
-                        after_hash=self._none_if_blank(data.get("after_hash")),
-                        backup_ref=self._none_if_blank(data.get("backup_ref")),
-                        error=self._none_if_blank(data.get("error")),
-                    )
-                )
-        if not rows:
-            return []
-        return rows[-limit:][::-1]
+    @classmethod
+    def _entry_from_row(cls, data: Mapping[str, Any] | sqlite3.Row) -> PolicyAuditEntry:
+        def get(key: str) -> Any:
+            try:
+                return data[key]
+            except (KeyError, IndexError):
+                return None
 
-    def find(self, change_id: str) -> PolicyAuditEntry | None:
-        if not self._history_path.exists():
-            return None
-        with open(self._history_path, encoding="utf-8", errors="ignore") as f:
-            for line in f:
-                compact = line.strip()
-                if not compact:
-                    continue
-                try:
-                    data = json.loads(compact)
-                except json.JSONDecodeError:
-                    continue
-                if str(data.get("id", "")).strip() != change_id:
-                    continue
-                return PolicyAuditEntry(
-                    id=str(data.get("id", "")),
-                    timestamp=str(data.get("timestamp", "")),
-                    actor_source=str(data.get("actor_source", "")),
-                    actor_id=str(data.get("actor_id", "")),
-                    channel=str(data.get("channel", "")),
-                    chat_id=str(data.get("chat_id", "")),
-                    command_raw=str(data.get("command_raw", "")),
-                    dry_run=bool(data.get("dry_run", False)),
-                    result=str(data.get("result", "")),
-                    before_hash=self._none_if_blank(data.get("before_hash")),
-                    after_hash=self._none_if_blank(data.get("after_hash")),
-                    backup_ref=self._none_if_blank(data.get("backup_ref")),
-                    error=self._none_if_blank(data.get("error")),
-                )
-        return None
+        return PolicyAuditEntry(
+            id=str(get("id") or "").strip(),
+            timestamp=str(get("timestamp") or ""),
+            actor_source=str(get("actor_source") or ""),
+            actor_id=str(get("actor_id") or ""),
+            channel=str(get("channel") or ""),
+            chat_id=str(get("chat_id") or ""),
+            command_raw=str(get("command_raw") or ""),
+            dry_run=bool(get("dry_run") or False),
+            result=str(get("result") or ""),
+            before_hash=cls._none_if_blank(get("before_hash")),
+            after_hash=cls._none_if_blank(get("after_hash")),
+            backup_ref=cls._none_if_blank(get("backup_ref")),
+            error=cls._none_if_blank(get("error")),
+        )
 
     @staticmethod
     def now_iso() -> str:
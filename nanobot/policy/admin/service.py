@@ -11,9 +11,7 @@ import uuid
 from collections import defaultdict, deque
 from dataclasses import replace
 from pathlib import Path
-from typing import Any, Callable
-
-import websockets
+from typing import TYPE_CHECKING, Any, Callable
 
 from nanobot.config.loader import load_config
 from nanobot.policy.admin.audit import PolicyAuditEntry, PolicyAuditStore
@@ -36,6 +34,9 @@ from nanobot.policy.schema import (
     WhoCanTalkPolicyOverride,
 )
 
+if TYPE_CHECKING:
+    from nanobot.storage.group_directory import GroupDirectory
+
 
 class PolicyAdminService:
     """Executes policy admin commands against policy.json with guardrails."""
@@ -49,6 +50,7 @@ class PolicyAdminService:
         apply_channels: set[str],
         on_policy_applied: Callable[[PolicyConfig], None] | None = None,
         group_subject_resolver: Callable[[list[str]], dict[str, str]] | None = None,
+        group_directory: "GroupDirectory | None" = None,
     ) -> None:
         self._policy_path = policy_path
         self._workspace = workspace
@@ -58,6 +60,7 @@ class PolicyAdminService:
         self._registry = PolicyCommandRegistry()
         self._audit = PolicyAuditStore(policy_path)
         self._group_subject_resolver = group_subject_resolver
+        self._group_directory = group_directory
         self._bridge_subject_cache: dict[str, str] = {}
         self._rate_limit_windows: dict[str, deque[float]] = defaultdict(deque)
 
@@ -65,6 +68,10 @@ class PolicyAdminService:
     def registry(self) -> PolicyCommandRegistry:
         return self._registry
 
+    def close(self) -> None:
+        """Close the audit store's database connection."""
+        self._audit.close()
+
     def usage(self) -> str:
         return "\n".join(self._registry.usage_lines())
 
@@ -427,6 +434,7 @@ class PolicyAdminService:
                     "seen_session": False,
                     "seen_log": False,
                     "seen_bridge": False,
+                    "seen_index": False,
                     "session_mtime": 0.0,
                 }
                 records[chat_id] = rec
@@ -450,6 +458,10 @@ class PolicyAdminService:
                 if tags:
                     rec["tags"] = tags
 
+        if self._group_directory is not None:
+            self._merge_group_directory(records, ensure)
+            return records
+
         base_dir = self._policy_path.parent
         sessions_dir = base_dir / "sessions"
         if sessions_dir.exists():
@@ -492,6 +504,27 @@ class PolicyAdminService:
 
         return records
 
+    def _merge_group_directory(
+        self,
+        records: dict[str, dict[str, Any]],
+        ensure: Callable[[str], dict[str, Any]],
+    ) -> None:
+        """Fill records from the group index; stale subjects refresh in the background."""
+        assert self._group_directory is not None
+        entries = self._group_directory.entries()
+        for chat_id, entry in entries.items():
+            rec = ensure(chat_id)
+            rec["seen_index"] = True
+            rec["session_mtime"] = max(float(rec["session_mtime"]), entry.last_seen)
+            if entry.subject:
+                rec["seen_bridge"] = True
+                self._bridge_subject_cache[chat_id] = entry.subject
+                if not str(rec.get("comment") or "").strip():
+                    rec["comment"] = entry.subject
+        stale = self._group_directory.stale_subject_ids(records.keys())
+        if stale:
+            self._group_directory.request_subject_refresh(stale)
+
     def _match_group_query(self, query: str, records: dict[str, dict[str, Any]]) -> tuple[str | None, list[str]]:
         target = query.strip()
         if not target:
@@ -720,6 +753,8 @@ class PolicyAdminService:
                 sources.append("sessions")
             if rec["seen_log"]:
                 sources.append("log")
+            if rec.get("seen_index"):
+                sources.append("seen")
             if rec.get("seen_bridge"):
                 sources.append("bridge")
             source_text = "+".join(sources) if sources else "unknown"
@@ -1490,6 +1525,8 @@ class PolicyAdminService:
                 "accountId": "default",
                 "payload": {"ids": chat_ids},
             }
+            import websockets
+
             async with websockets.connect(url) as ws:
                 await ws.send(json.dumps(payload))
                 deadline = time.monotonic() + 5.0
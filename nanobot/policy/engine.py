@@ -166,13 +166,21 @@ class _CompiledMemoryNotesSettings:
 
 
 class PolicyEngine:
-    """Evaluates per-channel/per-chat policy rules."""
+    """
+    Evaluates per-channel/per-chat policy rules.
+
+    With ``previous`` set, compiled rules whose merged source did not change
+    are reused from that engine, so an edit to one chat override recompiles
+    only that chat.
+    """
 
     def __init__(
         self,
         policy: PolicyConfig,
         workspace: Path,
         apply_channels: set[str] | None = None,
+        *,
+        previous: "PolicyEngine | None" = None,
     ):
         self.policy = policy
         self.workspace = workspace.expanduser().resolve()
@@ -181,6 +189,10 @@ class PolicyEngine:
         self._channel_defaults: dict[str, _CompiledPolicy] = {}
         self._chat_rules: dict[tuple[str, str], _CompiledPolicy] = {}
         self._resolved_cache: dict[tuple[str, str], _CompiledPolicy] = {}
+        # Merged rule sources, compared against ``previous`` to skip recompiles.
+        self._channel_sources: dict[str, dict[str, Any]] = {}
+        self._chat_sources: dict[tuple[str, str], dict[str, Any]] = {}
+        self.compile_stats = {"compiled": 0, "reused": 0}
         self._memory_notes_apply_channels: set[str] = set()
         self._memory_notes_batch_interval_seconds = 1800
         self._memory_notes_batch_max_messages = 100
@@ -191,9 +203,9 @@ class PolicyEngine:
         )
         self._memory_notes_channel_defaults: dict[str, _CompiledMemoryNotesSettings] = {}
         self._memory_notes_chat_overrides: dict[tuple[str, str], _CompiledMemoryNotesSettings] = {}
-        self._compile()
+        self._compile(previous)
 
-    def _compile(self) -> None:
+    def _compile(self, previous: "PolicyEngine | None" = None) -> None:
         self._owner_index = {
             channel: normalize_sender_list(channel, owners)
             for channel, owners in self.policy.owners.items()
@@ -212,19 +224,42 @@ class PolicyEngine:
             channel_policy = self.policy.channels.get(channel)
             if channel_policy:
                 merged = _deep_merge(merged, dump_override(channel_policy.default))
-            resolved = ChatPolicy.model_validate(merged)
-            compiled_default = self._compile_chat_policy(channel, resolved)
-            self._channel_defaults[channel] = compiled_default
+            self._channel_sources[channel] = merged
+            self._channel_defaults[channel] = self._compile_source(
+                channel,
+                merged,
+                previous._channel_sources.get(channel) if previous else None,
+                previous._channel_defaults.get(channel) if previous else None,
+            )
 
             if channel_policy:
                 for chat_id, override in channel_policy.chats.items():
+                    key = (channel, chat_id)
                     chat_merged = _deep_merge(merged, dump_override(override))
-                    chat_resolved = ChatPolicy.model_validate(chat_merged)
-                    self._chat_rules[(channel, chat_id)] = self._compile_chat_policy(channel, chat_resolved)
+                    self._chat_sources[key] = chat_merged
+                    self._chat_rules[key] = self._compile_source(
+                        channel,
+                        chat_merged,
+                        previous._chat_sources.get(key) if previous else None,
+                        previous._chat_rules.get(key) if previous else None,
+                    )
 
         self._resolved_cache.clear()
         self._compile_memory_notes()
 
+    def _compile_source(
+        self,
+        channel: str,
+        merged: dict[str, Any],
+        previous_source: dict[str, Any] | None,
+        previous_compiled: _CompiledPolicy | None,
+    ) -> _CompiledPolicy:
+        if previous_compiled is not None and previous_source == merged:
+            self.compile_stats["reused"] += 1
+            return previous_compiled
+        self.compile_stats["compiled"] += 1
+        return self._compile_chat_policy(channel, ChatPolicy.model_validate(merged))
+
     @staticmethod
     def _compile_memory_notes_override(override: Any) -> _CompiledMemoryNotesSettings:
         return _CompiledMemoryNotesSettings(
@@ -26,6 +26,15 @@ class LLMResponse:
         """Check if response contains tool calls."""
         return len(self.tool_calls) > 0
 
+    @property
+    def is_error(self) -> bool:
+        """
+        The call failed and ``content`` is an error text, not a model answer.
+
+        Only fit to show to a user; never store, parse or cache it.
+        """
+        return self.finish_reason == "error"
+
 
 class LLMProvider(ABC):
     """
@@ -63,6 +72,28 @@ class LLMProvider(ABC):
         """
         pass
 
+    async def complete(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        """
+        Like ``chat``, but transport errors are raised instead of returned.
+
+        Providers whose ``chat`` turns errors into content override this, so
+        that retry and failover layers can tell a failure from an answer.
+        """
+        return await self.chat(
+            messages=messages,
+            tools=tools,
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+
     @abstractmethod
     def get_default_model(self) -> str:
         """Get the default model for this provider."""
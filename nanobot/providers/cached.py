@@ -0,0 +1,76 @@
+"""Response caching around a chat provider for one opted-in route."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import TYPE_CHECKING, Any
+
+from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+from nanobot.storage.llm_cache import request_key
+
+if TYPE_CHECKING:
+    from nanobot.storage.llm_cache import LLMResponseCache
+
+
+class CachedProvider(LLMProvider):
+    """
+    Serves repeated identical requests on ``route`` from ``cache``.
+
+    Only successful, non-empty responses are stored, so errors and timeouts
+    are always retried against the wrapped provider.
+    """
+
+    def __init__(
+        self, provider: LLMProvider, *, cache: "LLMResponseCache", route: str, ttl_seconds: int
+    ) -> None:
+        super().__init__(provider.api_key, provider.api_base)
+        self.provider = provider
+        self.cache = cache
+        self.route = route
+        self.ttl_seconds = ttl_seconds
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        key = request_key(
+            model=model or self.provider.get_default_model(),
+            messages=messages,
+            tools=tools,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        cached = self.cache.get(self.route, key)
+        if cached is not None:
+            return LLMResponse(
+                content=cached.get("content"),
+                tool_calls=[ToolCallRequest(**call) for call in cached.get("tool_calls") or []],
+                finish_reason=str(cached.get("finish_reason") or "stop"),
+                usage={},
+            )
+        response = await self.provider.chat(
+            messages=messages,
+            tools=tools,
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+        if not response.is_error and (response.content or response.tool_calls):
+            self.cache.put(
+                self.route,
+                key,
+                {
+                    "content": response.content,
+                    "tool_calls": [asdict(call) for call in response.tool_calls],
+                    "finish_reason": response.finish_reason,
+                },
+                ttl_seconds=self.ttl_seconds,
+            )
+        return response
+
+    def get_default_model(self) -> str:
+        return self.provider.get_default_model()
@@ -10,6 +10,7 @@ from nanobot.providers.litellm_provider import LiteLLMProvider
 if TYPE_CHECKING:
     from nanobot.config.schema import Config
     from nanobot.providers.base import LLMProvider
+    from nanobot.storage.llm_cache import LLMResponseCache
 
 
 @dataclass(slots=True)
@@ -17,9 +18,28 @@ class ProviderFactory:
     """Build scoped provider instances for routed task models."""
 
     config: "Config"
+    response_cache: "LLMResponseCache | None" = None
 
-    def create_chat_provider(self, model: str) -> "LLMProvider":
-        """Create a provider bound to the supplied model route."""
+    def create_chat_provider(self, model: str, route_key: str | None = None) -> "LLMProvider":
+        """
+        Create a provider bound to the supplied model route.
+
+        With ``route_key`` set and that route listed in ``models.cache.routes``,
+        identical requests are answered from the response cache.
+        """
+        return self.cached(self._create_litellm_provider(model), route_key)
+
+    def cached(self, provider: "LLMProvider", route_key: str | None) -> "LLMProvider":
+        """Wrap ``provider`` in the response cache if ``route_key`` opted in."""
+        from nanobot.providers.cached import CachedProvider
+
+        cache = self.response_cache
+        ttl = cache.ttl_for(route_key) if cache is not None else None
+        if cache is None or ttl is None or route_key is None:
+            return provider
+        return CachedProvider(provider, cache=cache, route=route_key, ttl_seconds=ttl)
+
+    def _create_litellm_provider(self, model: str) -> "LLMProvider":
         provider_cfg = self.config.get_provider(model)
         api_key = provider_cfg.api_key if provider_cfg and provider_cfg.api_key else None
         api_base = provider_cfg.api_base if provider_cfg else None
@@ -30,3 +50,58 @@ class ProviderFactory:
             default_model=model,
             extra_headers=extra_headers,
         )
+
+    def create_resilient_chat_provider(
+        self, route_key: str, primary: "LLMProvider"
+    ) -> "LLMProvider":
+        """
+        Wrap ``primary`` with timeouts, retries, breakers and the route's fallbacks.
+
+        Fallbacks are the chat profiles listed in the routed profile's
+        ``fallbacks``; each gets a provider for its own model's credentials.
+        Returns ``primary`` unchanged when ``models.resilience`` is disabled.
+        """
+        from nanobot.providers.resilience import ProviderRoute, ResilientProvider
+
+        models = self.config.models
+        settings = models.resilience
+        if not settings.enabled:
+            return primary
+        default_timeout = settings.default_timeout_ms / 1000
+        routes = [
+            ProviderRoute(
+                name=primary.get_default_model(),
+                provider=primary,
+                model=primary.get_default_model(),
+                timeout_seconds=default_timeout,
+            )
+        ]
+        profile_name = models.routes.get(route_key)
+        profile = models.profiles.get(profile_name) if profile_name else None
+        if profile is not None:
+            if profile.timeout_ms:
+                routes[0].timeout_seconds = profile.timeout_ms / 1000
+            for name in profile.fallbacks:
+                fallback = models.profiles[name]
+                if fallback.kind != "chat" or not fallback.model:
+                    continue
+                routes.append(
+                    ProviderRoute(
+                        name=name,
+                        provider=self._create_litellm_provider(fallback.model),
+                        model=fallback.model,
+                        timeout_seconds=(fallback.timeout_ms or settings.default_timeout_ms)
+                        / 1000,
+                    )
+                )
+        return ResilientProvider(
+            routes,
+            retries=settings.retries,
+            retry_base_delay=settings.retry_base_delay_ms / 1000,
+            retry_max_delay=settings.retry_max_delay_ms / 1000,
+            failure_threshold=settings.breaker_failure_threshold,
+            reset_seconds=settings.breaker_reset_seconds,
+            hedge=settings.hedge,
+            hedge_min_delay=settings.hedge_min_delay_ms / 1000,
+            default_timeout=default_timeout,
+        )
@@ -1,15 +1,28 @@
 """LiteLLM provider implementation for multi-provider support."""
 
+import asyncio
 import json
 import os
+from types import ModuleType
 from typing import Any
 
-import litellm
-from litellm import acompletion
-
 from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
 from nanobot.providers.registry import find_by_model, find_gateway
 
+_litellm: ModuleType | None = None
+
+
+def _load_litellm() -> ModuleType:
+    """Import litellm on first LLM call; it costs seconds of startup on small hosts."""
+    global _litellm
+    if _litellm is None:
+        import litellm
+
+        # Disable LiteLLM logging noise
+        litellm.suppress_debug_info = True
+        _litellm = litellm
+    return _litellm
+
 
 class LiteLLMProvider(LLMProvider):
     """
@@ -43,11 +56,7 @@ class LiteLLMProvider(LLMProvider):
         if api_key:
             self._setup_env(api_key, api_base, default_model)
 
-        if api_base:
-            litellm.api_base = api_base
-
-        # Disable LiteLLM logging noise
-        litellm.suppress_debug_info = True
+        self._litellm_configured = False
 
     def _setup_env(self, api_key: str, api_base: str | None, model: str) -> None:
         """Set environment variables based on detected provider."""
@@ -119,6 +128,24 @@ class LiteLLMProvider(LLMProvider):
         Returns:
             LLMResponse with content and/or tool calls.
         """
+        try:
+            return await self.complete(messages, tools, model, max_tokens, temperature)
+        except Exception as e:
+            # Return error as content for graceful handling
+            return LLMResponse(
+                content=f"Error calling LLM: {str(e)}",
+                finish_reason="error",
+            )
+
+    async def complete(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        """Send a chat completion request via LiteLLM, raising on failure."""
         model = self._resolve_model(model or self.default_model)
 
         kwargs: dict[str, Any] = {
@@ -143,15 +170,14 @@ class LiteLLMProvider(LLMProvider):
             kwargs["tools"] = tools
             kwargs["tool_choice"] = "auto"
 
-        try:
-            response = await acompletion(**kwargs)
-            return self._parse_response(response)
-        except Exception as e:
-            # Return error as content for graceful handling
-            return LLMResponse(
-                content=f"Error calling LLM: {str(e)}",
-                finish_reason="error",
-            )
+        # The first import takes seconds; keep it off the event loop.
+        litellm = _litellm if _litellm is not None else await asyncio.to_thread(_load_litellm)
+        if not self._litellm_configured:
+            if self.api_base:
+                litellm.api_base = self.api_base
+            self._litellm_configured = True
+        response = await litellm.acompletion(**kwargs)
+        return self._parse_response(response)
 
     def _parse_response(self, response: Any) -> LLMResponse:
         """Parse LiteLLM response into our standard format."""
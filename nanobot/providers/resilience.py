@@ -0,0 +1,341 @@
+"""Timeouts, retries, circuit breaking, failover and hedging around chat providers."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from loguru import logger
+
+from nanobot.providers.base import LLMProvider, LLMResponse
+
+FAILURE_MESSAGE = (
+    "Sorry, I can't reach the language model right now. Please try again in a moment."
+)
+# Latency samples kept per route for the hedge delay.
+LATENCY_WINDOW = 200
+MIN_HEDGE_SAMPLES = 20
+# 4xx statuses that are worth retrying on the same route.
+RETRYABLE_CLIENT_STATUSES = frozenset({408, 409, 429})
+# Transient error classes of litellm/openai/httpx, matched by name so none
+# of them has to be imported here.
+RETRYABLE_ERROR_NAMES = frozenset(
+    {
+        "APIConnectionError",
+        "APITimeoutError",
+        "InternalServerError",
+        "RateLimitError",
+        "ServiceUnavailableError",
+        "Timeout",
+        "TimeoutException",
+        "TransportError",
+    }
+)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Timeouts, connection errors, rate limits and 5xx.
+
+    Anything not recognised as transient (auth, bad requests, bugs in the
+    provider code) is not retried and does not count against the breaker.
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status in RETRYABLE_CLIENT_STATUSES or status >= 500
+    return any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(error).__mro__)
+
+
+@dataclass(slots=True)
+class ProviderRoute:
+    """One provider/model pair a request can be sent to."""
+
+    name: str
+    provider: LLMProvider
+    model: str
+    timeout_seconds: float
+
+
+class RouteHealth:
+    """
+    Circuit breaker and latency window for one route.
+
+    After ``failure_threshold`` consecutive retryable failures the breaker
+    opens and the route is skipped for ``reset_seconds``; then one probe
+    request is let through (half-open), which closes the breaker again on
+    success or re-opens it on failure.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int,
+        reset_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._failure_threshold = max(1, int(failure_threshold))
+        self._reset_seconds = max(0.0, float(reset_seconds))
+        self._clock = clock
+        self._consecutive_failures = 0
+        self._opened_at: float | None = None
+        self._probe_in_flight = False
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self._reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now; claims the probe when half-open."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self, latency: float) -> None:
+        self.calls += 1
+        self._latencies.append(latency)
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self, error: BaseException) -> None:
+        self.calls += 1
+        self.failures += 1
+        if isinstance(error, TimeoutError):
+            self.timeouts += 1
+        self._consecutive_failures += 1
+        if self._probe_in_flight or self._consecutive_failures >= self._failure_threshold:
+            if self._opened_at is None or self._probe_in_flight:
+                self.opened += 1
+            self._opened_at = self._clock()
+        self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Give the half-open probe back when it ended without an outcome."""
+        self._probe_in_flight = False
+
+    def quantile(self, q: float) -> float | None:
+        if len(self._latencies) < MIN_HEDGE_SAMPLES:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def snapshot(self) -> dict[str, object]:
+        p50 = self.quantile(0.5)
+        p95 = self.quantile(0.95)
+        return {
+            "state": self.state,
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "opened": self.opened,
+            "p50_ms": None if p50 is None else int(p50 * 1000),
+            "p95_ms": None if p95 is None else int(p95 * 1000),
+        }
+
+
+class ResilientProvider(LLMProvider):
+    """
+    Chat provider that survives a slow or failing upstream.
+
+    Requests for the primary model go through ``routes`` in order: each
+    attempt is bounded by the route's timeout, retryable errors are retried
+    with full-jitter exponential backoff, and routes whose breaker is open
+    are skipped. With ``hedge`` set, a request that is still running after
+    the primary route's p95 latency (and at least ``hedge_min_delay``) is
+    also sent to the next route, and the first answer wins. Requests for
+    other models (e.g. the subagent model) get timeouts, retries and a
+    breaker of their own, without fallbacks.
+
+    When every route fails, a short apology is returned with
+    ``finish_reason="error"`` instead of the raw exception text. That is
+    meant for the user-facing reply; callers that use the content for
+    anything else must check ``LLMResponse.is_error`` first.
+    """
+
+    def __init__(
+        self,
+        routes: Sequence[ProviderRoute],
+        *,
+        retries: int = 2,
+        retry_base_delay: float = 0.25,
+        retry_max_delay: float = 4.0,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+        hedge: bool = False,
+        hedge_min_delay: float = 1.5,
+        default_timeout: float = 60.0,
+    ) -> None:
+        if not routes:
+            raise ValueError("ResilientProvider needs at least one route")
+        primary = routes[0].provider
+        super().__init__(primary.api_key, primary.api_base)
+        self.routes = list(routes)
+        self._retries = max(0, int(retries))
+        self._retry_base_delay = max(0.0, float(retry_base_delay))
+        self._retry_max_delay = max(self._retry_base_delay, float(retry_max_delay))
+        self._failure_threshold = failure_threshold
+        self._reset_seconds = reset_seconds
+        self._hedge = hedge
+        self._hedge_min_delay = max(0.0, float(hedge_min_delay))
+        self._default_timeout = max(0.001, float(default_timeout))
+        self._health: dict[str, RouteHealth] = {}
+        self._stats = {
+            "requests": 0,
+            "retries": 0,
+            "fallbacks": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "exhausted": 0,
+        }
+
+    def get_default_model(self) -> str:
+        return self.routes[0].model
+
+    def health(self, route: ProviderRoute) -> RouteHealth:
+        health = self._health.get(route.name)
+        if health is None:
+            health = RouteHealth(
+                failure_threshold=self._failure_threshold, reset_seconds=self._reset_seconds
+            )
+            self._health[route.name] = health
+        return health
+
+    def _routes_for(self, model: str | None) -> list[ProviderRoute]:
+        if not model or model == self.routes[0].model:
+            return self.routes
+        primary = self.routes[0]
+        return [ProviderRoute(model, primary.provider, model, self._default_timeout)]
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        self._stats["requests"] += 1
+        request = {
+            "messages": messages,
+            "tools": tools,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        routes = self._routes_for(model)
+        last_error: BaseException | None = None
+        for index, route in enumerate(routes):
+            if not self.health(route).allow():
+                continue
+            if index > 0:
+                self._stats["fallbacks"] += 1
+            hedge = None
+            if self._hedge:
+                hedge = next(
+                    (r for r in routes[index + 1 :] if self.health(r).state == "closed"), None
+                )
+            try:
+                return await self._call_with_retries(route, hedge, request)
+            except Exception as e:
+                last_error = e
+                logger.warning("LLM route {} failed: {}", route.name, e)
+        self._stats["exhausted"] += 1
+        logger.error("all LLM routes failed or unavailable; last error: {}", last_error)
+        return LLMResponse(content=FAILURE_MESSAGE, finish_reason="error")
+
+    async def _call_with_retries(
+        self, route: ProviderRoute, hedge: ProviderRoute | None, request: dict[str, Any]
+    ) -> LLMResponse:
+        attempt = 0
+        while True:
+            try:
+                if hedge is not None and attempt == 0:
+                    return await self._hedged(route, hedge, request)
+                return await self._attempt(route, request)
+            except Exception as e:
+                # Stop early once the breaker opened; the next route takes over.
+                if (
+                    attempt >= self._retries
+                    or not is_retryable(e)
+                    or self.health(route).state != "closed"
+                ):
+                    raise
+            attempt += 1
+            self._stats["retries"] += 1
+            ceiling = min(self._retry_max_delay, self._retry_base_delay * 2 ** (attempt - 1))
+            await asyncio.sleep(random.uniform(0, ceiling))
+
+    async def _attempt(self, route: ProviderRoute, request: dict[str, Any]) -> LLMResponse:
+        health = self.health(route)
+        started = time.monotonic()
+        try:
+            response = await asyncio.wait_for(
+                route.provider.complete(model=route.model, **request),
+                timeout=route.timeout_seconds,
+            )
+        except asyncio.CancelledError:
+            health.release_probe()
+            raise
+        except Exception as e:
+            if is_retryable(e):
+                health.record_failure(e)
+            else:
+                health.release_probe()
+            raise
+        health.record_success(time.monotonic() - started)
+        return response
+
+    async def _hedged(
+        self, route: ProviderRoute, hedge: ProviderRoute, request: dict[str, Any]
+    ) -> LLMResponse:
+        p95 = self.health(route).quantile(0.95)
+        if p95 is None:
+            return await self._attempt(route, request)
+        first = asyncio.create_task(self._attempt(route, request))
+        done, _ = await asyncio.wait({first}, timeout=max(self._hedge_min_delay, p95))
+        if done:
+            return first.result()
+        self._stats["hedges"] += 1
+        second = asyncio.create_task(self._attempt(hedge, request))
+        pending = {first, second}
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self._stats["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            assert error is not None
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> dict[str, object]:
+        """Request outcome counters plus breaker state and latency per route."""
+        return {
+            **self._stats,
+            "routes": {name: health.snapshot() for name, health in self._health.items()},
+        }
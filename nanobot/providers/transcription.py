@@ -6,10 +6,16 @@ import shutil
 import subprocess
 import tempfile
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import httpx
 from loguru import logger
 
+from nanobot.storage.llm_cache import request_key
+
+if TYPE_CHECKING:
+    from nanobot.storage.llm_cache import LLMResponseCache
+
 
 class GroqTranscriptionProvider:
     """
@@ -87,6 +93,8 @@ class OpenAITranscriptionProvider:
         extra_headers: dict[str, str] | None = None,
         model: str = "whisper-1",
         timeout_seconds: float = 60.0,
+        response_cache: "LLMResponseCache | None" = None,
+        cache_route: str | None = None,
     ):
         self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
         base = api_base or os.environ.get("OPENAI_API_BASE") or "https://api.openai.com/v1"
@@ -94,6 +102,9 @@ class OpenAITranscriptionProvider:
         self.model = model
         self.timeout_seconds = timeout_seconds
         self.extra_headers = extra_headers
+        # Only the OpenRouter chat-completions path is cached; it is an LLM call.
+        self.response_cache = response_cache
+        self.cache_route = cache_route
 
     async def transcribe(self, file_path: str | Path) -> str:
         if not self.api_key:
@@ -177,6 +188,16 @@ class OpenAITranscriptionProvider:
             "temperature": 0,
         }
 
+        cache = self.response_cache
+        route = self.cache_route or ""
+        ttl = cache.ttl_for(route) if cache is not None else None
+        cache_key = ""
+        if cache is not None and ttl is not None:
+            cache_key = request_key(model=model_value, messages=payload["messages"], temperature=0)
+            cached = cache.get(route, cache_key)
+            if cached is not None:
+                return str(cached.get("content") or "")
+
         try:
             async with httpx.AsyncClient() as client:
                 response = await client.post(
@@ -187,10 +208,13 @@ class OpenAITranscriptionProvider:
                 )
             response.raise_for_status()
             data = response.json()
-            return self._extract_chat_content(data)
+            text = self._extract_chat_content(data)
         except Exception as e:
             logger.error(f"OpenRouter transcription error: {e}")
             return ""
+        if cache is not None and ttl is not None and text:
+            cache.put(route, cache_key, {"content": text}, ttl_seconds=ttl)
+        return text
 
     def _resolve_openrouter_model(self) -> str:
         model_value = str(self.model or "").strip()
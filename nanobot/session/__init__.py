@@ -1,5 +1,6 @@
 """Session management module."""
 
+from nanobot.session.history import HistoryBuilder
 from nanobot.session.manager import Session, SessionManager
 
-__all__ = ["SessionManager", "Session"]
+__all__ = ["SessionManager", "Session", "HistoryBuilder"]
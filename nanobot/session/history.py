@@ -0,0 +1,200 @@
+"""Token-budgeted history windows with a rolling per-session summary."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from nanobot.session.manager import Session
+
+# Role/formatting overhead the chat APIs add to every message.
+MESSAGE_OVERHEAD_TOKENS = 4
+SUMMARY_METADATA_KEY = "history_summary"
+
+Summarizer = Callable[[str, list[dict[str, Any]]], Awaitable[str | None]]
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap local token estimate, no tokenizer download needed.
+
+    BPE vocabularies average about four characters per token for
+    English/code; scripts outside ASCII run closer to one token per two or
+    three UTF-8 bytes, so those are counted by byte length instead.
+    """
+    if not text:
+        return 0
+    if text.isascii():
+        return (len(text) + 3) // 4
+    return (len(text.encode("utf-8")) + 2) // 3
+
+
+def clip_text(text: str, max_tokens: int) -> str:
+    """Cut ``text`` to roughly ``max_tokens``, keeping the head and tail."""
+    tokens = estimate_tokens(text)
+    if tokens <= max_tokens:
+        return text
+    # Scale by this text's chars per token so non-ASCII input is cut
+    # proportionally; the omission marker costs about a dozen tokens.
+    keep = max(16, len(text) * max(1, max_tokens - 12) // tokens)
+    head = text[: keep * 3 // 4]
+    tail = text[len(text) - keep // 4 :]
+    return f"{head}\n[... {len(text) - len(head) - len(tail)} chars omitted ...]\n{tail}"
+
+
+class HistoryBuilder:
+    """
+    Packs a session's recent turns into a token budget.
+
+    Walks back from the newest message and stops once the budget is spent
+    (or ``max_messages`` is reached). A single message can use at most
+    ``max_message_tokens``; larger ones are clipped, so one pasted log no
+    longer inflates every later prompt. Turns that fell out of the window
+    are folded into a rolling summary by a background task, and the summary
+    is sent ahead of the packed turns. A long backlog is summarized in
+    batches of at most ``max_summary_batch`` turns (and about ``max_tokens``
+    of text), advancing the summary after each one. Per-message token counts are cached on
+    the session, so each call only estimates messages added since the last.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_tokens: int = 6000,
+        max_message_tokens: int = 1500,
+        max_messages: int = 50,
+        summarize: Summarizer | None = None,
+        summary_max_tokens: int = 400,
+        min_summary_batch: int = 8,
+        max_summary_batch: int = 40,
+        on_summary: Callable[[Session], None] | None = None,
+    ) -> None:
+        self.max_tokens = max(1, int(max_tokens))
+        self.max_message_tokens = max(1, min(int(max_message_tokens), self.max_tokens))
+        self.max_messages = max(1, int(max_messages))
+        self._summarize = summarize
+        self.summary_max_tokens = max(1, int(summary_max_tokens))
+        self._min_summary_batch = max(1, int(min_summary_batch))
+        self.max_summary_batch = max(self._min_summary_batch, int(max_summary_batch))
+        self._on_summary = on_summary
+        self._inflight: dict[str, asyncio.Task[None]] = {}
+        self._stats = {
+            "builds": 0,
+            "clipped_messages": 0,
+            "summaries": 0,
+            "summary_failures": 0,
+        }
+
+    def build(self, session: Session) -> list[dict[str, Any]]:
+        """History in LLM format, newest turns within budget plus the summary."""
+        self._stats["builds"] += 1
+        counts = session.message_tokens()
+        summary = self.summary_of(session)
+        summary_text = str(summary.get("text") or "")
+        budget = self.max_tokens
+        if summary_text:
+            budget -= estimate_tokens(summary_text) + MESSAGE_OVERHEAD_TOKENS
+
+        start = len(session.messages)
+        floor = max(0, start - self.max_messages, int(summary.get("through") or 0))
+        while start > floor:
+            cost = min(counts[start - 1], self.max_message_tokens) + MESSAGE_OVERHEAD_TOKENS
+            if cost > budget:
+                break
+            budget -= cost
+            start -= 1
+
+        history: list[dict[str, Any]] = []
+        if summary_text:
+            history.append(
+                {"role": "system", "content": f"Summary of earlier conversation:\n{summary_text}"}
+            )
+        for message, tokens in zip(session.messages[start:], counts[start:]):
+            content = message["content"]
+            if tokens > self.max_message_tokens and isinstance(content, str):
+                self._stats["clipped_messages"] += 1
+                content = clip_text(content, self.max_message_tokens)
+            history.append({"role": message["role"], "content": content})
+
+        self._maybe_refresh(session, start)
+        return history
+
+    @staticmethod
+    def summary_of(session: Session) -> dict[str, Any]:
+        summary = session.metadata.get(SUMMARY_METADATA_KEY)
+        if not isinstance(summary, dict) or summary.get("through", 0) > len(session.messages):
+            return {}
+        return summary
+
+    def _maybe_refresh(self, session: Session, window_start: int) -> None:
+        if self._summarize is None:
+            return
+        through = int(self.summary_of(session).get("through") or 0)
+        if window_start - through < self._min_summary_batch:
+            return
+        task = self._inflight.get(session.key)
+        if task is not None and not task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._inflight[session.key] = loop.create_task(
+            self._refresh(session, through, window_start)
+        )
+
+    async def _refresh(self, session: Session, through: int, until: int) -> None:
+        try:
+            while through < until:
+                step = self._batch_end(session, through, until)
+                if not await self._summarize_batch(session, through, step):
+                    return
+                through = step
+        finally:
+            self._inflight.pop(session.key, None)
+
+    def _batch_end(self, session: Session, through: int, until: int) -> int:
+        """End of the next summary batch: capped by turn count and token estimate."""
+        counts = session.message_tokens()
+        end = min(until, through + self.max_summary_batch)
+        budget = self.max_tokens
+        for i in range(through, end):
+            budget -= min(counts[i], self.max_message_tokens) + MESSAGE_OVERHEAD_TOKENS
+            if budget < 0 and i > through:
+                return i
+        return end
+
+    async def _summarize_batch(self, session: Session, through: int, until: int) -> bool:
+        assert self._summarize is not None
+        previous = str(self.summary_of(session).get("text") or "")
+        turns = [
+            {"role": m["role"], "content": clip_text(str(m["content"]), self.max_message_tokens)}
+            for m in session.messages[through:until]
+        ]
+        try:
+            text = await self._summarize(previous, turns)
+        except Exception as e:
+            logger.warning("history summary failed for {}: {}", session.key, e)
+            text = None
+        if not text:
+            self._stats["summary_failures"] += 1
+            return False
+        # The session may have been cleared while the summary was generated.
+        if len(session.messages) < until:
+            return False
+        session.metadata[SUMMARY_METADATA_KEY] = {
+            "text": clip_text(text.strip(), self.summary_max_tokens),
+            "through": until,
+        }
+        self._stats["summaries"] += 1
+        if self._on_summary is not None:
+            self._on_summary(session)
+        return True
+
+    def stats(self) -> dict[str, object]:
+        """Build, clipping and summary counters."""
+        return {**self._stats, "summaries_inflight": len(self._inflight)}
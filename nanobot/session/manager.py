@@ -8,6 +8,7 @@ from typing import Any
 
 from loguru import logger
 
+from nanobot.session.history import SUMMARY_METADATA_KEY, estimate_tokens
 from nanobot.utils.helpers import ensure_dir, safe_filename
 
 
@@ -24,6 +25,7 @@ class Session:
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
     metadata: dict[str, Any] = field(default_factory=dict)
+    _token_counts: list[int] = field(default_factory=list, repr=False, compare=False)
 
     def add_message(self, role: str, content: str, **kwargs: Any) -> None:
         """Add a message to the session."""
@@ -52,9 +54,19 @@ class Session:
         # Convert to LLM format (just role and content)
         return [{"role": m["role"], "content": m["content"]} for m in recent]
 
+    def message_tokens(self) -> list[int]:
+        """Estimated token count per message, computed once per message."""
+        counts = self._token_counts
+        for message in self.messages[len(counts) :]:
+            content = message.get("content")
+            counts.append(estimate_tokens(content if isinstance(content, str) else str(content)))
+        return counts
+
     def clear(self) -> None:
         """Clear all messages in the session."""
         self.messages = []
+        self._token_counts = []
+        self.metadata.pop(SUMMARY_METADATA_KEY, None)
         self.updated_at = datetime.now()
 
 
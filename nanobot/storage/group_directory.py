@@ -0,0 +1,237 @@
+"""Persistent directory of WhatsApp groups seen by the runtime."""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from loguru import logger
+
+from nanobot.utils.helpers import ensure_dir, get_operational_data_path
+
+# Re-writing last_seen for a busy group on every message buys nothing for discovery.
+TOUCH_INTERVAL_SECONDS = 300.0
+SUBJECT_MAX_AGE_SECONDS = 24 * 3600.0
+
+_LOG_CHAT_RE = re.compile(r"chat=([0-9a-zA-Z-]+@g\.us)")
+
+
+@dataclass(slots=True)
+class GroupEntry:
+    """One indexed group."""
+
+    chat_id: str
+    subject: str
+    first_seen: float
+    last_seen: float
+    subject_updated_at: float
+
+
+class GroupDirectory:
+    """
+    SQLite-backed index of WhatsApp groups and their subjects.
+
+    Updated incrementally from inbound group messages and bridge ``list_groups``
+    replies, so ``/policy list-groups`` and group resolution read a small table
+    instead of scanning logs or calling the bridge. Subject refreshes are requested
+    through a hook registered by the live channel and never block the caller.
+    """
+
+    def __init__(self, db_path: Path | None = None) -> None:
+        self.db_path = db_path or (get_operational_data_path() / "whatsapp" / "groups.db")
+        ensure_dir(self.db_path.parent)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+        self._last_touch: dict[str, float] = {}
+        self._refresh_hook: Callable[[list[str]], None] | None = None
+
+    def _create_schema(self) -> None:
+        with self._lock:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS whatsapp_groups (
+                    chat_id TEXT PRIMARY KEY,
+                    subject TEXT NOT NULL DEFAULT '',
+                    first_seen REAL NOT NULL,
+                    last_seen REAL NOT NULL,
+                    subject_updated_at REAL NOT NULL DEFAULT 0
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS directory_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+
+    def record_seen(self, chat_id: str, *, seen_at: float | None = None) -> bool:
+        """Note activity in a group. Returns True when the group was not indexed yet."""
+        chat_id = str(chat_id or "").strip()
+        if not chat_id.endswith("@g.us"):
+            return False
+        now = time.time() if seen_at is None else float(seen_at)
+        with self._lock:
+            last = self._last_touch.get(chat_id)
+            if last is not None and now - last < TOUCH_INTERVAL_SECONDS:
+                return False
+            self._last_touch[chat_id] = now
+            cursor = self._conn.execute(
+                """
+                INSERT INTO whatsapp_groups (chat_id, first_seen, last_seen)
+                VALUES (?, ?, ?)
+                ON CONFLICT(chat_id) DO UPDATE SET last_seen = MAX(last_seen, excluded.last_seen)
+                RETURNING first_seen
+                """,
+                (chat_id, now, now),
+            )
+            first_seen = float(cursor.fetchone()[0])
+            self._conn.commit()
+        return first_seen == now
+
+    def update_subjects(self, subjects: dict[str, str]) -> int:
+        """Store group subjects reported by the bridge. Returns rows written."""
+        now = time.time()
+        rows = [
+            (chat_id, subject.strip(), now, now, now)
+            for chat_id, subject in subjects.items()
+            if chat_id.endswith("@g.us") and subject and subject.strip()
+        ]
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT INTO whatsapp_groups (
+                    chat_id, subject, first_seen, last_seen, subject_updated_at
+                ) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(chat_id) DO UPDATE SET
+                    subject = excluded.subject,
+                    subject_updated_at = excluded.subject_updated_at
+                """,
+                rows,
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def entries(self) -> dict[str, GroupEntry]:
+        """All indexed groups keyed by chat id."""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT chat_id, subject, first_seen, last_seen, subject_updated_at
+                FROM whatsapp_groups
+                """
+            ).fetchall()
+        return {
+            str(row["chat_id"]): GroupEntry(
+                chat_id=str(row["chat_id"]),
+                subject=str(row["subject"] or ""),
+                first_seen=float(row["first_seen"]),
+                last_seen=float(row["last_seen"]),
+                subject_updated_at=float(row["subject_updated_at"]),
+            )
+            for row in rows
+        }
+
+    def stale_subject_ids(
+        self,
+        chat_ids: Iterable[str] | None = None,
+        *,
+        max_age_seconds: float = SUBJECT_MAX_AGE_SECONDS,
+    ) -> list[str]:
+        """Groups whose subject is missing or older than ``max_age_seconds``."""
+        cutoff = time.time() - max_age_seconds
+        entries = self.entries()
+        wanted = entries.keys() if chat_ids is None else chat_ids
+        out: list[str] = []
+        for chat_id in wanted:
+            entry = entries.get(chat_id)
+            if entry is None or entry.subject_updated_at < cutoff:
+                out.append(chat_id)
+        return out
+
+    def set_refresh_hook(self, hook: Callable[[list[str]], None] | None) -> None:
+        """Register the live channel's non-blocking subject refresh entry point."""
+        self._refresh_hook = hook
+
+    def request_subject_refresh(self, chat_ids: Iterable[str]) -> bool:
+        """Ask the live channel to refresh subjects in the background."""
+        ids = [cid for cid in chat_ids if cid.endswith("@g.us")]
+        hook = self._refresh_hook
+        if not ids or hook is None:
+            return False
+        try:
+            hook(ids)
+        except Exception as e:
+            logger.debug("group subject refresh request failed: {}", e)
+            return False
+        return True
+
+    def backfill_once(self, base_dir: Path) -> int:
+        """
+        Seed the index from session files and the legacy gateway log.
+
+        Runs only the first time a directory is opened; later discovery is purely
+        incremental. Returns the number of groups found.
+        """
+        with self._lock:
+            done = self._conn.execute(
+                "SELECT value FROM directory_meta WHERE key = 'backfilled_at'"
+            ).fetchone()
+        if done is not None:
+            return 0
+
+        seen: dict[str, float] = {}
+        sessions_dir = base_dir / "sessions"
+        if sessions_dir.exists():
+            for path in sessions_dir.glob("whatsapp_*@g.us.jsonl"):
+                chat_id = path.name[len("whatsapp_") : -len(".jsonl")]
+                try:
+                    seen[chat_id] = max(seen.get(chat_id, 0.0), path.stat().st_mtime)
+                except OSError:
+                    seen.setdefault(chat_id, 0.0)
+        log_path = base_dir / "logs" / "gateway.log"
+        if log_path.exists():
+            try:
+                with open(log_path, encoding="utf-8", errors="ignore") as f:
+                    for line in f:
+                        for chat_id in _LOG_CHAT_RE.findall(line):
+                            seen.setdefault(chat_id, 0.0)
+            except OSError:
+                pass
+
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT INTO whatsapp_groups (chat_id, first_seen, last_seen)
+                VALUES (?, ?, ?)
+                ON CONFLICT(chat_id) DO NOTHING
+                """,
+                [(chat_id, ts or now, ts or now) for chat_id, ts in seen.items()],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO directory_meta (key, value) VALUES ('backfilled_at', ?)",
+                (str(now),),
+            )
+            self._conn.commit()
+        return len(seen)
+
+    def close(self) -> None:
+        """Close the sqlite connection."""
+        with self._lock:
+            self._conn.close()
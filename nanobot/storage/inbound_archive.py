@@ -15,10 +15,42 @@ from nanobot.utils.helpers import ensure_dir, get_data_path
 
 DEFAULT_RETENTION_DAYS = 30
 PURGE_INTERVAL_SECONDS = 3600
+# Rows deleted per purge transaction; the lock is released between chunks.
+PURGE_BATCH_ROWS = 5000
+SCHEMA_VERSION = 2
+
+_COLUMN_NAMES = (
+    "channel",
+    "chat_id",
+    "message_id",
+    "participant",
+    "sender_id",
+    "text",
+    "timestamp",
+    "created_at",
+)
+_COLUMNS = ", ".join(_COLUMN_NAMES)
+_WINDOW_COLUMNS = ", ".join(f"m.{name}" for name in _COLUMN_NAMES)
+
+
+def _sort_ts(timestamp: int | None, created_at: str) -> int:
+    """Ordering key: the message timestamp, or the archive time when it is missing."""
+    if timestamp:
+        return int(timestamp)
+    return int(datetime.fromisoformat(created_at).timestamp())
 
 
 class InboundArchive:
-    """SQLite-backed archive keyed by channel/chat/message_id."""
+    """
+    SQLite-backed archive keyed by channel/chat/message_id.
+
+    Schema v2 keeps an integer ``seq`` rowid (insertion order) and a
+    ``sort_ts`` ordering key next to every row, with one index per query
+    shape: the unique key, ``(channel, message_id)`` for reply lookups
+    across chats, ``(channel, chat_id, sort_ts, seq)`` for context windows
+    and ``created_at`` for retention. A v1 database is migrated in place on
+    first open.
+    """
 
     def __init__(
         self,
@@ -39,28 +71,73 @@ class InboundArchive:
 
     def _create_schema(self) -> None:
         with self._lock:
-            self._conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS inbound_messages (
-                    channel TEXT NOT NULL,
-                    chat_id TEXT NOT NULL,
-                    message_id TEXT NOT NULL,
-                    participant TEXT,
-                    sender_id TEXT,
-                    text TEXT NOT NULL,
-                    timestamp INTEGER,
-                    created_at TEXT NOT NULL,
-                    PRIMARY KEY (channel, chat_id, message_id)
+            version = int(self._conn.execute("PRAGMA user_version").fetchone()[0])
+            if version >= SCHEMA_VERSION:
+                return
+            legacy = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'inbound_messages'"
+            ).fetchone()
+            with self._conn:
+                self._conn.execute("BEGIN")
+                if legacy is not None:
+                    self._conn.execute("ALTER TABLE inbound_messages RENAME TO inbound_messages_v1")
+                    self._conn.execute("DROP INDEX IF EXISTS idx_inbound_messages_chat_created")
+                self._conn.execute(
+                    """
+                    CREATE TABLE inbound_messages (
+                        seq INTEGER PRIMARY KEY,
+                        channel TEXT NOT NULL,
+                        chat_id TEXT NOT NULL,
+                        message_id TEXT NOT NULL,
+                        participant TEXT,
+                        sender_id TEXT,
+                        text TEXT NOT NULL,
+                        timestamp INTEGER,
+                        created_at TEXT NOT NULL,
+                        sort_ts INTEGER NOT NULL
+                    )
+                    """
                 )
-                """
-            )
-            self._conn.execute(
-                """
-                CREATE INDEX IF NOT EXISTS idx_inbound_messages_chat_created
-                ON inbound_messages (channel, chat_id, created_at)
-                """
-            )
-            self._conn.commit()
+                if legacy is not None:
+                    started = time.monotonic()
+                    self._conn.create_function("sort_ts", 2, _sort_ts, deterministic=True)
+                    cur = self._conn.execute(
+                        f"""
+                        INSERT INTO inbound_messages ({_COLUMNS}, sort_ts)
+                        SELECT {_COLUMNS}, sort_ts(timestamp, created_at)
+                        FROM inbound_messages_v1
+                        ORDER BY created_at
+                        """
+                    )
+                    self._conn.execute("DROP TABLE inbound_messages_v1")
+                    logger.info(
+                        "inbound archive migrated {} rows to schema v{} in {:.1f}s",
+                        cur.rowcount,
+                        SCHEMA_VERSION,
+                        time.monotonic() - started,
+                    )
+                self._conn.execute(
+                    """
+                    CREATE UNIQUE INDEX idx_inbound_key
+                    ON inbound_messages (channel, chat_id, message_id)
+                    """
+                )
+                self._conn.execute(
+                    """
+                    CREATE INDEX idx_inbound_message
+                    ON inbound_messages (channel, message_id, chat_id)
+                    """
+                )
+                self._conn.execute(
+                    """
+                    CREATE INDEX idx_inbound_chat_order
+                    ON inbound_messages (channel, chat_id, sort_ts, seq)
+                    """
+                )
+                self._conn.execute(
+                    "CREATE INDEX idx_inbound_created ON inbound_messages (created_at)"
+                )
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
 
     def record_inbound(
         self,
@@ -78,12 +155,12 @@ class InboundArchive:
             return
 
         created_at = datetime.now(UTC).isoformat()
+        ts = int(timestamp) if isinstance(timestamp, (int, float)) else None
         with self._lock:
             self._conn.execute(
-                """
-                INSERT OR IGNORE INTO inbound_messages (
-                    channel, chat_id, message_id, participant, sender_id, text, timestamp, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                f"""
+                INSERT OR IGNORE INTO inbound_messages ({_COLUMNS}, sort_ts)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                 (
                     str(channel),
@@ -92,12 +169,13 @@ class InboundArchive:
                     str(participant) if participant else None,
                     str(sender_id) if sender_id else None,
                     str(text),
-                    int(timestamp) if isinstance(timestamp, (int, float)) else None,
+                    ts,
                     created_at,
+                    _sort_ts(ts, created_at),
                 ),
             )
             self._conn.commit()
-            self._maybe_purge_locked()
+        self._maybe_purge()
 
     def lookup_message(self, channel: str, chat_id: str, message_id: str) -> dict[str, Any] | None:
         """Find an archived message by unique key."""
@@ -105,8 +183,8 @@ class InboundArchive:
             return None
         with self._lock:
             row = self._conn.execute(
-                """
-                SELECT channel, chat_id, message_id, participant, sender_id, text, timestamp, created_at
+                f"""
+                SELECT {_COLUMNS}
                 FROM inbound_messages
                 WHERE channel = ? AND chat_id = ? AND message_id = ?
                 LIMIT 1
@@ -130,14 +208,15 @@ class InboundArchive:
 
         preferred = str(preferred_chat_id or "")
         with self._lock:
+            # idx_inbound_message narrows this to the few rows sharing the id.
             row = self._conn.execute(
-                """
-                SELECT channel, chat_id, message_id, participant, sender_id, text, timestamp, created_at
-                FROM inbound_messages
+                f"""
+                SELECT {_COLUMNS}
+                FROM inbound_messages INDEXED BY idx_inbound_message
                 WHERE channel = ? AND message_id = ?
                 ORDER BY
                     CASE WHEN chat_id = ? THEN 0 ELSE 1 END,
-                    created_at DESC
+                    seq DESC
                 LIMIT 1
                 """,
                 (str(channel), str(message_id), preferred),
@@ -160,78 +239,60 @@ class InboundArchive:
             return []
         effective_limit = max(1, int(limit))
 
+        # One statement: the anchor row is found through the unique key and the
+        # window is read backwards from it along idx_inbound_chat_order.
         with self._lock:
-            anchor = self._conn.execute(
-                """
-                SELECT timestamp, created_at
-                FROM inbound_messages
-                WHERE channel = ? AND chat_id = ? AND message_id = ?
-                LIMIT 1
+            rows = self._conn.execute(
+                f"""
+                SELECT {_WINDOW_COLUMNS}
+                FROM inbound_messages AS a
+                JOIN inbound_messages AS m INDEXED BY idx_inbound_chat_order
+                  ON m.channel = a.channel AND m.chat_id = a.chat_id
+                 AND (m.sort_ts, m.seq) < (a.sort_ts, a.seq)
+                WHERE a.channel = ? AND a.chat_id = ? AND a.message_id = ?
+                ORDER BY m.sort_ts DESC, m.seq DESC
+                LIMIT ?
                 """,
-                (str(channel), str(chat_id), str(anchor_message_id)),
-            ).fetchone()
-            if anchor is None:
-                return []
-
-            anchor_timestamp = anchor["timestamp"]
-            anchor_created_at = str(anchor["created_at"] or "")
-
-            if isinstance(anchor_timestamp, int):
-                rows = self._conn.execute(
-                    """
-                    SELECT channel, chat_id, message_id, participant, sender_id, text, timestamp, created_at
-                    FROM inbound_messages
-                    WHERE channel = ? AND chat_id = ?
-                      AND (
-                        timestamp < ?
-                        OR (timestamp = ? AND created_at < ?)
-                      )
-                    ORDER BY timestamp DESC, created_at DESC
-                    LIMIT ?
-                    """,
-                    (
-                        str(channel),
-                        str(chat_id),
-                        anchor_timestamp,
-                        anchor_timestamp,
-                        anchor_created_at,
-                        effective_limit,
-                    ),
-                ).fetchall()
-            else:
-                rows = self._conn.execute(
-                    """
-                    SELECT channel, chat_id, message_id, participant, sender_id, text, timestamp, created_at
-                    FROM inbound_messages
-                    WHERE channel = ? AND chat_id = ? AND created_at < ?
-                    ORDER BY created_at DESC
-                    LIMIT ?
-                    """,
-                    (str(channel), str(chat_id), anchor_created_at, effective_limit),
-                ).fetchall()
+                (str(channel), str(chat_id), str(anchor_message_id), effective_limit),
+            ).fetchall()
 
         return [dict(row) for row in rows]
 
-    def purge_older_than(self, days: int = DEFAULT_RETENTION_DAYS) -> int:
-        """Delete rows older than the retention window."""
+    def purge_older_than(
+        self, days: int = DEFAULT_RETENTION_DAYS, *, batch_size: int = PURGE_BATCH_ROWS
+    ) -> int:
+        """Delete rows older than the retention window, ``batch_size`` rows per commit."""
         effective_days = max(1, int(days))
         cutoff = datetime.now(UTC) - timedelta(days=effective_days)
         cutoff_iso = cutoff.isoformat()
-        with self._lock:
-            cur = self._conn.execute(
-                "DELETE FROM inbound_messages WHERE created_at < ?",
-                (cutoff_iso,),
-            )
-            deleted = int(cur.rowcount or 0)
-            self._conn.commit()
-        return deleted
+        batch = max(1, int(batch_size))
+        deleted = 0
+        while True:
+            with self._lock:
+                cur = self._conn.execute(
+                    """
+                    DELETE FROM inbound_messages
+                    WHERE seq IN (
+                        SELECT seq FROM inbound_messages
+                        WHERE created_at < ?
+                        ORDER BY created_at
+                        LIMIT ?
+                    )
+                    """,
+                    (cutoff_iso, batch),
+                )
+                chunk = int(cur.rowcount or 0)
+                self._conn.commit()
+            deleted += chunk
+            if chunk < batch:
+                return deleted
 
     def close(self) -> None:
         """Close the sqlite connection."""
         with self._lock:
             self._conn.close()
 
-    def _maybe_purge_locked(self) -> None:
+    def _maybe_purge(self) -> None:
         now = time.monotonic()
         if now - self._last_purge_at < PURGE_INTERVAL_SECONDS:
             return
@@ -0,0 +1,183 @@
+"""Size-bounded on-disk cache for deterministic LLM side calls."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+from nanobot.utils.helpers import ensure_dir, get_cache_path
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+def request_key(
+    *,
+    model: str,
+    messages: list[dict[str, Any]],
+    tools: list[dict[str, Any]] | None = None,
+    temperature: float | None = None,
+    max_tokens: int | None = None,
+) -> str:
+    """SHA-256 over a canonical JSON encoding of the request."""
+    canonical = json.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "tools": tools or [],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed response cache for routes that opted in.
+
+    Only routes listed in ``route_ttls`` are cached, each with its own TTL;
+    the key is :func:`request_key`, so any change in model, prompt, tools or
+    sampling parameters misses. Total payload size is capped and the least
+    recently used entries are evicted first. There is no semantic matching.
+    """
+
+    def __init__(
+        self,
+        db_path: Path | None = None,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        route_ttls: Mapping[str, int] | None = None,
+    ) -> None:
+        self.db_path = db_path or (get_cache_path() / "llm" / "responses.db")
+        self.max_bytes = max(1024 * 1024, int(max_bytes))
+        self.max_entry_bytes = max(1, self.max_bytes // 16)
+        self._route_ttls = {route: int(ttl) for route, ttl in (route_ttls or {}).items()}
+        ensure_dir(self.db_path.parent)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                route TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)"
+        )
+        self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+        self._conn.commit()
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        self._total_bytes = int(row[0])
+        self._counters: Counter[str] = Counter()
+
+    def ttl_for(self, route: str | None) -> int | None:
+        """TTL in seconds for ``route``, or None when it has not opted in."""
+        if not route:
+            return None
+        ttl = self._route_ttls.get(route)
+        return ttl if ttl and ttl > 0 else None
+
+    def get(self, route: str, key: str) -> dict[str, Any] | None:
+        """Fresh payload for ``key``, counting a hit or miss for ``route``."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or float(row[1]) <= now:
+                self._counters[f"{route}.miss"] += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._counters[f"{route}.hit"] += 1
+        return json.loads(row[0])
+
+    def put(self, route: str, key: str, payload: dict[str, Any], *, ttl_seconds: float) -> bool:
+        """Store a payload. Returns False when it is too large to cache."""
+        data = json.dumps(payload, ensure_ascii=False)
+        size = len(data.encode("utf-8"))
+        with self._lock:
+            if size > self.max_entry_bytes:
+                self._counters[f"{route}.skip_large"] += 1
+                return False
+            now = time.time()
+            previous = self._conn.execute(
+                "SELECT size FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO llm_cache (key, route, payload, size, expires_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (key, route, data, size, now + max(0.0, float(ttl_seconds)), now),
+            )
+            self._total_bytes += size - (int(previous[0]) if previous else 0)
+            self._evict_locked()
+            self._conn.commit()
+            self._counters[f"{route}.store"] += 1
+        return True
+
+    def _evict_locked(self) -> None:
+        if self._total_bytes <= self.max_bytes:
+            return
+        # Expired rows go first, then least recently used down to 90% of the budget.
+        self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        self._total_bytes = int(row[0])
+        target = int(self.max_bytes * 0.9)
+        victims: list[tuple[str]] = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM llm_cache ORDER BY last_access ASC"
+        ):
+            if self._total_bytes <= target:
+                break
+            victims.append((key,))
+            self._total_bytes -= int(size)
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", victims)
+        self._counters["evicted"] += len(victims)
+
+    def stats(self) -> dict[str, object]:
+        """Hit rate per route plus overall size."""
+        with self._lock:
+            entries = int(self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0])
+            counters = dict(self._counters)
+        routes: dict[str, dict[str, float]] = {}
+        for name, value in counters.items():
+            if "." in name:
+                route, outcome = name.rsplit(".", 1)
+                routes.setdefault(route, {})[outcome] = value
+        for counts in routes.values():
+            lookups = counts.get("hit", 0) + counts.get("miss", 0)
+            counts["hit_rate"] = round(counts.get("hit", 0) / lookups, 3) if lookups else 0.0
+        return {
+            "entries": entries,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "evicted": counters.get("evicted", 0),
+            "routes": routes,
+        }
+
+    def close(self) -> None:
+        """Close the sqlite connection."""
+        with self._lock:
+            self._conn.close()
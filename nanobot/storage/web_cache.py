@@ -0,0 +1,268 @@
+"""Size-bounded on-disk cache for web_fetch and web_search results."""
+
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import UTC
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any
+
+from nanobot.utils.helpers import ensure_dir, get_cache_path
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_FETCH_TTL_SECONDS = 300
+DEFAULT_SEARCH_TTL_SECONDS = 600
+
+_MAX_AGE_RE = re.compile(r"(?:^|,)\s*(?:s-maxage|max-age)\s*=\s*\"?(\d+)", re.I)
+
+
+@dataclass(slots=True)
+class CachedEntry:
+    """One cached payload with its HTTP validators."""
+
+    payload: bytes
+    expires_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+    meta: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def fresh(self) -> bool:
+        return self.expires_at > time.time()
+
+    def text(self) -> str:
+        return self.payload.decode("utf-8", errors="replace")
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form of a search query for cache keys."""
+    return " ".join(str(query or "").lower().split())
+
+
+def freshness_ttl(headers: Mapping[str, str], default_ttl: float) -> float | None:
+    """
+    Seconds a response may be served without revalidation.
+
+    Returns None for ``no-store`` responses, 0 for ``no-cache``, the
+    ``max-age``/``Expires`` lifetime when present and ``default_ttl`` otherwise.
+    """
+    cache_control = str(headers.get("cache-control") or "").lower()
+    if "no-store" in cache_control:
+        return None
+    if "no-cache" in cache_control:
+        return 0.0
+    if match := _MAX_AGE_RE.search(cache_control):
+        return float(match.group(1))
+    expires = headers.get("expires")
+    if expires:
+        try:
+            expires_at = parsedate_to_datetime(expires)
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=UTC)
+            return max(0.0, expires_at.timestamp() - time.time())
+        except (TypeError, ValueError):
+            return 0.0
+    return float(default_ttl)
+
+
+class WebCache:
+    """
+    SQLite-backed cache shared by the web tools.
+
+    Entries live in namespaces (``http`` raw responses, ``extract`` extracted
+    page text, ``search`` search results). Total payload size is capped; the
+    least recently used entries are evicted first.
+    """
+
+    def __init__(
+        self,
+        db_path: Path | None = None,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        fetch_ttl_seconds: int = DEFAULT_FETCH_TTL_SECONDS,
+        search_ttl_seconds: int = DEFAULT_SEARCH_TTL_SECONDS,
+    ) -> None:
+        self.db_path = db_path or (get_cache_path() / "web" / "web_cache.db")
+        self.max_bytes = max(1024 * 1024, int(max_bytes))
+        self.max_entry_bytes = max(1, self.max_bytes // 16)
+        self.fetch_ttl_seconds = max(0, int(fetch_ttl_seconds))
+        self.search_ttl_seconds = max(0, int(search_ttl_seconds))
+        ensure_dir(self.db_path.parent)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM web_cache").fetchone()
+        self._total_bytes = int(row[0])
+        self._counters: Counter[str] = Counter()
+
+    def _create_schema(self) -> None:
+        with self._lock:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS web_cache (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    meta TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_web_cache_last_access
+                ON web_cache (last_access)
+                """
+            )
+            self._conn.commit()
+
+    def get(self, namespace: str, key: str) -> CachedEntry | None:
+        """Look up an entry, fresh or stale, and count the outcome."""
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT payload, etag, last_modified, meta, expires_at
+                FROM web_cache
+                WHERE namespace = ? AND key = ?
+                """,
+                (namespace, key),
+            ).fetchone()
+            if row is None:
+                self._counters[f"{namespace}.miss"] += 1
+                return None
+            self._conn.execute(
+                "UPDATE web_cache SET last_access = ? WHERE namespace = ? AND key = ?",
+                (time.time(), namespace, key),
+            )
+            self._conn.commit()
+            entry = CachedEntry(
+                payload=bytes(row["payload"]),
+                expires_at=float(row["expires_at"]),
+                etag=row["etag"],
+                last_modified=row["last_modified"],
+                meta=json.loads(row["meta"] or "{}"),
+            )
+            self._counters[f"{namespace}.{'hit' if entry.fresh else 'stale'}"] += 1
+        return entry
+
+    def put(
+        self,
+        namespace: str,
+        key: str,
+        payload: bytes | str,
+        *,
+        ttl_seconds: float,
+        etag: str | None = None,
+        last_modified: str | None = None,
+        meta: dict[str, Any] | None = None,
+    ) -> bool:
+        """Store an entry. Returns False when it is too large to cache."""
+        data = payload.encode("utf-8") if isinstance(payload, str) else bytes(payload)
+        if len(data) > self.max_entry_bytes:
+            with self._lock:
+                self._counters[f"{namespace}.skip_large"] += 1
+            return False
+
+        now = time.time()
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT size FROM web_cache WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO web_cache (
+                    namespace, key, payload, size, etag, last_modified, meta, expires_at, last_access
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    namespace,
+                    key,
+                    data,
+                    len(data),
+                    etag,
+                    last_modified,
+                    json.dumps(meta or {}, ensure_ascii=False),
+                    now + max(0.0, float(ttl_seconds)),
+                    now,
+                ),
+            )
+            self._total_bytes += len(data) - (int(previous["size"]) if previous else 0)
+            self._evict_locked()
+            self._conn.commit()
+            self._counters[f"{namespace}.store"] += 1
+        return True
+
+    def refresh(self, namespace: str, key: str, ttl_seconds: float) -> None:
+        """Extend an entry after a successful revalidation (HTTP 304)."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE web_cache SET expires_at = ? WHERE namespace = ? AND key = ?",
+                (time.time() + max(0.0, float(ttl_seconds)), namespace, key),
+            )
+            self._conn.commit()
+            self._counters[f"{namespace}.revalidated"] += 1
+
+    def stats(self) -> dict[str, object]:
+        """Counters and hit rate per namespace plus overall size."""
+        with self._lock:
+            entries = int(self._conn.execute("SELECT COUNT(*) FROM web_cache").fetchone()[0])
+            counters = dict(self._counters)
+        namespaces: dict[str, dict[str, float]] = {}
+        for name, value in counters.items():
+            if "." in name:
+                namespace, outcome = name.split(".", 1)
+                namespaces.setdefault(namespace, {})[outcome] = value
+        for counts in namespaces.values():
+            lookups = counts.get("hit", 0) + counts.get("stale", 0) + counts.get("miss", 0)
+            served = counts.get("hit", 0) + counts.get("revalidated", 0)
+            counts["hit_rate"] = round(served / lookups, 3) if lookups else 0.0
+        return {
+            "entries": entries,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "evicted": counters.get("evicted", 0),
+            "namespaces": namespaces,
+        }
+
+    def close(self) -> None:
+        """Close the sqlite connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _evict_locked(self) -> None:
+        if self._total_bytes <= self.max_bytes:
+            return
+        # Trim to 90% of the budget so a steady stream of writes does not evict on every put.
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute(
+            "SELECT namespace, key, size FROM web_cache ORDER BY last_access ASC"
+        )
+        victims: list[tuple[str, str]] = []
+        for row in rows:
+            if self._total_bytes <= target:
+                break
+            victims.append((row["namespace"], row["key"]))
+            self._total_bytes -= int(row["size"])
+        self._conn.executemany(
+            "DELETE FROM web_cache WHERE namespace = ? AND key = ?",
+            victims,
+        )
+        self._counters["evicted"] += len(victims)
@@ -0,0 +1,56 @@
+"""Parse ``python -X importtime`` output for startup diagnostics."""
+
+from __future__ import annotations
+
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+
+_MODULE_RE = re.compile(r"^[A-Za-z_][\w]*(\.[A-Za-z_][\w]*)*$")
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+@dataclass(frozen=True, slots=True)
+class ImportTiming:
+    """One module import with self and cumulative time in microseconds."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_import_times(text: str) -> list[ImportTiming]:
+    """Parse ``-X importtime`` stderr; header and unrelated lines are skipped."""
+    rows: list[ImportTiming] = []
+    for line in text.splitlines():
+        match = _LINE_RE.match(line)
+        if match is None:
+            continue
+        indent = len(match.group(3)) - 1
+        rows.append(
+            ImportTiming(
+                module=match.group(4),
+                self_us=int(match.group(1)),
+                cumulative_us=int(match.group(2)),
+                depth=max(0, indent // 2),
+            )
+        )
+    return rows
+
+
+def measure_import(module: str, *, python: str | None = None) -> list[ImportTiming]:
+    """Import ``module`` in a fresh interpreter and return its import timings."""
+    if not _MODULE_RE.match(module):
+        raise ValueError(f"invalid module name: {module!r}")
+    proc = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"import {module} failed")
+    return parse_import_times(proc.stderr)
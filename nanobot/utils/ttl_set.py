@@ -0,0 +1,180 @@
+"""Bounded set of recently seen keys with a fixed time-to-live."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+
+from loguru import logger
+
+from nanobot.utils.helpers import ensure_dir
+
+# Persisted rows are pruned with one indexed DELETE every this many inserts.
+PRUNE_EVERY = 256
+
+
+class TTLSet:
+    """
+    Set of keys that expire ``ttl_seconds`` after they were added.
+
+    Every key gets the same TTL, so insertion order is expiry order: keys
+    live in an ``OrderedDict`` and expiry only ever pops from the front,
+    making inserts, lookups and expiry amortized O(1) with no periodic full
+    scans. ``max_entries`` bounds memory by evicting the oldest keys early.
+
+    With ``db_path`` the keys are also written to SQLite and reloaded on
+    start, so duplicates replayed after a restart are still caught.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        *,
+        max_entries: int,
+        name: str = "dedupe",
+        db_path: Path | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.name = name
+        self._ttl = max(0.001, float(ttl_seconds))
+        self._max_entries = max(1, int(max_entries))
+        self._clock = clock
+        self._expires: OrderedDict[str, float] = OrderedDict()
+        self._hits = 0
+        self._expired = 0
+        self._evicted = 0
+        self._inserts = 0
+        self._lock = threading.RLock()
+        self._conn: sqlite3.Connection | None = None
+        if db_path is not None:
+            self._open(db_path)
+
+    def _open(self, db_path: Path) -> None:
+        ensure_dir(db_path.parent)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS seen_keys (
+                name TEXT NOT NULL,
+                key TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (name, key)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_seen_keys_expires ON seen_keys(expires_at)"
+        )
+        now = self._clock()
+        self._conn.execute("DELETE FROM seen_keys WHERE expires_at <= ?", (now,))
+        rows = self._conn.execute(
+            """
+            SELECT key, expires_at FROM (
+                SELECT key, expires_at FROM seen_keys WHERE name = ?
+                ORDER BY expires_at DESC LIMIT ?
+            ) ORDER BY expires_at
+            """,
+            (self.name, self._max_entries),
+        ).fetchall()
+        self._conn.commit()
+        for key, expires_at in rows:
+            self._expires[str(key)] = float(expires_at)
+
+    def _expire(self, now: float) -> None:
+        while self._expires:
+            key, expires_at = next(iter(self._expires.items()))
+            if expires_at > now:
+                return
+            del self._expires[key]
+            self._expired += 1
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            self._expire(self._clock())
+            return key in self._expires
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire(self._clock())
+            return len(self._expires)
+
+    def seen(self, key: str) -> bool:
+        """Return True if ``key`` is still live; otherwise add it and return False."""
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            if key in self._expires:
+                self._hits += 1
+                return True
+            self._add(key, now)
+            return False
+
+    def add(self, key: str) -> None:
+        """Add ``key`` (or restart its TTL)."""
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            self._expires.pop(key, None)
+            self._add(key, now)
+
+    def _add(self, key: str, now: float) -> None:
+        evicted: list[str] = []
+        while len(self._expires) >= self._max_entries:
+            evicted.append(self._expires.popitem(last=False)[0])
+            self._evicted += 1
+            if self._evicted == 1 or self._evicted % 500 == 0:
+                logger.warning(
+                    "{} cache overflow: evictions={} max={}",
+                    self.name,
+                    self._evicted,
+                    self._max_entries,
+                )
+        expires_at = now + self._ttl
+        self._expires[key] = expires_at
+        self._inserts += 1
+        if self._conn is not None:
+            self._persist(key, expires_at, now, evicted)
+
+    def _persist(self, key: str, expires_at: float, now: float, evicted: list[str]) -> None:
+        assert self._conn is not None
+        try:
+            if evicted:
+                self._conn.executemany(
+                    "DELETE FROM seen_keys WHERE name = ? AND key = ?",
+                    [(self.name, k) for k in evicted],
+                )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO seen_keys (name, key, expires_at) VALUES (?, ?, ?)",
+                (self.name, key, expires_at),
+            )
+            if self._inserts % PRUNE_EVERY == 0:
+                self._conn.execute("DELETE FROM seen_keys WHERE expires_at <= ?", (now,))
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning("Failed to persist {} key: {}", self.name, e)
+
+    def stats(self) -> dict[str, object]:
+        """Size and hit/expiry/eviction counters."""
+        with self._lock:
+            return {
+                "entries": len(self._expires),
+                "max_entries": self._max_entries,
+                "hits": self._hits,
+                "inserts": self._inserts,
+                "expired": self._expired,
+                "evicted": self._evicted,
+                "persistent": self._conn is not None,
+            }
+
+    def close(self) -> None:
+        """Close the sqlite connection, if any."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,192 @@
+"""Throughput benchmark for WhatsApp bridge framing, v2 versus v3.
+
+Run with ``python tests/benchmarks/bench_bridge.py [--messages N] [--media-mb M]``.
+A local websocket server stands in for the Node bridge and speaks both wire
+formats, so the numbers cover the real ``websockets`` transport plus the
+channel's reader path:
+
+- inbound: N message events as one v2 envelope each, then as v3
+  ``message_batch`` frames, decoded by ``WhatsAppChannel``;
+- outbound: attachments as v2 ``mediaBase64`` JSON, then as v3 binary frames.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import websockets
+from loguru import logger
+
+from nanobot.bus.queue import MessageBus
+from nanobot.channels.whatsapp import (
+    BINARY_FRAME_PREFIX,
+    WhatsAppChannel,
+    _encode_binary_frame,
+)
+from nanobot.config.schema import WhatsAppConfig, WhatsAppMediaConfig
+from nanobot.media.pipeline import MediaPipeline
+
+BATCH = 64  # MAX_BATCH_MESSAGES in bridge/src/server.ts
+FIELDS = [
+    "messageId",
+    "chatJid",
+    "participantJid",
+    "senderId",
+    "isGroup",
+    "text",
+    "timestamp",
+    "mentionedJids",
+    "mentionedBot",
+    "replyToBot",
+    "replyToMessageId",
+    "replyToParticipantJid",
+    "replyToText",
+    "media",
+]
+
+
+def _message(i: int) -> dict[str, Any]:
+    return {
+        "messageId": f"MSG{i:08d}",
+        "chatJid": "120363000000000000@g.us",
+        "participantJid": f"49170{i % 997:07d}@s.whatsapp.net",
+        "senderId": f"49170{i % 997:07d}@s.whatsapp.net",
+        "isGroup": True,
+        "text": f"message number {i} with a little bit of text",
+        "timestamp": 1_760_000_000 + i,
+        "mentionedJids": [],
+        "mentionedBot": False,
+        "replyToBot": False,
+        "replyToMessageId": None,
+        "replyToParticipantJid": None,
+        "replyToText": None,
+        "media": None,
+    }
+
+
+def _inbound_frames(count: int, version: int) -> list[str]:
+    messages = [_message(i) for i in range(count)]
+    if version == 2:
+        return [
+            json.dumps({"version": 2, "type": "message", "ts": 0, "payload": m})
+            for m in messages
+        ]
+    frames = []
+    for start in range(0, count, BATCH):
+        rows = [[m[f] for f in FIELDS] for m in messages[start : start + BATCH]]
+        payload = {"fields": FIELDS, "rows": rows}
+        frames.append(json.dumps({"version": 3, "type": "message_batch", "payload": payload}))
+    return frames
+
+
+async def _bench_inbound(channel: WhatsAppChannel, count: int, version: int) -> None:
+    frames = _inbound_frames(count, version)
+    received = 0
+    done = asyncio.Event()
+
+    async def _ingest(event: Any) -> None:
+        nonlocal received
+        received += 1
+        if received == count:
+            done.set()
+
+    channel._ingest_inbound_event = _ingest  # type: ignore[method-assign]
+
+    async def _serve(ws: Any) -> None:
+        for frame in frames:
+            await ws.send(frame)
+        await ws.wait_closed()
+
+    async with websockets.serve(_serve, "127.0.0.1", 0, max_size=None) as server:
+        port = server.sockets[0].getsockname()[1]
+        async with websockets.connect(f"ws://127.0.0.1:{port}", max_size=None) as ws:
+            started = time.perf_counter()
+            for _ in frames:
+                await channel._handle_bridge_message(await ws.recv())
+            await done.wait()
+            elapsed = time.perf_counter() - started
+    wire = sum(len(f) for f in frames)
+    print(
+        f"inbound  v{version}: {count / elapsed:10.0f} msg/s  {len(frames):6d} frames  "
+        f"{wire / count:5.0f} B/msg"
+    )
+
+
+async def _bench_media(path: Path, repeat: int, version: int) -> None:
+    body = path.read_bytes()
+    received = 0
+
+    async def _serve(ws: Any) -> None:
+        nonlocal received
+        async for frame in ws:
+            if isinstance(frame, str):
+                envelope = json.loads(frame)
+                data = base64.b64decode(envelope["payload"]["mediaBase64"])
+            else:
+                header_len = BINARY_FRAME_PREFIX.unpack_from(frame)[3]
+                start = BINARY_FRAME_PREFIX.size
+                envelope = json.loads(frame[start : start + header_len])
+                data = memoryview(frame)[start + header_len :]
+            received += len(data)
+            await ws.send(json.dumps({"requestId": envelope["requestId"]}))
+
+    payload = {"to": "1@s.whatsapp.net", "mimeType": "video/mp4", "fileName": path.name}
+    async with websockets.serve(_serve, "127.0.0.1", 0, max_size=None) as server:
+        port = server.sockets[0].getsockname()[1]
+        async with websockets.connect(f"ws://127.0.0.1:{port}", max_size=None) as ws:
+            started = time.perf_counter()
+            for i in range(repeat):
+                envelope = {"version": version, "type": "send_media", "requestId": str(i)}
+                data = await asyncio.to_thread(path.read_bytes)
+                if version == 2:
+                    envelope["payload"] = {
+                        **payload,
+                        "mediaBase64": base64.b64encode(data).decode("ascii"),
+                    }
+                    await ws.send(json.dumps(envelope))
+                else:
+                    envelope["payload"] = {**payload, "mediaInline": True}
+                    header = json.dumps(envelope).encode("utf-8")
+                    await ws.send(_encode_binary_frame(header, data))
+                await ws.recv()
+            elapsed = time.perf_counter() - started
+    assert received == len(body) * repeat
+    mb = received / (1024 * 1024)
+    print(f"outbound v{version}: {mb / elapsed:10.1f} MB/s  ({repeat} x {len(body) >> 10} KiB)")
+
+
+async def _main(messages: int, media_mb: float, repeat: int) -> None:
+    logger.remove()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        config = WhatsAppConfig(bridge_token="bench", media=WhatsAppMediaConfig(outgoing_dir=tmp))
+        channel = WhatsAppChannel(
+            config, MessageBus(), media_pipeline=MediaPipeline(incoming_root=root / "in")
+        )
+        for version in (2, 3):
+            await _bench_inbound(channel, messages, version)
+
+        media = root / "clip.mp4"
+        media.write_bytes(bytes(range(256)) * int(media_mb * 4096))
+        for version in (2, 3):
+            await _bench_media(media, repeat, version)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--media-mb", type=float, default=8.0)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(_main(args.messages, args.media_mb, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Tick-cost benchmark for the cron scheduler.
+
+Run with ``python tests/benchmarks/bench_cron.py [--jobs N]``. Loads N interval
+jobs and measures how long it takes to find the next wake time and to dispatch
+one due job, which should stay flat as N grows.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from loguru import logger
+
+from nanobot.cron.service import CronService
+from nanobot.cron.types import CronJob, CronJobState, CronPayload, CronSchedule
+
+
+async def _bench(jobs: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        store_path = Path(tmp) / "jobs.json"
+        seed = CronService(store_path)
+        store = seed._load_store()
+        now_ms = int(time.time() * 1000)
+        for i in range(jobs):
+            store.jobs.append(
+                CronJob(
+                    id=f"{i:08x}",
+                    name=f"job-{i}",
+                    schedule=CronSchedule(kind="every", every_ms=3_600_000),
+                    payload=CronPayload(message="ping"),
+                    state=CronJobState(next_run_at_ms=now_ms + 60_000 + i),
+                )
+            )
+        seed._save_store()
+
+        service = CronService(store_path)
+        started = time.perf_counter()
+        service._load_store()
+        service._save_store()
+        print(f"load + save {jobs} jobs: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        await service.start()
+        try:
+            rounds = 1000
+            started = time.perf_counter()
+            for _ in range(rounds):
+                service._get_next_wake_ms()
+            wake_us = (time.perf_counter() - started) / rounds * 1e6
+
+            job = service.list_jobs()[0]
+            job.state.next_run_at_ms = 1
+            service._schedule(job)
+            started = time.perf_counter()
+            await service._on_timer()
+            tick_us = (time.perf_counter() - started) * 1e6
+            print(f"next wake: {wake_us:.1f} us  tick with one due job: {tick_us:.0f} us")
+        finally:
+            service.stop()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=5000)
+    args = parser.parse_args()
+    logger.remove()
+    asyncio.run(_bench(max(1, args.jobs)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,172 @@
+"""Lookup and purge benchmark for the inbound reply-context archive.
+
+Run with ``python tests/benchmarks/bench_inbound_archive.py [--rows N] [--chats C]``
+(default 10M rows; expect a few GB of temporary disk). Seeds a schema v1
+database, times the v1 query shapes on it, then opens it with
+``InboundArchive`` (which migrates to v2) and times the same lookups plus a
+chunked retention purge:
+
+- reply miss: ``lookup_message_any_chat`` for an id in some other chat;
+- context window: ``lookup_messages_before`` around an anchor mid-chat;
+- purge: removing the oldest 1% of rows.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from loguru import logger
+
+from nanobot.storage.inbound_archive import InboundArchive
+
+SEED_BATCH = 50_000
+LOOKUPS = 200
+
+
+def _seed_v1(db_path: Path, rows: int, chats: int) -> None:
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute(
+        """
+        CREATE TABLE inbound_messages (
+            channel TEXT NOT NULL,
+            chat_id TEXT NOT NULL,
+            message_id TEXT NOT NULL,
+            participant TEXT,
+            sender_id TEXT,
+            text TEXT NOT NULL,
+            timestamp INTEGER,
+            created_at TEXT NOT NULL,
+            PRIMARY KEY (channel, chat_id, message_id)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX idx_inbound_messages_chat_created
+        ON inbound_messages (channel, chat_id, created_at)
+        """
+    )
+    # Oldest 1% sits outside the 30-day retention window.
+    now = datetime.now(UTC)
+    start = now - timedelta(days=29)
+    step = timedelta(days=29) / rows
+    for offset in range(0, rows, SEED_BATCH):
+        batch = []
+        for i in range(offset, min(rows, offset + SEED_BATCH)):
+            if i < rows // 100:
+                created = now - timedelta(days=31, seconds=rows - i)
+            else:
+                created = start + step * i
+            batch.append(
+                (
+                    f"{i % chats}@g.us",
+                    f"MSG{i:010d}",
+                    f"49170{i % 997:07d}@s.whatsapp.net",
+                    f"49170{i % 997:07d}@s.whatsapp.net",
+                    f"inbound message number {i} with a little text",
+                    int(created.timestamp()),
+                    created.isoformat(),
+                )
+            )
+        conn.executemany(
+            "INSERT INTO inbound_messages VALUES ('whatsapp', ?, ?, ?, ?, ?, ?, ?)", batch
+        )
+        conn.commit()
+    conn.close()
+
+
+def _time_us(fn: Callable[[int], object], samples: list[int]) -> float:
+    started = time.perf_counter()
+    for i in samples:
+        fn(i)
+    return (time.perf_counter() - started) / len(samples) * 1e6
+
+
+def _bench(rows: int, chats: int) -> None:
+    rng = random.Random(7)
+    samples = [rng.randrange(rows // 100, rows) for _ in range(LOOKUPS)]
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "reply_context.db"
+        started = time.perf_counter()
+        _seed_v1(db_path, rows, chats)
+        print(f"seed {rows} rows in {chats} chats: {time.perf_counter() - started:.1f} s")
+
+        v1 = sqlite3.connect(db_path)
+        any_chat_v1 = _time_us(
+            lambda i: v1.execute(
+                """
+                SELECT * FROM inbound_messages WHERE channel = 'whatsapp' AND message_id = ?
+                ORDER BY CASE WHEN chat_id = 'x' THEN 0 ELSE 1 END, created_at DESC LIMIT 1
+                """,
+                (f"MSG{i:010d}",),
+            ).fetchone(),
+            samples[:10],
+        )
+
+        def window_v1(i: int) -> None:
+            chat_id = f"{i % chats}@g.us"
+            anchor = v1.execute(
+                """
+                SELECT timestamp, created_at FROM inbound_messages
+                WHERE channel = 'whatsapp' AND chat_id = ? AND message_id = ?
+                """,
+                (chat_id, f"MSG{i:010d}"),
+            ).fetchone()
+            v1.execute(
+                """
+                SELECT * FROM inbound_messages
+                WHERE channel = 'whatsapp' AND chat_id = ?
+                  AND (timestamp < ? OR (timestamp = ? AND created_at < ?))
+                ORDER BY timestamp DESC, created_at DESC LIMIT 20
+                """,
+                (chat_id, anchor[0], anchor[0], anchor[1]),
+            ).fetchall()
+
+        window_us_v1 = _time_us(window_v1, samples)
+        v1.close()
+        print(f"v1 reply miss: {any_chat_v1:.0f} us  context window: {window_us_v1:.0f} us")
+
+        started = time.perf_counter()
+        archive = InboundArchive(db_path)
+        print(f"migrate to v2: {time.perf_counter() - started:.1f} s")
+        any_chat = _time_us(
+            lambda i: archive.lookup_message_any_chat(
+                "whatsapp", f"MSG{i:010d}", preferred_chat_id="x"
+            ),
+            samples,
+        )
+        window_us = _time_us(
+            lambda i: archive.lookup_messages_before(
+                "whatsapp", f"{i % chats}@g.us", f"MSG{i:010d}", limit=20
+            ),
+            samples,
+        )
+        print(f"v2 reply miss: {any_chat:.0f} us  context window: {window_us:.0f} us")
+
+        started = time.perf_counter()
+        deleted = archive.purge_older_than(days=30)
+        print(f"purge {deleted} rows in chunks: {time.perf_counter() - started:.1f} s")
+        archive.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--chats", type=int, default=2000)
+    args = parser.parse_args()
+    logger.remove()
+    _bench(max(1000, args.rows), max(1, args.chats))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,66 @@
+"""Startup-time regression benchmark for the CLI and gateway entry modules.
+
+Run with ``python tests/benchmarks/bench_startup.py [--max-ms N]``. Each module
+is imported in a fresh interpreter several times and the median wall time is
+reported, together with whether heavy optional dependencies were pulled in.
+With ``--max-ms`` the script exits non-zero when any median exceeds the budget,
+so it can gate CI on small hosts.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+MODULES = (
+    "nanobot.cli.commands",
+    "nanobot.app.bootstrap",
+    "nanobot.channels.manager",
+)
+HEAVY = ("litellm", "telegram", "lark_oapi", "websockets")
+
+_PROBE = (
+    "import sys, {module}; "
+    "print(','.join(m for m in {heavy!r} if m in sys.modules))"
+)
+
+
+def _run_once(module: str) -> tuple[float, str]:
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return (time.perf_counter() - started) * 1000, proc.stdout.strip()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    baseline = statistics.median(
+        _run_once("sys")[0] for _ in range(max(1, args.repeat))
+    )
+    print(f"interpreter baseline: {baseline:.0f} ms")
+
+    failed = False
+    for module in MODULES:
+        runs = [_run_once(module) for _ in range(max(1, args.repeat))]
+        median = statistics.median(ms for ms, _ in runs)
+        heavy = runs[-1][1] or "-"
+        over = bool(args.max_ms) and median > args.max_ms
+        failed = failed or over
+        flag = "  OVER BUDGET" if over else ""
+        print(f"{module:<28} median={median:7.0f} ms  heavy={heavy}{flag}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,124 @@
+"""Micro-benchmark for tool schema rendering and parameter validation.
+
+Run with ``python tests/benchmarks/bench_tool_schema.py``. Compares the
+per-iteration schema rebuild + recursive validation walk that the agent loop
+used to do against the memoized registry views and compiled validators, using
+the same parameter shapes as ``tests/test_tool_validation.py``.
+"""
+
+from __future__ import annotations
+
+import timeit
+from typing import Any
+
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.pi_stats import PiStatsTool
+from nanobot.agent.tools.registry import ToolRegistry
+
+SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "query": {"type": "string", "minLength": 2},
+        "count": {"type": "integer", "minimum": 1, "maximum": 10},
+        "mode": {"type": "string", "enum": ["fast", "full"]},
+        "meta": {
+            "type": "object",
+            "properties": {
+                "tag": {"type": "string"},
+                "flags": {"type": "array", "items": {"type": "string"}},
+            },
+            "required": ["tag"],
+        },
+    },
+    "required": ["query", "count"],
+}
+
+SCENARIOS: list[dict[str, Any]] = [
+    {"query": "hi"},
+    {"query": "hi", "count": 0},
+    {"query": "hi", "count": "2"},
+    {"query": "h", "count": 2, "mode": "slow"},
+    {"query": "hi", "count": 2, "meta": {"flags": [1, "ok"]}},
+    {"query": "hi", "count": 2, "extra": "x"},
+]
+
+
+class BenchTool(Tool):
+    @property
+    def name(self) -> str:
+        return "bench"
+
+    @property
+    def description(self) -> str:
+        return "benchmark tool"
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return SCHEMA
+
+    async def execute(self, **kwargs: Any) -> str:
+        return "ok"
+
+
+def _legacy_validate(val: Any, schema: dict[str, Any], path: str) -> list[str]:
+    t, label = schema.get("type"), path or "parameter"
+    if t in Tool._TYPE_MAP and not isinstance(val, Tool._TYPE_MAP[t]):
+        return [f"{label} should be {t}"]
+    errors = []
+    if "enum" in schema and val not in schema["enum"]:
+        errors.append(f"{label} must be one of {schema['enum']}")
+    if t in ("integer", "number"):
+        if "minimum" in schema and val < schema["minimum"]:
+            errors.append(f"{label} must be >= {schema['minimum']}")
+        if "maximum" in schema and val > schema["maximum"]:
+            errors.append(f"{label} must be <= {schema['maximum']}")
+    if t == "string":
+        if "minLength" in schema and len(val) < schema["minLength"]:
+            errors.append(f"{label} must be at least {schema['minLength']} chars")
+        if "maxLength" in schema and len(val) > schema["maxLength"]:
+            errors.append(f"{label} must be at most {schema['maxLength']} chars")
+    if t == "object":
+        props = schema.get("properties", {})
+        for k in schema.get("required", []):
+            if k not in val:
+                errors.append(f"missing required {path + '.' + k if path else k}")
+        for k, v in val.items():
+            if k in props:
+                errors.extend(_legacy_validate(v, props[k], path + "." + k if path else k))
+    if t == "array" and "items" in schema:
+        for i, item in enumerate(val):
+            errors.extend(
+                _legacy_validate(item, schema["items"], f"{path}[{i}]" if path else f"[{i}]")
+            )
+    return errors
+
+
+def main() -> None:
+    tool = BenchTool()
+    for params in SCENARIOS:
+        assert tool.validate_params(params) == _legacy_validate(params, SCHEMA, ""), params
+
+    number = 20_000
+    legacy = timeit.timeit(
+        lambda: [_legacy_validate(p, SCHEMA, "") for p in SCENARIOS], number=number
+    )
+    compiled = timeit.timeit(lambda: [tool.validate_params(p) for p in SCENARIOS], number=number)
+    print(f"validate x{number * len(SCENARIOS)}: legacy={legacy:.3f}s compiled={compiled:.3f}s")
+
+    reg = ToolRegistry()
+    reg.register(tool)
+    reg.register(PiStatsTool())
+    allowed = {"bench"}
+    tools = [tool, PiStatsTool()]
+    legacy = timeit.timeit(
+        lambda: [
+            s for s in (t.to_schema() for t in tools) if s["function"]["name"] in allowed
+        ],
+        number=number,
+    )
+    memoized = timeit.timeit(lambda: reg.get_definitions(allowed), number=number)
+    print(f"definitions x{number}: rebuild={legacy:.3f}s memoized={memoized:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,45 +5,68 @@ import platform
 import shutil
 import time
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Any
 
+import httpx
 import pytest
 
 from nanobot.adapters.responder_llm import LLMResponder
 from nanobot.agent.tools.base import Tool
 from nanobot.agent.tools.exec_isolation import (
+    BubblewrapSandboxSession,
     CommandResult,
     ExecSandboxManager,
     MountAllowlist,
     SandboxPreemptedError,
     SandboxTimeoutError,
 )
+from nanobot.agent.tools.exec_output import OutputCollector
 from nanobot.agent.tools.filesystem import ReadFileTool
 from nanobot.agent.tools.message import MessageTool
 from nanobot.agent.tools.pi_stats import PiStatsTool
 from nanobot.agent.tools.registry import ToolRegistry
 from nanobot.agent.tools.send_voice import SendVoiceTool, VoiceSendRequest
 from nanobot.agent.tools.shell import ExecTool
-from nanobot.agent.tools.web import _validate_url
+from nanobot.agent.tools.web import WebFetchTool, _validate_url
 from nanobot.app.bootstrap import _resolve_security_tool_settings
 from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
+from nanobot.channels.base import BaseChannel
+from nanobot.channels.rate_limit import RateLimiter
+from nanobot.channels.whatsapp import BINARY_FRAME_PREFIX, WhatsAppChannel
 from nanobot.config.loader import (
     _atomic_write_config,
     _migrate_config,
     convert_keys,
     convert_to_camel,
 )
-from nanobot.config.schema import Config, ExecIsolationConfig, ExecToolConfig, SecurityConfig
+from nanobot.config.schema import (
+    ChannelRateLimitConfig,
+    Config,
+    ExecIsolationConfig,
+    ExecToolConfig,
+    SecurityConfig,
+    WhatsAppConfig,
+    WhatsAppMediaConfig,
+)
 from nanobot.core.intents import SendOutboundIntent
 from nanobot.core.models import InboundEvent, PolicyDecision
 from nanobot.core.orchestrator import Orchestrator
 from nanobot.core.ports import PolicyPort, ResponderPort
 from nanobot.cron.service import CronService
 from nanobot.cron.types import CronSchedule
+from nanobot.media.index import MediaIndex
+from nanobot.media.pipeline import MediaPipeline, MediaTooLargeError
+from nanobot.media.tts import write_tts_audio_file
+from nanobot.policy.admin.audit import PolicyAuditEntry, PolicyAuditStore
+from nanobot.policy.admin.contracts import PolicyActorContext
+from nanobot.policy.admin.service import PolicyAdminService
 from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
 from nanobot.security.engine import SecurityEngine
 from nanobot.security.normalize import normalize_text
+from nanobot.storage.group_directory import GroupDirectory
+from nanobot.storage.web_cache import WebCache, freshness_ttl, normalize_query
 from nanobot.utils.helpers import get_workspace_path
 
 
@@ -131,6 +154,30 @@ async def test_registry_returns_validation_error() -> None:
     assert "Invalid parameters" in result
 
 
+def test_registry_memoizes_filtered_definitions() -> None:
+    reg = ToolRegistry()
+    reg.register(SampleTool())
+    reg.register(PiStatsTool())
+
+    defs = reg.get_definitions({"sample"})
+    assert [d["function"]["name"] for d in defs] == ["sample"]
+    assert reg.get_definitions(["sample"])[0] is defs[0]
+
+    reg.unregister("sample")
+    assert reg.get_definitions({"sample"}) == []
+    assert [d["function"]["name"] for d in reg.get_definitions()] == ["pi_stats"]
+
+
+def test_validate_params_reuses_compiled_validator() -> None:
+    tool = SampleTool()
+    assert tool.validate_params({"query": "hi", "count": 2}) == []
+    compiled = tool._compiled_validator
+    assert compiled is not None
+    errors = tool.validate_params({"query": "hi", "count": 2, "meta": "x"})
+    assert errors == ["meta should be object"]
+    assert tool._compiled_validator is compiled
+
+
 @pytest.mark.asyncio
 async def test_message_tool_resolves_whatsapp_group_reference() -> None:
     sent: list[OutboundMessage] = []
@@ -239,6 +286,326 @@ def test_cron_service_add_voice_job_persists_payload(tmp_path: Path) -> None:
     assert payload.voice_tts_route == "whatsapp.tts.speak"
 
 
+async def test_cron_service_runs_due_jobs_concurrently_without_overlap(tmp_path: Path) -> None:
+    store_path = tmp_path / "cron" / "jobs.json"
+    gate = asyncio.Event()
+    started: list[str] = []
+
+    async def on_job(job) -> None:
+        started.append(job.name)
+        await gate.wait()
+
+    service = CronService(store_path, on_job=on_job, max_concurrency=2)
+    for name in ("a", "b", "c"):
+        service.add_job(name, CronSchedule(kind="every", every_ms=60_000), "ping")
+    await service.start()
+    try:
+        for job in service.list_jobs():
+            job.state.next_run_at_ms = 1
+            service._schedule(job)
+        await service._on_timer()
+        await asyncio.sleep(0.05)
+        # Two slots: the third job waits instead of running behind a slow one.
+        assert sorted(started) == ["a", "b"]
+        assert service.status()["running"] == 3
+        assert service._get_next_wake_ms() is None
+
+        job_a = next(j for j in service.list_jobs(include_disabled=True) if j.name == "a")
+        assert await service.run_job(job_a.id) is False
+
+        gate.set()
+        for _ in range(50):
+            if not service.status()["running"]:
+                break
+            await asyncio.sleep(0.01)
+        assert sorted(started) == ["a", "b", "c"]
+        assert service._get_next_wake_ms() is not None
+    finally:
+        service.stop()
+
+    saved = json.loads(store_path.read_text())
+    assert {j["state"]["lastStatus"] for j in saved["jobs"]} == {"ok"}
+    assert not list(store_path.parent.glob(".jobs.json.tmp-*"))
+    inode = store_path.stat().st_ino
+    service._save_store()
+    assert store_path.stat().st_ino == inode  # unchanged state is not rewritten
+
+
+async def test_cron_rearms_interrupted_one_shot_and_run_job_owns_its_task(
+    tmp_path: Path,
+) -> None:
+    store_path = tmp_path / "cron" / "jobs.json"
+    gate = asyncio.Event()
+
+    async def on_job(job) -> None:
+        await gate.wait()
+
+    service = CronService(store_path, on_job=on_job)
+    at_ms = int(time.time() * 1000) + 60_000
+    job = service.add_job("remind", CronSchedule(kind="at", at_ms=at_ms), "ping")
+    await service.start()
+    job.state.next_run_at_ms = 1
+    service._schedule(job)
+    await service._on_timer()
+    await asyncio.sleep(0.01)
+    service._save_store()  # what a debounced save would persist mid-run
+    saved = json.loads(store_path.read_text())["jobs"][0]["state"]
+    assert saved["nextRunAtMs"] == 1 and saved["runningSinceMs"] is not None
+
+    # A restart mid-run re-arms the one-shot even under the "skip" policy.
+    restarted = CronService(store_path, on_job=on_job)
+    await restarted.start()
+    rearmed = restarted.list_jobs()[0]
+    assert rearmed.enabled and rearmed.state.running_since_ms is None
+    assert rearmed.state.next_run_at_ms is not None
+    assert rearmed.state.next_run_at_ms <= int(time.time() * 1000)
+    restarted.stop()
+    service.stop()
+
+    # stop() cancels a manual run, not the coroutine that asked for it.
+    manual = CronService(tmp_path / "manual.json", on_job=on_job)
+    every = manual.add_job("tick", CronSchedule(kind="every", every_ms=60_000), "ping")
+    await manual.start()
+    runner = asyncio.create_task(manual.run_job(every.id))
+    await asyncio.sleep(0.01)
+    manual.stop()
+    assert await runner is False
+    assert not runner.cancelled()
+
+
+async def test_rate_limiter_queues_per_chat_and_honours_server_holds() -> None:
+    now = [100.0]
+    slept: list[float] = []
+
+    async def fake_sleep(delay: float) -> None:
+        slept.append(round(delay, 3))
+
+    limiter = RateLimiter(
+        "test",
+        global_per_second=10.0,
+        global_burst=10,
+        per_chat_per_second=1.0,
+        per_chat_burst=2,
+        clock=lambda: now[0],
+        sleep=fake_sleep,
+    )
+    # Burst of four to one chat: two go straight out, the rest queue 1s apart.
+    waits = [await limiter.acquire("chat-a") for _ in range(4)]
+    assert waits == [0.0, 0.0, 1.0, 2.0]
+    # Another chat is only bound by the global bucket.
+    assert await limiter.acquire("chat-b") == 0.0
+
+    now[0] += 10.0
+    limiter.observe_headers(
+        "chat-a", {"x-ratelimit-remaining": "0", "x-ratelimit-reset-after": "3.5"}
+    )
+    assert await limiter.acquire("chat-a") == pytest.approx(3.5)
+    assert await limiter.acquire("chat-b") == 0.0
+    limiter.hold(None, 2.0)
+    assert await limiter.acquire("chat-b") == pytest.approx(2.0)
+
+    stats = limiter.stats()
+    assert stats["acquired"] == 8
+    assert stats["delayed"] == 4
+    assert stats["penalties"] == 2
+    assert stats["wait_max_s"] == 3.5
+    assert slept == [1.0, 2.0, 3.5, 2.0]
+    assert RateLimiter.from_config("off", ChannelRateLimitConfig(enabled=False)) is None
+
+
+async def test_media_pipeline_streams_with_cap_and_caches_transcripts(tmp_path: Path) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        size = 4096 if request.url.path == "/big" else 100
+
+        async def body():
+            for _ in range(4):
+                yield b"x" * (size // 4)
+
+        # No Content-Length: the cap has to be enforced while streaming.
+        return httpx.Response(200, content=body())
+
+    class _CountingASR:
+        calls = 0
+
+        async def transcribe(self, path: Path, profile: object) -> str:
+            del path, profile
+            self.calls += 1
+            return "hello there"
+
+    class _Router:
+        def resolve(self, task_key: str, channel: str | None = None) -> object:
+            del task_key, channel
+            return SimpleNamespace(provider="groq_whisper", model="whisper-large-v3")
+
+    asr = _CountingASR()
+    pipeline = MediaPipeline(
+        router=_Router(),
+        asr=asr,
+        incoming_root=tmp_path / "incoming",
+        max_download_bytes=1024,
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    first = await pipeline.download("Telegram", "https://files.test/small", filename="a.ogg")
+    second = await pipeline.download("telegram", "https://files.test/small", filename="b.ogg")
+    assert first.path == tmp_path / "incoming" / "telegram" / "a.ogg"
+    assert first.size_bytes == 100 and first.sha256 == second.sha256
+
+    with pytest.raises(MediaTooLargeError):
+        await pipeline.download("telegram", "https://files.test/big", filename="big.ogg")
+    assert sorted(p.name for p in (tmp_path / "incoming" / "telegram").iterdir()) == [
+        "a.ogg",
+        "b.ogg",
+    ]
+
+    assert await pipeline.transcribe_audio(first.path, "telegram", sha256=first.sha256)
+    # Same content under another name (e.g. a forwarded voice note) hits the cache.
+    assert await pipeline.transcribe_audio(second.path, "telegram") == "hello there"
+    assert asr.calls == 1
+    stats = pipeline.stats()
+    assert stats["downloads"] == 2 and stats["rejected_too_large"] == 1
+    assert stats["cache_hits"] == 1
+    await pipeline._client.aclose()
+
+    class _SlowASR:
+        active = peak = 0
+
+        async def transcribe(self, path: Path, profile: object) -> str:
+            del path, profile
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            await asyncio.sleep(0.01)
+            self.active -= 1
+            return "ok"
+
+    slow = _SlowASR()
+    limited = MediaPipeline(router=_Router(), asr=slow, asr_channel_limits={"whatsapp": 1})
+    await asyncio.gather(
+        *(limited.transcribe_audio(first.path, "whatsapp", sha256=f"h{i}") for i in range(3))
+    )
+    assert slow.peak == 1
+
+
+def test_media_index_sweeps_by_age_and_quota_within_budget(tmp_path: Path) -> None:
+    index = MediaIndex(tmp_path / "index.db")
+    now = time.time()
+    day = 86_400.0
+
+    def put(channel: str, name: str, age_days: float, size: int = 100) -> Path:
+        path = tmp_path / channel / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * size)
+        index.record(path, channel=channel, direction="incoming", created_at=now - age_days * day)
+        return path
+
+    wa_old = put("whatsapp", "old.jpg", 10)
+    tg_old = [put("telegram", f"old-{i}.ogg", 40 + i) for i in range(3)]
+    tg_new = put("telegram", "new.ogg", 1, size=1000)
+    tts = write_tts_audio_file(tmp_path / "out", b"y" * 50, media_index=index)
+    assert index.usage()["whatsapp"]["outgoing"] == {"files": 1, "bytes": 50}
+
+    # Budget of two: the oldest expired telegram files go first, the rest next pass.
+    first = index.sweep(
+        max_age_seconds=30 * day,
+        channel_max_age={"whatsapp": 5 * day},
+        budget=2,
+        now=now,
+    )
+    assert first.deleted == 2 and first.budget_exhausted
+    second = index.sweep(
+        max_age_seconds=30 * day, channel_max_age={"whatsapp": 5 * day}, now=now
+    )
+    assert second.deleted == 2 and not second.budget_exhausted
+    assert not wa_old.exists() and not any(p.exists() for p in tg_old)
+    assert tg_new.exists() and tts.exists()
+
+    # Quota: 1050 bytes indexed, keep at most 1000 -> the oldest file goes.
+    quota = index.sweep(max_age_seconds=30 * day, max_total_bytes=1000, now=now)
+    assert quota.deleted == 1 and not tg_new.exists() and tts.exists()
+    assert index.usage() == {"whatsapp": {"outgoing": {"files": 1, "bytes": 50}}}
+
+    # A file that cannot be removed keeps its row; a missing one loses it.
+    stuck = tmp_path / "telegram" / "stuck"
+    (stuck / "inner").mkdir(parents=True)
+    for path in (stuck, tmp_path / "gone.ogg"):
+        index.record(
+            path, channel="telegram", direction="incoming", size_bytes=10, created_at=now - 60 * day
+        )
+    result = index.sweep(max_age_seconds=30 * day, now=now)
+    assert result.deleted == 1 and stuck.exists()
+    assert index.usage()["telegram"]["incoming"] == {"files": 1, "bytes": 10}
+    index.close()
+
+
+async def test_telegram_send_falls_back_to_plain_text_only_on_parse_errors() -> None:
+    from telegram.error import BadRequest, RetryAfter
+
+    from nanobot.channels.telegram import MAX_RETRY_AFTER_RETRIES, TelegramChannel
+    from nanobot.config.schema import ChannelRateLimitConfig, TelegramConfig
+
+    sent: list[dict[str, Any]] = []
+    failures: list[Exception] = []
+
+    async def _send_message(**kwargs: Any) -> None:
+        sent.append(kwargs)
+        if failures:
+            raise failures.pop(0)
+
+    config = TelegramConfig(rate_limit=ChannelRateLimitConfig(enabled=False))
+    channel = TelegramChannel(config, MessageBus())
+    bot = SimpleNamespace(send_message=_send_message)
+    channel._app = SimpleNamespace(bot=bot)  # type: ignore[assignment]
+    msg = OutboundMessage(channel="telegram", chat_id="42", content="*hi*")
+
+    failures[:] = [BadRequest("Can't parse entities: unsupported start tag")]
+    await channel.send(msg)
+    assert [m.get("parse_mode") for m in sent] == ["HTML", None]
+    assert sent[-1]["text"] == "*hi*"
+
+    sent.clear()
+    failures[:] = [RetryAfter(0)] * (MAX_RETRY_AFTER_RETRIES + 1)
+    await channel.send(msg)
+    assert len(sent) == MAX_RETRY_AFTER_RETRIES + 1
+    assert all(m.get("parse_mode") == "HTML" for m in sent)
+
+    sent.clear()
+    failures[:] = [BadRequest("Chat not found")]
+    await channel.send(msg)
+    assert len(sent) == 1
+
+
+async def test_channel_dispatch_inbound_keeps_chat_order_behind_media() -> None:
+    class _Channel(BaseChannel):
+        name = "test"
+
+        async def start(self) -> None: ...
+
+        async def stop(self) -> None: ...
+
+        async def send(self, msg: OutboundMessage) -> None: ...
+
+    bus = MessageBus()
+    channel = _Channel(SimpleNamespace(), bus)
+    gate = asyncio.Event()
+
+    def fields(chat_id: str, content: str) -> dict[str, Any]:
+        return {"sender_id": "u", "chat_id": chat_id, "content": content}
+
+    async def slow_media() -> dict[str, Any]:
+        await gate.wait()
+        return fields("c1", "photo")
+
+    await channel._dispatch_inbound("c1", prepare=slow_media())
+    await channel._dispatch_inbound("c1", fields("c1", "after photo"))
+    await channel._dispatch_inbound("c2", fields("c2", "other chat"))
+    # The handler returned immediately; only the unrelated chat was published.
+    assert bus.inbound_size == 1
+    gate.set()
+    await asyncio.gather(*list(channel._background_tasks))
+    published = [(await bus.consume_inbound()).content for _ in range(3)]
+    assert published == ["other chat", "photo", "after photo"]
+    assert not channel._chat_tails
+
+
 async def test_exec_tool_blocks_dangerous_command(tmp_path: Path) -> None:
     tool = ExecTool(timeout=1, working_dir=str(tmp_path))
     result = await tool.execute("rm -rf /")
@@ -259,6 +626,73 @@ async def test_exec_tool_timeout_and_recovery(tmp_path: Path) -> None:
     assert "ok" in recovered
 
 
+async def test_exec_tool_kills_command_on_output_limit(tmp_path: Path) -> None:
+    tool = ExecTool(
+        timeout=10,
+        working_dir=str(tmp_path),
+        allow_host_execution=True,
+        isolation_config=ExecIsolationConfig(enabled=False),
+        max_output_bytes=200_000,
+    )
+    started = time.monotonic()
+    result = await tool.execute("yes nanobot")
+    assert time.monotonic() - started < 5
+    assert "Command killed: output limit exceeded" in result
+    assert "bytes omitted" in result
+    assert len(result) < 11_000
+
+
+async def test_exec_tool_timeout_covers_closed_output_and_kills_group(tmp_path: Path) -> None:
+    tool = ExecTool(
+        timeout=2,
+        working_dir=str(tmp_path),
+        allow_host_execution=True,
+        isolation_config=ExecIsolationConfig(enabled=False),
+    )
+    started = time.monotonic()
+    result = await tool.execute("exec >&- 2>&-; sleep 8")
+    assert time.monotonic() - started < 5
+    assert "timed out" in result
+
+    pid_file = tmp_path / "child.pid"
+    result = await tool.execute(f"sleep 30 & echo $! > {pid_file}; wait")
+    assert "timed out" in result
+    child = int(pid_file.read_text().strip())
+    await asyncio.sleep(0.2)
+    try:
+        state = Path(f"/proc/{child}/stat").read_text().split(")")[-1].split()[0]
+    except FileNotFoundError:
+        state = "gone"
+    assert state in {"gone", "Z"}
+
+
+def test_output_collector_keeps_head_and_tail() -> None:
+    collector = OutputCollector(head_bytes=4, tail_bytes=3, max_total_bytes=20)
+    assert collector.feed(b"abcdef")
+    assert collector.feed(b"ghij")
+    assert collector.text() == "abcd\n... (3 bytes omitted) ...\nhij"
+    assert not collector.feed(b"x" * 10)
+    assert collector.dropped_bytes == 13
+
+
+async def test_sandbox_marker_reader_streams_into_collector(tmp_path: Path) -> None:
+    session = BubblewrapSandboxSession("s1", tmp_path)
+    reader = asyncio.StreamReader()
+    reader.feed_data(b"x" * 50_000 + b"\nend\n__NB_DONE_T__:3\nleftover")
+    session._process = SimpleNamespace(stdout=reader)  # type: ignore[assignment]
+
+    collector = OutputCollector()
+    status = await session._read_until_marker("__NB_DONE_T__", 5, collector)
+    assert status == 3
+    assert collector.total_bytes == 50_004
+    assert collector.text().endswith("x\nend")
+    assert session._buffer == b"leftover"
+
+    limited = OutputCollector(max_total_bytes=1_000)
+    reader.feed_data(b"y" * 70_000)
+    assert await session._read_until_marker("__NB_DONE_U__", 5, limited) is None
+
+
 async def test_exec_tool_blocks_host_execution_when_disabled(tmp_path: Path) -> None:
     tool = ExecTool(
         timeout=1,
@@ -811,6 +1245,7 @@ async def test_isolation_forces_workspace_restriction(tmp_path: Path) -> None:
 class FakeSandboxSession:
     counter = 0
     by_key: dict[str, "FakeSandboxSession"] = {}
+    warm_start_gate: asyncio.Event | None = None
 
     def __init__(
         self,
@@ -825,6 +1260,7 @@ class FakeSandboxSession:
         self.workspace = workspace
         self.last_used_at = time.monotonic()
         self.active_since: float | None = None
+        self.use_count = 0
         self._preempt_reason: str | None = None
         self._hold = asyncio.Event()
         self._stopped = False
@@ -835,9 +1271,17 @@ class FakeSandboxSession:
         return self.active_since is not None
 
     async def start(self) -> None:
-        return None
+        gate = type(self).warm_start_gate
+        if gate is not None and not self.session_key:
+            await gate.wait()
 
-    async def run_command(self, command: str, cwd: str, timeout: int) -> CommandResult:
+    async def run_command(
+        self,
+        command: str,
+        cwd: str,
+        timeout: int,
+        max_output_bytes: int = 0,
+    ) -> CommandResult:
         if self._preempt_reason:
             raise SandboxPreemptedError(self._preempt_reason)
 
@@ -870,9 +1314,14 @@ class FakeSandboxSession:
         self._hold.set()
 
 
-def _build_fake_manager(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> ExecSandboxManager:
+def _build_fake_manager(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    **kwargs: Any,
+) -> ExecSandboxManager:
     FakeSandboxSession.counter = 0
     FakeSandboxSession.by_key = {}
+    FakeSandboxSession.warm_start_gate = None
 
     allowlist = MountAllowlist(allowed_roots=[tmp_path.resolve()], blocked_patterns=[])
     monkeypatch.setattr(
@@ -893,6 +1342,7 @@ def _build_fake_manager(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Exec
         idle_seconds=600,
         pressure_policy="preempt_oldest_active",
         allowlist_path=tmp_path / "allowlist.json",
+        **kwargs,
     )
 
 
@@ -998,6 +1448,104 @@ async def test_manager_drops_broken_session_after_timeout(
     await manager.aclose()
 
 
+async def test_manager_binds_warm_sandbox_and_recycles_after_budget(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    manager = _build_fake_manager(
+        monkeypatch, tmp_path, warm_pool_size=1, max_uses_per_sandbox=2
+    )
+
+    await manager.prewarm()
+    assert manager.stats()["warm"] == 1
+    warm = manager._warm[0]
+
+    await manager.execute("s1", "echo", str(workspace), timeout=3)
+    assert manager._sessions["s1"] is warm
+    assert warm.session_key == "s1"
+    assert manager.stats()["pool_hits"] == 1
+
+    await manager.execute("s1", "echo", str(workspace), timeout=3)
+    assert "s1" not in manager._sessions
+    assert warm._stopped
+    assert manager.stats()["recycled"] == 1
+
+    await asyncio.sleep(0)
+    if manager._refill_task is not None:
+        await manager._refill_task
+    assert manager.stats()["warm"] == 1
+
+    await manager.aclose()
+
+
+async def test_manager_warm_pool_respects_capacity(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    manager = _build_fake_manager(monkeypatch, tmp_path, warm_pool_size=1)
+
+    await manager.execute("s1", "echo", str(workspace), timeout=3)
+    if manager._refill_task is not None:
+        await manager._refill_task
+    assert manager.stats()["warm"] == 1
+
+    await manager.execute("s2", "echo", str(workspace), timeout=3)
+    assert set(manager._sessions) == {"s1", "s2"}
+    await manager.prewarm()
+    assert manager.stats()["warm"] == 0
+    assert manager.stats()["starts"] == 2
+
+    await manager.aclose()
+
+
+async def test_manager_inflight_prewarm_never_displaces_chat_sandbox(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    manager = _build_fake_manager(monkeypatch, tmp_path, warm_pool_size=1)
+    gate = asyncio.Event()
+    FakeSandboxSession.warm_start_gate = gate
+
+    t1 = asyncio.create_task(manager.execute("chat1", "hold", str(workspace), timeout=30))
+    await asyncio.sleep(0.05)
+    assert len(manager._warming) == 1
+
+    r2 = await manager.execute("chat2", "echo", str(workspace), timeout=3)
+    assert "chat2" in r2.output
+    assert not t1.done()
+
+    gate.set()
+    assert manager._refill_task is not None
+    await manager._refill_task
+    assert manager.stats()["bound"] == 2
+    assert manager.stats()["warm"] == 0
+
+    FakeSandboxSession.by_key["chat1"]._hold.set()
+    assert (await t1).output == "held"
+    await manager.aclose()
+
+
+async def test_manager_close_stops_inflight_warm_start(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    manager = _build_fake_manager(monkeypatch, tmp_path, warm_pool_size=1)
+    FakeSandboxSession.warm_start_gate = asyncio.Event()
+
+    manager.schedule_prewarm()
+    await asyncio.sleep(0.01)
+    inflight = FakeSandboxSession.by_key[""]
+    await manager.aclose()
+    assert inflight._stopped
+    assert not manager._warming
+
+
 async def test_bubblewrap_smoke_if_available(tmp_path: Path) -> None:
     if platform.system() != "Linux" or shutil.which("bwrap") is None or os.geteuid() == 0:
         pytest.skip("requires non-root Linux with bubblewrap")
@@ -1022,3 +1570,1119 @@ async def test_bubblewrap_smoke_if_available(tmp_path: Path) -> None:
     result = await manager.execute("smoke", "pwd", str(workspace), timeout=5)
     assert "/workspace" in result.output
     await manager.aclose()
+
+
+def test_web_cache_freshness_and_query_normalization() -> None:
+    assert freshness_ttl({"cache-control": "public, max-age=120"}, 300) == 120
+    assert freshness_ttl({"cache-control": "no-cache"}, 300) == 0
+    assert freshness_ttl({"cache-control": "no-store, max-age=60"}, 300) is None
+    assert freshness_ttl({"expires": "Thu, 01 Jan 1970 00:00:00 GMT"}, 300) == 0
+    assert freshness_ttl({}, 300) == 300
+    assert normalize_query("  Python   ASYNCIO\tTips ") == "python asyncio tips"
+
+
+def test_web_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = WebCache(tmp_path / "web.db", max_bytes=1024 * 1024)
+    blob = b"x" * 60_000
+    cache.put("http", "keep", blob, ttl_seconds=60)
+    cache.put("http", "old", blob, ttl_seconds=60)
+    for i in range(20):
+        assert cache.get("http", "keep") is not None
+        cache.put("http", f"k{i}", blob, ttl_seconds=60)
+
+    assert cache.get("http", "keep") is not None
+    assert cache.get("http", "old") is None
+    stats = cache.stats()
+    assert stats["bytes"] <= cache.max_bytes
+    assert stats["evicted"] > 0
+    assert not cache.put("http", "huge", b"x" * (cache.max_entry_bytes + 1), ttl_seconds=60)
+    cache.close()
+
+
+async def test_web_fetch_revalidates_stale_entry_with_etag(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    cache = WebCache(tmp_path / "web.db")
+    tool = WebFetchTool(api_key="", cache=cache)
+    url = "https://example.com/page"
+    sent: list[dict[str, str]] = []
+
+    async def _fake_get(self: WebFetchTool, target: str, headers: dict[str, str]) -> httpx.Response:
+        sent.append(dict(headers))
+        request = httpx.Request("GET", target)
+        if headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"cache-control": "max-age=60"}, request=request)
+        return httpx.Response(
+            200,
+            headers={"etag": '"v1"', "cache-control": "no-cache", "content-type": "text/plain"},
+            content=b"hello cache",
+            request=request,
+        )
+
+    monkeypatch.setattr(WebFetchTool, "_get_following_redirects", _fake_get)
+
+    first = json.loads(await tool.execute(url=url))
+    second = json.loads(await tool.execute(url=url))
+    third = json.loads(await tool.execute(url=url))
+
+    assert first["text"] == second["text"] == third["text"] == "hello cache"
+    assert sent == [{}, {"If-None-Match": '"v1"'}]
+    stats = cache.stats()["namespaces"]
+    assert stats["http"]["revalidated"] == 1
+    assert stats["extract"]["hit"] == 1
+    cache.close()
+
+
+async def test_deep_research_fans_out_and_stops_at_target_sources(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    import nanobot.agent.tools.web as web_module
+
+    async def _fake_search(api_key: str, payload: dict[str, Any], **kwargs: Any) -> dict[str, Any]:
+        query = payload["query"]
+        if query == "rust":
+            return {
+                "answer": "primary",
+                "results": [
+                    {"title": "Rust Async Runtime", "url": "https://a.example/1"},
+                    {"title": "Tokio Scheduler Design", "url": "https://a.example/2"},
+                ],
+            }
+        if query == "Tokio Scheduler Design":
+            await asyncio.sleep(10)
+        return {
+            "results": [{"title": f"r{i}", "url": f"https://b.example/{i}"} for i in range(5)]
+        }
+
+    async def _fake_extract(api_key: str, url: str, **kwargs: Any) -> str | None:
+        await asyncio.sleep(0.2)
+        return f"body of {url}"
+
+    monkeypatch.setattr(web_module, "_tavily_search", _fake_search)
+    monkeypatch.setattr(web_module, "_tavily_extract", _fake_extract)
+    tool = web_module.DeepResearchTool(api_key="k", target_sources=6, extract_top=3)
+
+    started = time.monotonic()
+    report = await tool.execute(query="rust")
+    assert time.monotonic() - started < 2
+    assert "[rust] primary" in report
+    assert "## Sources (7 results)" in report
+    assert report.count("body of https://") == 3
+    assert "follow-ups" in report and "(1/2 queries)" in report
+    assert "extract" in report and "(3/3 pages)" in report
+
+
+def test_group_directory_indexes_groups_incrementally(tmp_path: Path) -> None:
+    sessions = tmp_path / "sessions"
+    sessions.mkdir()
+    (sessions / "whatsapp_111-1@g.us.jsonl").write_text("{}\n")
+    directory = GroupDirectory(tmp_path / "groups.db")
+    assert directory.backfill_once(tmp_path) == 1
+    assert directory.backfill_once(tmp_path) == 0
+
+    assert directory.record_seen("222-2@g.us")
+    assert not directory.record_seen("222-2@g.us")
+    assert not directory.record_seen("someone@s.whatsapp.net")
+    assert sorted(directory.stale_subject_ids()) == ["111-1@g.us", "222-2@g.us"]
+
+    directory.update_subjects({"222-2@g.us": "Finanzgruppe"})
+    assert directory.stale_subject_ids() == ["111-1@g.us"]
+    assert directory.entries()["222-2@g.us"].subject == "Finanzgruppe"
+    directory.close()
+
+
+def test_policy_list_groups_answers_from_directory_without_bridge(tmp_path: Path) -> None:
+    directory = GroupDirectory(tmp_path / "groups.db")
+    directory.record_seen("111-1@g.us")
+    directory.record_seen("222-2@g.us")
+    directory.update_subjects({"222-2@g.us": "Finanzgruppe"})
+    requested: list[list[str]] = []
+    directory.set_refresh_hook(requested.append)
+
+    def _blocking_resolver(ids: list[str]) -> dict[str, str]:
+        raise AssertionError("bridge must not be queried inline")
+
+    service = PolicyAdminService(
+        policy_path=tmp_path / "policy.json",
+        workspace=tmp_path,
+        known_tools=set(),
+        apply_channels={"whatsapp"},
+        group_subject_resolver=_blocking_resolver,
+        group_directory=directory,
+    )
+    actor = PolicyActorContext(
+        source="cli",
+        channel="cli",
+        chat_id="local",
+        sender_id="owner",
+        is_group=False,
+        is_owner=True,
+    )
+    listed = service.execute_from_text("/policy list-groups", actor=actor)
+    assert "222-2@g.us | seen+bridge | Finanzgruppe" in listed.message
+    assert requested == [["111-1@g.us"]]
+    assert service.resolve_group_reference("finanzgruppe") == ("222-2@g.us", None)
+    directory.close()
+
+
+def test_policy_audit_store_imports_jsonl_and_reads_by_index(tmp_path: Path) -> None:
+    store = PolicyAuditStore(tmp_path / "policy.json")
+    assert store.read_recent(5) == []
+    assert not store.db_path.exists()
+
+    store.legacy_history_path.parent.mkdir(parents=True)
+    legacy = [
+        {"id": f"c{i}", "timestamp": f"t{i}", "command_raw": f"/policy x {i}", "result": "applied"}
+        for i in range(50)
+    ]
+    store.legacy_history_path.write_text(
+        "\n".join(json.dumps(row) for row in legacy) + "\nnot json\n", encoding="utf-8"
+    )
+    assert [e.id for e in store.read_recent(3)] == ["c49", "c48", "c47"]
+
+    store.append(
+        PolicyAuditEntry(
+            id="new",
+            timestamp="t-new",
+            actor_source="cli",
+            actor_id="owner",
+            channel="cli",
+            chat_id="local",
+            command_raw="/policy allow-group x",
+            dry_run=True,
+            result="applied",
+            before_hash="a",
+            after_hash="b",
+            backup_ref="backups/new.json",
+        )
+    )
+    assert store.read_recent(1)[0].id == "new"
+    found = store.find("c7")
+    assert found is not None and found.command_raw == "/policy x 7"
+    assert store.find("new").dry_run  # type: ignore[union-attr]
+    assert store.find("missing") is None
+    store.close()
+
+    reopened = PolicyAuditStore(tmp_path / "policy.json")
+    assert len(reopened.read_recent(100)) == 51
+    reopened.close()
+
+
+def test_runtime_imports_defer_heavy_dependencies() -> None:
+    import subprocess
+    import sys
+
+    from nanobot.utils.importtime import parse_import_times
+
+    probe = (
+        "import sys, nanobot.app.bootstrap, nanobot.cli.commands; "
+        "print(','.join(m for m in ('litellm', 'telegram', 'websockets') if m in sys.modules))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", probe], capture_output=True, text=True, check=True, timeout=60
+    )
+    assert proc.stdout.strip() == ""
+
+    sample = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     json.decoder\n"
+        "import time:       300 |        420 |   json\n"
+    )
+    rows = parse_import_times(sample)
+    assert [(r.module, r.self_us, r.cumulative_us, r.depth) for r in rows] == [
+        ("json.decoder", 120, 120, 2),
+        ("json", 300, 420, 1),
+    ]
+
+
+async def test_whatsapp_v3_batches_inbound_and_falls_back_to_inline_media(tmp_path: Path) -> None:
+    config = WhatsAppConfig(
+        bridge_token="t", media=WhatsAppMediaConfig(outgoing_dir=str(tmp_path))
+    )
+    channel = WhatsAppChannel(
+        config, MessageBus(), media_pipeline=MediaPipeline(incoming_root=tmp_path / "in")
+    )
+    channel._protocol_version = 3
+    frames: list[str | bytes] = []
+    inline_bodies: list[bytes] = []
+
+    class _Bridge:
+        async def send(self, frame: str | bytes) -> None:
+            frames.append(frame)
+            if isinstance(frame, str):
+                envelope = json.loads(frame)
+                result = {
+                    "ok": False,
+                    "error": {"code": "ERR_SCHEMA", "message": "mediaPath must be under root"},
+                }
+            else:
+                _, version, _, header_len = BINARY_FRAME_PREFIX.unpack_from(frame)
+                assert version == 3
+                start = BINARY_FRAME_PREFIX.size
+                envelope = json.loads(frame[start : start + header_len])
+                assert envelope["payload"]["mediaInline"] is True
+                assert "mediaPath" not in envelope["payload"]
+                inline_bodies.append(frame[start + header_len :])
+                result = {"ok": True, "result": {"sent": True}}
+            asyncio.get_running_loop().call_soon(
+                channel._resolve_pending, envelope["requestId"], result
+            )
+
+    channel._ws = _Bridge()
+    voice = tmp_path / "note.ogg"
+    voice.write_bytes(b"\x00OggS" * 100)
+    payload = {"to": "1@s.whatsapp.net", "mediaPath": str(voice), "mimeType": "audio/ogg"}
+    await channel._send_media(voice, payload)
+    await channel._send_media(voice, payload)
+
+    # One rejected path handoff, then the connection stays on binary frames.
+    assert [isinstance(f, bytes) for f in frames] == [False, True, True]
+    assert inline_bodies == [voice.read_bytes()] * 2
+
+    ingested: list[str] = []
+
+    async def _ingest(event: Any) -> None:
+        ingested.append(event.text)
+
+    channel._ingest_inbound_event = _ingest  # type: ignore[method-assign]
+    fields = ["messageId", "chatJid", "senderId", "text", "media"]
+    rows = [[f"m{i}", "1@s.whatsapp.net", "1@s.whatsapp.net", f"hi {i}", None] for i in range(3)]
+    await channel._handle_bridge_message(
+        json.dumps(
+            {"version": 3, "type": "message_batch", "payload": {"fields": fields, "rows": rows}}
+        )
+    )
+    await asyncio.gather(*channel._inbound_tasks)
+    assert sorted(ingested) == ["hi 0", "hi 1", "hi 2"]
+
+
+async def test_whatsapp_coalesces_group_chatter_per_sender_and_flushes_on_mention(
+    tmp_path: Path,
+) -> None:
+    config = WhatsAppConfig(bridge_token="t", debounce_ms=30, debounce_max_ms=300)
+    channel = WhatsAppChannel(
+        config, MessageBus(), media_pipeline=MediaPipeline(incoming_root=tmp_path)
+    )
+    published: list[Any] = []
+
+    async def _publish(event: Any) -> None:
+        published.append(event)
+
+    channel._publish_event = _publish  # type: ignore[method-assign]
+
+    def _event(i: int, chat: str, sender: str, **kw: Any) -> Any:
+        fields = {"messageId": f"m{i}", "chatJid": chat, "senderId": sender, "text": f"t{i}"}
+        return channel._parse_inbound_event({**fields, **kw})
+
+    group = "120363@g.us"
+    for i, sender in enumerate(["a@s", "b@s", "a@s"]):
+        await channel._ingest_inbound_event(_event(i, group, sender, isGroup=True))
+    await channel._ingest_inbound_event(_event(3, "dm@s", "dm@s"))
+    # The DM is not debounced; the group chatter is still pending.
+    assert [e.message_id for e in published] == ["m3"]
+
+    await asyncio.sleep(0.4)
+    # Senders never share a turn, so policy still sees who said what.
+    by_sender = {e.sender_id: e for e in published[1:]}
+    assert len(published) == 3
+    assert by_sender["a@s"].coalesced == 2 and by_sender["a@s"].text == "t0\nt2"
+    assert by_sender["b@s"].coalesced == 1 and by_sender["b@s"].text == "t1"
+
+    await channel._ingest_inbound_event(_event(4, group, "b@s", isGroup=True))
+    await channel._ingest_inbound_event(_event(5, group, "a@s", isGroup=True))
+    await channel._ingest_inbound_event(
+        _event(6, group, "a@s", isGroup=True, mentionedBot=True)
+    )
+    mention = published[3]
+    assert mention.sender_id == "a@s" and mention.coalesced == 2 and mention.mentioned_bot
+    assert "t4" not in mention.text
+    assert channel.coalescer is not None
+    assert channel.coalescer.stats()["pending_items"] == 1  # b@s still waits
+    await channel.coalescer.close()
+
+
+async def test_orchestrator_uses_configured_empty_dedupe_set(tmp_path: Path) -> None:
+    from nanobot.utils.ttl_set import TTLSet
+
+    configured = TTLSet(60, max_entries=10, db_path=tmp_path / "dedupe.db")
+    assert len(configured) == 0
+    orchestrator = Orchestrator(
+        policy=_AllowPolicy(),
+        responder=_CaptureResponder(),
+        reply_archive=None,
+        reply_context_window_limit=6,
+        reply_context_line_max_chars=256,
+        message_dedupe=configured,
+    )
+    assert orchestrator._recent_message_keys is configured
+    event = InboundEvent(
+        channel="telegram", chat_id="1", sender_id="u1", content="hi", message_id="m1"
+    )
+    await orchestrator.handle(event)
+    assert len(configured) == 1
+    configured.close()
+
+
+def test_ttl_set_expires_in_order_evicts_oldest_and_reloads(tmp_path: Path) -> None:
+    from nanobot.utils.ttl_set import TTLSet
+
+    now = [1000.0]
+    db = tmp_path / "dedupe.db"
+    seen = TTLSet(10, max_entries=3, db_path=db, clock=lambda: now[0])
+    assert not seen.seen("a")
+    assert seen.seen("a")
+    now[0] += 5
+    assert not seen.seen("b") and not seen.seen("c")
+    now[0] += 6  # "a" expired, "b" and "c" still live
+    assert "a" not in seen and "b" in seen
+    assert not seen.seen("d") and not seen.seen("e")  # full: "b" is evicted early
+    assert "b" not in seen and "c" in seen
+    assert seen.stats() | {"persistent": None} == {
+        "entries": 3,
+        "max_entries": 3,
+        "hits": 1,
+        "inserts": 5,
+        "expired": 1,
+        "evicted": 1,
+        "persistent": None,
+    }
+    seen.close()
+
+    reopened = TTLSet(10, max_entries=3, db_path=db, clock=lambda: now[0])
+    assert reopened.seen("d") and reopened.seen("c")
+    now[0] += 5
+    assert "c" not in reopened and "e" in reopened
+    reopened.close()
+
+
+async def test_history_builder_packs_budget_clips_and_summarizes() -> None:
+    from nanobot.session import HistoryBuilder, Session
+    from nanobot.session.history import SUMMARY_METADATA_KEY, estimate_tokens
+
+    calls: list[tuple[str, int]] = []
+    saved: list[str] = []
+
+    async def _summarize(previous: str, turns: list[dict[str, Any]]) -> str:
+        calls.append((previous, len(turns)))
+        return f"summary of {len(turns)} turns"
+
+    session = Session(key="whatsapp:g")
+    for i in range(20):
+        session.add_message("user" if i % 2 == 0 else "assistant", f"turn {i} " + "x" * 36)
+    session.add_message("user", "log line\n" * 2000)
+    builder = HistoryBuilder(
+        max_tokens=200,
+        max_message_tokens=60,
+        summarize=_summarize,
+        on_summary=lambda s: saved.append(s.key),
+    )
+
+    history = builder.build(session)
+    assert history[-1]["content"].startswith("log line")
+    assert "chars omitted" in history[-1]["content"]
+    assert sum(estimate_tokens(m["content"]) + 4 for m in history) <= 200
+    kept = len(history)
+    assert 1 < kept < 21
+    assert session.message_tokens()[-1] == estimate_tokens("log line\n" * 2000)
+
+    await asyncio.sleep(0)
+    assert calls == [("", 21 - kept)] and saved == ["whatsapp:g"]
+    assert session.metadata[SUMMARY_METADATA_KEY]["through"] == 21 - kept
+
+    history = builder.build(session)
+    assert history[0] == {
+        "role": "system",
+        "content": f"Summary of earlier conversation:\nsummary of {21 - kept} turns",
+    }
+    assert builder.stats()["summaries"] == 1
+    session.clear()
+    assert builder.build(session) == []
+
+
+async def test_history_summary_is_batched_and_skips_error_responses(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from nanobot.session import HistoryBuilder, Session
+    from nanobot.session.history import SUMMARY_METADATA_KEY
+
+    batches: list[int] = []
+
+    async def _summarize(previous: str, turns: list[dict[str, Any]]) -> str:
+        batches.append(len(turns))
+        return f"{previous} +{len(turns)}".strip()
+
+    session = Session(key="whatsapp:g")
+    for i in range(100):
+        session.add_message("user", f"turn {i}")
+    builder = HistoryBuilder(max_messages=5, max_summary_batch=30, summarize=_summarize)
+    builder.build(session)
+    await builder._inflight["whatsapp:g"]
+    assert batches == [30, 30, 30, 5]
+    assert session.metadata[SUMMARY_METADATA_KEY] == {"text": "+30 +30 +30 +5", "through": 95}
+
+    class _FailingProvider(LLMProvider):
+        async def chat(self, messages: list[dict[str, Any]], **_: Any) -> LLMResponse:
+            return LLMResponse(content="Sorry, something went wrong.", finish_reason="error")
+
+        def get_default_model(self) -> str:
+            return "dummy/model"
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    responder = LLMResponder(bus=MessageBus(), provider=_FailingProvider(), workspace=tmp_path)
+    assert await responder._summarize_history("", [{"role": "user", "content": "hi"}]) is None
+    await responder.aclose()
+
+
+async def test_responder_compacts_older_tool_results_and_serves_handles(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    workspace = tmp_path / "ws"
+    workspace.mkdir()
+    big = workspace / "big.log"
+    big.write_text("".join(f"line {i:05d}\n" for i in range(5000)))
+    seen: list[list[dict[str, Any]]] = []
+    tool_names: list[set[str]] = []
+
+    class _Provider(LLMProvider):
+        async def chat(self, messages: list[dict[str, Any]], tools: Any = None, **_: Any) -> Any:
+            seen.append([dict(m) for m in messages])
+            tool_names.append({t["function"]["name"] for t in tools or []})
+            step = len(seen)
+            if step <= 2:
+                call = ToolCallRequest(f"t{step}", "read_file", {"path": str(big)})
+            elif step == 3:
+                call = ToolCallRequest("t3", "tool_result", {"handle": "r1", "offset": 2000})
+            else:
+                return LLMResponse(content="done")
+            return LLMResponse(content=None, tool_calls=[call])
+
+        def get_default_model(self) -> str:
+            return "dummy/model"
+
+    metrics: dict[tuple[str, tuple[tuple[str, str], ...]], int] = {}
+
+    class _Telemetry:
+        def incr(self, name: str, value: int = 1, labels: Any = ()) -> None:
+            metrics[(name, tuple(labels))] = metrics.get((name, tuple(labels)), 0) + value
+
+    responder = LLMResponder(
+        bus=MessageBus(),
+        provider=_Provider(),
+        workspace=workspace,
+        telemetry=_Telemetry(),  # type: ignore[arg-type]
+    )
+    assert await responder.process_direct("summarize the log") == "done"
+    await responder.aclose()
+
+    full = big.read_text()
+    assert seen[1][-1]["content"] == full  # latest result is complete
+    assert "tool_result" not in tool_names[1]
+    # By the third call the first read is shortened; the second is still whole.
+    first, second = [m for m in seen[2] if m["role"] == "tool"]
+    assert first["content"].startswith(full[:2000]) and 'handle="r1"' in first["content"]
+    assert len(first["content"]) < 2200 and second["content"] == full
+    assert "tool_result" in tool_names[2]
+    assert seen[3][-1]["content"].startswith(full[2000:6000])
+    assert metrics[("llm_calls", (("iteration", "4"),))] == 1
+    assert metrics[("llm_prompt_tokens", (("iteration", "2"),))] > len(full) // 4
+    assert metrics[("tool_results_compacted", ())] == 2
+
+
+async def test_inline_image_cache_encodes_once_per_content_and_model_limit(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from nanobot.agent.context import ContextBuilder
+    from nanobot.media.inline_images import PILLOW_AVAILABLE, InlineImageCache
+
+    cache = InlineImageCache(model_max_pixels={"openai/*": 500, "openai/gpt-4o*": 2000})
+    assert cache.pixel_limit("openai/gpt-4o-mini") == 2000
+    assert cache.pixel_limit("openai/o3") == 500
+    assert cache.pixel_limit("anthropic/claude") == cache.max_pixels
+
+    png = tmp_path / "a.png"
+    png.write_bytes(b"\x89PNG\r\n\x1a\nnot-really-a-png")
+    copy = tmp_path / "copy.png"
+    copy.write_bytes(png.read_bytes())
+    (tmp_path / "notes.txt").write_text("hi")
+
+    paths = [str(png), str(copy), str(tmp_path / "notes.txt"), str(tmp_path / "gone.png")]
+    parts = await cache.image_parts(paths, model="anthropic/claude")
+    assert len(parts) == 2
+    assert parts[0] == parts[1]  # same content hash, encoded once
+    assert parts[0]["image_url"]["url"].startswith("data:image/png;base64,")
+    assert cache.stats()["misses"] == 1 and cache.stats()["hits"] == 1
+
+    builder = ContextBuilder(tmp_path, images=cache)
+    messages = builder.build_messages([], "look", media=[str(png)])
+    assert messages[-1]["content"][1] == parts[0]
+    assert cache.stats()["hits"] == 2
+
+    if PILLOW_AVAILABLE:
+        from PIL import Image
+
+        big = tmp_path / "big.png"
+        Image.new("RGB", (400, 300), (200, 30, 30)).save(big)
+        [part] = await cache.image_parts([str(big)], model="openai/o3")
+        assert part["image_url"]["url"].startswith("data:image/jpeg;base64,")
+        assert cache.stats()["downscaled"] == 1
+
+        monkeypatch.setattr("nanobot.media.inline_images.MAX_DECODE_PIXELS", 1000)
+        huge = tmp_path / "huge.png"
+        Image.new("RGB", (100, 100)).save(huge)
+        assert await cache.image_parts([str(huge)]) == []
+        assert cache.stats()["refused"] == 1
+
+    # Bounded by total data URL bytes; oversized entries are served but not kept.
+    small = InlineImageCache(cache_bytes=3400)
+    for i in range(10):
+        (tmp_path / f"s{i}.gif").write_bytes(bytes([i]) * 300)
+        assert small.encode(tmp_path / f"s{i}.gif", 1000) is not None
+    stats = small.stats()
+    assert stats["entries"] == 8 and stats["cache_bytes"] <= 3400
+    (tmp_path / "large.gif").write_bytes(b"x" * 600)
+    assert small.encode(tmp_path / "large.gif", 1000) is not None
+    assert small.stats()["uncached_large"] == 1 and small.stats()["entries"] == 8
+
+
+async def test_talkative_cooldown_is_deferred_and_uses_pregenerated_variants(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from dataclasses import replace
+
+    from nanobot.core.intents import SendDeferredOutboundIntent
+    from nanobot.core.models import DeferredReply
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    workspace = tmp_path / "ws"
+    workspace.mkdir()
+    prompts: list[str] = []
+
+    class _Provider(LLMProvider):
+        async def chat(self, messages: list[dict[str, Any]], **_: Any) -> LLMResponse:
+            prompts.append(str(messages[-1]["content"]))
+            if "cheeky messages" in prompts[-1]:
+                return LLMResponse(content="1. take five\n2. breathe\n- go outside")
+            return LLMResponse(content="normal reply")
+
+        def get_default_model(self) -> str:
+            return "dummy/model"
+
+    responder = LLMResponder(bus=MessageBus(), provider=_Provider(), workspace=workspace)
+    decision = replace(
+        _AllowPolicy().evaluate(None),  # type: ignore[arg-type]
+        talkative_cooldown_enabled=True,
+        talkative_cooldown_streak_threshold=4,
+        talkative_cooldown_delay_seconds=30.0,
+        talkative_cooldown_use_llm_message=True,
+    )
+
+    def _event(i: int) -> InboundEvent:
+        return InboundEvent(
+            channel="whatsapp",
+            chat_id="g@g.us",
+            sender_id="chatty",
+            content=f"what about the football transfer rumours {i}",
+            message_id=f"m{i}",
+            is_group=True,
+        )
+
+    replies = [await responder.generate_reply(_event(i), decision) for i in range(3)]
+    assert replies == ["normal reply"] * 3
+    # Halfway to the threshold the variants were requested in the background.
+    await responder._talkative_refills["English"]
+    assert responder._talkative_variants["English"] == ["take five", "breathe", "go outside"]
+
+    reply = await asyncio.wait_for(responder.generate_reply(_event(3), decision), timeout=1)
+    assert reply == DeferredReply(text="go outside", delay_seconds=30.0)
+
+    class _DeferringResponder(ResponderPort):
+        async def generate_reply(self, event: InboundEvent, decision: PolicyDecision) -> Any:
+            return DeferredReply(text="later", delay_seconds=2.5)
+
+    orchestrator = Orchestrator(
+        policy=_AllowPolicy(),
+        responder=_DeferringResponder(),
+        reply_archive=None,
+        reply_context_window_limit=6,
+        reply_context_line_max_chars=256,
+    )
+    intents = await orchestrator.handle(_event(9))
+    [deferred] = [i for i in intents if isinstance(i, SendDeferredOutboundIntent)]
+    assert deferred.event.content == "later" and deferred.delay_seconds == 2.5
+    assert not any(isinstance(i, SendOutboundIntent) for i in intents)
+    await responder.aclose()
+
+
+async def test_talkative_variants_skip_error_responses(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from nanobot.providers.resilience import FAILURE_MESSAGE
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+    class _FailingProvider(LLMProvider):
+        async def chat(self, messages: list[dict[str, Any]], **_: Any) -> LLMResponse:
+            return LLMResponse(content=FAILURE_MESSAGE, finish_reason="error")
+
+        def get_default_model(self) -> str:
+            return "dummy/model"
+
+    responder = LLMResponder(bus=MessageBus(), provider=_FailingProvider(), workspace=tmp_path)
+    assert await responder._generate_talkative_variants_llm("English") == []
+    responder._warm_talkative_variants("English")
+    await responder._talkative_refills["English"]
+    assert responder._talkative_variants["English"] == []
+    assert responder._take_talkative_variant("hello there") is None
+    await responder.aclose()
+
+
+def test_session_state_store_batches_rotates_and_clears(tmp_path: Path) -> None:
+    import gzip
+
+    from nanobot.memory.session_state import SessionStateStore
+
+    store = SessionStateStore(
+        tmp_path, max_segment_bytes=2048, max_segments=2, flush_interval_seconds=60
+    )
+    for i in range(40):
+        store.pre_write(
+            session_key="whatsapp:g@g.us",
+            channel="whatsapp",
+            chat_id="g@g.us",
+            user_message=f"turn {i} " + "x" * 80,
+            metadata={"message_id": f"m{i}"},
+        )
+        store.post_write(session_key="whatsapp:g@g.us", assistant_reply=f"reply {i}")
+    store.post_write(session_key="telegram:1", assistant_reply="hi")
+    # Nothing hits the disk until the flusher runs; then one write per session.
+    assert not list(store.state_dir.iterdir())
+    store.flush()
+    stats = store.stats()
+    assert stats["appends"] == 81 and stats["file_writes"] == 2 and stats["sessions"] == 2
+
+    for i in range(40, 80):
+        store.post_write(session_key="whatsapp:g@g.us", assistant_reply=f"reply {i} " + "y" * 80)
+        store.flush()
+    stats = store.stats()
+    assert stats["rotations"] >= 3 and stats["pruned"] >= 1 and stats["rotated_segments"] == 2
+    archives = sorted(store.state_dir.glob("whatsapp_g@g.us.*.md.gz"))
+    assert len(archives) == 2
+    assert "reply" in gzip.decompress(archives[-1].read_bytes()).decode()
+    active = store.read("whatsapp:g@g.us")
+    assert active.startswith("# Session WAL State") and "reply 79" in active
+    assert len(active.encode()) <= 2048
+
+    # Appends and stats do not wait for a flush that is busy writing.
+    with store._io_lock:
+        store.post_write(session_key="whatsapp:g@g.us", assistant_reply="during flush")
+        assert store.stats()["pending_bytes"] > 0
+    store.flush()
+    assert "during flush" in store.read("whatsapp:g@g.us")
+    stats = store.stats()
+
+    # A restarted store rebuilds the same index from one directory scan.
+    store.close()
+    reopened = SessionStateStore(tmp_path, flush_interval_seconds=0)
+    assert reopened.stats()["rotated_segments"] == 2
+    assert reopened.stats()["active_bytes"] == stats["active_bytes"]
+
+    reopened.post_write(session_key="whatsapp:g@g.us", assistant_reply="after restart")
+    assert reopened.clear("whatsapp:g@g.us") is True
+    assert sorted(p.name for p in store.state_dir.iterdir()) == ["telegram_1.md"]
+    assert reopened.stats()["rotated_segments"] == 0
+    reopened.close()
+
+
+async def test_subagent_scheduler_queues_rejects_and_cancels(tmp_path: Path) -> None:
+    from nanobot.agent.subagent import SubagentManager
+    from nanobot.agent.tools.spawn import SpawnTool
+    from nanobot.config.schema import SubagentConfig
+
+    class _GatedProvider(LLMProvider):
+        def __init__(self) -> None:
+            super().__init__(api_key=None, api_base=None)
+            self.release = asyncio.Event()
+            self.calls = 0
+
+        async def chat(self, **kwargs: Any) -> LLMResponse:
+            self.calls += 1
+            await self.release.wait()
+            return LLMResponse(
+                content="done", usage={"prompt_tokens": 100, "completion_tokens": 7}
+            )
+
+        def get_default_model(self) -> str:
+            return "test-model"
+
+    provider = _GatedProvider()
+    bus = MessageBus()
+    manager = SubagentManager(
+        provider=provider,
+        workspace=tmp_path,
+        bus=bus,
+        config=SubagentConfig(max_concurrent=1, max_queued=1, max_per_chat=2),
+    )
+    tool = SpawnTool(manager)
+    tool.set_context("telegram", "1")
+
+    first = await tool.execute(task="summarize the logs")
+    second = await tool.execute(task="check the disk")
+    assert "started" in first and "queued" in second and "position 1" in second
+    assert "already has 2 background tasks" in await tool.execute(task="one more")
+    tool.set_context("telegram", "2")
+    assert "already waiting" in await tool.execute(task="other chat")
+    assert await tool.execute(action="list") == "No background tasks in this chat."
+    tool.set_context("telegram", "1")
+
+    # An interactive turn holds the running subagent's model call.
+    async with manager.interactive():
+        await asyncio.sleep(0.05)
+        assert provider.calls == 0
+    await asyncio.sleep(0.01)
+    assert provider.calls == 1
+    assert manager.stats()["interactive_waits"] == 1
+
+    listing = await tool.execute(action="list")
+    queued_id = second.split("id: ")[1].split(",")[0]
+    assert "running" in listing and f"{queued_id} [check the disk] queued" in listing
+    assert "Cancelled" in await tool.execute(action="cancel", task_id=queued_id)
+    assert "No background task" in await tool.execute(action="cancel", task_id="nope")
+
+    provider.release.set()
+    announced = await asyncio.wait_for(bus.consume_inbound(), timeout=2)
+    assert announced.sender_id == "subagent" and "done" in announced.content
+    await asyncio.sleep(0.01)
+    stats = manager.stats()
+    assert stats["completed"] == 1 and stats["cancelled"] == 1 and stats["rejected"] == 2
+    assert stats["prompt_tokens"] == 100 and stats["completion_tokens"] == 7
+    assert stats["running"] == 0 and stats["queued"] == 0 and provider.calls == 1
+    await manager.aclose()
+
+
+async def test_litellm_first_import_runs_off_the_event_loop(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    import threading
+
+    import nanobot.providers.litellm_provider as module
+
+    loader_threads: list[str] = []
+
+    async def _acompletion(**kwargs: Any) -> Any:
+        message = SimpleNamespace(content=f"from {kwargs['model']}", tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason=None)])
+
+    fake = SimpleNamespace(acompletion=_acompletion, api_base=None)
+
+    def _load() -> Any:
+        loader_threads.append(threading.current_thread().name)
+        module._litellm = fake  # type: ignore[assignment]
+        return fake
+
+    monkeypatch.setattr(module, "_litellm", None)
+    monkeypatch.setattr(module, "_load_litellm", _load)
+    provider = module.LiteLLMProvider(default_model="openai/gpt-4o")
+    messages = [{"role": "user", "content": "hi"}]
+    for _ in range(2):
+        response = await provider.complete(messages)
+        assert response.content and response.content.startswith("from ")
+    assert len(loader_threads) == 1
+    assert loader_threads[0] != threading.current_thread().name
+
+
+async def test_resilient_provider_retries_fails_over_and_hedges() -> None:
+    from nanobot.providers.resilience import (
+        FAILURE_MESSAGE,
+        ProviderRoute,
+        ResilientProvider,
+        is_retryable,
+    )
+
+    class RateLimitError(Exception):
+        pass
+
+    class _Status(Exception):
+        def __init__(self, status_code: int) -> None:
+            self.status_code = status_code
+
+    assert is_retryable(TimeoutError()) and is_retryable(RateLimitError("slow down"))
+    assert is_retryable(_Status(503)) and is_retryable(_Status(429))
+    assert not is_retryable(_Status(401)) and not is_retryable(ValueError("bug"))
+    assert LLMResponse(content=FAILURE_MESSAGE, finish_reason="error").is_error
+
+    class _ScriptedProvider(LLMProvider):
+        def __init__(self, name: str, delay: float = 0.0) -> None:
+            super().__init__(api_key=None, api_base=None)
+            self.name = name
+            self.delay = delay
+            self.fail_with: Exception | None = None
+            self.calls = 0
+
+        async def chat(self, **kwargs: Any) -> LLMResponse:
+            self.calls += 1
+            await asyncio.sleep(self.delay)
+            if self.fail_with is not None:
+                raise self.fail_with
+            return LLMResponse(content=f"from {self.name}")
+
+        def get_default_model(self) -> str:
+            return self.name
+
+    primary = _ScriptedProvider("primary")
+    backup = _ScriptedProvider("backup")
+    provider = ResilientProvider(
+        [
+            ProviderRoute("primary", primary, "primary", timeout_seconds=0.05),
+            ProviderRoute("backup", backup, "backup", timeout_seconds=1.0),
+        ],
+        retries=1,
+        retry_base_delay=0.0,
+        failure_threshold=3,
+        reset_seconds=60,
+    )
+    messages = [{"role": "user", "content": "hi"}]
+
+    # Timeouts are retried, then the fallback answers.
+    primary.delay = 0.2
+    assert (await provider.chat(messages)).content == "from backup"
+    assert primary.calls == 2
+    # The third consecutive timeout opens the breaker; primary is then skipped.
+    assert (await provider.chat(messages)).content == "from backup"
+    assert provider.stats()["routes"]["primary"]["state"] == "open"
+    calls = primary.calls
+    assert (await provider.chat(messages)).content == "from backup"
+    assert primary.calls == calls
+
+    # Non-retryable errors go straight to the next route; total failure is not leaked.
+    class _BadRequest(Exception):
+        status_code = 400
+
+    backup.fail_with = _BadRequest("context window exceeded: secret details")
+    response = await provider.chat(messages)
+    assert response.content == FAILURE_MESSAGE and response.finish_reason == "error"
+    assert backup.calls == 4
+
+    # Hedging: once p95 is known, a slow primary is raced against the fallback.
+    fast = _ScriptedProvider("fast", delay=0.001)
+    spare = _ScriptedProvider("spare")
+    hedged = ResilientProvider(
+        [
+            ProviderRoute("fast", fast, "fast", timeout_seconds=1.0),
+            ProviderRoute("spare", spare, "spare", timeout_seconds=1.0),
+        ],
+        hedge=True,
+        hedge_min_delay=0.01,
+    )
+    for _ in range(20):
+        assert (await hedged.chat(messages)).content == "from fast"
+    assert spare.calls == 0
+    fast.delay = 0.5
+    assert (await hedged.chat(messages)).content == "from spare"
+    stats = hedged.stats()
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+    assert stats["routes"]["fast"]["calls"] == 20  # the losing request was cancelled
+
+
+async def test_llm_response_cache_serves_opted_in_routes(tmp_path: Path) -> None:
+    from nanobot.config.schema import Config
+    from nanobot.media.router import ModelRouter
+    from nanobot.providers.cached import CachedProvider
+    from nanobot.providers.factory import ProviderFactory
+    from nanobot.storage.llm_cache import LLMResponseCache, request_key
+
+    class _CountingProvider(LLMProvider):
+        def __init__(self) -> None:
+            super().__init__(api_key=None, api_base=None)
+            self.calls = 0
+
+        async def chat(self, **kwargs: Any) -> LLMResponse:
+            self.calls += 1
+            if kwargs["messages"][0]["content"] == "fail":
+                return LLMResponse(content="Error calling LLM: boom", finish_reason="error")
+            return LLMResponse(
+                content="a cat",
+                tool_calls=[ToolCallRequest(id="t1", name="noop", arguments={"x": 1})],
+            )
+
+        def get_default_model(self) -> str:
+            return "vision-model"
+
+    messages = [{"role": "user", "content": "describe"}]
+    assert request_key(model="m", messages=messages, temperature=0.1) == request_key(
+        model="m", messages=[{"content": "describe", "role": "user"}], temperature=0.1
+    )
+    assert request_key(model="m", messages=messages, temperature=0.1) != request_key(
+        model="m", messages=messages, temperature=0.2
+    )
+
+    db_path = tmp_path / "llm.db"
+    cache = LLMResponseCache(db_path, route_ttls={"vision.describe_image": 60})
+    inner = _CountingProvider()
+    factory = ProviderFactory(config=Config(), response_cache=cache)
+    assert factory.cached(inner, "assistant.reply") is inner
+    cached = factory.cached(inner, "vision.describe_image")
+    assert isinstance(cached, CachedProvider)
+
+    first = await cached.chat(messages=messages, temperature=0.1)
+    second = await cached.chat(messages=messages, temperature=0.1)
+    assert inner.calls == 1 and second.content == "a cat"
+    assert second.tool_calls[0].arguments == {"x": 1}
+    await cached.chat(messages=[{"role": "user", "content": "fail"}], temperature=0.1)
+    await cached.chat(messages=[{"role": "user", "content": "fail"}], temperature=0.1)
+    assert inner.calls == 3  # errors are not cached
+    assert first.content == second.content
+
+    stats = cache.stats()["routes"]["vision.describe_image"]
+    assert stats["hit"] == 1 and stats["miss"] == 3 and stats["store"] == 1
+    cache.close()
+
+    # Entries survive a restart; routed vision providers are wrapped by route key.
+    reopened = LLMResponseCache(db_path, route_ttls={"vision.describe_image": 60})
+    assert reopened.stats()["entries"] == 1
+    profile = ModelRouter(Config().models).resolve("vision.describe_image")
+    provider = ProviderFactory(config=Config(), response_cache=reopened).create_chat_provider(
+        "vision-model", route_key=profile.route_key
+    )
+    assert isinstance(provider, CachedProvider)
+    reopened.close()
+
+
+async def test_policy_reload_runs_in_background_and_recompiles_only_changed_chats(
+    tmp_path: Path,
+) -> None:
+    import threading
+    from dataclasses import replace
+
+    from nanobot.adapters.policy_engine import EnginePolicyAdapter
+    from nanobot.core.models import InboundEvent
+    from nanobot.policy.engine import PolicyEngine
+    from nanobot.policy.loader import save_policy
+    from nanobot.policy.schema import ChannelPolicy, ChatPolicyOverride, PolicyConfig
+
+    policy = PolicyConfig()
+    chats = {f"{i}-1@g.us": ChatPolicyOverride(persona_file=None) for i in range(5)}
+    policy.channels["whatsapp"] = ChannelPolicy(chats=chats)
+    path = tmp_path / "policy.json"
+    save_policy(policy, path)
+
+    engine = PolicyEngine(policy, tmp_path, {"whatsapp"})
+    assert engine.compile_stats["reused"] == 0
+
+    edited = policy.model_copy(deep=True)
+    edited.channels["whatsapp"].chats["3-1@g.us"].comment = "notes only"
+    assert PolicyEngine(edited, tmp_path, {"whatsapp"}, previous=engine).compile_stats == {
+        "compiled": 0,
+        "reused": 7,
+    }
+    edited.channels["whatsapp"].chats["3-1@g.us"] = ChatPolicyOverride.model_validate(
+        {"whenToReply": {"mode": "off"}}
+    )
+    rebuilt = PolicyEngine(edited, tmp_path, {"whatsapp"}, previous=engine)
+    assert rebuilt.compile_stats == {"compiled": 1, "reused": 6}
+    assert rebuilt.resolve_policy("whatsapp", "3-1@g.us").when_to_reply_mode == "off"
+
+    adapter = EnginePolicyAdapter(
+        engine=engine,
+        known_tools=set(policy.defaults.allowed_tools.tools),
+        policy_path=path,
+        reload_check_interval_seconds=0.0,
+    )
+    save_policy(edited, path)
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 1_000_000))
+    event = InboundEvent(channel="whatsapp", chat_id="3-1@g.us", sender_id="x", content="hi")
+    adapter.evaluate(event)  # schedules the reload, never compiles inline
+    assert adapter._reload_future is not None
+    adapter._reload_future.result(timeout=5)
+    assert adapter._engine is not engine
+    assert adapter._engine.resolve_policy("whatsapp", "3-1@g.us").when_to_reply_mode == "off"
+    assert adapter.stats()["reloads"] == 1 and adapter.stats()["rules_reused"] == 6
+
+    assert await adapter.aroute_admin_command(event) is None
+    slash = InboundEvent(channel="whatsapp", chat_id="3-1@g.us", sender_id="x", content="/nope")
+    result = await adapter.aroute_admin_command(slash)
+    assert result is not None and not result.response
+    assert adapter.stats()["admin_commands"] == 1
+
+    # Session commands stay on the loop thread; policy commands use the worker.
+    threads: list[str] = []
+    adapter.route_admin_command = lambda e: threads.append(  # type: ignore[method-assign]
+        threading.current_thread().name
+    )
+    for content in ("/reset", "/policy help"):
+        await adapter.aroute_admin_command(replace(slash, content=content))
+    assert threads[0] == threading.current_thread().name
+    assert threads[1].startswith("policy-admin")
+    audit = adapter._policy_admin_service._audit  # type: ignore[union-attr]
+    assert audit._connection(create=True) is not None
+    adapter.close()
+    assert audit._conn is None
+
+
+def test_inbound_archive_migrates_v1_and_queries_by_timestamp_window(tmp_path: Path) -> None:
+    import sqlite3
+
+    from nanobot.storage.inbound_archive import InboundArchive
+
+    db_path = tmp_path / "reply_context.db"
+    legacy = sqlite3.connect(db_path)
+    legacy.execute(
+        """
+        CREATE TABLE inbound_messages (
+            channel TEXT NOT NULL, chat_id TEXT NOT NULL, message_id TEXT NOT NULL,
+            participant TEXT, sender_id TEXT, text TEXT NOT NULL, timestamp INTEGER,
+            created_at TEXT NOT NULL, PRIMARY KEY (channel, chat_id, message_id)
+        )
+        """
+    )
+    legacy.executemany(
+        "INSERT INTO inbound_messages VALUES ('whatsapp', ?, ?, NULL, 's', ?, ?, ?)",
+        [
+            ("old@g.us", f"old{i}", f"old {i}", 100 + i, f"2020-01-01T00:00:0{i}+00:00")
+            for i in range(7)
+        ],
+    )
+    legacy.commit()
+    legacy.close()
+
+    archive = InboundArchive(db_path)
+    assert archive._conn.execute("PRAGMA user_version").fetchone()[0] == 2
+    assert archive.lookup_message("whatsapp", "old@g.us", "old3")["text"] == "old 3"
+    assert archive.purge_older_than(days=30, batch_size=3) == 7
+    assert archive.lookup_message("whatsapp", "old@g.us", "old3") is None
+    for i, ts in enumerate([10, 20, 20, 30]):
+        archive.record_inbound(
+            channel="whatsapp",
+            chat_id="g@g.us",
+            message_id=f"m{i}",
+            participant=None,
+            sender_id="s",
+            text=f"text {i}",
+            timestamp=ts,
+        )
+    archive.record_inbound(
+        channel="whatsapp",
+        chat_id="other@g.us",
+        message_id="m1",
+        participant=None,
+        sender_id="s",
+        text="elsewhere",
+        timestamp=20,
+    )
+
+    window = archive.lookup_messages_before("whatsapp", "g@g.us", "m3", limit=2)
+    assert [row["message_id"] for row in window] == ["m2", "m1"]
+    assert archive.lookup_messages_before("whatsapp", "g@g.us", "missing", limit=2) == []
+    hit = archive.lookup_message_any_chat("whatsapp", "m1", preferred_chat_id="g@g.us")
+    assert hit is not None and hit["text"] == "text 1"
+    assert archive.lookup_message_any_chat("whatsapp", "m1")["text"] == "elsewhere"
+    archive.close()
+    reopened = InboundArchive(db_path)
+    assert len(reopened.lookup_messages_before("whatsapp", "g@g.us", "m3", limit=10)) == 3
+    reopened.close()